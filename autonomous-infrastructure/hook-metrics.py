@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Record and report hook latency from a fixed-size ring-buffer file.
+
+The hooks source hook-metrics.sh, which times each run and calls `record` in
+the background. Samples land in ~/.claude/logs/hook_metrics.ring:
+
+- A 64-byte header followed by CAPACITY slots of 128-byte records (hook, tool,
+  start time, wall time, subprocesses, payload bytes, exit status, CRC32).
+- Writers never lock. A slot is claimed by appending one byte to a ticket file
+  opened O_APPEND: the kernel serializes appends, so the offset after the
+  write is a unique ticket, and ticket % CAPACITY is the slot. The record goes
+  in with a single pwrite. Readers skip slots whose CRC does not match, so a
+  write torn by a crash costs one sample rather than the file.
+- The ticket file is truncated once it reaches TICKET_WRAP bytes (a multiple
+  of CAPACITY, so slot order carries on); a racing writer can lose one record.
+
+`report` prints p50/p95/p99 per hook and per tool with a latency histogram
+per hook; --budget-ms exits 1 when a p95 is over budget. `bench` replays
+sample payloads through the hooks in this directory.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+RING_FILE = Path(os.environ.get(
+    'HOOK_METRICS_RING', Path.home() / '.claude' / 'logs' / 'hook_metrics.ring'))
+
+MAGIC = b'HKRB'
+VERSION = 1
+HEADER = struct.Struct('<4sIII')  # magic, version, capacity, record size
+HEADER_SIZE = 64
+# ticket, start_ns, wall_us, payload bytes, subprocesses, exit status, hook, tool
+RECORD = struct.Struct('<QQIIhh48s48s')
+CHECKSUM = struct.Struct('<I')
+RECORD_SIZE = RECORD.size + CHECKSUM.size
+CAPACITY = 8192
+TICKET_WRAP = 1 << 20
+NAME_BYTES = 48
+
+# Histogram buckets in milliseconds (upper bounds); the last bucket is open
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+BAR_WIDTH = 40
+
+
+class Sample:
+    """One timed hook run."""
+
+    __slots__ = ('ticket', 'start_ns', 'wall_us', 'payload', 'pids', 'status', 'hook', 'tool')
+
+    def __init__(self, hook: str, tool: str, start_ns: int, wall_us: int,
+                 payload: int = 0, pids: int = -1, status: int = 0, ticket: int = 0):
+        self.ticket = ticket
+        self.start_ns = start_ns
+        self.wall_us = wall_us
+        self.payload = payload
+        self.pids = pids
+        self.status = status
+        self.hook = hook
+        self.tool = tool
+
+    def pack(self) -> bytes:
+        """Fixed-size record with a trailing CRC32."""
+        body = RECORD.pack(
+            self.ticket, self.start_ns, min(self.wall_us, 0xFFFFFFFF),
+            min(self.payload, 0xFFFFFFFF), max(-1, min(self.pids, 0x7FFF)),
+            max(-0x8000, min(self.status, 0x7FFF)),
+            self.hook.encode()[:NAME_BYTES], self.tool.encode()[:NAME_BYTES])
+        return body + CHECKSUM.pack(zlib.crc32(body))
+
+    @classmethod
+    def unpack(cls, raw: bytes) -> Optional['Sample']:
+        """Decode a slot, or None if it is empty or torn."""
+        body, (crc,) = raw[:RECORD.size], CHECKSUM.unpack(raw[RECORD.size:])
+        if crc != zlib.crc32(body) or not any(body):
+            return None
+        ticket, start_ns, wall_us, payload, pids, status, hook, tool = RECORD.unpack(body)
+        return cls(hook.rstrip(b'\0').decode(errors='replace'),
+                   tool.rstrip(b'\0').decode(errors='replace'),
+                   start_ns, wall_us, payload, pids, status, ticket)
+
+
+class HookRing:
+    """Lock-free ring of hook samples shared by concurrent hook processes."""
+
+    def __init__(self, path: Path = RING_FILE, capacity: int = CAPACITY):
+        if capacity <= 0 or capacity & (capacity - 1) or TICKET_WRAP % capacity:
+            raise ValueError(f"capacity must be a power of two <= {TICKET_WRAP}")
+        self.path = Path(path)
+        self.tickets = self.path.with_name(self.path.name + '.seq')
+        self.capacity = capacity
+
+    def _create(self) -> None:
+        """Build the file under a temp name and link it in; losing the race is fine."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix='.hook_metrics.')
+        try:
+            os.write(fd, HEADER.pack(MAGIC, VERSION, self.capacity, RECORD_SIZE)
+                     .ljust(HEADER_SIZE, b'\0'))
+            os.ftruncate(fd, HEADER_SIZE + self.capacity * RECORD_SIZE)
+            os.close(fd)
+            try:
+                os.link(tmp, self.path)
+            except FileExistsError:
+                pass
+        finally:
+            os.unlink(tmp)
+
+    def _check_header(self, raw: bytes) -> int:
+        """Capacity recorded in the file, which wins over the constructor's."""
+        magic, version, capacity, size = HEADER.unpack_from(raw, 0)
+        if magic != MAGIC or version != VERSION or size != RECORD_SIZE:
+            raise ValueError(f"{self.path} is not a hook metrics ring")
+        return capacity
+
+    def _ticket(self) -> int:
+        """Unique, increasing ticket from an O_APPEND write (wraps at TICKET_WRAP)."""
+        fd = os.open(self.tickets, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, b'.')
+            ticket = os.lseek(fd, 0, os.SEEK_CUR)
+            if ticket >= TICKET_WRAP:
+                os.ftruncate(fd, 0)
+            return ticket
+        finally:
+            os.close(fd)
+
+    def append(self, sample: Sample) -> None:
+        """Write one sample into its slot."""
+        if not self.path.exists():
+            self._create()
+        fd = os.open(self.path, os.O_RDWR)
+        try:
+            capacity = self._check_header(os.pread(fd, HEADER.size, 0))
+            sample.ticket = self._ticket()
+            slot = sample.ticket % capacity
+            os.pwrite(fd, sample.pack(), HEADER_SIZE + slot * RECORD_SIZE)
+        finally:
+            os.close(fd)
+
+    def samples(self) -> List[Sample]:
+        """All intact samples, oldest first."""
+        if not self.path.exists():
+            return []
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        capacity = self._check_header(data)
+        view = memoryview(data)
+        found = []
+        for slot in range(capacity):
+            offset = HEADER_SIZE + slot * RECORD_SIZE
+            sample = Sample.unpack(bytes(view[offset:offset + RECORD_SIZE]))
+            if sample is not None:
+                found.append(sample)
+        found.sort(key=lambda s: s.start_ns)
+        return found
+
+    def ticket_count(self) -> int:
+        """Tickets issued since the last wrap (used by bench to wait for recorders)."""
+        try:
+            return self.tickets.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def clear(self) -> None:
+        """Remove the ring and its ticket file."""
+        for path in (self.path, self.tickets):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[max(1, math.ceil(len(values) * fraction)) - 1]
+
+
+def parse_since(text: str) -> float:
+    """'30m', '24h', '7d' -> seconds."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd])', text.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"expected e.g. 30m, 24h, 7d; got {text!r}")
+    return float(match.group(1)) * {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[match.group(2)]
+
+
+def summarize(samples: List[Sample]) -> Dict:
+    """Latency percentiles, subprocess and payload means for a group of samples."""
+    walls = sorted(s.wall_us / 1000.0 for s in samples)
+    pids = [s.pids for s in samples if s.pids >= 0]
+    return {
+        'count': len(walls),
+        'p50_ms': percentile(walls, 0.50),
+        'p95_ms': percentile(walls, 0.95),
+        'p99_ms': percentile(walls, 0.99),
+        'max_ms': walls[-1] if walls else 0.0,
+        'subprocesses': sum(pids) / len(pids) if pids else None,
+        'payload_bytes': sum(s.payload for s in samples) / len(samples) if samples else 0,
+        'failures': sum(1 for s in samples if s.status != 0),
+    }
+
+
+def group(samples: List[Sample]) -> Dict[str, Tuple[Dict, Dict[str, Dict]]]:
+    """{hook: (summary, {tool: summary})}."""
+    by_hook: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_hook[sample.hook].append(sample)
+    result = {}
+    for hook in sorted(by_hook):
+        by_tool: Dict[str, List[Sample]] = defaultdict(list)
+        for sample in by_hook[hook]:
+            by_tool[sample.tool].append(sample)
+        result[hook] = (summarize(by_hook[hook]),
+                        {tool: summarize(by_tool[tool]) for tool in sorted(by_tool)})
+    return result
+
+
+def histogram(samples: List[Sample]) -> List[str]:
+    """ASCII latency histogram over BUCKETS_MS."""
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for sample in samples:
+        ms = sample.wall_us / 1000.0
+        index = next((i for i, bound in enumerate(BUCKETS_MS) if ms < bound), len(BUCKETS_MS))
+        counts[index] += 1
+    top = max(counts) or 1
+    first = next((i for i, c in enumerate(counts) if c), 0)
+    last = max((i for i, c in enumerate(counts) if c), default=0)
+    lines = []
+    for i in range(first, last + 1):
+        low = BUCKETS_MS[i - 1] if i else 0
+        label = f"{low}-{BUCKETS_MS[i]}ms" if i < len(BUCKETS_MS) else f">={low}ms"
+        bar = '#' * max(1 if counts[i] else 0, round(BAR_WIDTH * counts[i] / top))
+        lines.append(f"  {label:>11} {counts[i]:>6} {bar}")
+    return lines
+
+
+def format_row(name: str, stats: Dict) -> str:
+    subprocesses = '-' if stats['subprocesses'] is None else f"{stats['subprocesses']:.1f}"
+    return (f"{name:<30} {stats['count']:>6} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+            f"{stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f} {subprocesses:>6} "
+            f"{stats['payload_bytes']:>8.0f} {stats['failures']:>5}")
+
+
+def report(samples: List[Sample], show_histogram: bool = True,
+           budget_ms: Optional[float] = None) -> Tuple[List[str], bool]:
+    """Report lines, and whether every hook's p95 is within budget."""
+    if not samples:
+        return ["No hook samples recorded."], True
+    first = time.strftime('%Y-%m-%d %H:%M', time.localtime(samples[0].start_ns / 1e9))
+    last = time.strftime('%Y-%m-%d %H:%M', time.localtime(samples[-1].start_ns / 1e9))
+    lines = [f"{len(samples)} hook runs, {first} .. {last}", "",
+             f"{'hook / tool':<30} {'runs':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+             f"{'max ms':>8} {'procs':>6} {'bytes':>8} {'fail':>5}"]
+    ok = True
+    grouped = group(samples)
+    for hook, (stats, tools) in grouped.items():
+        row = format_row(hook, stats)
+        if budget_ms is not None and stats['p95_ms'] > budget_ms:
+            row += f"  OVER BUDGET ({budget_ms:g} ms)"
+            ok = False
+        lines.append(row)
+        for tool, tool_stats in tools.items():
+            lines.append(format_row(f"  {tool}", tool_stats))
+    if show_histogram:
+        for hook in grouped:
+            lines += ["", f"{hook} wall time:"]
+            lines += histogram([s for s in samples if s.hook == hook])
+    return lines, ok
+
+
+BENCH_PAYLOADS = [
+    ('skill-recommender.sh', {'tool_name': 'Task', 'tool_input': {
+        'description': 'Debug login', 'subagent_type': 'root-cause-analyzer',
+        'prompt': 'Debug the failing login flow and also research alternatives '
+                  'to the session store design'}}),
+    ('skill-recommender.sh', {'tool_name': 'Task', 'tool_input': {
+        'description': 'Rename', 'prompt': 'rename a variable'}}),
+    ('skill-outcome-logger.sh', {'tool_name': 'Task', 'tool_input': {
+        'description': 'Implement cache', 'subagent_type': 'implementor'},
+        'tool_result': 'Implemented and tests pass'}),
+    ('skill-outcome-logger.sh', {'tool_name': 'Skill', 'tool_input': {
+        'skill': 'integrated-reasoning-v2'}, 'tool_result': 'error: failed to parse'}),
+]
+
+
+def bench(runs: int) -> List[str]:
+    """Replay BENCH_PAYLOADS through the hooks into a scratch ring and report."""
+    here = Path(__file__).resolve().parent
+    with tempfile.TemporaryDirectory() as scratch:
+        ring = HookRing(Path(scratch) / 'bench.ring')
+        env = dict(os.environ, HOOK_METRICS_RING=str(ring.path),
+                   SKILL_OUTCOMES_LOG=str(Path(scratch) / 'outcomes.jsonl'))
+        env.pop('HOOK_METRICS', None)
+        expected = 0
+        for _ in range(runs):
+            for script, payload in BENCH_PAYLOADS:
+                subprocess.run([str(here / script)], input=json.dumps(payload).encode(),
+                               env=env, stdout=subprocess.DEVNULL, check=False)
+                expected += 1
+        # recorders run detached; give the last few a moment to land
+        deadline = time.time() + 10
+        while ring.ticket_count() < expected and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.1)
+        lines, _ = report(ring.samples())
+    return [f"bench: {runs} rounds of {len(BENCH_PAYLOADS)} payloads", ""] + lines
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ring', type=Path, default=RING_FILE, help=f"Ring file (default: {RING_FILE})")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help='Append one sample (called by hook-metrics.sh)')
+    rec.add_argument('--hook', required=True)
+    rec.add_argument('--tool', default='unknown')
+    rec.add_argument('--start', required=True, help='Start time, epoch seconds')
+    rec.add_argument('--end', required=True, help='End time, epoch seconds')
+    rec.add_argument('--pids', type=int, default=-1, help='Subprocesses spawned (-1 = unknown)')
+    rec.add_argument('--bytes', type=int, default=0, help='Payload size')
+    rec.add_argument('--status', type=int, default=0, help='Hook exit status')
+
+    rep = sub.add_parser('report', help='Latency percentiles per hook and tool')
+    rep.add_argument('--since', type=parse_since, help='Only runs in the last e.g. 30m, 24h, 7d')
+    rep.add_argument('--hook', help='Only this hook')
+    rep.add_argument('--budget-ms', type=float, help='Exit 1 if any hook p95 exceeds this')
+    rep.add_argument('--no-histogram', action='store_true')
+    rep.add_argument('--json', action='store_true', help='Machine-readable summary')
+
+    sub.add_parser('clear', help='Delete recorded samples')
+
+    ben = sub.add_parser('bench', help='Time the hooks in this directory on sample payloads')
+    ben.add_argument('--runs', type=int, default=25)
+
+    args = parser.parse_args()
+    ring = HookRing(args.ring)
+
+    if args.command == 'record':
+        start = float(args.start.replace(',', '.'))
+        end = float(args.end.replace(',', '.'))
+        ring.append(Sample(args.hook, args.tool, int(start * 1e9),
+                           max(0, round((end - start) * 1e6)),
+                           args.bytes, args.pids, args.status))
+    elif args.command == 'report':
+        samples = ring.samples()
+        if args.since:
+            cutoff = (time.time() - args.since) * 1e9
+            samples = [s for s in samples if s.start_ns >= cutoff]
+        if args.hook:
+            samples = [s for s in samples if s.hook == args.hook]
+        if args.json:
+            grouped = group(samples)
+            ok = all(args.budget_ms is None or stats['p95_ms'] <= args.budget_ms
+                     for stats, _ in grouped.values())
+            print(json.dumps({hook: {**stats, 'tools': tools}
+                              for hook, (stats, tools) in grouped.items()}, indent=2))
+        else:
+            lines, ok = report(samples, not args.no_histogram, args.budget_ms)
+            print('\n'.join(lines))
+        if not ok:
+            sys.exit(1)
+    elif args.command == 'clear':
+        ring.clear()
+        print(f"Cleared {ring.path}")
+    elif args.command == 'bench':
+        print('\n'.join(bench(args.runs)))
+
+
+if __name__ == "__main__":
+    main()
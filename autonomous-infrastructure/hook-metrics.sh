@@ -0,0 +1,69 @@
+#!/bin/bash
+# Hook Metrics
+# Latency instrumentation sourced by the hooks in this directory
+# Times the hook from the point it is sourced to exit, then hands the sample
+# to hook-metrics.py in the background so recording stays off the critical path
+#
+# Usage (first line of a hook, before reading stdin):
+#   HOOK_NAME="skill-recommender"
+#   source "${BASH_SOURCE[0]%/*}/hook-metrics.sh" 2>/dev/null || true
+#
+# Set HOOK_METRICS=0 to disable, HOOK_METRICS_RING to record elsewhere
+
+# Wall clock in seconds; EPOCHREALTIME (bash 5) avoids a fork per reading
+_hook_metrics_now() {
+    if [ -n "$EPOCHREALTIME" ]; then
+        _HM_NOW="${EPOCHREALTIME/,/.}"
+    else
+        _HM_NOW=$(date +%s.%N 2>/dev/null)
+        # BSD date has no %N; no sub-second clock means nothing to record
+        [[ "$_HM_NOW" == *N ]] && _HM_NOW=""
+    fi
+}
+
+# Last PID handed out by the kernel; the delta over the hook's run bounds the
+# subprocesses it spawned (exact on an otherwise idle machine, Linux only)
+_hook_metrics_last_pid() {
+    _HM_PID=-1
+    read -r _HM_PID < /proc/sys/kernel/ns_last_pid 2>/dev/null || _HM_PID=-1
+}
+
+_hook_metrics_finish() {
+    local status=$?
+    _hook_metrics_now
+    local end="$_HM_NOW"
+    _hook_metrics_last_pid
+    local pids=-1
+    if [ "$_HM_START_PID" -ge 0 ] && [ "$_HM_PID" -ge 0 ]; then
+        pids=$(( _HM_PID - _HM_START_PID ))
+    fi
+
+    [ -z "$end" ] && return "$status"
+
+    # Tool name and payload size without spawning jq again
+    local tool="${HOOK_TOOL:-}"
+    if [ -z "$tool" ] && [[ "$INPUT" =~ \"tool_name\"[[:space:]]*:[[:space:]]*\"([^\"]*)\" ]]; then
+        tool="${BASH_REMATCH[1]}"
+    fi
+    local LC_ALL=C
+    local bytes=${#INPUT}
+
+    python3 "$_HM_DIR/hook-metrics.py" record \
+        --hook "${HOOK_NAME:-unknown}" --tool "${tool:-unknown}" \
+        --start "$_HM_START" --end "$end" --pids "$pids" \
+        --bytes "$bytes" --status "$status" \
+        </dev/null >/dev/null 2>&1 &
+    return "$status"
+}
+
+if [ "${HOOK_METRICS:-1}" != "0" ]; then
+    _HM_DIR="${BASH_SOURCE[0]%/*}"
+    [ "$_HM_DIR" = "${BASH_SOURCE[0]}" ] && _HM_DIR="."
+    _hook_metrics_last_pid
+    _HM_START_PID="$_HM_PID"
+    _hook_metrics_now
+    _HM_START="$_HM_NOW"
+    if [ -n "$_HM_START" ] && [ -f "$_HM_DIR/hook-metrics.py" ]; then
+        trap _hook_metrics_finish EXIT
+    fi
+fi
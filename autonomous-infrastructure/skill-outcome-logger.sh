@@ -3,6 +3,10 @@
 # Automatically logs task/skill outcomes to ChromaDB skill_memory collection
 # Runs as PostToolUse hook for Task and Skill tools
 
+# Latency instrumentation (see hook-metrics.sh); skipped if not installed
+HOOK_NAME="skill-outcome-logger"
+source "${BASH_SOURCE[0]%/*}/hook-metrics.sh" 2>/dev/null || true
+
 # Read JSON input from stdin
 INPUT=$(cat)
 
@@ -42,7 +46,7 @@ DOC_ID="outcome_${TASK_TYPE}_${TIMESTAMP}"
 DOC_CONTENT="Task: ${DESCRIPTION}. Type: ${TASK_TYPE}. Agent/Skill: ${AGENT_TYPE}. Success: ${SUCCESS}. Timestamp: $(date -Iseconds)"
 
 # Log to file for debugging (ChromaDB write would need Python/API)
-LOG_FILE="/home/kim/.claude/logs/skill_outcomes.jsonl"
+LOG_FILE="${SKILL_OUTCOMES_LOG:-/home/kim/.claude/logs/skill_outcomes.jsonl}"
 mkdir -p "$(dirname "$LOG_FILE")"
 
 echo "{\"id\": \"${DOC_ID}\", \"task_type\": \"${TASK_TYPE}\", \"description\": \"${DESCRIPTION}\", \"agent\": \"${AGENT_TYPE}\", \"success\": ${SUCCESS}, \"timestamp\": \"$(date -Iseconds)\"}" >> "$LOG_FILE"
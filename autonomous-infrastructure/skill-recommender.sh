@@ -3,6 +3,10 @@
 # Analyzes task descriptions and recommends relevant skills/agents
 # Runs as PreToolUse hook for Task tool
 
+# Latency instrumentation (see hook-metrics.sh); skipped if not installed
+HOOK_NAME="skill-recommender"
+source "${BASH_SOURCE[0]%/*}/hook-metrics.sh" 2>/dev/null || true
+
 # Read JSON input from stdin
 INPUT=$(cat)
 
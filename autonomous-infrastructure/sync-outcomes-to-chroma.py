@@ -7,7 +7,7 @@ Run periodically or at end of session.
 import json
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 
 # Try to import chromadb
@@ -17,6 +17,20 @@ except ImportError:
     print("chromadb not installed. Run: pip install chromadb")
     sys.exit(1)
 
+# timestamp_epoch is parsed by the chromadb-integration skill's to_epoch, so the
+# writer and temporal_retrieval.py agree (repo checkout or ~/.claude/skills install)
+for skills_root in (Path(__file__).resolve().parent.parent / "skill-frameworks",
+                    Path.home() / ".claude" / "skills"):
+    scripts_dir = skills_root / "chromadb-integration-skills" / "scripts"
+    if (scripts_dir / "temporal_retrieval.py").exists():
+        sys.path.insert(0, str(scripts_dir))
+        break
+try:
+    from temporal_retrieval import to_epoch
+except ImportError:
+    print("chromadb-integration-skills not installed. Run: scripts/install.sh")
+    sys.exit(1)
+
 LOG_FILE = Path.home() / ".claude" / "logs" / "skill_outcomes.jsonl"
 CHROMA_DIR = Path.home() / ".claude" / "chroma_data"
 SYNCED_FILE = Path.home() / ".claude" / "logs" / "skill_outcomes_synced.txt"
@@ -71,6 +85,7 @@ def main():
     metadatas = []
 
     for outcome in outcomes:
+        timestamp = outcome.get('timestamp', datetime.now(timezone.utc).isoformat())
         doc = f"Task: {outcome.get('description', 'unknown')}. Type: {outcome.get('task_type', 'unknown')}. Agent/Skill: {outcome.get('agent', 'unknown')}. Success: {outcome.get('success', False)}"
         documents.append(doc)
         ids.append(outcome['id'])
@@ -78,7 +93,8 @@ def main():
             "task_type": outcome.get('task_type', 'unknown'),
             "agent": outcome.get('agent', 'unknown'),
             "success": outcome.get('success', False),
-            "timestamp": outcome.get('timestamp', datetime.now().isoformat()),
+            "timestamp": timestamp,
+            "timestamp_epoch": to_epoch(timestamp, datetime.now(timezone.utc).timestamp()),
             "description": outcome.get('description', 'unknown')[:200]  # Truncate long descriptions
         })
 
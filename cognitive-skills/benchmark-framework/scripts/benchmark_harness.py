@@ -0,0 +1,663 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the cognitive-skills benchmark framework.
+
+Loads problem-set YAMLs (Problem Definition Schema), runs pluggable solvers for
+every experiment condition across a process pool with fixed per-run seeds, and
+computes the framework's metrics in vectorized form:
+
+- Quality score: weighted rubric score normalized 0-100
+- Efficiency: tokens/time per quality point, quality per minute
+- Calibration: Brier score and expected calibration error (ECE) of confidence
+  against correctness, plus the framework's confidence-vs-quality score
+- Sample size check against the A/B/C statistical requirements
+- Optional sequential mode (see sequential_testing.py): problems are run in
+  batches and each comparison against the baseline stops at significance or
+  futility, with the runs saved versus the fixed design reported
+
+Results are written as runs.csv (one row per run) and summary.json, so runs
+can be compared over time without re-parsing markdown reports.
+
+A solver is any importable callable `module:function` taking
+(problem, condition, seed) and returning a dict with:
+    criteria_scores    {criterion: 1-5}   (or `quality` 0-100 directly)
+    confidence         0-100 or 0-1
+    tokens             int
+    correctness        0-1
+    completeness       0-100 (optional)
+
+Usage:
+    python benchmark_harness.py run experiment.yaml --problems benchmark-problems/ \\
+        --solver my_solvers:run_pattern --workers 4 --output results/
+    python benchmark_harness.py run experiment.yaml --problems benchmark-problems/ \\
+        --solver benchmark_harness:synthetic_solver
+    python benchmark_harness.py run experiment.yaml --problems benchmark-problems/ \\
+        --solver my_solvers:run_pattern --sequential
+    python benchmark_harness.py sample-size --effect 0.5 --power 0.8
+"""
+
+import argparse
+import csv
+import importlib
+import json
+import math
+import os
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:
+    print("pyyaml not installed. Run: pip install pyyaml")
+    sys.exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+from sequential_testing import comparisons_for, positive_float
+
+CALIBRATION_BINS = 10
+DEFAULT_RUNS_PER_PROBLEM = 3
+MIN_CALIBRATION_SAMPLES = 10
+
+RUN_FIELDS = [
+    'experiment_id', 'problem_id', 'domain', 'difficulty', 'condition', 'pattern',
+    'run', 'seed', 'quality', 'confidence', 'tokens', 'execution_time_ms',
+    'correctness', 'completeness', 'tokens_per_quality_point',
+    'time_per_quality_point', 'quality_per_minute', 'error',
+]
+
+
+def load_problems(
+    problem_dir: str,
+    domain: Optional[str] = None,
+    difficulties: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Load problem definitions from a directory tree of YAML files.
+
+    Args:
+        problem_dir: Root such as benchmark-problems/ or benchmark-problems/optimization/
+        domain: Keep only problems of this domain
+        difficulties: Keep only these difficulty levels
+
+    Returns:
+        Problems sorted by problem_id (order is randomized later with the
+        experiment seed, so loading itself stays deterministic)
+    """
+    problems = []
+    root = Path(problem_dir)
+    paths = sorted(root.rglob('*.yaml')) + sorted(root.rglob('*.yml'))
+    for path in paths:
+        with open(path, 'r') as f:
+            for document in yaml.safe_load_all(f):
+                if not document:
+                    continue
+                for problem in document if isinstance(document, list) else [document]:
+                    if 'problem_id' not in problem:
+                        continue
+                    problem.setdefault('_source', str(path))
+                    problems.append(problem)
+
+    if domain:
+        problems = [p for p in problems if p.get('domain') == domain]
+    if difficulties:
+        problems = [p for p in problems if p.get('difficulty') in difficulties]
+    return sorted(problems, key=lambda p: str(p['problem_id']))
+
+
+def run_seed(base_seed: int, problem_id: str, condition: str, run: int) -> int:
+    """Stable per-run seed, independent of scheduling order and process."""
+    return zlib.crc32(f"{base_seed}:{problem_id}:{condition}:{run}".encode()) & 0x7FFFFFFF
+
+
+def resolve_solver(spec: str) -> Callable[[Dict[str, Any], Dict[str, Any], int], Dict[str, Any]]:
+    """Import a solver from a 'module:function' spec."""
+    module_name, _, function_name = spec.partition(':')
+    if not function_name:
+        raise ValueError(f"Solver spec must be 'module:function', got '{spec}'")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _execute(task: Tuple[str, Dict[str, Any], Dict[str, Any], int, int]) -> Dict[str, Any]:
+    """Worker entry point: seed everything, run the solver, time it."""
+    solver_spec, problem, condition, run, seed = task
+    random.seed(seed)
+    np.random.seed(seed)
+    started = time.perf_counter()
+    try:
+        output = resolve_solver(solver_spec)(problem, condition, seed) or {}
+        error = None
+    except Exception as e:
+        output, error = {}, f"{type(e).__name__}: {e}"
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    output.setdefault('execution_time_ms', elapsed_ms)
+    return {
+        'problem_id': problem['problem_id'],
+        'condition': condition['name'],
+        'run': run,
+        'seed': seed,
+        'output': output,
+        'error': error,
+    }
+
+
+def compute_run_metrics(problems: Dict[str, Dict[str, Any]], results: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Turn raw solver outputs into metric arrays (one element per run).
+
+    Criteria differ per problem, so rubric scores are packed into a
+    runs × criteria matrix padded with zero weight. A run with no scored
+    criteria (errored or empty output) gets NaN quality, not 0.
+    """
+    n = len(results)
+    width = max((len(p.get('evaluation_criteria', [])) for p in problems.values()), default=0) or 1
+    scores = np.ones((n, width))
+    weights = np.zeros((n, width))
+    direct_quality = np.full(n, np.nan)
+    confidence = np.full(n, np.nan)
+    tokens = np.zeros(n)
+    time_ms = np.zeros(n)
+    correctness = np.full(n, np.nan)
+    completeness = np.full(n, np.nan)
+
+    for i, result in enumerate(results):
+        output = result['output']
+        criteria = problems[result['problem_id']].get('evaluation_criteria', [])
+        given = output.get('criteria_scores') or {}
+        for j, criterion in enumerate(criteria):
+            if criterion['criterion'] in given:
+                scores[i, j] = given[criterion['criterion']]
+                weights[i, j] = criterion.get('weight', 1.0)
+        if 'quality' in output:
+            direct_quality[i] = output['quality']
+        if output.get('confidence') is not None:
+            confidence[i] = output['confidence']
+        tokens[i] = output.get('tokens', 0)
+        time_ms[i] = output.get('execution_time_ms', 0.0)
+        if output.get('correctness') is not None:
+            correctness[i] = output['correctness']
+        if output.get('completeness') is not None:
+            completeness[i] = output['completeness']
+
+    # Score is 1-5, normalize to 0-100, then weight
+    total_weight = weights.sum(axis=1)
+    rubric_quality = np.divide(
+        ((scores - 1.0) * 25.0 * weights).sum(axis=1), total_weight,
+        out=np.full(n, np.nan), where=total_weight > 0,
+    )
+    quality = np.where(np.isnan(direct_quality), rubric_quality, direct_quality)
+
+    # Confidence may be reported 0-100 or 0-1
+    confidence = np.where(confidence > 1.0, confidence / 100.0, confidence)
+
+    return {
+        'quality': quality,
+        'confidence': confidence,
+        'tokens': tokens,
+        'execution_time_ms': time_ms,
+        'correctness': correctness,
+        'completeness': completeness,
+        'tokens_per_quality_point': tokens / np.maximum(quality, 1.0),
+        'time_per_quality_point': time_ms / np.maximum(quality, 1.0),
+        'quality_per_minute': quality * 60000.0 / np.maximum(time_ms, 1.0),
+    }
+
+
+def calibration(confidence: np.ndarray, outcome: np.ndarray, bins: int = CALIBRATION_BINS) -> Dict[str, Any]:
+    """
+    Brier score and expected calibration error.
+
+    Args:
+        confidence: Predicted probability of success (0-1)
+        outcome: Observed correctness (0-1, partial credit allowed)
+        bins: Equal-width confidence bins for ECE
+
+    Returns:
+        Dict with brier, ece, per-bin reliability table and sample count
+    """
+    mask = ~(np.isnan(confidence) | np.isnan(outcome))
+    c, y = confidence[mask], outcome[mask]
+    if c.size == 0:
+        return {'n': 0, 'brier': None, 'ece': None, 'reliability': []}
+
+    index = np.minimum((c * bins).astype(int), bins - 1)
+    count = np.bincount(index, minlength=bins)
+    conf_sum = np.bincount(index, weights=c, minlength=bins)
+    acc_sum = np.bincount(index, weights=y, minlength=bins)
+    occupied = count > 0
+    mean_conf = np.divide(conf_sum, count, out=np.zeros(bins), where=occupied)
+    mean_acc = np.divide(acc_sum, count, out=np.zeros(bins), where=occupied)
+    ece = float((count / c.size * np.abs(mean_conf - mean_acc)).sum())
+
+    return {
+        'n': int(c.size),
+        'brier': float(np.mean((c - y) ** 2)),
+        'ece': ece,
+        'reliability': [
+            {'bin': f"{b / bins:.1f}-{(b + 1) / bins:.1f}", 'count': int(count[b]),
+             'mean_confidence': float(mean_conf[b]), 'accuracy': float(mean_acc[b])}
+            for b in range(bins) if occupied[b]
+        ],
+    }
+
+
+def quality_calibration_score(confidence: np.ndarray, quality: np.ndarray) -> Optional[float]:
+    """
+    The framework's confidence-vs-quality calibration score (-1 to 1, 1 is
+    perfect): bin by confidence decile, compare bin center to mean quality.
+    """
+    mask = ~(np.isnan(confidence) | np.isnan(quality))
+    if mask.sum() < MIN_CALIBRATION_SAMPLES:
+        return None
+    conf_pct, q = confidence[mask] * 100.0, quality[mask]
+    index = np.minimum((conf_pct // 10).astype(int), 9)
+    count = np.bincount(index, minlength=10)
+    occupied = count > 0
+    actual = np.bincount(index, weights=q, minlength=10)[occupied] / count[occupied]
+    expected = np.arange(10)[occupied] * 10 + 5
+    return float(1 - np.mean(np.abs(expected - actual)) / 50)
+
+
+def required_sample_size(effect_size: float = 0.5, alpha: float = 0.05, power: float = 0.80) -> int:
+    """Per-condition sample size for a two-tailed comparison (normal approximation)."""
+    z_alpha = NormalDist().inv_cdf(1 - alpha / 2)
+    z_beta = NormalDist().inv_cdf(power)
+    return int(math.ceil(2 * ((z_alpha + z_beta) / effect_size) ** 2))
+
+
+def _nanmean(values: np.ndarray) -> Optional[float]:
+    """Mean over non-NaN values, None if there are none."""
+    values = values[~np.isnan(values)]
+    return float(np.mean(values)) if values.size else None
+
+
+def summarize(metrics: Dict[str, np.ndarray], conditions: np.ndarray, baseline: Optional[str],
+              errors: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Per-condition aggregates, calibration and effect size vs baseline.
+
+    Quality statistics cover only runs that produced a quality score; errored
+    runs are counted separately instead of being scored 0.
+    """
+    if errors is None:
+        errors = np.zeros(conditions.size, dtype=bool)
+    summary = {}
+    for name in dict.fromkeys(conditions.tolist()):
+        mask = conditions == name
+        completed = mask & ~errors
+        quality = metrics['quality'][mask]
+        quality = quality[~np.isnan(quality)]
+        n = int(quality.size)
+        mean = float(np.mean(quality)) if n else None
+        std = float(np.std(quality, ddof=1)) if n > 1 else 0.0
+        summary[name] = {
+            'runs': int(mask.sum()),
+            'scored_runs': n,
+            'errors': int((mask & errors).sum()),
+            'mean_quality': mean,
+            'std_quality': std,
+            'ci95_quality': [mean - 1.96 * std / math.sqrt(n), mean + 1.96 * std / math.sqrt(n)] if n else None,
+            'mean_tokens': _nanmean(metrics['tokens'][completed]),
+            'mean_time_ms': _nanmean(metrics['execution_time_ms'][completed]),
+            'mean_correctness': _nanmean(metrics['correctness'][mask]),
+            'tokens_per_quality_point': _nanmean(metrics['tokens_per_quality_point'][mask]),
+            'quality_per_minute': _nanmean(metrics['quality_per_minute'][mask]),
+            'calibration': calibration(metrics['confidence'][mask], metrics['correctness'][mask]),
+            'quality_calibration_score': quality_calibration_score(
+                metrics['confidence'][mask], metrics['quality'][mask]
+            ),
+        }
+
+    if baseline in summary:
+        scored = ~np.isnan(metrics['quality'])
+        base = metrics['quality'][(conditions == baseline) & scored]
+        for name, stats in summary.items():
+            if name == baseline:
+                continue
+            other = metrics['quality'][(conditions == name) & scored]
+            if not (base.size and other.size):
+                stats['vs_baseline'] = {'difference': None, 'cohens_d': None}
+                continue
+            pooled = math.sqrt((np.var(base, ddof=1) + np.var(other, ddof=1)) / 2) if min(
+                base.size, other.size) > 1 else 0.0
+            stats['vs_baseline'] = {
+                'difference': float(np.mean(other) - np.mean(base)),
+                'cohens_d': float((np.mean(other) - np.mean(base)) / pooled) if pooled else None,
+            }
+    return summary
+
+
+def synthetic_solver(problem: Dict[str, Any], condition: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    """
+    Deterministic stand-in solver for smoke-testing the harness.
+
+    Pattern skill is a fixed offset per pattern; everything else is drawn from
+    the run seed, so reruns reproduce exactly.
+    """
+    rng = random.Random(seed)
+    skill = (zlib.crc32(condition.get('pattern', condition['name']).encode()) % 100) / 100.0
+    scores = {
+        c['criterion']: int(min(5, max(1, round(rng.gauss(2.5 + 2.0 * skill, 0.8)))))
+        for c in problem.get('evaluation_criteria', [])
+    }
+    confidence = min(0.99, max(0.05, rng.gauss(0.45 + 0.4 * skill, 0.1)))
+    return {
+        'criteria_scores': scores,
+        'confidence': round(confidence * 100),
+        'tokens': int(rng.gauss(6000, 1500)),
+        'correctness': 1.0 if rng.random() < 0.3 + 0.6 * skill else 0.0,
+    }
+
+
+class BenchmarkRunner:
+    """Runs one experiment configuration against a problem set."""
+
+    def __init__(self, experiment: Dict[str, Any], problems: List[Dict[str, Any]],
+                 default_solver: Optional[str] = None, workers: int = 4):
+        """
+        Initialize runner.
+
+        Args:
+            experiment: The `experiment` mapping from an experiment YAML
+            problems: Candidate problems (already filtered by domain/difficulty)
+            default_solver: 'module:function' used when a condition has no `solver`
+            workers: Process pool size
+        """
+        self.experiment = experiment
+        self.default_solver = default_solver
+        self.workers = workers
+
+        randomization = experiment.get('randomization', {})
+        self.seed = int(randomization.get('seed', 42))
+        controls = experiment.get('controls', {})
+        self.runs_per_problem = int(controls.get('runs_per_problem', DEFAULT_RUNS_PER_PROBLEM))
+
+        ordered = list(problems)
+        random.Random(self.seed).shuffle(ordered)
+        sample_size = experiment.get('problem_set', {}).get('sample_size')
+        self.problems = ordered[:sample_size] if sample_size else ordered
+        # Sequential mode draws past sample_size, up to its own truncation point
+        self.candidates = ordered
+
+        self.conditions = experiment.get('conditions', [])
+        self.baseline = next((c['name'] for c in self.conditions if c['name'] == 'baseline'),
+                             self.conditions[0]['name'] if self.conditions else None)
+
+    def tasks(self, problems: Optional[List[Dict[str, Any]]] = None,
+              conditions: Optional[List[Dict[str, Any]]] = None) -> List[Tuple[str, Dict[str, Any], Dict[str, Any], int, int]]:
+        tasks = []
+        for problem in self.problems if problems is None else problems:
+            for condition in self.conditions if conditions is None else conditions:
+                solver = condition.get('solver') or self.default_solver
+                if not solver:
+                    raise ValueError(f"No solver for condition '{condition['name']}'")
+                for run in range(1, self.runs_per_problem + 1):
+                    seed = run_seed(self.seed, problem['problem_id'], condition['name'], run)
+                    tasks.append((solver, problem, condition, run, seed))
+        return tasks
+
+    def _execute_all(self, tasks, pool: Optional[ProcessPoolExecutor]) -> List[Dict[str, Any]]:
+        if pool is None:
+            return [_execute(task) for task in tasks]
+        return list(pool.map(_execute, tasks, chunksize=max(1, len(tasks) // (self.workers * 4))))
+
+    def run(self) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Execute all runs.
+
+        Returns:
+            Tuple of (per-run rows, summary dict)
+        """
+        tasks = self.tasks()
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = self._execute_all(tasks, pool)
+        else:
+            results = self._execute_all(tasks, None)
+        return self._report(results, self.problems)
+
+    def run_sequential(self, config: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Execute runs in problem batches, stopping each comparison at significance or futility.
+
+        Every batch runs the baseline plus the conditions whose comparison is
+        still open; per-problem quality (mean over runs) is differenced against
+        the baseline and fed to that condition's SPRT. Errored runs are left
+        out of the per-problem mean, and a problem where either side has no
+        successful run is skipped (and counted) rather than scored. The
+        baseline stops once no comparison is open.
+
+        Args:
+            config: The experiment's `sequential` mapping (effect_size, alpha,
+                power, min_problems, max_problems)
+
+        Returns:
+            Tuple of (per-run rows, summary dict with a `sequential` section)
+        """
+        names = [c['name'] for c in self.conditions]
+        comparisons = comparisons_for(names, self.baseline, config)
+        if not comparisons:
+            raise ValueError('Sequential mode needs at least one condition besides the baseline')
+        # Never truncate beyond the problems that exist
+        if any(c.max_samples > len(self.candidates) for c in comparisons.values()):
+            comparisons = comparisons_for(names, self.baseline, dict(config, max_problems=len(self.candidates)))
+        horizon = max(c.max_samples for c in comparisons.values())
+        by_name = {c['name']: c for c in self.conditions}
+        batch_size = max(1, self.workers)
+
+        results: List[Dict[str, Any]] = []
+        used: List[Dict[str, Any]] = []
+        skipped = {name: 0 for name in comparisons}
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            for start in range(0, horizon, batch_size):
+                open_names = [name for name, c in comparisons.items() if not c.decision]
+                if not open_names:
+                    break
+                batch = self.candidates[start:min(start + batch_size, horizon)]
+                batch_conditions = [by_name[self.baseline]] + [by_name[name] for name in open_names]
+                batch_results = self._execute_all(self.tasks(batch, batch_conditions), pool)
+                results.extend(batch_results)
+                used.extend(batch)
+
+                quality = compute_run_metrics({p['problem_id']: p for p in batch}, batch_results)['quality']
+                keys = [(r['problem_id'], r['condition']) for r in batch_results]
+                per_problem: Dict[Tuple[str, str], List[float]] = {}
+                for key, value, result in zip(keys, quality, batch_results):
+                    if not result['error'] and not math.isnan(value):
+                        per_problem.setdefault(key, []).append(float(value))
+                for problem in batch:
+                    base = per_problem.get((problem['problem_id'], self.baseline))
+                    for name in open_names:
+                        other = per_problem.get((problem['problem_id'], name))
+                        if base and other:
+                            comparisons[name].update(sum(other) / len(other) - sum(base) / len(base))
+                        else:
+                            skipped[name] += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        rows, summary = self._report(results, used)
+        fixed_problems = max(c.fixed_samples for c in comparisons.values())
+        fixed_runs = fixed_problems * len(self.conditions) * self.runs_per_problem
+        summary['sequential'] = {
+            'method': 'truncated SPRT, Bonferroni across comparisons',
+            'comparisons': [dict(c.report(), problems_skipped=skipped[name])
+                            for name, c in comparisons.items()],
+            'problems_used': len(used),
+            'runs_executed': len(results),
+            'fixed_design_problems': fixed_problems,
+            'fixed_design_runs': fixed_runs,
+            'runs_saved': fixed_runs - len(results),
+            'runs_saved_pct': round(1 - len(results) / fixed_runs, 4),
+        }
+        return rows, summary
+
+    def _report(self, results: List[Dict[str, Any]],
+                problems: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        by_id = {p['problem_id']: p for p in problems}
+        patterns = {c['name']: c.get('pattern', c['name']) for c in self.conditions}
+        metrics = compute_run_metrics(by_id, results)
+        conditions = np.array([r['condition'] for r in results])
+
+        rows = []
+        experiment_id = self.experiment.get('id', 'EXP')
+        for i, result in enumerate(results):
+            problem = by_id[result['problem_id']]
+            row = {
+                'experiment_id': experiment_id,
+                'problem_id': result['problem_id'],
+                'domain': problem.get('domain'),
+                'difficulty': problem.get('difficulty'),
+                'condition': result['condition'],
+                'pattern': patterns[result['condition']],
+                'run': result['run'],
+                'seed': result['seed'],
+                'error': result['error'],
+            }
+            for key, values in metrics.items():
+                value = float(values[i])
+                row[key] = None if math.isnan(value) else round(value, 4)
+            rows.append(row)
+
+        problem_set = self.experiment.get('problem_set', {})
+        required = required_sample_size()
+        summary = {
+            'experiment_id': experiment_id,
+            'hypothesis': self.experiment.get('hypothesis'),
+            'completed_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'seed': self.seed,
+            'runs_per_problem': self.runs_per_problem,
+            'problems': [p['problem_id'] for p in problems],
+            'errors': sum(1 for r in results if r['error']),
+            'sample_size': {
+                'requested': problem_set.get('sample_size'),
+                'actual': len(problems),
+                'required_medium_effect': required,
+                'sufficient': len(problems) >= required,
+            },
+            'baseline': self.baseline,
+            'conditions': summarize(metrics, conditions, self.baseline,
+                                    np.array([bool(r['error']) for r in results], dtype=bool)),
+        }
+        return rows, summary
+
+
+def write_results(output_dir: str, rows: List[Dict[str, Any]], summary: Dict[str, Any]) -> Path:
+    """
+    Write runs.csv and summary.json into a new timestamped run directory.
+
+    A run that starts in the same second as an earlier one gets a numeric
+    suffix (-2, -3, ...) instead of overwriting it.
+    """
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')
+    base = f"{summary['experiment_id']}-{stamp}"
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    suffix = 1
+    while True:
+        run_dir = Path(output_dir) / (base if suffix == 1 else f"{base}-{suffix}")
+        try:
+            run_dir.mkdir()
+            break
+        except FileExistsError:
+            suffix += 1
+    with open(run_dir / 'runs.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RUN_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(run_dir / 'summary.json', 'w') as f:
+        json.dump(summary, f, indent=2)
+    return run_dir
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Run cognitive-skills benchmark experiments')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run an experiment YAML')
+    run_parser.add_argument('experiment', help='Experiment YAML (A/B/C experimental design)')
+    run_parser.add_argument('--problems', required=True, help='Problem set directory')
+    run_parser.add_argument('--solver', help="Default solver 'module:function'")
+    run_parser.add_argument('--workers', type=int, default=4, help='Process pool size (default: 4)')
+    run_parser.add_argument('--output', default='benchmark-results', help='Results directory')
+    run_parser.add_argument('--sequential', action='store_true',
+                            help="Stop comparisons early (also enabled by a 'sequential' block in the YAML)")
+
+    size_parser = subparsers.add_parser('sample-size', help='Per-condition sample size')
+    size_parser.add_argument('--effect', type=positive_float, default=0.5, help="Cohen's d (default: 0.5)")
+    size_parser.add_argument('--alpha', type=float, default=0.05, help='Significance level (default: 0.05)')
+    size_parser.add_argument('--power', type=float, default=0.80, help='Statistical power (default: 0.80)')
+
+    args = parser.parse_args()
+
+    if args.command == 'sample-size':
+        print(required_sample_size(args.effect, args.alpha, args.power))
+        return
+
+    with open(args.experiment, 'r') as f:
+        config = yaml.safe_load(f)
+    experiment = config.get('experiment', config)
+    problem_set = experiment.get('problem_set', {})
+    problems = load_problems(args.problems, problem_set.get('domain'), problem_set.get('difficulties'))
+    if not problems:
+        print(f"Error: no problems found in {args.problems}", file=sys.stderr)
+        sys.exit(1)
+
+    # Solver modules usually live in the working directory, not next to this script
+    sys.path.insert(0, os.getcwd())
+
+    try:
+        runner = BenchmarkRunner(experiment, problems, default_solver=args.solver, workers=args.workers)
+        sequential = experiment.get('sequential')
+        if args.sequential or sequential:
+            rows, summary = runner.run_sequential(sequential if isinstance(sequential, dict) else {})
+        else:
+            rows, summary = runner.run()
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    run_dir = write_results(args.output, rows, summary)
+
+    print(f"Experiment {summary['experiment_id']}: {len(summary['problems'])} problems, "
+          f"{len(rows)} runs, {summary['errors']} errors\n")
+    print(f"{'Condition':<16} {'Quality':>8} {'±CI95':>7} {'Tokens':>8} {'Brier':>7} {'ECE':>7} {'Errors':>7}")
+    for name, stats in summary['conditions'].items():
+        cal = stats['calibration']
+        quality = f"{stats['mean_quality']:.1f}" if stats['mean_quality'] is not None else '-'
+        half_width = (f"{(stats['ci95_quality'][1] - stats['ci95_quality'][0]) / 2:.1f}"
+                      if stats['ci95_quality'] else '-')
+        tokens = f"{stats['mean_tokens']:.0f}" if stats['mean_tokens'] is not None else '-'
+        brier = f"{cal['brier']:.3f}" if cal['brier'] is not None else '-'
+        ece = f"{cal['ece']:.3f}" if cal['ece'] is not None else '-'
+        print(f"{name:<16} {quality:>8} {half_width:>7} {tokens:>8} {brier:>7} {ece:>7} {stats['errors']:>7}")
+    if 'sequential' in summary:
+        seq = summary['sequential']
+        print(f"\n{'Comparison':<16} {'Decision':<14} {'Problems':>8} {'Δ quality':>10} {'Skipped':>8}")
+        for comparison in seq['comparisons']:
+            print(f"{comparison['condition']:<16} {comparison['decision']:<14} "
+                  f"{comparison['problems_used']:>8} {comparison['mean_difference']:>+10.2f} "
+                  f"{comparison['problems_skipped']:>8}")
+        print(f"\nRuns: {seq['runs_executed']} executed vs {seq['fixed_design_runs']} for the fixed design "
+              f"({seq['runs_saved']:+d} saved, {seq['runs_saved_pct']:.0%})")
+    elif not summary['sample_size']['sufficient']:
+        print(f"\n⚠️  {summary['sample_size']['actual']} problems is below the "
+              f"{summary['sample_size']['required_medium_effect']} needed for a medium effect")
+    print(f"\nResults: {run_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Sequential A/B/C testing with early stopping.
+
+The fixed-sample protocol runs every problem for every condition. Here each
+condition is compared with the baseline on paired per-problem quality
+differences, and the comparison stops as soon as a two-sided SPRT (Wald's
+sequential probability ratio test, run as two one-sided tests at alpha/2)
+reaches significance or futility:
+
+    LLR+ = d * Σz - n * d² / 2        (H1: condition better by effect size d)
+    LLR- = -d * Σz - n * d² / 2       (H1: condition worse by effect size d)
+    Σz   = sqrt(n) * z(t),  t = paired t statistic on the running mean and SD
+
+    significance: LLR± >= log((1 - beta) / (alpha / 2))
+    futility:     both LLR± <= log(beta / (1 - alpha / 2))
+
+The standard deviation is estimated from the same data, so t is mapped to a
+normal-equivalent score (Wallace's approximation) before it enters the
+likelihood ratio; plugging t in directly inflates the type I error several-fold
+at the small n where early stopping happens.
+
+A comparison that reaches `max_samples` without crossing a boundary gets a final
+two-sided test. Its critical value is calibrated once per design by Monte Carlo
+so that the boundary crossings plus the final look together spend alpha - a
+plain fixed-sample test at that point would push the overall type I error to
+~6%. The default truncation is 1.25x the fixed-design size, which keeps power
+near the protocol's 0.80 while the expected number of problems stays well
+below the fixed design. With several conditions, alpha is Bonferroni-corrected
+across the comparisons as in the Statistical Reference.
+
+Running sums keep each update O(1). The `simulate` command reports type I
+error, power and problems saved for a design.
+
+Usage:
+    python sequential_testing.py simulate --effect 0.5 --alpha 0.05 --power 0.8
+    python sequential_testing.py simulate --effect 0.5 --max-samples 30 --trials 20000
+"""
+
+import argparse
+import math
+import sys
+from functools import lru_cache
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+DEFAULT_EFFECT_SIZE = 0.5
+DEFAULT_ALPHA = 0.05
+DEFAULT_POWER = 0.80
+MIN_SAMPLES = 5
+MIN_PAIRED_PROBLEMS = 20
+TRUNCATION_FACTOR = 1.25
+CALIBRATION_TRIALS = 40000
+CALIBRATION_SEED = 20240101
+
+
+def paired_sample_size(effect_size: float = DEFAULT_EFFECT_SIZE, alpha: float = DEFAULT_ALPHA,
+                       power: float = DEFAULT_POWER) -> int:
+    """Fixed-design problem count for a paired comparison (at least 20, per protocol)."""
+    if effect_size <= 0:
+        raise ValueError(f"effect size must be positive, got {effect_size:g}")
+    z_alpha = NormalDist().inv_cdf(1 - alpha / 2)
+    z_beta = NormalDist().inv_cdf(power)
+    return max(MIN_PAIRED_PROBLEMS, int(math.ceil(((z_alpha + z_beta) / effect_size) ** 2)))
+
+
+def boundaries(alpha: float, power: float) -> Tuple[float, float]:
+    """Upper (significance) and lower (futility) log-likelihood-ratio boundaries."""
+    beta = 1.0 - power
+    return math.log((1.0 - beta) / (alpha / 2.0)), math.log(beta / (1.0 - alpha / 2.0))
+
+
+def normal_equivalent(t, df):
+    """Map t statistics with `df` degrees of freedom to normal-equivalent scores (scalar or array)."""
+    return np.sign(t) * np.sqrt(df * np.log1p(t * t / df)) * (8 * df + 1) / (8 * df + 3)
+
+
+def _paths(x, effect_size: float, alpha: float, power: float, min_samples: int) -> Dict[str, Any]:
+    """
+    Apply the stopping rule to a (trials, n_max) array of paired differences.
+
+    Returns:
+        Per-trial stopping index, boundary rejection flag, truncation flag and
+        the normal-equivalent score at the stopping point
+    """
+    trials, n_max = x.shape
+    upper, lower = boundaries(alpha, power)
+    n = np.arange(1, n_max + 1)
+    df = np.maximum(n - 1, 1)
+    s = np.cumsum(x, axis=1)
+    ss = np.cumsum(x * x, axis=1)
+    var = np.maximum((ss - s * s / n) / df, 1e-12)
+    z = normal_equivalent((s / n) / np.sqrt(var / n), df)
+    z_sum = np.sqrt(n) * z
+    llr_plus = effect_size * z_sum - n * effect_size ** 2 / 2
+    llr_minus = -effect_size * z_sum - n * effect_size ** 2 / 2
+    active = n >= min_samples
+
+    reject = active & ((llr_plus >= upper) | (llr_minus >= upper))
+    futile = active & (llr_plus <= lower) & (llr_minus <= lower)
+    decided = reject | futile
+    stop = decided.copy()
+    stop[:, -1] = True
+
+    first = stop.argmax(axis=1)
+    rows = np.arange(trials)
+    return {
+        'first': first,
+        'rejected': reject[rows, first],
+        'truncated': ~decided[rows, first],
+        'z': z[rows, first],
+    }
+
+
+@lru_cache(maxsize=64)
+def final_critical_value(effect_size: float, alpha: float, power: float, min_samples: int,
+                         max_samples: int) -> float:
+    """
+    Critical |z| for the truncation look so boundary crossings plus the final test spend alpha.
+
+    Calibrated under the null by Monte Carlo with a fixed seed, so a design
+    always gets the same value.
+    """
+    rng = np.random.default_rng(CALIBRATION_SEED)
+    paths = _paths(rng.normal(0.0, 1.0, size=(CALIBRATION_TRIALS, max_samples)),
+                   effect_size, alpha, power, min_samples)
+    crossed = float(paths['rejected'].mean())
+    # Keep two standard errors of the crossing estimate in reserve
+    remaining = alpha - crossed - 2.0 * math.sqrt(crossed * (1.0 - crossed) / CALIBRATION_TRIALS)
+    scores = np.sort(np.abs(paths['z'][paths['truncated']]))[::-1]
+    allowed = int(remaining * CALIBRATION_TRIALS)
+    if allowed <= 0 or scores.size == 0:
+        return math.inf
+    if allowed >= scores.size:
+        return 0.0
+    # Just above the (allowed+1)-th largest score rejects at most `allowed` paths
+    return float(np.nextafter(scores[allowed], math.inf))
+
+
+class SequentialComparison:
+    """Truncated two-sided SPRT on paired differences (condition - baseline)."""
+
+    def __init__(
+        self,
+        name: str,
+        effect_size: float = DEFAULT_EFFECT_SIZE,
+        alpha: float = DEFAULT_ALPHA,
+        power: float = DEFAULT_POWER,
+        min_samples: int = MIN_SAMPLES,
+        max_samples: Optional[int] = None,
+    ):
+        """
+        Initialize comparison.
+
+        Args:
+            name: Condition being compared with the baseline
+            effect_size: Standardized paired effect (Cohen's d) worth detecting
+            alpha: Two-sided type I error for this comparison
+            power: 1 - type II error at the effect size
+            min_samples: Problems required before any decision
+            max_samples: Truncation point (default: 1.25x the fixed-design size)
+        """
+        if max_samples is not None and max_samples < min_samples:
+            raise ValueError(f"max_samples ({max_samples}) must be at least min_samples ({min_samples})")
+        self.name = name
+        self.effect_size = effect_size
+        self.alpha = alpha
+        self.power = power
+        self.min_samples = min_samples
+        self.fixed_samples = paired_sample_size(effect_size, alpha, power)
+        self.max_samples = max(min_samples,
+                               max_samples or int(math.ceil(self.fixed_samples * TRUNCATION_FACTOR)))
+        self.upper, self.lower = boundaries(alpha, power)
+        self.z_critical = final_critical_value(effect_size, alpha, power, min_samples, self.max_samples)
+
+        self.n = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self.decision: Optional[str] = None
+        self.llr_plus = 0.0
+        self.llr_minus = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.n if self.n else 0.0
+
+    @property
+    def std(self) -> float:
+        if self.n < 2:
+            return 0.0
+        variance = (self._sumsq - self._sum * self._sum / self.n) / (self.n - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def update(self, difference: float) -> Optional[str]:
+        """
+        Add one paired difference and re-evaluate the stopping rule.
+
+        Returns:
+            'superior', 'inferior', 'futility' or 'no_difference' once decided,
+            otherwise None
+        """
+        if self.decision:
+            return self.decision
+        self.n += 1
+        self._sum += difference
+        self._sumsq += difference * difference
+        if self.n < self.min_samples:
+            return None
+
+        sigma = self.std
+        if sigma == 0.0:
+            # Identical differences carry no evidence about an effect of size d; keep sampling
+            if self.n >= self.max_samples:
+                self.decision = 'no_difference'
+            return self.decision
+
+        d = self.effect_size
+        t = self.mean / (sigma / math.sqrt(self.n))
+        z = float(normal_equivalent(t, self.n - 1))
+        self.llr_plus = d * z * math.sqrt(self.n) - self.n * d * d / 2.0
+        self.llr_minus = -d * z * math.sqrt(self.n) - self.n * d * d / 2.0
+
+        if self.llr_plus >= self.upper:
+            self.decision = 'superior'
+        elif self.llr_minus >= self.upper:
+            self.decision = 'inferior'
+        elif self.llr_plus <= self.lower and self.llr_minus <= self.lower:
+            self.decision = 'futility'
+        elif self.n >= self.max_samples:
+            self.decision = ('superior' if z >= self.z_critical else
+                             'inferior' if z <= -self.z_critical else 'no_difference')
+        return self.decision
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'condition': self.name,
+            'decision': self.decision or 'undecided',
+            'problems_used': self.n,
+            'fixed_design_problems': self.fixed_samples,
+            'max_problems': self.max_samples,
+            'mean_difference': round(self.mean, 4),
+            'std_difference': round(self.std, 4),
+            'llr_plus': round(self.llr_plus, 4),
+            'llr_minus': round(self.llr_minus, 4),
+            'boundaries': {'upper': round(self.upper, 4), 'lower': round(self.lower, 4),
+                           'final_z': round(self.z_critical, 4)},
+            'alpha': self.alpha,
+            'power': self.power,
+            'effect_size': self.effect_size,
+        }
+
+
+def comparisons_for(conditions: List[str], baseline: str,
+                    config: Dict[str, Any]) -> Dict[str, SequentialComparison]:
+    """
+    Build one comparison per non-baseline condition with Bonferroni-corrected alpha.
+
+    Args:
+        conditions: All condition names in the experiment
+        baseline: Name of the baseline condition
+        config: The experiment's `sequential` mapping (effect_size, alpha, power,
+            min_problems, max_problems)
+    """
+    others = [c for c in conditions if c != baseline]
+    alpha = float(config.get('alpha', DEFAULT_ALPHA)) / max(1, len(others))
+    max_problems = config.get('max_problems')
+    return {
+        name: SequentialComparison(
+            name,
+            effect_size=float(config.get('effect_size', DEFAULT_EFFECT_SIZE)),
+            alpha=alpha,
+            power=float(config.get('power', DEFAULT_POWER)),
+            min_samples=int(config.get('min_problems', MIN_SAMPLES)),
+            max_samples=int(max_problems) if max_problems else None,
+        )
+        for name in others
+    }
+
+
+def simulate(effect_size: float, alpha: float, power: float, max_samples: Optional[int],
+             trials: int, seed: int, min_samples: int = MIN_SAMPLES) -> Dict[str, Dict[str, float]]:
+    """
+    Monte Carlo operating characteristics of the truncated SPRT.
+
+    Vectorized over trials: all paths are drawn at once and the stopping rule
+    is evaluated on cumulative sums for every prefix length.
+    """
+    reference = SequentialComparison('sim', effect_size, alpha, power, min_samples, max_samples)
+    rng = np.random.default_rng(seed)
+    results = {}
+
+    for label, true_effect in (('null', 0.0), ('alternative', effect_size)):
+        x = rng.normal(true_effect, 1.0, size=(trials, reference.max_samples))
+        paths = _paths(x, effect_size, alpha, power, min_samples)
+        rejected = paths['rejected'] | (paths['truncated'] & (np.abs(paths['z']) >= reference.z_critical))
+        used = paths['first'] + 1
+        results[label] = {
+            'rejection_rate': float(rejected.mean()),
+            'mean_problems': float(used.mean()),
+            'saved_vs_fixed_pct': float(1 - used.mean() / reference.fixed_samples),
+            'truncated_pct': float(paths['truncated'].mean()),
+        }
+    results['design'] = {
+        'fixed_problems': reference.fixed_samples,
+        'max_problems': reference.max_samples,
+        'final_z': reference.z_critical,
+        'alpha': alpha,
+        'power': power,
+        'effect_size': effect_size,
+    }
+    return results
+
+
+def positive_float(text: str) -> float:
+    """argparse type for effect sizes: a number > 0."""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {text!r}")
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"must be > 0, got {text}")
+    return value
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Sequential A/B/C testing (truncated SPRT)')
+    parser.add_argument('command', choices=['simulate'])
+    parser.add_argument('--effect', type=positive_float, default=DEFAULT_EFFECT_SIZE,
+                        help=f"Paired Cohen's d to detect (default: {DEFAULT_EFFECT_SIZE})")
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                        help=f'Two-sided type I error (default: {DEFAULT_ALPHA})')
+    parser.add_argument('--power', type=float, default=DEFAULT_POWER,
+                        help=f'Power at the effect size (default: {DEFAULT_POWER})')
+    parser.add_argument('--max-samples', type=int,
+                        help=f'Truncation point (default: {TRUNCATION_FACTOR}x fixed-design size)')
+    parser.add_argument('--min-samples', type=int, default=MIN_SAMPLES,
+                        help=f'Problems before the first decision (default: {MIN_SAMPLES})')
+    parser.add_argument('--trials', type=int, default=20000, help='Monte Carlo trials (default: 20000)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+
+    args = parser.parse_args()
+
+    try:
+        results = simulate(args.effect, args.alpha, args.power, args.max_samples, args.trials,
+                           args.seed, args.min_samples)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    design = results['design']
+    print(f"Truncated SPRT: d={design['effect_size']}, alpha={design['alpha']}, power={design['power']}")
+    print(f"Fixed design {design['fixed_problems']} problems, truncation at {design['max_problems']}, "
+          f"final-look |z| >= {design['final_z']:.3f}\n")
+    print(f"{'Scenario':<12} {'Rejects':>8} {'Mean n':>8} {'Saved':>7} {'Truncated':>10}")
+    for label in ('null', 'alternative'):
+        r = results[label]
+        print(f"{label:<12} {r['rejection_rate']:>8.3f} {r['mean_problems']:>8.1f} "
+              f"{r['saved_vs_fixed_pct']:>6.1%} {r['truncated_pct']:>9.1%}")
+
+    type_i = results['null']['rejection_rate']
+    achieved = results['alternative']['rejection_rate']
+    print(f"\nType I error {type_i:.3f} (target <= {args.alpha}), power {achieved:.3f} (target >= {args.power})")
+
+
+if __name__ == '__main__':
+    main()
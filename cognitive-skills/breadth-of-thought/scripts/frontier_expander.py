@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Budget-aware Breadth of Thought (BoT) frontier expander.
+
+Step 4 of breadth-of-thought/SKILL.md expands every retained approach into 5
+sub-approaches per level, so the work grows as 5^depth. This module runs the
+same methodology under an explicit evaluation budget:
+
+- One evaluation is one scored approach (the confidence estimate of Step 2).
+  The run stops when the budget is spent, and never overspends it.
+- Unexpanded approaches wait in a bounded frontier ordered by
+  confidence * decay^depth. The decay keeps the search breadth-first in
+  spirit: a Level 1 sub-approach has to beat its Level 0 peers clearly
+  before it is expanded first. When the frontier is full, the
+  lowest-priority approach is evicted and reported as not explored.
+- Conservative pruning is unchanged: an approach scored below 40% is not
+  expanded, and Level 2 is the deepest level.
+- The best frontier approaches are expanded in batches. Sub-approaches are
+  generated and then scored on a thread pool.
+- Generated sub-approaches are checked for near-duplicates before they are
+  scored. The check uses Jaccard similarity of word sets against every
+  approach seen so far, across branches. A duplicate costs no budget and is
+  recorded as an alias of the approach it repeats.
+- Every run reports the coverage it achieved against the budget it used.
+  That covers scored approaches per level against the full 5^depth tree,
+  retained roots that were expanded, duplicates skipped, and evicted or
+  unscored approaches.
+
+generate(approach, n) and evaluate(approach) are plain callables, so an LLM,
+a human-in-the-loop form or a heuristic can be plugged in. SyntheticSpace
+provides both for the benchmark.
+
+Usage:
+    python frontier_expander.py plan approaches.json --budget 60
+    python frontier_expander.py bench --budget 100 --workers 8 --latency-ms 2
+"""
+
+import argparse
+import heapq
+import json
+import math
+import random
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+PRUNE_THRESHOLD = 0.40
+BRANCHING = 5
+MAX_DEPTH = 2
+FRONTIER_CAPACITY = 64
+BATCH_SIZE = 8
+MAX_WORKERS = 8
+DEPTH_DECAY = 0.9
+DUPLICATE_SIMILARITY = 0.8
+TOP_SOLUTIONS = 5
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset('a an and as at by for from in of on or the to using via with'.split())
+
+
+def tokenize(text: str) -> frozenset:
+    """Content words of an approach description."""
+    return frozenset(t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS)
+
+
+class Approach:
+    """One node of the BoT tree: a Level 0 approach or a sub-approach."""
+
+    def __init__(self, node_id: int, text: str, label: str, depth: int, root: int,
+                 parent: Optional[int] = None, confidence: Optional[float] = None):
+        self.id = node_id
+        self.text = text
+        self.label = label
+        self.depth = depth
+        self.root = root
+        self.parent = parent
+        self.confidence = confidence
+        self.status = 'new'  # frontier, expanded, leaf, pruned, evicted, unscored
+        self.aliases: List[str] = []
+        self.children = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable summary."""
+        confidence = round(self.confidence, 4) if self.confidence is not None else None
+        return {'label': self.label, 'text': self.text, 'depth': self.depth,
+                'confidence': confidence, 'status': self.status, 'aliases': self.aliases}
+
+
+class DuplicateIndex:
+    """Near-duplicate lookup by Jaccard similarity of word sets, via an inverted index."""
+
+    def __init__(self, threshold: float = DUPLICATE_SIMILARITY):
+        self.threshold = threshold
+        self.tokens: Dict[int, frozenset] = {}
+        self.postings: Dict[str, List[int]] = {}
+
+    def find(self, tokens: frozenset) -> Optional[int]:
+        """Most similar indexed approach at or above the threshold, if any."""
+        if not tokens:
+            return None
+        overlap = Counter(i for t in tokens for i in self.postings.get(t, ()))
+        best, best_similarity = None, self.threshold
+        for node_id, shared in overlap.items():
+            similarity = shared / (len(tokens) + len(self.tokens[node_id]) - shared)
+            if similarity >= best_similarity:
+                best, best_similarity = node_id, similarity
+        return best
+
+    def add(self, node_id: int, tokens: frozenset) -> None:
+        """Index an approach."""
+        self.tokens[node_id] = tokens
+        for t in tokens:
+            self.postings.setdefault(t, []).append(node_id)
+
+
+class BoundedFrontier:
+    """Min-heap of unexpanded approaches with a fixed capacity; evicts the lowest priority."""
+
+    def __init__(self, capacity: int = FRONTIER_CAPACITY):
+        self.capacity = capacity
+        self.heap: List[Tuple[float, int, int]] = []
+        self.seq = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def push(self, priority: float, node_id: int) -> Optional[int]:
+        """Add an approach; returns the id evicted to stay within capacity (possibly node_id)."""
+        self.seq += 1
+        entry = (priority, -self.seq, node_id)
+        if len(self.heap) < self.capacity:
+            heapq.heappush(self.heap, entry)
+            return None
+        if entry <= self.heap[0]:
+            return node_id
+        return heapq.heapreplace(self.heap, entry)[2]
+
+    def take(self, count: int) -> List[int]:
+        """Remove and return the count best approaches, best first."""
+        if count >= len(self.heap):
+            best, self.heap = sorted(self.heap, reverse=True), []
+        else:
+            best = heapq.nlargest(count, self.heap)
+            chosen = {entry[1] for entry in best}
+            self.heap = [entry for entry in self.heap if entry[1] not in chosen]
+            heapq.heapify(self.heap)
+        return [entry[2] for entry in best]
+
+    def ids(self) -> List[int]:
+        """Approaches still waiting, best first."""
+        return [entry[2] for entry in sorted(self.heap, reverse=True)]
+
+
+Generator = Callable[[Approach, int], List[str]]
+Evaluator = Callable[[Approach], float]
+RootSpec = Union[str, Tuple[str, Optional[float]]]
+
+
+class FrontierExpander:
+    """Best-first BoT expansion under an evaluation budget."""
+
+    def __init__(self, generate: Generator, evaluate: Evaluator, budget: int,
+                 branching: int = BRANCHING, max_depth: int = MAX_DEPTH,
+                 capacity: int = FRONTIER_CAPACITY, batch_size: int = BATCH_SIZE,
+                 max_workers: int = MAX_WORKERS, threshold: float = PRUNE_THRESHOLD,
+                 depth_decay: float = DEPTH_DECAY,
+                 duplicate_similarity: Optional[float] = DUPLICATE_SIMILARITY):
+        """
+        Args:
+            generate: (approach, n) -> up to n sub-approach descriptions
+            evaluate: approach -> confidence in [0, 1]; each call costs one evaluation
+            budget: Maximum number of evaluate() calls
+            duplicate_similarity: Jaccard threshold for near-duplicates, or None to disable
+        """
+        self.generate = generate
+        self.evaluate = evaluate
+        self.budget = budget
+        self.branching = branching
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.threshold = threshold
+        self.depth_decay = depth_decay
+        self.frontier = BoundedFrontier(capacity)
+        self.index = DuplicateIndex(duplicate_similarity) if duplicate_similarity is not None else None
+        self.nodes: List[Approach] = []
+        self.used = 0
+        self.duplicates = 0
+        self.batches: List[List[str]] = []
+
+    def run(self, roots: Sequence[RootSpec]) -> Dict[str, Any]:
+        """
+        Expand from the Level 0 approaches until the budget or the frontier runs out.
+
+        Args:
+            roots: Descriptions, or (description, confidence) pairs. Roots with a
+                   confidence are not re-scored and cost no budget.
+
+        Returns:
+            Coverage report (see report())
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            fresh = []
+            for number, spec in enumerate(roots, 1):
+                text, confidence = (spec, None) if isinstance(spec, str) else spec
+                node = self._add(text, str(number), 0, None, confidence)
+                if node is not None:
+                    fresh.append(node)
+            self._score(pool, fresh)
+
+            while len(self.frontier) and self.used < self.budget:
+                remaining = self.budget - self.used
+                count = min(self.batch_size, max(1, math.ceil(remaining / self.branching)))
+                batch = [self.nodes[i] for i in self.frontier.take(count)]
+                self.batches.append([node.label for node in batch])
+                proposals = list(pool.map(lambda node: self.generate(node, self.branching), batch))
+                fresh = []
+                for parent, texts in zip(batch, proposals):
+                    parent.status = 'expanded'
+                    for text in texts[:self.branching]:
+                        parent.children += 1
+                        node = self._add(text, f"{parent.label}.{parent.children}", parent.depth + 1,
+                                         parent, None)
+                        if node is not None:
+                            fresh.append(node)
+                self._score(pool, fresh)
+        return self.report(time.perf_counter() - start)
+
+    def _add(self, text: str, label: str, depth: int, parent: Optional[Approach],
+             confidence: Optional[float]) -> Optional[Approach]:
+        """Create an approach, or record it as an alias of a near-duplicate."""
+        tokens = tokenize(text)
+        if self.index is not None:
+            existing = self.index.find(tokens)
+            if existing is not None:
+                self.nodes[existing].aliases.append(label)
+                self.duplicates += 1
+                return None
+        node = Approach(len(self.nodes), text, label, depth,
+                        parent.root if parent else len(self.nodes), parent.id if parent else None, confidence)
+        self.nodes.append(node)
+        if self.index is not None:
+            self.index.add(node.id, tokens)
+        return node
+
+    def _score(self, pool: ThreadPoolExecutor, nodes: List[Approach]) -> None:
+        """Evaluate new approaches within the budget, then prune, keep as leaf or queue them."""
+        pending = [n for n in nodes if n.confidence is None]
+        room = max(0, self.budget - self.used)
+        for node in pending[room:]:
+            node.status = 'unscored'
+        pending = pending[:room]
+        for node, confidence in zip(pending, pool.map(self.evaluate, pending)):
+            node.confidence = min(1.0, max(0.0, float(confidence)))
+        self.used += len(pending)
+
+        for node in nodes:
+            if node.confidence is None:
+                continue
+            if node.confidence < self.threshold:
+                node.status = 'pruned'
+            elif node.depth >= self.max_depth:
+                node.status = 'leaf'
+            else:
+                node.status = 'frontier'
+                evicted = self.frontier.push(node.confidence * self.depth_decay ** node.depth, node.id)
+                if evicted is not None:
+                    self.nodes[evicted].status = 'evicted'
+
+    def solutions(self, top: int = TOP_SOLUTIONS) -> List[Approach]:
+        """
+        Best retained approaches, one per Level 0 approach first, then by confidence.
+
+        Deeper approaches are preferred at equal confidence, since they are more concrete.
+        """
+        viable = sorted((n for n in self.nodes if n.confidence is not None and n.status != 'pruned'),
+                        key=lambda n: (-n.confidence, -n.depth, n.id))
+        chosen: List[Approach] = []
+        roots = set()
+        for node in viable:
+            if node.root not in roots:
+                chosen.append(node)
+                roots.add(node.root)
+        chosen += [n for n in viable if n not in chosen]
+        return chosen[:top]
+
+    def report(self, elapsed: float = 0.0) -> Dict[str, Any]:
+        """Coverage achieved against the budget used."""
+        root_count = sum(1 for n in self.nodes if n.depth == 0)
+        levels = []
+        for depth in range(self.max_depth + 1):
+            at_depth = [n for n in self.nodes if n.depth == depth]
+            possible = root_count * self.branching ** depth
+            scored = sum(1 for n in at_depth if n.confidence is not None)
+            levels.append({
+                'depth': depth,
+                'possible': possible,
+                'scored': scored,
+                'pruned': sum(1 for n in at_depth if n.status == 'pruned'),
+                'expanded': sum(1 for n in at_depth if n.status == 'expanded'),
+                'coverage': round(scored / possible, 4) if possible else 0.0,
+            })
+        exhaustive = sum(level['possible'] for level in levels)
+        scored = sum(level['scored'] for level in levels)
+        retained_roots = [n for n in self.nodes if n.depth == 0 and n.status != 'pruned']
+        expanded_roots = sum(1 for n in retained_roots if n.status == 'expanded')
+        return {
+            'budget': self.budget,
+            'evaluations': self.used,
+            'budget_used': round(self.used / self.budget, 4) if self.budget else 0.0,
+            'exhaustive_tree': exhaustive,
+            'tree_coverage': round(scored / exhaustive, 4) if exhaustive else 0.0,
+            'retained_roots': len(retained_roots),
+            'expanded_roots': expanded_roots,
+            'levels': levels,
+            'duplicates_skipped': self.duplicates,
+            'evicted': sum(1 for n in self.nodes if n.status == 'evicted'),
+            'unexpanded': len(self.frontier),
+            'unscored': sum(1 for n in self.nodes if n.status == 'unscored'),
+            'batches': len(self.batches),
+            'elapsed_s': round(elapsed, 4),
+            'solutions': [n.to_dict() for n in self.solutions()],
+            'not_explored': [self.nodes[i].to_dict() for i in self.frontier.ids()]
+                            + [n.to_dict() for n in self.nodes if n.status == 'evicted'],
+        }
+
+
+class SyntheticSpace:
+    """
+    Random solution space for benchmarking.
+
+    Approaches are five random words, so unrelated approaches rarely overlap.
+    A sub-approach's true quality is its parent's plus Gaussian noise with a
+    slight downward drift.
+    With probability duplicate_rate a proposal rewords an earlier sibling or
+    the parent: the word order is shuffled, a filler stopword is added, and
+    one new content word is added, so its tokens differ from the original's
+    (Jaccard 5/6) and only near-duplicate matching catches it. It has the
+    same quality as the one it repeats. evaluate() returns the quality with a
+    little noise after latency_ms.
+    """
+
+    WORDS_PER_APPROACH = 5
+    REWORDINGS = ('approach', 'variant', 'strategy', 'option', 'design')
+
+    def __init__(self, roots: int = 10, duplicate_rate: float = 0.2, latency_ms: float = 0.0,
+                 vocabulary: int = 2000, seed: int = 0):
+        self.duplicate_rate = duplicate_rate
+        self.latency = latency_ms / 1000.0
+        self.words = [f"w{i:04d}" for i in range(vocabulary)]
+        self.seed = seed
+        self.quality: Dict[frozenset, float] = {}
+        rng = random.Random(seed)
+        self.roots = []
+        for _ in range(roots):
+            text = ' '.join(rng.sample(self.words, self.WORDS_PER_APPROACH))
+            self.quality[tokenize(text)] = rng.uniform(0.2, 0.9)
+            self.roots.append(text)
+
+    def generate(self, parent: Approach, n: int) -> List[str]:
+        """Up to n sub-approach descriptions, deterministic per parent."""
+        rng = random.Random(f"{self.seed}:{parent.text}")
+        base = self.quality[tokenize(parent.text)]
+        proposals: List[str] = []
+        for _ in range(n):
+            if rng.random() < self.duplicate_rate:
+                original = rng.choice(proposals + [parent.text])
+                words = original.split() + [rng.choice(self.REWORDINGS)]
+                rng.shuffle(words)
+                reworded = ' '.join(words + [rng.choice(('with', 'using', 'via'))])
+                self.quality.setdefault(tokenize(reworded), self.quality[tokenize(original)])
+                proposals.append(reworded)
+                continue
+            text = ' '.join(rng.sample(self.words, self.WORDS_PER_APPROACH))
+            self.quality.setdefault(tokenize(text), min(1.0, max(0.0, base + rng.gauss(-0.03, 0.08))))
+            proposals.append(text)
+        return proposals
+
+    def evaluate(self, approach: Approach) -> float:
+        """Noisy confidence estimate of the approach's true quality."""
+        if self.latency:
+            time.sleep(self.latency)
+        noise = random.Random(f"{self.seed}:eval:{approach.text}").gauss(0.0, 0.03)
+        return self.quality[tokenize(approach.text)] + noise
+
+
+def bench(roots: int, budget: int, workers: int, latency_ms: float, duplicate_rate: float,
+          branching: int, max_depth: int, capacity: int, seed: int) -> Dict[str, Any]:
+    """Budgeted runs (one worker and a pool) against an exhaustive run of the same space."""
+    def run(run_budget: int, run_workers: int, run_capacity: int,
+            latency: float) -> Tuple[FrontierExpander, Dict[str, Any]]:
+        space = SyntheticSpace(roots, duplicate_rate, latency, seed=seed)
+        expander = FrontierExpander(space.generate, space.evaluate, run_budget, branching=branching,
+                                    max_depth=max_depth, capacity=run_capacity, max_workers=run_workers)
+        return expander, expander.run(space.roots)
+
+    unbounded = sum(roots * branching ** d for d in range(max_depth + 1))
+    exhaustive, _ = run(unbounded, workers, unbounded, 0.0)
+    best = {n.text for n in exhaustive.solutions()}
+    result = {'unbounded_tree': unbounded, 'exhaustive_evaluations': exhaustive.used,
+              'exhaustive_best': max(n.confidence for n in exhaustive.nodes)}
+    for name, run_workers in (('serial', 1), ('pool', workers)):
+        expander, report = run(budget, run_workers, capacity, latency_ms)
+        found = {s['text'] for s in report['solutions']}
+        report['best_confidence'] = max((n.confidence for n in expander.nodes if n.confidence is not None),
+                                        default=0.0)
+        report['top_recall'] = round(len(found & best) / len(best), 4) if best else 0.0
+        result[name] = report
+    return result
+
+
+def positive_int(text: str) -> int:
+    """argparse type for pool sizes: an integer >= 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def load_roots(path: str) -> List[RootSpec]:
+    """Level 0 approaches: a JSON list of strings or of {name, confidence} objects."""
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('approaches', [])
+    roots: List[RootSpec] = []
+    for item in data:
+        if isinstance(item, str):
+            roots.append((item, None))
+        else:
+            confidence = item.get('confidence')
+            if confidence is not None and confidence > 1:
+                confidence = confidence / 100.0
+            roots.append((item['name'], confidence))
+    return roots
+
+
+def plan(roots: List[RootSpec], budget: int, branching: int, max_depth: int, capacity: int,
+         batch_size: int, depth_decay: float, threshold: float) -> FrontierExpander:
+    """
+    Budget allocation for real roots, before any sub-approach exists.
+
+    Sub-approaches are placeholders that inherit their parent's confidence, so
+    the plan shows which approaches the budget reaches and in what batches.
+    Unscored roots are assumed to sit at the pruning threshold.
+    """
+    def placeholders(parent: Approach, n: int) -> List[str]:
+        return [parent.text] * n
+
+    def inherit(approach: Approach) -> float:
+        parent = expander.nodes[approach.parent] if approach.parent is not None else None
+        return parent.confidence if parent else threshold
+
+    expander = FrontierExpander(placeholders, inherit, budget, branching=branching, max_depth=max_depth,
+                                capacity=capacity, batch_size=batch_size, max_workers=1,
+                                threshold=threshold, depth_decay=depth_decay, duplicate_similarity=None)
+    expander.run(roots)
+    return expander
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Human-readable coverage report."""
+    print(f"Budget: {report['evaluations']}/{report['budget']} evaluations "
+          f"({report['budget_used']:.0%}), {report['batches']} batches, {report['elapsed_s']:.3f}s")
+    print(f"Coverage: {report['tree_coverage']:.1%} of the {report['exhaustive_tree']}-node exhaustive tree; "
+          f"{report['expanded_roots']}/{report['retained_roots']} retained Level 0 approaches expanded")
+    for level in report['levels']:
+        print(f"  Level {level['depth']}: {level['scored']:>5}/{level['possible']:<6} scored "
+              f"({level['coverage']:.1%}), {level['pruned']} pruned, {level['expanded']} expanded")
+    print(f"Skipped: {report['duplicates_skipped']} near-duplicates, {report['evicted']} evicted, "
+          f"{report['unexpanded']} left in frontier, {report['unscored']} generated but unscored")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Budget-aware Breadth of Thought frontier expander')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_common(sub: argparse.ArgumentParser, budget: int) -> None:
+        sub.add_argument('--budget', type=int, default=budget, help=f'Evaluation budget (default: {budget})')
+        sub.add_argument('--branching', type=int, default=BRANCHING,
+                         help=f'Sub-approaches per expansion (default: {BRANCHING})')
+        sub.add_argument('--max-depth', type=int, default=MAX_DEPTH,
+                         help=f'Deepest level (default: {MAX_DEPTH})')
+        sub.add_argument('--capacity', type=int, default=FRONTIER_CAPACITY,
+                         help=f'Frontier capacity (default: {FRONTIER_CAPACITY})')
+        sub.add_argument('--json', action='store_true', help='Print JSON')
+
+    plan_parser = subparsers.add_parser('plan', help='Show how a budget is spent over Level 0 approaches')
+    plan_parser.add_argument('approaches', help='JSON list of names or {name, confidence}')
+    add_common(plan_parser, 60)
+    plan_parser.add_argument('--batch', type=int, default=BATCH_SIZE,
+                             help=f'Approaches expanded per batch (default: {BATCH_SIZE})')
+    plan_parser.add_argument('--decay', type=float, default=DEPTH_DECAY,
+                             help=f'Priority decay per level (default: {DEPTH_DECAY})')
+    plan_parser.add_argument('--threshold', type=float, default=PRUNE_THRESHOLD,
+                             help=f'Pruning threshold (default: {PRUNE_THRESHOLD})')
+
+    bench_parser = subparsers.add_parser('bench', help='Run on a synthetic solution space')
+    add_common(bench_parser, 100)
+    bench_parser.add_argument('--roots', type=int, default=10, help='Level 0 approaches (default: 10)')
+    bench_parser.add_argument('--workers', type=positive_int, default=MAX_WORKERS,
+                              help=f'Worker pool size (default: {MAX_WORKERS})')
+    bench_parser.add_argument('--latency-ms', type=float, default=2.0,
+                              help='Simulated latency per evaluation (default: 2)')
+    bench_parser.add_argument('--duplicates', type=float, default=0.2,
+                              help='Share of near-duplicate proposals (default: 0.2)')
+    bench_parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == 'plan':
+        try:
+            roots = load_roots(args.approaches)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Cannot load approaches: {e}")
+            sys.exit(1)
+        expander = plan(roots, args.budget, args.branching, args.max_depth, args.capacity,
+                        args.batch, args.decay, args.threshold)
+        report = expander.report()
+        if args.json:
+            report['plan'] = expander.batches
+            print(json.dumps(report, indent=2))
+            return
+        print_report(report)
+        print("\nExpansion order:")
+        for number, labels in enumerate(expander.batches, 1):
+            print(f"  batch {number}: {', '.join(labels)}")
+        print("\nEvaluations per Level 0 approach:")
+        spent = Counter(n.root for n in expander.nodes if n.depth > 0 and n.confidence is not None)
+        for node in expander.nodes:
+            if node.depth == 0:
+                confidence = f"{node.confidence:.0%}" if node.confidence is not None else '?'
+                print(f"  {node.label}. {node.text} ({confidence}, {node.status}): {spent[node.id]}")
+
+    elif args.command == 'bench':
+        result = bench(args.roots, args.budget, args.workers, args.latency_ms, args.duplicates,
+                       args.branching, args.max_depth, args.capacity, args.seed)
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+        print(f"Unbounded BoT tree: {result['unbounded_tree']} approaches; exhaustive run scored "
+              f"{result['exhaustive_evaluations']} (best confidence {result['exhaustive_best']:.2f})\n")
+        for name in ('serial', 'pool'):
+            report = result[name]
+            print(f"[{name}]")
+            print_report(report)
+            print(f"Best confidence {report['best_confidence']:.2f}; "
+                  f"{report['top_recall']:.0%} of the exhaustive top {TOP_SOLUTIONS} found\n")
+
+
+if __name__ == '__main__':
+    main()
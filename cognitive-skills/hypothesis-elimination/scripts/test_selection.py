@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Information-gain test selection for Hypothesis-Elimination (HEDAM).
+
+Phase 2 of SKILL.md ranks evidence sources by Discrimination / Cost. That
+ranking is fixed before any evidence comes in. This engine re-ranks after
+every result:
+
+- Likelihoods are held as a NumPy array L[test, outcome, hypothesis] =
+  P(outcome | hypothesis). Each test may have its own outcomes; unused outcome
+  slots are zero.
+- The expected information gain of every test is computed at once as the
+  mutual information between the hypothesis and the test outcome under the
+  current posterior. Tests are ranked by gain per unit cost (or by gain alone).
+- observe() multiplies the posterior by the likelihood row of the outcome,
+  in place. Hypotheses below 1% are reported as ELIMINATED. The rest are
+  WEAKENED, UNCHANGED or STRENGTHENED, as in the Phase 3 table.
+- Selection stays interactive at hundreds of hypotheses and tests: it is one
+  pass over an (m × k × n) array.
+
+Session files are JSON:
+
+    {
+      "hypotheses": [{"name": "H1: Memory leak", "prior": 0.2}, ...],
+      "tests": [
+        {"name": "Error logs (last hour)", "cost": 2,
+         "outcomes": ["spike", "clean"],
+         "likelihood": {"H1: Memory leak": [0.3, 0.7], "H3: Slow external API": [0.9, 0.1]},
+         "default": [0.5, 0.5]}
+      ]
+    }
+
+Hypotheses a test does not list use its `default` row (uninformative if
+omitted). Every row needs one probability in [0, 1] per outcome, summing to 1.
+observe appends to "observations" and stores the posterior; a test can be
+observed once. The session file is replaced atomically.
+
+Usage:
+    python test_selection.py next incident.json --top 5
+    python test_selection.py observe incident.json "Error logs (last hour)" spike
+    python test_selection.py status incident.json
+    python test_selection.py bench --hypotheses 200 --tests 300 --trials 100
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+ELIMINATED_BELOW = 0.01
+CONFIRM_AT = 0.95
+CHANGE_RATIO = 1.25
+ROW_SUM_TOLERANCE = 1e-3
+
+
+def entropy(p: np.ndarray) -> float:
+    nz = p[p > 0]
+    return float(-(nz * np.log2(nz)).sum())
+
+
+class TestSelector:
+    """Posterior over hypotheses plus expected-information-gain ranking of tests."""
+
+    def __init__(self, hypotheses: List[str], tests: List[str], likelihood: np.ndarray, costs: np.ndarray,
+                 prior: Optional[np.ndarray] = None, outcomes: Optional[List[List[str]]] = None):
+        """
+        Initialize selector.
+
+        Args:
+            hypotheses: Hypothesis names (n)
+            tests: Test names (m)
+            likelihood: (m, k, n) array of P(outcome | hypothesis)
+            costs: (m,) acquisition costs, > 0
+            prior: (n,) prior probabilities (uniform if omitted)
+            outcomes: Outcome labels per test (defaults to '0'..'k-1')
+        """
+        m, k, n = likelihood.shape
+        if len(hypotheses) != n or len(tests) != m or costs.shape != (m,):
+            raise ValueError("likelihood shape does not match hypotheses, tests and costs")
+        if np.any(costs <= 0):
+            raise ValueError("test costs must be positive")
+        self.hypotheses = hypotheses
+        self.tests = tests
+        self.likelihood = np.ascontiguousarray(likelihood, dtype=np.float64)
+        self.costs = np.asarray(costs, dtype=np.float64)
+        self.outcomes = outcomes or [[str(o) for o in range(k)] for _ in range(m)]
+        self.posterior = np.full(n, 1.0 / n) if prior is None else np.asarray(prior, dtype=np.float64).copy()
+        self.posterior /= self.posterior.sum()
+        self.done = np.zeros(m, dtype=bool)
+        self._log_likelihood = np.log(np.where(self.likelihood > 0, self.likelihood, 1.0))
+        self._test_index = {name: i for i, name in enumerate(tests)}
+
+    def expected_gain(self) -> np.ndarray:
+        """
+        Mutual information I(H; outcome of t) in bits for every test.
+
+        I = Σ_o Σ_h p(h) L[t,o,h] (log L[t,o,h] - log q[t,o]), q[t,o] = Σ_h p(h) L[t,o,h]
+        """
+        joint = self.likelihood * self.posterior
+        predictive = joint.sum(axis=2)
+        log_predictive = np.log(np.where(predictive > 0, predictive, 1.0))
+        gain = (joint * self._log_likelihood).sum(axis=2) - predictive * log_predictive
+        return np.maximum(gain.sum(axis=1), 0.0) / np.log(2)
+
+    def rank(self, top: int = 5, per_cost: bool = True, include_done: bool = False) -> List[Dict[str, Any]]:
+        """Tests ordered by expected gain per unit cost (or by gain)."""
+        gain = self.expected_gain()
+        score = gain / self.costs if per_cost else gain.copy()
+        if not include_done:
+            score[self.done] = -np.inf
+        order = np.argsort(-score, kind='stable')[:top]
+        return [
+            {'test': self.tests[i], 'expected_gain_bits': round(float(gain[i]), 4),
+             'cost': float(self.costs[i]), 'score': round(float(score[i]), 4)}
+            for i in order if np.isfinite(score[i])
+        ]
+
+    def best(self, per_cost: bool = True) -> Optional[int]:
+        gain = self.expected_gain()
+        score = gain / self.costs if per_cost else gain
+        score = np.where(self.done, -np.inf, score)
+        i = int(np.argmax(score))
+        return i if np.isfinite(score[i]) else None
+
+    def observe(self, test: Any, outcome: Any) -> Dict[str, Any]:
+        """
+        Update the posterior in place with one test result.
+
+        Args:
+            test: Test name or index
+            outcome: Outcome label or index
+
+        Returns:
+            Per-hypothesis status changes for the Phase 3 table
+        """
+        t = self._test_index[test] if isinstance(test, str) else int(test)
+        o = self.outcomes[t].index(outcome) if isinstance(outcome, str) else int(outcome)
+        if self.done[t]:
+            raise ValueError(f"'{self.tests[t]}' has already been observed; its evidence is in the posterior")
+        before = self.posterior.copy()
+        self.posterior *= self.likelihood[t, o]
+        total = self.posterior.sum()
+        if total <= 0:
+            self.posterior[:] = before
+            raise ValueError(f"Outcome '{self.outcomes[t][o]}' of '{self.tests[t]}' is impossible under every "
+                             f"hypothesis: the hypothesis set is incomplete (reopen Phase 1)")
+        self.posterior /= total
+        self.done[t] = True
+        return {'test': self.tests[t], 'outcome': self.outcomes[t][o],
+                'changes': self._changes(before, self.posterior)}
+
+    def _changes(self, before: np.ndarray, after: np.ndarray) -> List[Dict[str, Any]]:
+        rows = []
+        for i in np.argsort(-after):
+            if before[i] < ELIMINATED_BELOW and after[i] < ELIMINATED_BELOW:
+                continue
+            if after[i] < ELIMINATED_BELOW:
+                status = 'ELIMINATED'
+            elif after[i] > before[i] * CHANGE_RATIO:
+                status = 'STRENGTHENED'
+            elif after[i] * CHANGE_RATIO < before[i]:
+                status = 'WEAKENED'
+            else:
+                status = 'UNCHANGED'
+            rows.append({'hypothesis': self.hypotheses[i], 'before': round(float(before[i]), 4),
+                         'after': round(float(after[i]), 4), 'status': status})
+        return rows
+
+    def status(self) -> Dict[str, Any]:
+        order = np.argsort(-self.posterior)
+        alive = int((self.posterior >= ELIMINATED_BELOW).sum())
+        return {
+            'leading': self.hypotheses[order[0]],
+            'leading_probability': round(float(self.posterior[order[0]]), 4),
+            'confirmed': bool(self.posterior[order[0]] >= CONFIRM_AT),
+            'remaining': alive,
+            'eliminated': len(self.hypotheses) - alive,
+            'entropy_bits': round(entropy(self.posterior), 4),
+            'posterior': [{'hypothesis': self.hypotheses[i], 'p': round(float(self.posterior[i]), 4)}
+                          for i in order if self.posterior[i] >= ELIMINATED_BELOW],
+        }
+
+
+def load_session(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_session(path: str, session: Dict[str, Any]) -> None:
+    """Write to a temp file beside the session and rename it over, so an interrupted write leaves the old file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(session, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def check_row(test: str, name: str, row: Any, labels: List[str]) -> np.ndarray:
+    """One likelihood row as an array: one probability in [0, 1] per outcome, summing to 1."""
+    try:
+        values = np.asarray(row, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"Test '{test}': {name} row must be numbers, got {row!r}")
+    if values.shape != (len(labels),):
+        raise ValueError(f"Test '{test}': {name} needs {len(labels)} likelihoods ({', '.join(labels)})")
+    if not np.all((values >= 0) & (values <= 1)):
+        raise ValueError(f"Test '{test}': {name} likelihoods must be in [0, 1], got {row}")
+    if abs(values.sum() - 1.0) > ROW_SUM_TOLERANCE:
+        raise ValueError(f"Test '{test}': {name} likelihoods must sum to 1 over the outcomes, got {values.sum():g}")
+    return values
+
+
+def selector_from_session(session: Dict[str, Any]) -> TestSelector:
+    """Build the likelihood array from a session and replay stored state."""
+    hypotheses = [h['name'] for h in session['hypotheses']]
+    index = {name: i for i, name in enumerate(hypotheses)}
+    tests = session['tests']
+    k = max(len(t.get('outcomes', ['positive', 'negative'])) for t in tests)
+    likelihood = np.zeros((len(tests), k, len(hypotheses)))
+    outcomes = []
+    for ti, test in enumerate(tests):
+        labels = test.get('outcomes', ['positive', 'negative'])
+        outcomes.append(labels)
+        default = test.get('default', [1.0 / len(labels)] * len(labels))
+        likelihood[ti, :len(labels), :] = check_row(test['name'], 'default', default, labels)[:, None]
+        for name, row in test.get('likelihood', {}).items():
+            if name not in index:
+                raise ValueError(f"Test '{test['name']}' refers to unknown hypothesis '{name}'")
+            likelihood[ti, :len(labels), index[name]] = check_row(test['name'], name, row, labels)
+    prior = np.array([h.get('prior', 1.0) for h in session['hypotheses']], dtype=np.float64)
+    selector = TestSelector(hypotheses, [t['name'] for t in tests], likelihood,
+                            np.array([t.get('cost', 1.0) for t in tests], dtype=np.float64), prior, outcomes)
+    for observation in session.get('observations', []):
+        selector.observe(observation['test'], observation['outcome'])
+    return selector
+
+
+def synthetic(n: int, m: int, rng: np.random.Generator, noise: float = 0.1):
+    """Random binary tests, each sensitive to 5-30% of hypotheses, with costs 1-10."""
+    sensitive = rng.random((m, n)) < rng.uniform(0.05, 0.3, size=(m, 1))
+    positive = np.where(sensitive, 1.0 - noise, noise)
+    likelihood = np.stack([positive, 1.0 - positive], axis=1)
+    costs = rng.integers(1, 11, size=m).astype(np.float64)
+    prior = rng.dirichlet(np.full(n, 2.0))
+    return likelihood, costs, prior, sensitive.sum(axis=1)
+
+
+def bench(n: int, m: int, trials: int, max_tests: int, seed: int) -> Dict[str, Any]:
+    """
+    Tests and cost needed to confirm (posterior ≥ 0.95) under three strategies:
+    gain per cost, gain alone, and the fixed Discrimination / Cost order from Phase 2.
+    """
+    rng = np.random.default_rng(seed)
+    names = ['gain_per_cost', 'gain', 'fixed_order']
+    totals = {s: {'tests': 0, 'cost': 0.0, 'correct': 0, 'confirmed': 0} for s in names}
+    select_time, selections = 0.0, 0
+    hyp_names = [f"H{i}" for i in range(n)]
+    test_names = [f"T{j}" for j in range(m)]
+    for _ in range(trials):
+        likelihood, costs, prior, discriminates = synthetic(n, m, rng)
+        truth = rng.choice(n, p=prior)
+        outcome_draws = rng.random(m)
+        outcomes = (outcome_draws >= likelihood[:, 0, truth]).astype(int)
+        fixed_order = list(np.argsort(-(discriminates / costs), kind='stable'))
+        for strategy in names:
+            selector = TestSelector(hyp_names, test_names, likelihood, costs, prior)
+            used = 0
+            while used < max_tests and selector.posterior.max() < CONFIRM_AT:
+                if strategy == 'fixed_order':
+                    t = fixed_order[used] if used < m else None
+                else:
+                    start = time.perf_counter()
+                    t = selector.best(per_cost=strategy == 'gain_per_cost')
+                    select_time += time.perf_counter() - start
+                    selections += 1
+                if t is None:
+                    break
+                selector.observe(t, outcomes[t])
+                totals[strategy]['cost'] += costs[t]
+                used += 1
+            totals[strategy]['tests'] += used
+            totals[strategy]['correct'] += int(np.argmax(selector.posterior) == truth)
+            totals[strategy]['confirmed'] += int(selector.posterior.max() >= CONFIRM_AT)
+    return {
+        'hypotheses': n, 'tests': m, 'trials': trials,
+        'select_ms': round(select_time / max(selections, 1) * 1000, 3),
+        'strategies': {
+            s: {'mean_tests': round(t['tests'] / trials, 2), 'mean_cost': round(t['cost'] / trials, 2),
+                'accuracy': round(t['correct'] / trials, 4), 'confirmed': round(t['confirmed'] / trials, 4)}
+            for s, t in totals.items()
+        },
+    }
+
+
+def print_changes(result: Dict[str, Any]) -> None:
+    print(f"### Evidence: {result['test']} -> {result['outcome']}\n")
+    print("| Hypothesis | Before | After | New Status |")
+    print("|------------|--------|-------|------------|")
+    for row in result['changes']:
+        print(f"| {row['hypothesis']} | {row['before']:.0%} | {row['after']:.0%} | {row['status']} |")
+
+
+def print_status(status: Dict[str, Any]) -> None:
+    mark = ' (CONFIRMED threshold reached)' if status['confirmed'] else ''
+    print(f"Leading: {status['leading']} at {status['leading_probability']:.0%}{mark}")
+    print(f"Remaining: {status['remaining']}, eliminated: {status['eliminated']}, "
+          f"entropy {status['entropy_bits']:.2f} bits")
+    for row in status['posterior'][:15]:
+        print(f"  {row['p']:>6.1%}  {row['hypothesis']}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Expected-information-gain test selection for HEDAM')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    next_parser = subparsers.add_parser('next', help='Rank the tests to run next')
+    next_parser.add_argument('session')
+    next_parser.add_argument('--top', type=int, default=5)
+    next_parser.add_argument('--ignore-cost', action='store_true', help='Rank by gain alone')
+
+    observe_parser = subparsers.add_parser('observe', help='Record a test result and update the posterior')
+    observe_parser.add_argument('session')
+    observe_parser.add_argument('test')
+    observe_parser.add_argument('outcome')
+
+    status_parser = subparsers.add_parser('status', help='Show the posterior')
+    status_parser.add_argument('session')
+
+    bench_parser = subparsers.add_parser('bench', help='Compare with the fixed Discrimination / Cost order')
+    bench_parser.add_argument('--hypotheses', type=int, default=200)
+    bench_parser.add_argument('--tests', type=int, default=300)
+    bench_parser.add_argument('--trials', type=int, default=50)
+    bench_parser.add_argument('--max-tests', type=int, default=60, help='Give up after this many tests')
+    bench_parser.add_argument('--seed', type=int, default=0)
+
+    for sub_parser in (next_parser, observe_parser, status_parser, bench_parser):
+        sub_parser.add_argument('--json', action='store_true', help='Print JSON')
+
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        result = bench(args.hypotheses, args.tests, args.trials, args.max_tests, args.seed)
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+        print(f"{result['trials']} trials, {result['hypotheses']} hypotheses x {result['tests']} tests "
+              f"(selection {result['select_ms']} ms)\n")
+        print(f"{'Strategy':<15} {'Tests':>7} {'Cost':>8} {'Confirmed':>10} {'Correct':>8}")
+        for name, r in result['strategies'].items():
+            print(f"{name:<15} {r['mean_tests']:>7} {r['mean_cost']:>8} {r['confirmed']:>9.0%} {r['accuracy']:>7.0%}")
+        return
+
+    try:
+        session = load_session(args.session)
+        selector = selector_from_session(session)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Cannot load session: {e}")
+        sys.exit(1)
+
+    if args.command == 'next':
+        ranking = selector.rank(args.top, per_cost=not args.ignore_cost)
+        if args.json:
+            print(json.dumps(ranking, indent=2))
+            return
+        print("| Test | Expected gain (bits) | Cost | Gain / Cost |")
+        print("|------|----------------------|------|-------------|")
+        for row in ranking:
+            print(f"| {row['test']} | {row['expected_gain_bits']:.3f} | {row['cost']:g} | {row['score']:.3f} |")
+        if not ranking:
+            print("All tests have been run.")
+
+    elif args.command == 'observe':
+        if args.test not in selector._test_index:
+            print(f"Unknown test: {args.test}")
+            sys.exit(1)
+        labels = selector.outcomes[selector._test_index[args.test]]
+        if args.outcome not in labels:
+            print(f"Unknown outcome '{args.outcome}' (expected one of: {', '.join(labels)})")
+            sys.exit(1)
+        try:
+            result = selector.observe(args.test, args.outcome)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        session.setdefault('observations', []).append({'test': args.test, 'outcome': args.outcome})
+        session['posterior'] = {h: round(float(p), 6) for h, p in zip(selector.hypotheses, selector.posterior)}
+        try:
+            save_session(args.session, session)
+        except OSError as e:
+            print(f"Cannot save session: {e}")
+            sys.exit(1)
+        if args.json:
+            print(json.dumps({**result, 'status': selector.status()}, indent=2))
+        else:
+            print_changes(result)
+            print()
+            print_status(selector.status())
+
+    elif args.command == 'status':
+        status = selector.status()
+        if args.json:
+            print(json.dumps(status, indent=2))
+        else:
+            print_status(status)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+"""
+Fit the IR-v2 pattern affinity weights (Step 2) to labelled problems.
+
+The Step 2 weights (ToT = Criteria 0.35, SingleAnswer 0.30, ...) are
+hand-set. The A/B suite (.reasoning/ab-tests/) records where they pick the
+wrong pattern. This tool refits them from labelled data:
+
+- Labelled problems come from A/B test-case markdown (`## Test Case` sections
+  with an Expected Pattern and a dimension table), from JSON/JSONL records
+  ({"dimensions": {...}, "expected": "HE"}), and from session manifests.
+  A manifest with `outcome.correct_pattern` uses that label; a completed
+  session without one counts its first planned pattern as correct. Failed
+  and active sessions are skipped.
+- The terms of each formula stay as written; only their weights change. Each
+  pattern's weights stay non-negative and sum to 1, so scores keep the 1-5
+  scale and the gates still mean the same: AR and NDF are 0 below their
+  thresholds, TimePressure = 5 selects RTR, and a top score under 2.5 means
+  Direct Analysis.
+- The fit minimizes softmax cross-entropy over the pattern scores, with
+  Direct Analysis as a class at the 2.5 threshold, plus an L2 pull toward the
+  base weights. It runs projected gradient descent with Nesterov momentum
+  and backtracking on the product of simplices. Scores are one matrix
+  product over all problems, so a single fit on 50k sessions takes under a
+  second. Fast-path problems and problems labelled with a gated pattern do
+  not depend on the weights and are left out of the fit.
+- The L2 strength is chosen by k-fold cross-validation, and the held-out
+  accuracy of base and fitted weights is reported side by side.
+
+Each calibration writes `weights-vNNN.json` (the full table plus provenance)
+and `report-vNNN.md` (accuracy delta, flipped problems, weight changes).
+Later runs and `evaluate` can start from a table with --weights.
+
+Usage:
+    python calibrate_weights.py evaluate .reasoning/ab-tests/test-cases.md
+    python calibrate_weights.py calibrate .reasoning/ab-tests/test-cases.md .reasoning/sessions/
+    python calibrate_weights.py score --weights .reasoning/ir-v2-weights/weights-v001.json \\
+        Sequential=4 Criteria=4 SpaceKnown=3 SingleAnswer=5 Evidence=5 OpposingViews=1 Novelty=2
+    python calibrate_weights.py bench --samples 50000
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+DIMENSIONS = ('Sequential', 'Criteria', 'SpaceKnown', 'SingleAnswer', 'Evidence', 'OpposingViews',
+              'Novelty', 'Robustness', 'SolutionExists', 'TimePressure', 'StakeholderComplexity')
+# Manifest names (reasoning-handover-protocol Part 1.3) -> formula names
+DIMENSION_ALIASES = {
+    'sequential_dependencies': 'Sequential', 'criteria_clarity': 'Criteria',
+    'solution_space_known': 'SpaceKnown', 'single_answer_needed': 'SingleAnswer',
+    'evidence_available': 'Evidence', 'opposing_valid_views': 'OpposingViews',
+    'problem_novelty': 'Novelty', 'robustness_required': 'Robustness',
+    'solution_exists': 'SolutionExists', 'time_pressure': 'TimePressure',
+    'stakeholder_complexity': 'StakeholderComplexity',
+}
+HAND_SET_WEIGHTS = {
+    'ToT': {'Criteria': 0.35, 'SingleAnswer': 0.30, 'SpaceKnown': 0.20, '6-Novelty': 0.15},
+    'BoT': {'6-SpaceKnown': 0.35, '6-SingleAnswer': 0.30, '6-Criteria': 0.20, 'Novelty': 0.15},
+    'SRC': {'Sequential': 0.45, 'Criteria': 0.25, 'SingleAnswer': 0.20, '6-OpposingViews': 0.10},
+    'HE': {'Evidence': 0.40, 'SingleAnswer': 0.30, '6-Novelty': 0.20, '6-OpposingViews': 0.10},
+    'AR': {'Robustness': 0.40, 'SolutionExists': 0.30, '6-Novelty': 0.15, 'Evidence': 0.15},
+    'DR': {'OpposingViews': 0.50, 'Criteria': 0.20, '6-Evidence': 0.15,
+           'MIN(SingleAnswer,OpposingViews)': 0.15},
+    'AT': {'Novelty': 0.45, '6-SpaceKnown': 0.30, '6-Evidence': 0.15, '6-Sequential': 0.10},
+    'RTR': {'TimePressure': 0.50, 'SingleAnswer': 0.25, 'Evidence': 0.15, '6-Novelty': 0.10},
+    'NDF': {'StakeholderComplexity': 0.45, 'OpposingViews': 0.25, '6-Criteria': 0.15, '6-TimePressure': 0.15},
+}
+PATTERNS = tuple(HAND_SET_WEIGHTS)
+DIRECT = 'Direct'
+CLASSES = PATTERNS + (DIRECT,)
+GATES = {'AR': ('SolutionExists', 3), 'NDF': ('StakeholderComplexity', 3)}
+FAST_PATH = ('TimePressure', 5, 'RTR')
+DIRECT_THRESHOLD = 2.5
+NEUTRAL_SCORE = 3
+
+BETA = 4.0
+LAMBDAS = (0.0, 0.01, 0.1, 1.0)
+FOLDS = 5
+MAX_ITERATIONS = 300
+TOLERANCE = 1e-7
+OUTPUT_DIR = '.reasoning/ir-v2-weights'
+
+
+def term_value(term: str, dims: np.ndarray) -> np.ndarray:
+    """Evaluate a formula term ('Criteria', '6-Novelty', 'MIN(A,B)') over an (N, 11) dimension array."""
+    index = {name: i for i, name in enumerate(DIMENSIONS)}
+    if term.startswith('6-'):
+        return 6.0 - dims[:, index[term[2:]]]
+    if term.startswith('MIN(') and term.endswith(')'):
+        a, b = term[4:-1].split(',')
+        return np.minimum(dims[:, index[a.strip()]], dims[:, index[b.strip()]])
+    return dims[:, index[term]].astype(float)
+
+
+class WeightTable:
+    """Per-pattern term weights, as a (patterns, terms) array over fixed term names."""
+
+    def __init__(self, weights: Dict[str, Dict[str, float]], version: int = 0):
+        missing = set(PATTERNS) - set(weights)
+        if missing:
+            raise ValueError(f"weight table lacks patterns: {', '.join(sorted(missing))}")
+        self.terms = {p: list(HAND_SET_WEIGHTS[p]) for p in PATTERNS}
+        for p in PATTERNS:
+            if set(weights[p]) != set(self.terms[p]):
+                raise ValueError(f"{p} terms must be {self.terms[p]}")
+        self.matrix = np.array([[weights[p][t] for t in self.terms[p]] for p in PATTERNS])
+        self.version = version
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> 'WeightTable':
+        """Weight table from a weights-vNNN.json file, or the hand-set table."""
+        if not path:
+            return cls(HAND_SET_WEIGHTS)
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['weights'], data.get('version', 0))
+
+    def with_matrix(self, matrix: np.ndarray) -> 'WeightTable':
+        """Same terms, new weights."""
+        table = WeightTable(HAND_SET_WEIGHTS, self.version)
+        table.matrix = matrix
+        return table
+
+    def as_dict(self, decimals: int = 3) -> Dict[str, Dict[str, float]]:
+        """Rounded weights that still sum to exactly 1 per pattern."""
+        result = {}
+        for p, row in zip(PATTERNS, self.matrix):
+            rounded = np.round(row, decimals)
+            rounded[int(np.argmax(rounded))] += round(1.0 - rounded.sum(), decimals)
+            result[p] = {t: round(float(w), decimals) for t, w in zip(self.terms[p], rounded)}
+        return result
+
+
+class Dataset:
+    """Dimension scores, labels and precomputed formula terms."""
+
+    def __init__(self, dims: np.ndarray, labels: np.ndarray, names: List[str]):
+        self.dims = dims
+        self.labels = labels
+        self.names = names
+        # terms[p, k, n]: value of term k of pattern p for problem n (problems last, so
+        # per-pattern sums and reductions run over contiguous memory)
+        self.terms = np.stack([
+            np.stack([term_value(t, dims) for t in HAND_SET_WEIGHTS[p]]) for p in PATTERNS
+        ])
+        self.gated = np.stack([
+            dims[:, DIMENSIONS.index(GATES[p][0])] < GATES[p][1] if p in GATES else np.zeros(len(dims), bool)
+            for p in PATTERNS
+        ])
+        name, level, _ = FAST_PATH
+        self.fast_path = dims[:, DIMENSIONS.index(name)] >= level
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def subset(self, index: np.ndarray) -> 'Dataset':
+        return Dataset(self.dims[index], self.labels[index], [self.names[i] for i in index])
+
+
+def pattern_scores(data: Dataset, matrix: np.ndarray) -> np.ndarray:
+    """(N, patterns) affinity scores, gated patterns at 0."""
+    return np.where(data.gated, 0.0, np.einsum('pk,pkn->pn', matrix, data.terms)).T
+
+
+def predict(data: Dataset, matrix: np.ndarray) -> np.ndarray:
+    """Class index per problem: fast path, then highest score, then Direct below the threshold."""
+    scores = pattern_scores(data, matrix)
+    choice = np.argmax(scores, axis=1)
+    choice = np.where(scores.max(axis=1) < DIRECT_THRESHOLD, CLASSES.index(DIRECT), choice)
+    return np.where(data.fast_path, CLASSES.index(FAST_PATH[2]), choice)
+
+
+def accuracy(data: Dataset, matrix: np.ndarray) -> float:
+    return float(np.mean(predict(data, matrix) == data.labels)) if len(data) else 0.0
+
+
+class _Objective:
+    """
+    Regularized softmax cross-entropy over pattern scores, Direct as the last class.
+
+    Identical (dimensions, label) rows are merged with a count, since logged
+    sessions repeat the same scores. Fast-path rows and rows labelled with a
+    gated pattern are dropped: no weights can change their selection.
+    """
+
+    def __init__(self, data: Dataset, base: np.ndarray, lam: float, beta: float):
+        labelled_gated = np.zeros(len(data), dtype=bool)
+        patterns = data.labels < len(PATTERNS)
+        labelled_gated[patterns] = data.gated[data.labels[patterns], np.flatnonzero(patterns)]
+        keep = ~data.fast_path & ~labelled_gated
+        rows = np.column_stack([data.dims[keep], data.labels[keep]]).astype(np.int64)
+        unique, first, counts = np.unique(rows, axis=0, return_index=True, return_counts=True)
+        index = np.flatnonzero(keep)[first]
+        self.terms = np.ascontiguousarray(data.terms[:, :, index])
+        self.penalty = np.where(data.gated[:, index], -np.inf, 0.0)
+        self.labels = unique[:, -1]
+        self.weights = counts / counts.sum()
+        self.is_direct = self.labels == len(PATTERNS)
+        self.columns = np.flatnonzero(~self.is_direct)
+        self.base, self.lam, self.beta = base, lam, beta
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __call__(self, matrix: np.ndarray, gradient: bool = True) -> Tuple[float, Optional[np.ndarray]]:
+        logits = self.beta * np.einsum('pk,pkn->pn', matrix, self.terms) + self.penalty
+        direct = self.beta * DIRECT_THRESHOLD
+        top = np.maximum(logits.max(axis=0), direct)
+        exps = np.exp(logits - top)
+        total = exps.sum(axis=0) + np.exp(direct - top)
+        chosen = np.full(len(self.labels), direct)
+        chosen[self.columns] = logits[self.labels[self.columns], self.columns]
+        per_row = np.log(total) + top - chosen
+        diff = matrix - self.base
+        loss = float(per_row @ self.weights) + self.lam * float(np.sum(diff * diff))
+        if not gradient:
+            return loss, None
+        residual = exps / total
+        residual[self.labels[self.columns], self.columns] -= 1.0
+        residual *= self.weights
+        return loss, self.beta * np.einsum('pn,pkn->pk', residual, self.terms) + 2.0 * self.lam * diff
+
+
+def project_simplex(matrix: np.ndarray) -> np.ndarray:
+    """Euclidean projection of each row onto the probability simplex."""
+    k = matrix.shape[1]
+    ordered = -np.sort(-matrix, axis=1)
+    cumulative = np.cumsum(ordered, axis=1) - 1.0
+    steps = np.arange(1, k + 1)
+    rho = np.sum(ordered - cumulative / steps > 0, axis=1)
+    theta = cumulative[np.arange(len(matrix)), rho - 1] / rho
+    return np.maximum(matrix - theta[:, None], 0.0)
+
+
+def fit(data: Dataset, base: np.ndarray, lam: float, beta: float = BETA,
+        start: Optional[np.ndarray] = None, max_iterations: int = MAX_ITERATIONS) -> np.ndarray:
+    """Accelerated projected gradient descent (FISTA with backtracking) on the weight simplices."""
+    objective = _Objective(data, base, lam, beta)
+    if not len(objective):
+        return base.copy()
+    current = project_simplex(start if start is not None else base)
+    momentum, t, step = current.copy(), 1.0, 1.0
+    previous_loss = np.inf
+    for _ in range(max_iterations):
+        loss, gradient = objective(momentum)
+        while True:
+            candidate = project_simplex(momentum - step * gradient)
+            delta = candidate - momentum
+            candidate_loss, _ = objective(candidate, gradient=False)
+            if candidate_loss <= loss + np.sum(gradient * delta) + np.sum(delta * delta) / (2 * step) + 1e-12:
+                break
+            step *= 0.5
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = candidate + (t - 1) / t_next * (candidate - current)
+        current, t = candidate, t_next
+        if abs(previous_loss - candidate_loss) < TOLERANCE:
+            break
+        previous_loss = candidate_loss
+    return current
+
+
+def folds_of(n: int, folds: int, labels: np.ndarray, seed: int) -> List[np.ndarray]:
+    """Stratified fold assignment: each class is dealt round-robin after a shuffle."""
+    rng = np.random.default_rng(seed)
+    assignment = np.empty(n, dtype=int)
+    offset = 0
+    for label in np.unique(labels):
+        members = rng.permutation(np.flatnonzero(labels == label))
+        assignment[members] = (np.arange(len(members)) + offset) % folds
+        offset += len(members)
+    return [np.flatnonzero(assignment == f) for f in range(folds)]
+
+
+def cross_validate(data: Dataset, base: np.ndarray, lambdas: Sequence[float] = LAMBDAS,
+                   folds: int = FOLDS, beta: float = BETA, seed: int = 0) -> Dict[str, Any]:
+    """Held-out accuracy per regularization strength, with the base weights as reference."""
+    folds = max(2, min(folds, len(data)))
+    parts = folds_of(len(data), folds, data.labels, seed)
+    correct = {lam: 0 for lam in lambdas}
+    base_correct = 0
+    for held_out in parts:
+        if not len(held_out):
+            continue
+        train = data.subset(np.setdiff1d(np.arange(len(data)), held_out))
+        test = data.subset(held_out)
+        base_correct += int(np.sum(predict(test, base) == test.labels))
+        start = base
+        for lam in sorted(lambdas, reverse=True):
+            start = fit(train, base, lam, beta, start=start)
+            correct[lam] += int(np.sum(predict(test, start) == test.labels))
+    by_lambda = {lam: correct[lam] / len(data) for lam in lambdas}
+    best = max(lambdas, key=lambda lam: (by_lambda[lam], lam))
+    return {'folds': folds, 'base_accuracy': base_correct / len(data), 'by_lambda': by_lambda,
+            'lambda': best, 'accuracy': by_lambda[best]}
+
+
+# ----------------------------------------------------------------- loading
+
+def _label(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    word = value.strip().split()[0] if value.strip() else ''
+    word = word.strip('*()')
+    if word.lower() == 'direct':
+        return DIRECT
+    return next((c for c in CLASSES if c.lower() == word.lower()), None)
+
+
+def _dimension_vector(values: Dict[str, Any]) -> np.ndarray:
+    vector = np.full(len(DIMENSIONS), NEUTRAL_SCORE, dtype=float)
+    for key, value in values.items():
+        name = DIMENSION_ALIASES.get(key, key)
+        if name in DIMENSIONS and isinstance(value, (int, float)):
+            vector[DIMENSIONS.index(name)] = value
+    return vector
+
+
+def parse_test_cases(path: str) -> List[Tuple[str, np.ndarray, str]]:
+    """Labelled problems from A/B test-case markdown."""
+    with open(path) as f:
+        text = f.read()
+    problems = []
+    for section in re.split(r'^## ', text, flags=re.M)[1:]:
+        title = section.splitlines()[0].strip()
+        expected = re.search(r'\*\*Expected Pattern\*\*:\s*(.+)', section)
+        if not title.startswith('Test Case') or not expected or not _label(expected.group(1)):
+            continue
+        values = {}
+        for name, score in re.findall(r'^\|\s*\**(\w+)\**\s*\|\s*\**(\d+)\**\s*\|', section, flags=re.M):
+            values[name] = int(score)
+        if values:
+            problems.append((f"{os.path.basename(path)}: {title}", _dimension_vector(values),
+                             _label(expected.group(1))))
+    return problems
+
+
+def _record_problem(record: Dict[str, Any], name: str) -> Optional[Tuple[str, np.ndarray, str]]:
+    if not isinstance(record, dict) or not isinstance(record.get('dimensions'), dict):
+        return None
+    label = None
+    outcome = record.get('outcome')
+    if isinstance(outcome, dict):
+        label = _label(outcome.get('correct_pattern'))
+    for key in ('expected', 'label', 'correct_pattern'):
+        label = label or _label(record.get(key))
+    if label is None and record.get('status') == 'completed':
+        planned = (record.get('orchestration') or {}).get('planned_patterns') or []
+        label = _label(planned[0]) if planned else None
+    if label is None:
+        return None
+    return record.get('session_id') or record.get('id') or name, _dimension_vector(record['dimensions']), label
+
+
+def load_sources(paths: Sequence[str]) -> Dataset:
+    """Labelled problems from markdown, JSON, JSONL files and session directories."""
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in ('**/manifest.json', '**/*.jsonl', '**/test-cases.md'):
+                files.extend(sorted(glob.glob(os.path.join(path, pattern), recursive=True)))
+        else:
+            files.append(path)
+    problems: List[Tuple[str, np.ndarray, str]] = []
+    for path in files:
+        if path.endswith('.md'):
+            problems.extend(parse_test_cases(path))
+        elif path.endswith('.jsonl'):
+            with open(path) as f:
+                for number, line in enumerate(f, 1):
+                    if line.strip():
+                        problem = _record_problem(json.loads(line), f"{path}:{number}")
+                        if problem:
+                            problems.append(problem)
+        else:
+            with open(path) as f:
+                data = json.load(f)
+            records = data if isinstance(data, list) else [data]
+            for number, record in enumerate(records):
+                problem = _record_problem(record, f"{path}:{number}")
+                if problem:
+                    problems.append(problem)
+    if not problems:
+        raise ValueError('no labelled problems found')
+    names = [p[0] for p in problems]
+    dims = np.stack([p[1] for p in problems])
+    labels = np.array([CLASSES.index(p[2]) for p in problems])
+    return Dataset(dims, labels, names)
+
+
+# ----------------------------------------------------------------- reporting
+
+def per_class(data: Dataset, matrix: np.ndarray) -> Dict[str, Dict[str, int]]:
+    """Expected count and correct count per class."""
+    chosen = predict(data, matrix)
+    result = {}
+    for c, name in enumerate(CLASSES):
+        members = data.labels == c
+        if members.any():
+            result[name] = {'expected': int(members.sum()), 'correct': int((chosen[members] == c).sum())}
+    return result
+
+
+def next_version(out_dir: str) -> int:
+    versions = [int(m.group(1)) for m in (re.match(r'weights-v(\d+)\.json$', f)
+                                          for f in (os.listdir(out_dir) if os.path.isdir(out_dir) else []))
+                if m]
+    return max(versions, default=0) + 1
+
+
+def calibrate(data: Dataset, base: WeightTable, lambdas: Sequence[float] = LAMBDAS, folds: int = FOLDS,
+              beta: float = BETA, seed: int = 0) -> Dict[str, Any]:
+    """Cross-validate, refit on everything and compare with the base table."""
+    start = time.perf_counter()
+    cv = cross_validate(data, base.matrix, lambdas, folds, beta, seed)
+    fitted = fit(data, base.matrix, cv['lambda'], beta)
+    elapsed = time.perf_counter() - start
+    before, after = predict(data, base.matrix), predict(data, fitted)
+    return {
+        'table': base.with_matrix(fitted),
+        'cv': cv,
+        'samples': len(data),
+        'accuracy_before': float(np.mean(before == data.labels)),
+        'accuracy_after': float(np.mean(after == data.labels)),
+        'fixed': [data.names[i] for i in np.flatnonzero((before != data.labels) & (after == data.labels))],
+        'broken': [data.names[i] for i in np.flatnonzero((before == data.labels) & (after != data.labels))],
+        'still_wrong': [(data.names[i], CLASSES[data.labels[i]], CLASSES[after[i]])
+                        for i in np.flatnonzero((before != data.labels) & (after != data.labels))],
+        'per_class_before': per_class(data, base.matrix),
+        'per_class_after': per_class(data, fitted),
+        'elapsed_s': elapsed,
+        'beta': beta,
+    }
+
+
+def _write_file(path: str, text: str, exclusive: bool = False) -> bool:
+    """
+    Write text to a temp file in the same directory, then move it into place.
+
+    A reader never sees a partial file. With exclusive=True the file is
+    hard-linked into place, which fails if path already exists.
+
+    Returns:
+        False if exclusive and path was already taken
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.calibrate-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if not exclusive:
+            os.replace(tmp_path, path)
+            return True
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            return False
+        return True
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _weights_payload(result: Dict[str, Any], base: WeightTable, sources: Sequence[str],
+                     version: int) -> Dict[str, Any]:
+    table = result['table']
+    cv = result['cv']
+    return {
+        'version': version,
+        'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'base_version': base.version,
+        'sources': list(sources),
+        'samples': result['samples'],
+        'fit': {'beta': result['beta'], 'lambda': cv['lambda'], 'folds': cv['folds']},
+        'accuracy': {'base_cv': round(cv['base_accuracy'], 4), 'fitted_cv': round(cv['accuracy'], 4),
+                     'base_in_sample': round(result['accuracy_before'], 4),
+                     'fitted_in_sample': round(result['accuracy_after'], 4)},
+        'rules': {'gates': {p: {'dimension': d, 'minimum': m} for p, (d, m) in GATES.items()},
+                  'fast_path': {'dimension': FAST_PATH[0], 'value': FAST_PATH[1], 'pattern': FAST_PATH[2]},
+                  'direct_threshold': DIRECT_THRESHOLD},
+        'weights': table.as_dict(),
+    }
+
+
+def render_report(result: Dict[str, Any], base: WeightTable, sources: Sequence[str], version: int) -> str:
+    """Markdown calibration report for one weights version."""
+    weights = result['table'].as_dict()
+    cv = result['cv']
+    base_weights = base.as_dict()
+    lines = [
+        f"# IR-v2 Weight Calibration v{version:03d}",
+        '',
+        f"**Base**: {'hand-set weights (SKILL.md Step 2)' if base.version == 0 else f'v{base.version:03d}'}",
+        f"**Samples**: {result['samples']} labelled problems from {', '.join(sources)}",
+        f"**Fit**: beta={result['beta']}, lambda={cv['lambda']} ({cv['folds']}-fold CV), "
+        f"{result['elapsed_s']:.2f}s",
+        '',
+        '## Accuracy',
+        '',
+        '| Metric | Base | Calibrated | Delta |',
+        '|--------|------|------------|-------|',
+        f"| Cross-validated | {cv['base_accuracy']:.1%} | {cv['accuracy']:.1%} | "
+        f"{cv['accuracy'] - cv['base_accuracy']:+.1%} |",
+        f"| In-sample | {result['accuracy_before']:.1%} | {result['accuracy_after']:.1%} | "
+        f"{result['accuracy_after'] - result['accuracy_before']:+.1%} |",
+        '',
+        '| Lambda | CV accuracy |',
+        '|--------|-------------|',
+    ]
+    lines += [f"| {lam} | {acc:.1%} |" for lam, acc in sorted(cv['by_lambda'].items())]
+    lines += ['', '## Per Pattern', '', '| Pattern | Expected | Base correct | Calibrated correct |',
+              '|---------|----------|--------------|--------------------|']
+    for name, counts in result['per_class_before'].items():
+        lines.append(f"| {name} | {counts['expected']} | {counts['correct']} | "
+                     f"{result['per_class_after'][name]['correct']} |")
+    lines += ['', '## Changed Selections', '']
+    lines += [f"- Fixed: {n}" for n in result['fixed']] or ['- Fixed: none']
+    lines += [f"- Broken: {n}" for n in result['broken']] or ['- Broken: none']
+    for name, expected, chosen in result['still_wrong'][:20]:
+        lines.append(f"- Still wrong: {name} (expected {expected}, selects {chosen})")
+    if len(result['still_wrong']) > 20:
+        lines.append(f"- ... {len(result['still_wrong']) - 20} more still wrong")
+    lines += ['', '## Weights', '', '| Pattern | Term | Base | Calibrated |', '|---------|------|------|------------|']
+    for p in PATTERNS:
+        for term, value in weights[p].items():
+            lines.append(f"| {p} | {term} | {base_weights[p][term]:.3f} | {value:.3f} |")
+    return '\n'.join(lines) + '\n'
+
+
+def write_outputs(result: Dict[str, Any], base: WeightTable, sources: Sequence[str],
+                  out_dir: str) -> Tuple[str, str]:
+    """
+    Write weights-vNNN.json and report-vNNN.md; returns their paths.
+
+    The version is claimed by creating the weights file exclusively, so a
+    concurrent run that picked the same number moves on to the next one.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    version = next_version(out_dir)
+    while True:
+        weights_path = os.path.join(out_dir, f"weights-v{version:03d}.json")
+        text = json.dumps(_weights_payload(result, base, sources, version), indent=2) + '\n'
+        if _write_file(weights_path, text, exclusive=True):
+            break
+        version += 1
+    report_path = os.path.join(out_dir, f"report-v{version:03d}.md")
+    _write_file(report_path, render_report(result, base, sources, version))
+    return weights_path, report_path
+
+
+def synthetic(samples: int, noise: float, seed: int) -> Tuple[Dataset, np.ndarray]:
+    """Problems labelled by a perturbed weight table, with a share of random labels."""
+    rng = np.random.default_rng(seed)
+    base = WeightTable(HAND_SET_WEIGHTS).matrix
+    truth = np.stack([rng.dirichlet(row * 40) for row in base])
+    dims = rng.integers(1, 6, size=(samples, len(DIMENSIONS))).astype(float)
+    data = Dataset(dims, np.zeros(samples, dtype=int), [f"synthetic-{i}" for i in range(samples)])
+    labels = predict(data, truth)
+    flip = rng.random(samples) < noise
+    labels[flip] = rng.integers(0, len(CLASSES), size=int(flip.sum()))
+    data.labels = labels
+    return data, truth
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Calibrate IR-v2 pattern affinity weights from labelled problems')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    calibrate_parser = subparsers.add_parser('calibrate', help='Fit a new versioned weight table')
+    calibrate_parser.add_argument('sources', nargs='+', help='Test-case markdown, JSON/JSONL records, session dirs')
+    calibrate_parser.add_argument('--weights', help='Base weight table (default: hand-set weights)')
+    calibrate_parser.add_argument('--folds', type=int, default=FOLDS, help=f'CV folds (default: {FOLDS})')
+    calibrate_parser.add_argument('--beta', type=float, default=BETA, help=f'Softmax sharpness (default: {BETA})')
+    calibrate_parser.add_argument('--out-dir', default=OUTPUT_DIR, help=f'Output directory (default: {OUTPUT_DIR})')
+    calibrate_parser.add_argument('--dry-run', action='store_true', help='Print the report without writing')
+    calibrate_parser.add_argument('--seed', type=int, default=0)
+
+    evaluate_parser = subparsers.add_parser('evaluate', help='Accuracy of a weight table on labelled problems')
+    evaluate_parser.add_argument('sources', nargs='+', help='Test-case markdown, JSON/JSONL records, session dirs')
+    evaluate_parser.add_argument('--weights', help='Weight table (default: hand-set weights)')
+
+    score_parser = subparsers.add_parser('score', help='Rank patterns for one problem')
+    score_parser.add_argument('dimensions', nargs='+', help='Name=score pairs; unlisted dimensions are 3')
+    score_parser.add_argument('--weights', help='Weight table (default: hand-set weights)')
+
+    bench_parser = subparsers.add_parser('bench', help='Calibrate on synthetic labelled sessions')
+    bench_parser.add_argument('--samples', type=int, default=50000, help='Labelled problems (default: 50000)')
+    bench_parser.add_argument('--noise', type=float, default=0.1, help='Share of random labels (default: 0.1)')
+    bench_parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'score':
+            table = WeightTable.load(args.weights)
+            values = {}
+            for item in args.dimensions:
+                name, _, value = item.partition('=')
+                if DIMENSION_ALIASES.get(name, name) not in DIMENSIONS or not value:
+                    raise ValueError(f"expected Name=score with a known dimension, got {item!r}")
+                values[name] = float(value)
+            data = Dataset(_dimension_vector(values)[None, :], np.zeros(1, dtype=int), ['problem'])
+            scores = pattern_scores(data, table.matrix)[0]
+            for p, s in sorted(zip(PATTERNS, scores), key=lambda x: -x[1]):
+                print(f"{p:<4} {s:.2f}")
+            print(f"Selected: {CLASSES[predict(data, table.matrix)[0]]}")
+
+        elif args.command == 'evaluate':
+            table = WeightTable.load(args.weights)
+            data = load_sources(args.sources)
+            chosen = predict(data, table.matrix)
+            for i in np.flatnonzero(chosen != data.labels):
+                print(f"MISS {data.names[i]}: expected {CLASSES[data.labels[i]]}, selects {CLASSES[chosen[i]]}")
+            print(f"\nAccuracy: {np.mean(chosen == data.labels):.1%} ({int(np.sum(chosen == data.labels))}/"
+                  f"{len(data)})")
+            for name, counts in per_class(data, table.matrix).items():
+                print(f"  {name:<6} {counts['correct']}/{counts['expected']}")
+
+        elif args.command == 'calibrate':
+            base = WeightTable.load(args.weights)
+            data = load_sources(args.sources)
+            result = calibrate(data, base, folds=args.folds, beta=args.beta, seed=args.seed)
+            cv = result['cv']
+            print(f"{len(data)} labelled problems, lambda={cv['lambda']} ({cv['folds']}-fold CV), "
+                  f"{result['elapsed_s']:.2f}s")
+            print(f"  CV accuracy:        {cv['base_accuracy']:.1%} -> {cv['accuracy']:.1%}")
+            print(f"  In-sample accuracy: {result['accuracy_before']:.1%} -> {result['accuracy_after']:.1%} "
+                  f"({len(result['fixed'])} fixed, {len(result['broken'])} broken)")
+            if args.dry_run:
+                print(render_report(result, base, args.sources, next_version(args.out_dir)), end='')
+            else:
+                weights_path, report_path = write_outputs(result, base, args.sources, args.out_dir)
+                print(f"✅ Wrote {weights_path} and {report_path}")
+
+        elif args.command == 'bench':
+            data, truth = synthetic(args.samples, args.noise, args.seed)
+            base = WeightTable(HAND_SET_WEIGHTS)
+            result = calibrate(data, base, seed=args.seed)
+            cv = result['cv']
+            fitted = result['table'].matrix
+            print(f"{args.samples} synthetic sessions ({args.noise:.0%} random labels), "
+                  f"calibrated in {result['elapsed_s']:.2f}s")
+            print(f"  CV accuracy:   hand-set {cv['base_accuracy']:.1%} -> calibrated {cv['accuracy']:.1%} "
+                  f"(generating weights {accuracy(data, truth):.1%})")
+            print(f"  Weight error:  hand-set {np.abs(base.matrix - truth).mean():.3f} -> "
+                  f"calibrated {np.abs(fitted - truth).mean():.3f} (mean absolute)")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Pareto-frontier and integrative-option solver for NDF (ALIGN).
+
+Works from the G-step Comparison Matrix instead of comparing options by hand:
+
+- Options are either listed directly (one utility per stakeholder) or
+  generated as packages: every combination of one level per issue, with
+  additive utilities. Packages are what "Trade Across Issues" and "Add
+  Issues" produce, and several issues quickly give thousands of candidates.
+- The Pareto-optimal set (no option is at least as good for everyone and
+  better for someone) is found with Sort-Filter-Skyline. Candidates are
+  visited in decreasing utility sum, so a visited option can never be
+  dominated by a later one. Each frontier point prunes everything it
+  dominates in one vectorized pass, so the cost grows with the frontier
+  size rather than with the square of the candidate count.
+- Options below any stakeholder's BATNA are flagged: that stakeholder does
+  better without an agreement.
+- Social-welfare functions rank the frontier:
+    utilitarian   Σ w_i u_i
+    nash          Σ w_i log(u_i - BATNA_i)  (Nash bargaining; only options above every BATNA)
+    egalitarian   min_i u_i                 (Rawlsian maximin, weight-free, so no sweep)
+- Sensitivity: thousands of weight vectors drawn from a Dirichlet around the
+  stated weights are scored in one matrix product. The report gives how often
+  each option wins, and, per stakeholder, the weight range over which the
+  recommended option stays on top.
+- L and I steps: issues where every stakeholder prefers the same level are
+  zones of agreement. Stakeholder pairs whose utilities are negatively
+  correlated across the frontier are irreducible conflicts.
+
+Utilities must share a scale (the 1-5 scores of the Comparison Matrix).
+
+Spec (JSON):
+    {
+      "stakeholders": [{"name": "Engineering", "weight": 0.35, "batna": 2}, ...],
+      "options": [{"name": "Opt 1", "utility": {"Engineering": 4, "Product": 3}}, ...]
+    }
+or, for packages:
+    {
+      "stakeholders": [...],
+      "issues": [{"name": "Timeline", "levels": [
+          {"name": "Q2", "utility": {"Engineering": 1, "Product": 5}},
+          {"name": "Q3", "utility": {"Engineering": 4, "Product": 3}}]}, ...]
+    }
+With issues, a stakeholder's package utility is the mean of its level
+utilities, so it stays on the level scale.
+
+Usage:
+    python pareto_solver.py solve decision.json --welfare nash --sweep 5000
+    python pareto_solver.py bench --issues 5 --levels 6 --stakeholders 6
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+WELFARE_FUNCTIONS = ('utilitarian', 'nash', 'egalitarian')
+SWEEP_SAMPLES = 2000
+CONCENTRATION = 50.0
+
+
+class Problem:
+    """Stakeholder weights, BATNAs and the candidate utility matrix."""
+
+    def __init__(self, stakeholders: List[str], weights: np.ndarray, batna: np.ndarray,
+                 utility: np.ndarray, labels: List[str], issues: Optional[List[Dict[str, Any]]] = None):
+        """
+        Args:
+            stakeholders: Stakeholder names (d)
+            weights: (d,) weights, normalized to sum 1
+            batna: (d,) utility of no agreement for each stakeholder
+            utility: (N, d) utility of each candidate for each stakeholder
+            labels: Candidate names (N)
+            issues: Issue specs when candidates are packages
+        """
+        self.stakeholders = stakeholders
+        self.weights = weights / weights.sum()
+        self.batna = batna
+        self.utility = utility
+        self.labels = labels
+        self.issues = issues or []
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any]) -> 'Problem':
+        people = spec['stakeholders']
+        names = [s['name'] for s in people]
+        weights = np.array([float(s.get('weight', 1.0)) for s in people])
+        batna = np.array([float(s.get('batna', -np.inf)) for s in people])
+        if np.any(weights < 0) or weights.sum() <= 0:
+            raise ValueError("stakeholder weights must be non-negative and not all zero")
+
+        def row(utility: Dict[str, float], where: str) -> np.ndarray:
+            unknown = set(utility) - set(names)
+            if unknown:
+                raise ValueError(f"{where}: unknown stakeholders {sorted(unknown)}")
+            missing = [n for n in names if n not in utility]
+            if missing:
+                raise ValueError(f"{where}: no utility for {missing}")
+            return np.array([float(utility[n]) for n in names])
+
+        if 'issues' in spec:
+            issues = spec['issues']
+            if not issues:
+                raise ValueError("'issues' is empty: give at least one issue with levels")
+            empty = [issue['name'] for issue in issues if not issue.get('levels')]
+            if empty:
+                raise ValueError(f"issues without levels: {empty}")
+            tables = [np.stack([row(level['utility'], f"{issue['name']}/{level['name']}")
+                                for level in issue['levels']]) for issue in issues]
+            utility = package_utilities(tables)
+            labels = [' + '.join(f"{issues[i]['name']}={issues[i]['levels'][k]['name']}" for i, k in enumerate(combo))
+                      for combo in itertools.product(*(range(len(issue['levels'])) for issue in issues))]
+            return cls(names, weights, batna, utility, labels, issues)
+        options = spec['options']
+        if not options:
+            raise ValueError("'options' is empty: give at least one option")
+        utility = np.stack([row(o['utility'], o['name']) for o in options])
+        return cls(names, weights, batna, utility, [o['name'] for o in options])
+
+
+def package_utilities(tables: List[np.ndarray]) -> np.ndarray:
+    """
+    Mean level utility for every combination of one level per issue.
+
+    Args:
+        tables: Per issue, a (levels, d) utility table
+
+    Returns:
+        (Π levels, d) array in itertools.product order
+    """
+    total = np.zeros((1, tables[0].shape[1]))
+    for table in tables:
+        total = (total[:, None, :] + table[None, :, :]).reshape(-1, table.shape[1])
+    return total / len(tables)
+
+
+def skyline(utility: np.ndarray) -> np.ndarray:
+    """
+    Indices of Pareto-optimal rows (maximizing every column), by Sort-Filter-Skyline.
+
+    Rows are sorted by utility sum, so nothing can be dominated by a row that
+    comes after it. The best remaining row is therefore always on the frontier,
+    and it prunes every remaining row it dominates in one vectorized pass; the
+    loop runs once per frontier point. Exact duplicates of a frontier point are
+    kept, since neither dominates the other.
+    """
+    remaining = np.argsort(-utility.sum(axis=1), kind='stable')
+    points = utility[remaining]
+    kept: List[int] = []
+    while len(remaining):
+        best = points[0]
+        kept.append(int(remaining[0]))
+        dominated = (points <= best).all(axis=1) & (points < best).any(axis=1)
+        dominated[0] = True
+        remaining, points = remaining[~dominated], points[~dominated]
+    return np.array(sorted(kept), dtype=np.int64)
+
+
+def welfare(utility: np.ndarray, weights: np.ndarray, batna: np.ndarray, function: str) -> np.ndarray:
+    """
+    Social-welfare score per option; weights may be (d,) or (samples, d).
+
+    Returns:
+        (N,) or (samples, N) scores; -inf where a Nash option is not above every BATNA
+    """
+    if function == 'utilitarian':
+        return weights @ utility.T
+    if function == 'nash':
+        surplus = utility - np.where(np.isfinite(batna), batna, 0.0)
+        feasible = (surplus > 0).all(axis=1)
+        logs = np.log(np.where(surplus > 0, surplus, 1.0))
+        scores = weights @ logs.T
+        return np.where(feasible, scores, -np.inf)
+    if function == 'egalitarian':
+        scores = utility.min(axis=1)
+        return scores if weights.ndim == 1 else np.broadcast_to(scores, (weights.shape[0], len(scores)))
+    raise ValueError(f"Unknown welfare function: {function}")
+
+
+def sweep(problem: Problem, candidates: np.ndarray, function: str, samples: int = SWEEP_SAMPLES,
+          concentration: float = CONCENTRATION, seed: int = 0) -> Dict[str, Any]:
+    """
+    Winner frequencies under Dirichlet-perturbed weights, plus one-at-a-time weight ranges.
+
+    Args:
+        problem: Decision problem
+        candidates: Option indices to consider (normally the Pareto set)
+        function: Welfare function
+        samples: Weight vectors to draw
+        concentration: Dirichlet concentration (higher = closer to the stated weights)
+    """
+    rng = np.random.default_rng(seed)
+    utility = problem.utility[candidates]
+    alpha = np.maximum(problem.weights * concentration * len(problem.weights), 1e-3)
+    drawn = rng.dirichlet(alpha, size=samples)
+    winners = np.argmax(welfare(utility, drawn, problem.batna, function), axis=1)
+    counts = np.bincount(winners, minlength=len(candidates))
+    base_winner = int(np.argmax(welfare(utility, problem.weights, problem.batna, function)))
+
+    ranges = {}
+    grid = np.linspace(0.0, 1.0, 101)
+    for j, name in enumerate(problem.stakeholders):
+        others = np.delete(problem.weights, j)
+        others = others / others.sum() if others.sum() > 0 else np.full(len(others), 1.0 / max(len(others), 1))
+        vectors = np.insert(np.outer(1.0 - grid, others), j, grid, axis=1)
+        stays = np.argmax(welfare(utility, vectors, problem.batna, function), axis=1) == base_winner
+        inside = grid[stays]
+        ranges[name] = [round(float(inside.min()), 2), round(float(inside.max()), 2)] if len(inside) else None
+
+    order = np.argsort(-counts)
+    return {
+        'samples': samples,
+        'base_winner': problem.labels[candidates[base_winner]],
+        'stability': round(float(counts[base_winner] / samples), 4),
+        'win_rates': [{'option': problem.labels[candidates[i]], 'rate': round(float(counts[i] / samples), 4)}
+                      for i in order if counts[i]],
+        'weight_ranges': ranges,
+    }
+
+
+def agreement_zones(problem: Problem, frontier: np.ndarray) -> Dict[str, Any]:
+    """Unanimous issue levels (L) and negatively correlated stakeholder pairs on the frontier (I)."""
+    zones = []
+    for issue in problem.issues:
+        table = np.array([[lvl['utility'][s] for s in problem.stakeholders] for lvl in issue['levels']])
+        favourites = table.argmax(axis=0)
+        if np.all(favourites == favourites[0]):
+            zones.append({'issue': issue['name'], 'level': issue['levels'][int(favourites[0])]['name']})
+    conflicts = []
+    utility = problem.utility[frontier]
+    if len(frontier) > 2:
+        spread = utility.std(axis=0)
+        valid = spread > 0
+        corr = np.corrcoef(utility[:, valid].T) if valid.sum() > 1 else np.zeros((0, 0))
+        names = [s for s, v in zip(problem.stakeholders, valid) if v]
+        for a, b in zip(*np.triu_indices(len(names), k=1)):
+            if corr[a, b] < -0.3:
+                conflicts.append({'parties': [names[a], names[b]], 'correlation': round(float(corr[a, b]), 3)})
+        conflicts.sort(key=lambda c: c['correlation'])
+    return {'zones_of_agreement': zones, 'irreducible_conflicts': conflicts}
+
+
+def solve(problem: Problem, function: str, top: int, samples: int, concentration: float,
+          seed: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    frontier = skyline(problem.utility)
+    scores = welfare(problem.utility[frontier], problem.weights, problem.batna, function)
+    order = np.argsort(-scores, kind='stable')
+    below = problem.utility < problem.batna
+    ranking = []
+    for i in order[:top]:
+        idx = frontier[i]
+        ranking.append({
+            'option': problem.labels[idx],
+            'welfare': None if not np.isfinite(scores[i]) else round(float(scores[i]), 4),
+            'utility': dict(zip(problem.stakeholders, problem.utility[idx].round(3).tolist())),
+            'below_batna': [s for s, b in zip(problem.stakeholders, below[idx]) if b],
+        })
+    result = {
+        'candidates': len(problem.labels),
+        'pareto_size': int(len(frontier)),
+        'welfare_function': function,
+        'ranking': ranking,
+        **agreement_zones(problem, frontier),
+    }
+    if samples and function != 'egalitarian' and np.isfinite(scores).any():
+        result['sensitivity'] = sweep(problem, frontier, function, samples, concentration, seed)
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def synthetic(issues: int, levels: int, stakeholders: int, seed: int) -> Problem:
+    """Random package problem; stakeholders pull against each other on about half the issues."""
+    rng = np.random.default_rng(seed)
+    names = [f"S{j + 1}" for j in range(stakeholders)]
+    spec_issues = []
+    for i in range(issues):
+        base = rng.uniform(1, 5, size=(levels, 1))
+        taste = rng.uniform(1, 5, size=(levels, stakeholders))
+        if rng.random() < 0.5:
+            taste[:, ::2] = 6 - taste[:, ::2]
+        table = np.clip(0.5 * base + 0.5 * taste, 1, 5).round(2)
+        spec_issues.append({'name': f"I{i + 1}", 'levels': [
+            {'name': f"L{k + 1}", 'utility': dict(zip(names, table[k].tolist()))} for k in range(levels)]})
+    spec = {
+        'stakeholders': [{'name': n, 'weight': float(w), 'batna': 2.5}
+                         for n, w in zip(names, rng.dirichlet(np.full(stakeholders, 5.0)))],
+        'issues': spec_issues,
+    }
+    return Problem.from_spec(spec)
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print(f"{result['candidates']} candidate options, {result['pareto_size']} Pareto-optimal "
+          f"({result['elapsed_ms']} ms)\n")
+    print(f"Ranked by {result['welfare_function']} welfare:")
+    for k, row in enumerate(result['ranking'], 1):
+        flag = f"  [below BATNA: {', '.join(row['below_batna'])}]" if row['below_batna'] else ''
+        welfare_value = 'n/a' if row['welfare'] is None else f"{row['welfare']:.3f}"
+        print(f"  {k}. {row['option']}  (welfare {welfare_value}){flag}")
+        print(f"     {', '.join(f'{s}: {u:g}' for s, u in row['utility'].items())}")
+    if result['zones_of_agreement']:
+        print("\nZones of agreement: " + '; '.join(f"{z['issue']} = {z['level']}" for z in result['zones_of_agreement']))
+    if result['irreducible_conflicts']:
+        print("Irreducible conflicts: " + '; '.join(
+            f"{c['parties'][0]} vs {c['parties'][1]} (r = {c['correlation']})" for c in result['irreducible_conflicts']))
+    sensitivity = result.get('sensitivity')
+    if sensitivity:
+        print(f"\nSensitivity ({sensitivity['samples']} weight samples): {sensitivity['base_winner']} "
+              f"wins {sensitivity['stability']:.0%}")
+        for row in sensitivity['win_rates'][1:4]:
+            if round(row['rate'], 2) > 0:  # below 0.5% it would print as "also wins 0%"
+                print(f"  also wins {row['rate']:.0%}: {row['option']}")
+        for name, bounds in sensitivity['weight_ranges'].items():
+            text = 'never' if bounds is None else f"{bounds[0]:.2f}-{bounds[1]:.2f}"
+            print(f"  stays on top while {name}'s weight is in {text}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Pareto frontier and welfare ranking for NDF decisions')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    solve_parser = subparsers.add_parser('solve', help='Solve a decision spec')
+    solve_parser.add_argument('spec', help='JSON with stakeholders and options or issues')
+
+    bench_parser = subparsers.add_parser('bench', help='Solve a random package problem')
+    bench_parser.add_argument('--issues', type=int, default=5)
+    bench_parser.add_argument('--levels', type=int, default=6)
+    bench_parser.add_argument('--stakeholders', type=int, default=6)
+
+    for sub_parser in (solve_parser, bench_parser):
+        sub_parser.add_argument('--welfare', choices=WELFARE_FUNCTIONS, default='utilitarian')
+        sub_parser.add_argument('--top', type=int, default=5, help='Options to list (default: 5)')
+        sub_parser.add_argument('--sweep', type=int, default=SWEEP_SAMPLES, help='Weight samples (0 = skip)')
+        sub_parser.add_argument('--concentration', type=float, default=CONCENTRATION,
+                                help='Dirichlet concentration for the sweep (default: 50)')
+        sub_parser.add_argument('--seed', type=int, default=0)
+        sub_parser.add_argument('--json', action='store_true', help='Print JSON')
+
+    args = parser.parse_args()
+
+    if args.command == 'solve':
+        try:
+            with open(args.spec) as f:
+                problem = Problem.from_spec(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Cannot load spec: {e}")
+            sys.exit(1)
+    else:
+        try:
+            problem = synthetic(args.issues, args.levels, args.stakeholders, args.seed)
+        except ValueError as e:
+            print(f"Cannot build problem: {e}")
+            sys.exit(1)
+
+    result = solve(problem, args.welfare, args.top, args.sweep, args.concentration, args.seed)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_result(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Branch-Solve-Merge (BSM) runtime on asyncio.
+
+Executable form of Pattern 2 in parallel-execution/SKILL.md:
+
+- Branch: the caller lists SubProblems. A sub-problem may depend on others
+  (SP4 needs SP1's partitioning scheme) and receives their results as inputs.
+- Solve: every sub-problem is a task that waits for its dependencies, then
+  takes a slot from a semaphore (`max_concurrency` solvers at once) and runs
+  the async solver under its own timeout. A global deadline cancels whatever
+  is still running when it expires.
+- Merge: results are streamed into the merger as they arrive, not after the
+  slowest worker finishes. A merger can declare itself decided (a consensus
+  majority is already in), and the remaining branches are then cancelled.
+- Failed, timed-out and cancelled branches are recorded as partial results.
+  Their dependents are skipped. The merge uses whatever completed.
+
+Each run reports wall-clock time, the summed solver time (the sequential
+cost), the speedup and the per-branch timeline.
+
+Solvers are pluggable: subclass Solver and implement `async solve()`.
+Merge strategies follow the SKILL.md table: ConsensusMerger,
+VotingMerger and AggregationMerger. A Synthesis merge needs a reasoning
+step, so ConsensusMerger exposes the competing answers for that step instead.
+
+Usage:
+    python bsm_runtime.py demo
+    python bsm_runtime.py simulate --branches 50 --concurrency 8 --timeout 2.0 --deadline 5.0
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+MAX_CONCURRENCY = 5
+
+
+class SubProblem:
+    """One branch of the decomposition."""
+
+    def __init__(self, sub_id: str, spec: Any = None, depends_on: Optional[List[str]] = None,
+                 timeout: Optional[float] = None):
+        """
+        Args:
+            sub_id: Unique sub-problem id
+            spec: Whatever the solver needs to know about the sub-problem
+            depends_on: Sub-problem ids whose results this one needs
+            timeout: Seconds allowed for this branch (overrides the runtime default)
+        """
+        self.id = sub_id
+        self.spec = spec
+        self.depends_on = list(depends_on or [])
+        self.timeout = timeout
+
+
+class BranchResult:
+    """Outcome of one branch."""
+
+    __slots__ = ('id', 'status', 'answer', 'confidence', 'error', 'started', 'elapsed')
+
+    def __init__(self, sub_id: str, status: str, answer: Any = None, confidence: float = 0.0,
+                 error: Optional[str] = None, started: float = 0.0, elapsed: float = 0.0):
+        self.id = sub_id
+        self.status = status
+        self.answer = answer
+        self.confidence = confidence
+        self.error = error
+        self.started = started
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id, 'status': self.status, 'answer': self.answer,
+            'confidence': round(self.confidence, 4), 'error': self.error,
+            'started_s': round(self.started, 4), 'elapsed_s': round(self.elapsed, 4),
+        }
+
+
+class Solver:
+    """
+    Interface for sub-problem solvers.
+
+    solve() returns {'answer': ..., 'confidence': 0-1}. inputs holds the
+    results of the sub-problem's dependencies, keyed by id.
+    """
+
+    async def solve(self, sub: SubProblem, inputs: Dict[str, BranchResult]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class Merger:
+    """Streaming merge: add() each result as it arrives, result() at the end."""
+
+    def add(self, result: BranchResult) -> None:
+        raise NotImplementedError
+
+    def decided(self) -> bool:
+        """True once further results cannot change the outcome."""
+        return False
+
+    def result(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class ConsensusMerger(Merger):
+    """Majority agreement between workers on the same problem."""
+
+    def __init__(self, expected: int):
+        self.expected = expected
+        self.votes: Counter = Counter()
+        self.received = 0
+
+    def add(self, result: BranchResult) -> None:
+        self.received += 1
+        if result.ok:
+            self.votes[json.dumps(result.answer, sort_keys=True, default=str)] += 1
+
+    def decided(self) -> bool:
+        return bool(self.votes) and self.votes.most_common(1)[0][1] > self.expected / 2
+
+    def result(self) -> Dict[str, Any]:
+        if not self.votes:
+            return {'strategy': 'consensus', 'answer': None, 'agreement': 0.0, 'alternatives': []}
+        ranked = self.votes.most_common()
+        answer, count = ranked[0]
+        return {
+            'strategy': 'consensus',
+            'answer': json.loads(answer),
+            'agreement': round(count / self.expected, 4),
+            'majority': count > self.expected / 2,
+            'alternatives': [{'answer': json.loads(a), 'votes': c} for a, c in ranked[1:]],
+        }
+
+
+class VotingMerger(Merger):
+    """Competing approaches: answers ranked by summed confidence."""
+
+    def __init__(self):
+        self.scores: Dict[str, float] = defaultdict(float)
+
+    def add(self, result: BranchResult) -> None:
+        if result.ok:
+            self.scores[json.dumps(result.answer, sort_keys=True, default=str)] += result.confidence
+
+    def result(self) -> Dict[str, Any]:
+        total = sum(self.scores.values()) or 1.0
+        ranked = sorted(self.scores.items(), key=lambda item: -item[1])
+        return {
+            'strategy': 'voting',
+            'answer': json.loads(ranked[0][0]) if ranked else None,
+            'ranking': [{'answer': json.loads(a), 'weight': round(s / total, 4)} for a, s in ranked],
+        }
+
+
+class AggregationMerger(Merger):
+    """Complementary results: union keyed by sub-problem id."""
+
+    def __init__(self):
+        self.parts: Dict[str, Any] = {}
+        self.confidence: Dict[str, float] = {}
+
+    def add(self, result: BranchResult) -> None:
+        if not result.ok:
+            return
+        self.parts[result.id] = result.answer
+        self.confidence[result.id] = result.confidence
+
+    def result(self) -> Dict[str, Any]:
+        mean = sum(self.confidence.values()) / len(self.confidence) if self.confidence else 0.0
+        return {'strategy': 'aggregation', 'answer': self.parts, 'confidence': round(mean, 4)}
+
+
+MERGERS = {
+    'consensus': ConsensusMerger,
+    'voting': VotingMerger,
+    'aggregation': AggregationMerger,
+}
+
+
+def find_cycle(subproblems: List[SubProblem]) -> List[str]:
+    """
+    Kahn's algorithm over the dependency graph.
+
+    Returns:
+        One dependency cycle as a closed id path (['A', 'B', 'A']), or [] if the graph is acyclic
+    """
+    pending = {sub.id: len(set(sub.depends_on)) for sub in subproblems}
+    dependents: Dict[str, List[str]] = defaultdict(list)
+    for sub in subproblems:
+        for dep in set(sub.depends_on):
+            dependents[dep].append(sub.id)
+    ready = [sid for sid, count in pending.items() if count == 0]
+    while ready:
+        sid = ready.pop()
+        del pending[sid]
+        for dependent in dependents[sid]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                ready.append(dependent)
+    if not pending:
+        return []
+    # every leftover node has a leftover dependency; walk them until one repeats
+    depends_on = {sub.id: sub.depends_on for sub in subproblems}
+    path: List[str] = []
+    node = next(iter(pending))
+    while node not in path:
+        path.append(node)
+        node = next(d for d in depends_on[node] if d in pending)
+    return path[path.index(node):] + [node]
+
+
+class BSMRuntime:
+    """Runs the Solve phase concurrently and streams results into the Merge phase."""
+
+    def __init__(self, solver: Solver, merger: Merger, max_concurrency: int = MAX_CONCURRENCY,
+                 branch_timeout: Optional[float] = None, deadline: Optional[float] = None):
+        """
+        Initialize runtime.
+
+        Args:
+            solver: Solves one sub-problem
+            merger: Receives results as they complete
+            max_concurrency: Solvers running at once
+            branch_timeout: Default per-branch timeout in seconds
+            deadline: Global deadline in seconds for the whole Solve phase
+        """
+        self.solver = solver
+        self.merger = merger
+        self.max_concurrency = max_concurrency
+        self.branch_timeout = branch_timeout
+        self.deadline = deadline
+
+    async def run(self, subproblems: List[SubProblem]) -> Dict[str, Any]:
+        """
+        Solve all sub-problems and merge the results.
+
+        Returns:
+            Merged result, per-branch results, timing and stop reason
+        """
+        duplicates = sorted(sid for sid, count in Counter(sub.id for sub in subproblems).items() if count > 1)
+        if duplicates:
+            raise ValueError(f"Sub-problem ids must be unique: {duplicates}")
+        ids = {sub.id for sub in subproblems}
+        for sub in subproblems:
+            unknown = [d for d in sub.depends_on if d not in ids]
+            if unknown:
+                raise ValueError(f"{sub.id} depends on unknown sub-problems: {unknown}")
+        cycle = find_cycle(subproblems)
+        if cycle:
+            raise ValueError(f"dependency cycle: {' -> '.join(cycle)}")
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        finished = {sub.id: loop.create_future() for sub in subproblems}
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def branch(sub: SubProblem) -> None:
+            result = await self._solve(sub, finished, semaphore, start)
+            if not finished[sub.id].done():
+                finished[sub.id].set_result(result)
+            queue.put_nowait(result)
+
+        tasks = {sub.id: asyncio.ensure_future(branch(sub)) for sub in subproblems}
+        results: Dict[str, BranchResult] = {}
+        stop_reason = 'all_branches_done'
+        try:
+            while len(results) < len(subproblems):
+                remaining = None
+                if self.deadline is not None:
+                    remaining = self.deadline - (loop.time() - start)
+                    if remaining <= 0:
+                        stop_reason = 'deadline'
+                        break
+                try:
+                    result = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    stop_reason = 'deadline'
+                    break
+                results[result.id] = result
+                self.merger.add(result)
+                if self.merger.decided() and len(results) < len(subproblems):
+                    stop_reason = 'merge_decided'
+                    break
+        finally:
+            pending = [task for sid, task in tasks.items() if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        while not queue.empty():
+            late = queue.get_nowait()
+            if late.id not in results:
+                results[late.id] = late
+                self.merger.add(late)
+        status = 'deadline' if stop_reason == 'deadline' else 'cancelled'
+        for sub in subproblems:
+            if sub.id in results:
+                continue
+            partial = finished[sub.id].result() if finished[sub.id].done() else None
+            if partial is not None:
+                partial.status = status
+                results[sub.id] = partial
+            else:
+                results[sub.id] = BranchResult(sub.id, status, error='not started')
+
+        wall = loop.time() - start
+        solver_time = sum(r.elapsed for r in results.values())
+        return {
+            'merged': self.merger.result(),
+            'branches': [results[sub.id].to_dict() for sub in subproblems],
+            'completed': sum(1 for r in results.values() if r.ok),
+            'stop_reason': stop_reason,
+            'wall_s': round(wall, 4),
+            'sequential_s': round(solver_time, 4),
+            'speedup': round(solver_time / wall, 2) if wall > 0 else None,
+        }
+
+    async def _solve(self, sub: SubProblem, finished: Dict[str, asyncio.Future],
+                     semaphore: asyncio.Semaphore, start: float) -> BranchResult:
+        loop = asyncio.get_running_loop()
+        inputs: Dict[str, BranchResult] = {}
+        for dep in sub.depends_on:
+            inputs[dep] = await asyncio.shield(finished[dep])
+        failed = [dep for dep, r in inputs.items() if not r.ok]
+        if failed:
+            return BranchResult(sub.id, 'skipped', error=f"dependencies not solved: {failed}",
+                                started=loop.time() - start)
+
+        timeout = sub.timeout if sub.timeout is not None else self.branch_timeout
+        async with semaphore:
+            began = loop.time()
+            try:
+                solution = await asyncio.wait_for(self.solver.solve(sub, inputs), timeout)
+                return BranchResult(sub.id, 'ok', solution.get('answer'), float(solution.get('confidence', 0.0)),
+                                    started=began - start, elapsed=loop.time() - began)
+            except asyncio.TimeoutError:
+                return BranchResult(sub.id, 'timeout', error=f"exceeded {timeout}s",
+                                    started=began - start, elapsed=loop.time() - began)
+            except asyncio.CancelledError:
+                result = BranchResult(sub.id, 'cancelled', started=began - start, elapsed=loop.time() - began)
+                if not finished[sub.id].done():
+                    finished[sub.id].set_result(result)
+                raise
+            except Exception as e:
+                return BranchResult(sub.id, 'error', error=str(e),
+                                    started=began - start, elapsed=loop.time() - began)
+
+
+def run_bsm(subproblems: List[SubProblem], solver: Solver, merger: Merger, **kwargs) -> Dict[str, Any]:
+    """Synchronous wrapper around BSMRuntime.run()."""
+    return asyncio.run(BSMRuntime(solver, merger, **kwargs).run(subproblems))
+
+
+class SyntheticSolver(Solver):
+    """
+    Simulated workers: log-normal latency, occasional failures, and an answer
+    drawn from a small set so consensus has something to agree on.
+    """
+
+    def __init__(self, seed: int = 0, median_s: float = 0.5, sigma: float = 0.8, failure_rate: float = 0.05,
+                 answers: int = 3):
+        self.seed = seed
+        self.median_s = median_s
+        self.sigma = sigma
+        self.failure_rate = failure_rate
+        self.answers = answers
+
+    async def solve(self, sub: SubProblem, inputs: Dict[str, BranchResult]) -> Dict[str, Any]:
+        rng = random.Random(f"{self.seed}:{sub.id}")
+        await asyncio.sleep(self.median_s * rng.lognormvariate(0.0, self.sigma))
+        if rng.random() < self.failure_rate:
+            raise RuntimeError('solver failed')
+        answer = sub.spec if sub.spec is not None else f"option-{min(int(rng.expovariate(1.0)), self.answers - 1)}"
+        return {'answer': answer, 'confidence': round(rng.uniform(0.6, 0.95), 2)}
+
+
+INVALID_GRAPHS = {
+    'duplicate id': [SubProblem('A'), SubProblem('A')],
+    'unknown dependency': [SubProblem('A', depends_on=['Z'])],
+    'dependency cycle': [SubProblem('A', depends_on=['B']), SubProblem('B', depends_on=['A'])],
+}
+
+
+def check_invalid_graphs(timeout_s: float = 5.0) -> List[Dict[str, Any]]:
+    """
+    Run each malformed graph and confirm it is rejected up front.
+
+    Returns:
+        One row per case: name, passed, and the error (or why it failed)
+    """
+    rows = []
+    solver = SyntheticSolver(median_s=0.01, failure_rate=0.0)
+    for name, subproblems in INVALID_GRAPHS.items():
+        runtime = BSMRuntime(solver, AggregationMerger())
+        try:
+            asyncio.run(asyncio.wait_for(runtime.run(subproblems), timeout_s))
+            rows.append({'case': name, 'passed': False, 'detail': 'ran without error'})
+        except ValueError as e:
+            rows.append({'case': name, 'passed': True, 'detail': str(e)})
+        except asyncio.TimeoutError:
+            rows.append({'case': name, 'passed': False, 'detail': f"hung for {timeout_s}s"})
+    return rows
+
+
+DEMO_SUBPROBLEMS = [
+    SubProblem('SP1', 'Consistent hashing with virtual nodes'),
+    SubProblem('SP2', 'Eventual consistency, read-your-writes for sessions'),
+    SubProblem('SP3', 'ARC eviction'),
+    SubProblem('SP4', 'Async replication with vector clocks', depends_on=['SP1']),
+    SubProblem('SP5', 'Pub/sub invalidation with TTL bound', depends_on=['SP2', 'SP4']),
+]
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"{'Branch':<8} {'Status':<10} {'Start':>7} {'Elapsed':>8} {'Conf':>5}  Answer")
+    for branch in report['branches']:
+        answer = '' if branch['answer'] is None else str(branch['answer'])[:50]
+        note = branch['error'] or ''
+        print(f"{branch['id']:<8} {branch['status']:<10} {branch['started_s']:>6.2f}s {branch['elapsed_s']:>7.2f}s "
+              f"{branch['confidence']:>5.2f}  {answer}{note}")
+    print(f"\nCompleted {report['completed']}/{len(report['branches'])} ({report['stop_reason']}); "
+          f"wall {report['wall_s']:.2f}s vs sequential {report['sequential_s']:.2f}s "
+          f"-> speedup {report['speedup']}x")
+    print(f"Merged: {json.dumps(report['merged'], default=str)[:400]}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Asyncio Branch-Solve-Merge runtime')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    demo_parser = subparsers.add_parser('demo', help='Distributed-cache decomposition from 02-BSM-test.md')
+    demo_parser.add_argument('--concurrency', type=int, default=3)
+
+    sim_parser = subparsers.add_parser('simulate', help='Many independent synthetic branches')
+    sim_parser.add_argument('--branches', type=int, default=20)
+    sim_parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY)
+    sim_parser.add_argument('--strategy', choices=sorted(MERGERS), default='consensus')
+    sim_parser.add_argument('--timeout', type=float, help='Per-branch timeout (seconds)')
+    sim_parser.add_argument('--deadline', type=float, help='Global deadline (seconds)')
+    sim_parser.add_argument('--median', type=float, default=0.3, help='Median solver latency (seconds)')
+    sim_parser.add_argument('--seed', type=int, default=0)
+
+    subparsers.add_parser('check', help='Confirm malformed graphs (duplicate ids, unknown deps, cycles) are rejected')
+
+    for sub_parser in (demo_parser, sim_parser):
+        sub_parser.add_argument('--json', action='store_true', help='Print JSON')
+
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        rows = check_invalid_graphs()
+        for row in rows:
+            print(f"{'✅' if row['passed'] else '❌'} {row['case']:<20} {row['detail']}")
+        sys.exit(0 if all(row['passed'] for row in rows) else 1)
+
+    if args.command == 'demo':
+        solver = SyntheticSolver(median_s=0.3, sigma=0.4, failure_rate=0.0)
+        report = run_bsm(DEMO_SUBPROBLEMS, solver, AggregationMerger(), max_concurrency=args.concurrency)
+    else:
+        if args.branches < 1:
+            print("--branches must be at least 1")
+            sys.exit(1)
+        subproblems = [SubProblem(f"W{k + 1}") for k in range(args.branches)]
+        merger = ConsensusMerger(args.branches) if args.strategy == 'consensus' else MERGERS[args.strategy]()
+        solver = SyntheticSolver(seed=args.seed, median_s=args.median)
+        report = run_bsm(subproblems, solver, merger, max_concurrency=args.concurrency,
+                         branch_timeout=args.timeout, deadline=args.deadline)
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Dynamic Parallel Tree Search (DPTS) scheduler and simulator.
+
+Executable form of Pattern 1 in parallel-execution/SKILL.md:
+
+- Frontier kept in a priority queue ordered by confidence
+- Pruning threshold: max(0.40, best_confidence - 0.30), recomputed after each
+  level's evaluations complete; children below it are pruned and the frontier
+  is re-filtered against it when the next level is allocated
+- Worker reallocation per level: the top branches get `top_workers` workers
+  each, the rest get 1, until the worker budget is spent
+- Convergence: best confidence >= target (0.85), max depth reached, or the
+  best confidence improved by less than `min_gain` over a level
+- Evaluations run concurrently on a concurrent.futures executor
+
+Branch evaluators are pluggable: subclass BranchEvaluator and implement
+expand() and evaluate(). SyntheticEvaluator generates deterministic random
+trees for the simulator, which compares DPTS against a static allocation
+(every retained branch expanded uniformly, static 40% pruning) and reports
+how much work each spends on branches a perfect-information search would have
+pruned.
+
+Usage:
+    python dpts_scheduler.py simulate --trees 20 --branching 5 --depth 5
+    python dpts_scheduler.py simulate --trees 5 --workers 10 --trace traces.jsonl
+"""
+
+import argparse
+import heapq
+import json
+import random
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+PRUNE_FLOOR = 0.40
+DPTS_MARGIN = 0.30
+TARGET_CONFIDENCE = 0.85
+MAX_WORKERS = 10
+TOP_BRANCHES = 2
+TOP_WORKERS = 3
+MAX_DEPTH = 4
+MIN_GAIN = 0.01
+
+
+class Branch:
+    """A node in the search tree."""
+
+    __slots__ = ('id', 'parent', 'depth', 'confidence', 'status', 'payload')
+
+    def __init__(self, branch_id: str, parent: Optional['Branch'] = None, payload: Any = None):
+        self.id = branch_id
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+        self.confidence: Optional[float] = None
+        self.status = 'pending'
+        self.payload = payload
+
+    def path(self) -> List[str]:
+        node, ids = self, []
+        while node is not None:
+            ids.append(node.id)
+            node = node.parent
+        return ids[::-1]
+
+
+class BranchEvaluator:
+    """
+    Interface for branch generation and scoring.
+
+    expand() is called on the scheduler thread; evaluate() runs on the worker
+    pool and must be safe to call concurrently.
+    """
+
+    def expand(self, parent: Optional[Branch], count: int) -> List[Branch]:
+        """Create up to `count` new children of parent (None for level 0)."""
+        raise NotImplementedError
+
+    def evaluate(self, branch: Branch) -> float:
+        """Return the branch confidence in [0, 1]."""
+        raise NotImplementedError
+
+
+def dynamic_threshold(best: float, floor: float = PRUNE_FLOOR, margin: float = DPTS_MARGIN) -> float:
+    """max(0.40, best_confidence - 0.30)"""
+    return max(floor, best - margin)
+
+
+class DPTSScheduler:
+    """Level-by-level DPTS with a confidence-ordered frontier."""
+
+    def __init__(
+        self,
+        evaluator: BranchEvaluator,
+        max_workers: int = MAX_WORKERS,
+        initial_branches: int = 5,
+        top_branches: int = TOP_BRANCHES,
+        top_workers: int = TOP_WORKERS,
+        target: float = TARGET_CONFIDENCE,
+        max_depth: int = MAX_DEPTH,
+        floor: float = PRUNE_FLOOR,
+        margin: float = DPTS_MARGIN,
+        min_gain: float = MIN_GAIN,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            evaluator: Generates and scores branches
+            max_workers: Evaluations allowed per level
+            initial_branches: Level 0 branches (N = 5-10)
+            top_branches: How many leading branches get extra workers
+            top_workers: Workers for each leading branch
+            target: Stop once a branch reaches this confidence
+            max_depth: Deepest level explored (level 0 is the first)
+            floor: Static pruning floor
+            margin: Dynamic pruning margin below the best confidence
+            min_gain: Stop when a level improves best confidence by less
+            executor: Executor for evaluations (defaults to a thread pool)
+        """
+        self.evaluator = evaluator
+        self.max_workers = max_workers
+        self.initial_branches = initial_branches
+        self.top_branches = top_branches
+        self.top_workers = top_workers
+        self.target = target
+        self.max_depth = max_depth
+        self.floor = floor
+        self.margin = margin
+        self.min_gain = min_gain
+        self.executor = executor
+
+        self.best: Optional[Branch] = None
+        self.evaluations = 0
+        self.trace: List[Dict[str, Any]] = []
+        self.pruned_from_frontier: List[str] = []
+        self._frontier: List[Tuple[float, int, Branch]] = []
+        self._sequence = 0
+
+    def _push(self, branch: Branch) -> None:
+        self._sequence += 1
+        heapq.heappush(self._frontier, (-branch.confidence, self._sequence, branch))
+
+    def _threshold(self) -> float:
+        best = self.best.confidence if self.best else 0.0
+        return dynamic_threshold(best, self.floor, self.margin)
+
+    def allocate(self) -> List[Tuple[Branch, int]]:
+        """
+        Pop retained branches in confidence order and assign workers.
+
+        Branches below the current threshold are pruned; the rest of the
+        frontier that gets no worker this level stays queued.
+        """
+        allocation: List[Tuple[Branch, int]] = []
+        budget = self.max_workers
+        threshold = self._threshold()
+        deferred = []
+        while self._frontier and budget > 0:
+            _, _, branch = heapq.heappop(self._frontier)
+            if branch.confidence < threshold:
+                branch.status = 'pruned'
+                self.pruned_from_frontier.append(branch.id)
+                continue
+            if branch.depth + 1 >= self.max_depth:
+                deferred.append(branch)
+                continue
+            workers = min(self.top_workers if len(allocation) < self.top_branches else 1, budget)
+            allocation.append((branch, workers))
+            budget -= workers
+        for branch in deferred:
+            self._push(branch)
+        return allocation
+
+    def _evaluate_all(self, branches: List[Branch], executor: Executor) -> None:
+        futures = {executor.submit(self.evaluator.evaluate, b): b for b in branches}
+        for future in as_completed(futures):
+            branch = futures[future]
+            try:
+                branch.confidence = float(future.result())
+                branch.status = 'evaluated'
+            except Exception as e:
+                branch.confidence = 0.0
+                branch.status = f'failed: {e}'
+            self.evaluations += 1
+            if self.best is None or branch.confidence > self.best.confidence:
+                self.best = branch
+
+    def _record(self, level: int, threshold: float, allocation, evaluated: List[Branch],
+                pruned: List[str]) -> None:
+        self.trace.append({
+            'level': level,
+            'threshold': round(threshold, 4),
+            'best_branch': self.best.id if self.best else None,
+            'best_confidence': round(self.best.confidence, 4) if self.best else None,
+            'allocation': {branch.id: workers for branch, workers in allocation},
+            'workers_used': len(evaluated),
+            'evaluated': {b.id: round(b.confidence, 4) for b in evaluated},
+            'pruned': pruned,
+            'frontier_size': len(self._frontier),
+        })
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run DPTS to convergence.
+
+        Returns:
+            Summary with best branch, evaluation count, stop reason and trace
+        """
+        owns_executor = self.executor is None
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.max_workers)
+        stop_reason = 'frontier_exhausted'
+        try:
+            level_0 = self.evaluator.expand(None, self.initial_branches)
+            self._evaluate_all(level_0, executor)
+            threshold = self._threshold()
+            pruned = [b.id for b in level_0 if b.confidence < threshold]
+            for branch in level_0:
+                if branch.confidence >= threshold:
+                    self._push(branch)
+                else:
+                    branch.status = 'pruned'
+            self._record(0, threshold, [(b, 1) for b in level_0], level_0, pruned)
+
+            level = 0
+            previous_best = self.best.confidence if self.best else 0.0
+            while True:
+                if self.best and self.best.confidence >= self.target:
+                    stop_reason = 'target_confidence'
+                    break
+                self.pruned_from_frontier = []
+                allocation = self.allocate()
+                if not allocation:
+                    stop_reason = 'max_depth' if self._frontier else 'frontier_exhausted'
+                    break
+                level += 1
+
+                children = []
+                for branch, workers in allocation:
+                    branch.status = 'expanded'
+                    children.extend(self.evaluator.expand(branch, workers))
+                self._evaluate_all(children, executor)
+
+                threshold = self._threshold()
+                pruned = []
+                for child in children:
+                    if child.confidence >= threshold:
+                        self._push(child)
+                    else:
+                        child.status = 'pruned'
+                        pruned.append(child.id)
+                self._record(level, threshold, allocation, children, self.pruned_from_frontier + pruned)
+
+                gain = self.best.confidence - previous_best
+                previous_best = self.best.confidence
+                if gain < self.min_gain and level > 1:
+                    stop_reason = 'diminishing_returns'
+                    break
+        finally:
+            if owns_executor:
+                executor.shutdown(wait=True)
+
+        return {
+            'best_branch': self.best.id if self.best else None,
+            'best_path': self.best.path() if self.best else [],
+            'best_confidence': round(self.best.confidence, 4) if self.best else None,
+            'evaluations': self.evaluations,
+            'levels': len(self.trace),
+            'stop_reason': stop_reason,
+            'trace': self.trace,
+        }
+
+
+class StaticScheduler(DPTSScheduler):
+    """
+    Baseline: every retained branch gets the same number of workers and the
+    static 40% floor is the only pruning rule.
+
+    There is no per-level worker budget: `max_workers` only sizes the thread
+    pool, so a wide level queues on the pool instead of spawning a thread per
+    evaluation.
+    """
+
+    def __init__(self, evaluator: BranchEvaluator, children_per_branch: int = 5, **kwargs):
+        kwargs['margin'] = 1.0
+        super().__init__(evaluator, **kwargs)
+        self.children_per_branch = children_per_branch
+
+    def allocate(self) -> List[Tuple[Branch, int]]:
+        allocation, deferred = [], []
+        while self._frontier:
+            _, _, branch = heapq.heappop(self._frontier)
+            if branch.confidence < self.floor:
+                branch.status = 'pruned'
+                self.pruned_from_frontier.append(branch.id)
+            elif branch.depth + 1 >= self.max_depth:
+                deferred.append(branch)
+            else:
+                allocation.append((branch, self.children_per_branch))
+        for branch in deferred:
+            self._push(branch)
+        return allocation
+
+
+class SyntheticEvaluator(BranchEvaluator):
+    """
+    Deterministic random tree for simulation.
+
+    Each node has a hidden quality drawn around its parent's quality; evaluate()
+    returns that quality plus observation noise. Nodes are generated lazily
+    and reproducibly from (seed, branch id).
+    """
+
+    ROOT_QUALITY = 0.50
+
+    def __init__(self, seed: int = 0, branching: int = 5, spread: float = 0.08, noise: float = 0.05):
+        self.seed = seed
+        self.branching = branching
+        self.spread = spread
+        self.noise = noise
+
+    def quality(self, branch_id: str, parent_quality: float) -> float:
+        rng = random.Random(f"{self.seed}:{branch_id}")
+        return min(1.0, max(0.0, parent_quality + rng.gauss(0.0, self.spread)))
+
+    def expand(self, parent: Optional[Branch], count: int) -> List[Branch]:
+        base = parent.payload if parent else self.ROOT_QUALITY
+        prefix = f"{parent.id}." if parent else 'branch-'
+        return [
+            Branch(f"{prefix}{k}", parent, payload=self.quality(f"{prefix}{k}", base))
+            for k in range(1, min(count, self.branching) + 1)
+        ]
+
+    def evaluate(self, branch: Branch) -> float:
+        rng = random.Random(f"{self.seed}:{branch.id}:obs")
+        return min(1.0, max(0.0, branch.payload + rng.gauss(0.0, self.noise)))
+
+    def best_by_depth(self, max_depth: int) -> List[float]:
+        """True best quality at each depth, by full enumeration."""
+        best = []
+        level = [(f"branch-{k}", self.quality(f"branch-{k}", self.ROOT_QUALITY)) for k in range(1, self.branching + 1)]
+        for _ in range(max_depth):
+            best.append(max(q for _, q in level))
+            level = [
+                (f"{bid}.{k}", self.quality(f"{bid}.{k}", q))
+                for bid, q in level
+                for k in range(1, self.branching + 1)
+            ]
+        return best
+
+
+def simulate_tree(
+    seed: int,
+    branching: int,
+    depth: int,
+    workers: int,
+    spread: float,
+    noise: float,
+    margin: float = DPTS_MARGIN,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run DPTS and the static baseline on one synthetic tree.
+
+    An evaluation counts as wasted when the evaluated node's true quality is
+    more than `margin` below the true best at its depth, i.e. a search with
+    perfect information would have pruned it.
+    """
+    true_best = SyntheticEvaluator(seed, branching, spread).best_by_depth(depth)
+    results = {}
+    for name, scheduler_cls, extra in (
+        ('dpts', DPTSScheduler, {'max_workers': workers}),
+        ('static', StaticScheduler, {'max_workers': workers, 'children_per_branch': branching}),
+    ):
+        evaluator = _RecordingEvaluator(SyntheticEvaluator(seed, branching, spread, noise))
+        scheduler = scheduler_cls(
+            evaluator, initial_branches=branching, max_depth=depth, margin=margin, **extra
+        )
+        summary = scheduler.run()
+        wasted = sum(
+            1 for branch in evaluator.evaluated
+            if branch.payload < true_best[branch.depth] - margin
+        )
+        best_quality = max(b.payload for b in evaluator.evaluated)
+        results[name] = {
+            'evaluations': summary['evaluations'],
+            'wasted': wasted,
+            'wasted_fraction': wasted / summary['evaluations'] if summary['evaluations'] else 0.0,
+            'best_confidence': summary['best_confidence'],
+            'best_true_quality': round(best_quality, 4),
+            'regret': round(max(true_best) - best_quality, 4),
+            'levels': summary['levels'],
+            'stop_reason': summary['stop_reason'],
+            'trace': summary['trace'],
+        }
+    return results
+
+
+class _RecordingEvaluator(BranchEvaluator):
+    """Wraps an evaluator and remembers every branch it scored."""
+
+    def __init__(self, inner: BranchEvaluator):
+        self.inner = inner
+        self.evaluated: List[Branch] = []
+
+    def expand(self, parent: Optional[Branch], count: int) -> List[Branch]:
+        return self.inner.expand(parent, count)
+
+    def evaluate(self, branch: Branch) -> float:
+        self.evaluated.append(branch)
+        return self.inner.evaluate(branch)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='DPTS scheduler simulator: dynamic pruning vs static allocation'
+    )
+    parser.add_argument('command', choices=['simulate'])
+    parser.add_argument('--trees', type=int, default=20, help='Synthetic trees to simulate (default: 20)')
+    parser.add_argument('--branching', type=int, default=5, help='Children per node (default: 5)')
+    parser.add_argument('--depth', type=int, default=5, help='Tree depth in levels (default: 5)')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f'DPTS workers per level (default: {MAX_WORKERS})')
+    parser.add_argument('--spread', type=float, default=0.08,
+                        help='Std-dev of child quality around its parent (default: 0.08)')
+    parser.add_argument('--noise', type=float, default=0.05, help='Evaluation noise std-dev (default: 0.05)')
+    parser.add_argument('--seed', type=int, default=0, help='First tree seed (default: 0)')
+    parser.add_argument('--trace', help='Append per-level allocation traces to this JSONL file')
+
+    args = parser.parse_args()
+
+    nodes = sum(args.branching ** (d + 1) for d in range(args.depth))
+    print(f"Simulating {args.trees} trees ({nodes} nodes each, branching {args.branching}, "
+          f"depth {args.depth})\n")
+
+    totals = {name: {'evaluations': 0, 'wasted': 0, 'regret': 0.0} for name in ('dpts', 'static')}
+    trace_file = open(args.trace, 'a') if args.trace else None
+    try:
+        for tree in range(args.trees):
+            seed = args.seed + tree
+            results = simulate_tree(seed, args.branching, args.depth, args.workers, args.spread, args.noise)
+            for name, result in results.items():
+                totals[name]['evaluations'] += result['evaluations']
+                totals[name]['wasted'] += result['wasted']
+                totals[name]['regret'] += result['regret']
+                if trace_file:
+                    for level in result.pop('trace'):
+                        trace_file.write(json.dumps({'seed': seed, 'scheduler': name, **level}) + '\n')
+    finally:
+        if trace_file:
+            trace_file.close()
+
+    print(f"{'Scheduler':<10} {'Evaluations':>12} {'Wasted':>10} {'Wasted %':>9} {'Avg regret':>11}")
+    for name, total in totals.items():
+        pct = 100.0 * total['wasted'] / total['evaluations'] if total['evaluations'] else 0.0
+        print(f"{name:<10} {total['evaluations']:>12} {total['wasted']:>10} {pct:>8.1f}% "
+              f"{total['regret'] / args.trees:>11.4f}")
+
+    dpts, static = totals['dpts'], totals['static']
+    if static['evaluations']:
+        saved = 1.0 - dpts['evaluations'] / static['evaluations']
+        print(f"\nDPTS used {saved:.1%} fewer evaluations than static allocation")
+
+
+if __name__ == '__main__':
+    main()
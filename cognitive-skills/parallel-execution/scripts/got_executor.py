@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Graph of Thoughts (GoT) executor with memoized, parallel node evaluation.
+
+Executable form of Pattern 4 in parallel-execution/SKILL.md:
+
+- Thoughts form a DAG. Each node is an operation (generate, refine, merge,
+  score, ...) over its parent thoughts. A GoT "cycle" is unrolled into
+  successive refine nodes with an `iteration` parameter, so the graph stays
+  acyclic. add() only accepts parents that already exist, so a cycle cannot
+  be built by accident.
+- Structural sharing: adding a node with the same operation, parameters and
+  parents as an existing node returns the existing node.
+- Content-keyed memoization: a node's memo key is a hash of its operation,
+  its parameters and the result digests of its parents. Identical
+  sub-thoughts reached along different paths are computed once. Two ready
+  nodes with the same key share one in-flight computation. Parameters whose
+  names start with an underscore are labels: they keep nodes apart in the
+  graph but are left out of the memo key.
+- Ready nodes run concurrently on a bounded concurrent.futures pool in
+  topological order (Kahn's algorithm over the nodes that need work).
+- Incremental invalidation: update() or invalidate() marks a node and its
+  descendants dirty, and the next run() revisits only those. A descendant
+  whose parents come back with unchanged results is a memo hit, so the
+  recomputation stops there (early cutoff).
+- Backtracking is left to the caller. Add new nodes from an earlier thought
+  and run again; everything already computed is reused.
+
+Operations are pluggable: subclass ThoughtOperator and add one method per
+operation name. SyntheticOperator produces deterministic results for the
+benchmark.
+
+Usage:
+    python got_executor.py bench --nodes 20000 --workers 8
+    python got_executor.py bench --nodes 5000 --cost-ms 2 --workers 16
+    python got_executor.py plan graph.json
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+MAX_WORKERS = 8
+
+
+def digest(value: Any) -> str:
+    """Stable content hash of a JSON-serializable value."""
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:32]
+
+
+def content_params(node: 'Thought') -> Dict[str, Any]:
+    """Node parameters without underscore-prefixed labels."""
+    return {k: v for k, v in node.params.items() if not k.startswith('_')}
+
+
+class Thought:
+    """A node in the thought graph."""
+
+    __slots__ = ('id', 'op', 'params', 'parents', 'children', 'result', 'result_digest',
+                 'memo_key', 'status', 'dirty')
+
+    def __init__(self, node_id: int, op: str, params: Dict[str, Any], parents: Tuple[int, ...]):
+        self.id = node_id
+        self.op = op
+        self.params = params
+        self.parents = parents
+        self.children: List[int] = []
+        self.result: Any = None
+        self.result_digest: Optional[str] = None
+        self.memo_key: Optional[str] = None
+        self.status = 'pending'
+        self.dirty = True
+
+
+class ThoughtOperator:
+    """
+    Interface for thought operations.
+
+    apply() dispatches to a method named after the operation, called with the
+    node parameters and the parent results (in parent order). Methods run on
+    the worker pool and must be safe to call concurrently.
+    """
+
+    def apply(self, op: str, params: Dict[str, Any], inputs: List[Any]) -> Any:
+        method = getattr(self, op, None)
+        if method is None:
+            raise ValueError(f"Unknown thought operation: {op}")
+        return method(params, inputs)
+
+
+class ThoughtGraph:
+    """DAG of thoughts with memoized results."""
+
+    def __init__(self, memo: Optional[Dict[str, Any]] = None):
+        """
+        Initialize graph.
+
+        Args:
+            memo: Memo table (memo key → result) to share across graphs or runs
+        """
+        self.nodes: List[Thought] = []
+        self.memo: Dict[str, Any] = memo if memo is not None else {}
+        self._structural: Dict[str, int] = {}
+
+    def add(self, op: str, parents: Sequence[int] = (), **params) -> int:
+        """
+        Add a thought, or return the existing node with the same op, params and parents.
+
+        Returns:
+            Node id
+        """
+        parents = tuple(parents)
+        for parent in parents:
+            if not 0 <= parent < len(self.nodes):
+                raise ValueError(f"Unknown parent node: {parent}")
+        key = digest([op, params, parents])
+        existing = self._structural.get(key)
+        if existing is not None:
+            return existing
+        node = Thought(len(self.nodes), op, params, parents)
+        self.nodes.append(node)
+        for parent in parents:
+            self.nodes[parent].children.append(node.id)
+        self._structural[key] = node.id
+        return node.id
+
+    def branch(self, parent: int, count: int, op: str = 'generate', **params) -> List[int]:
+        """Split one thought into `count` variants."""
+        return [self.add(op, (parent,), variant=k, **params) for k in range(count)]
+
+    def merge(self, parents: Sequence[int], op: str = 'merge', **params) -> int:
+        """Combine several thoughts into one."""
+        return self.add(op, parents, **params)
+
+    def refine(self, parent: int, iterations: int = 1, op: str = 'refine', **params) -> int:
+        """Chain `iterations` refine nodes (a GoT cycle, unrolled)."""
+        node = parent
+        for iteration in range(1, iterations + 1):
+            node = self.add(op, (node,), iteration=iteration, **params)
+        return node
+
+    def descendants(self, node_id: int) -> List[int]:
+        """The node and everything downstream of it."""
+        seen = {node_id}
+        queue = deque([node_id])
+        while queue:
+            for child in self.nodes[queue.popleft()].children:
+                if child not in seen:
+                    seen.add(child)
+                    queue.append(child)
+        return sorted(seen)
+
+    def invalidate(self, node_id: int, drop_memo: bool = True) -> int:
+        """
+        Force a node to recompute and mark its descendants dirty.
+
+        Args:
+            node_id: Node whose result is no longer trusted
+            drop_memo: Also forget the memoized result for the node's current key
+
+        Returns:
+            Number of nodes marked dirty
+        """
+        node = self.nodes[node_id]
+        if drop_memo and node.memo_key is not None:
+            self.memo.pop(node.memo_key, None)
+        affected = self.descendants(node_id)
+        for nid in affected:
+            self.nodes[nid].dirty = True
+        return len(affected)
+
+    def update(self, node_id: int, **params) -> int:
+        """Change a thought's parameters; it and its descendants recompute on the next run."""
+        node = self.nodes[node_id]
+        old_key = digest([node.op, node.params, node.parents])
+        if self._structural.get(old_key) == node_id:
+            del self._structural[old_key]
+        node.params = {**node.params, **params}
+        self._structural.setdefault(digest([node.op, node.params, node.parents]), node_id)
+        return self.invalidate(node_id, drop_memo=False)
+
+    def waves(self) -> List[List[int]]:
+        """Topological levels: every node in a wave depends only on earlier waves."""
+        depth = [0] * len(self.nodes)
+        for node in self.nodes:
+            if node.parents:
+                depth[node.id] = 1 + max(depth[p] for p in node.parents)
+        levels: List[List[int]] = [[] for _ in range(max(depth, default=-1) + 1)]
+        for nid, d in enumerate(depth):
+            levels[d].append(nid)
+        return levels
+
+    def path_count(self) -> int:
+        """Root-to-node paths summed over all nodes: the work a tree expansion without sharing repeats."""
+        paths = [0] * len(self.nodes)
+        for node in self.nodes:
+            paths[node.id] = sum(paths[p] for p in node.parents) if node.parents else 1
+        return sum(paths)
+
+
+class GoTExecutor:
+    """Runs the dirty part of a ThoughtGraph on a bounded worker pool."""
+
+    def __init__(self, graph: ThoughtGraph, operator: ThoughtOperator, max_workers: int = MAX_WORKERS,
+                 executor: Optional[Executor] = None):
+        """
+        Initialize executor.
+
+        Args:
+            graph: Thought graph to evaluate
+            operator: Implements the thought operations
+            max_workers: Operations in flight at once
+            executor: Executor for operations (defaults to a thread pool)
+        """
+        self.graph = graph
+        self.operator = operator
+        self.max_workers = max_workers
+        self.executor = executor
+
+    def _memo_key(self, node: Thought) -> str:
+        parents = [self.graph.nodes[p].result_digest for p in node.parents]
+        return digest([node.op, content_params(node), parents])
+
+    def run(self, targets: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """
+        Evaluate every dirty node (or only those needed for `targets`).
+
+        Returns:
+            Summary: nodes computed, memo hits, shared in-flight results, failures, elapsed time
+        """
+        nodes = self.graph.nodes
+        work = self._work_set(targets)
+        for nid in work:
+            nodes[nid].status = 'pending'
+        pending = {nid: sum(1 for p in nodes[nid].parents if p in work) for nid in work}
+        ready = deque(sorted(nid for nid, count in pending.items() if count == 0))
+        stats = {'scheduled': len(work), 'computed': 0, 'memo_hits': 0, 'shared': 0, 'failed': 0, 'skipped': 0}
+
+        owns_executor = self.executor is None
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.max_workers)
+        in_flight: Dict[Future, str] = {}
+        waiting: Dict[str, List[int]] = {}
+        start = time.perf_counter()
+
+        def finish(nid: int, status: str) -> None:
+            node = nodes[nid]
+            node.status = status
+            node.dirty = status != 'done'
+            for child in node.children:
+                if child in pending:
+                    if status != 'done':
+                        self._skip(child, pending, stats)
+                        continue
+                    pending[child] -= 1
+                    if pending[child] == 0:
+                        ready.append(child)
+
+        try:
+            while ready or in_flight:
+                while ready and len(in_flight) < self.max_workers:
+                    nid = ready.popleft()
+                    node = nodes[nid]
+                    if node.status == 'skipped':
+                        continue
+                    key = self._memo_key(node)
+                    node.memo_key = key
+                    if key in self.graph.memo:
+                        self._store(node, self.graph.memo[key])
+                        stats['memo_hits'] += 1
+                        finish(nid, 'done')
+                    elif key in waiting:
+                        waiting[key].append(nid)
+                        stats['shared'] += 1
+                    else:
+                        inputs = [nodes[p].result for p in node.parents]
+                        future = executor.submit(self.operator.apply, node.op, content_params(node), inputs)
+                        in_flight[future] = key
+                        waiting[key] = [nid]
+                if not in_flight:
+                    continue
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = in_flight.pop(future)
+                    owners = waiting.pop(key)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        for nid in owners:
+                            nodes[nid].result = None
+                            nodes[nid].result_digest = None
+                            stats['failed'] += 1
+                            finish(nid, f'failed: {e}')
+                        continue
+                    self.graph.memo[key] = result
+                    stats['computed'] += 1
+                    for nid in owners:
+                        self._store(nodes[nid], result)
+                        finish(nid, 'done')
+        finally:
+            if owns_executor:
+                executor.shutdown(wait=True)
+
+        stats['elapsed_s'] = round(time.perf_counter() - start, 4)
+        return stats
+
+    def _work_set(self, targets: Optional[Iterable[int]]) -> set:
+        nodes = self.graph.nodes
+        if targets is None:
+            return {node.id for node in nodes if node.dirty}
+        work, stack = set(), list(targets)
+        while stack:
+            nid = stack.pop()
+            if nid in work or not nodes[nid].dirty:
+                continue
+            work.add(nid)
+            stack.extend(nodes[nid].parents)
+        return work
+
+    @staticmethod
+    def _store(node: Thought, result: Any) -> None:
+        node.result = result
+        node.result_digest = digest(result)
+
+    def _skip(self, nid: int, pending: Dict[int, int], stats: Dict[str, int]) -> None:
+        """Mark a node and its pending descendants skipped after an upstream failure."""
+        stack = [nid]
+        while stack:
+            node = self.graph.nodes[stack.pop()]
+            if node.status == 'skipped':
+                continue
+            node.status = 'skipped'
+            node.dirty = True
+            stats['skipped'] += 1
+            stack.extend(c for c in node.children if c in pending)
+
+
+class SyntheticOperator(ThoughtOperator):
+    """
+    Deterministic stand-in for LLM calls.
+
+    Each result is a thought id and a score derived from the operation, its
+    parameters and its inputs, so equal content always gives equal output. `cost_ms` simulates
+    model latency.
+    """
+
+    def __init__(self, cost_ms: float = 0.0):
+        self.cost_ms = cost_ms
+
+    def _score(self, params: Dict[str, Any], inputs: List[Any], tag: str) -> Dict[str, Any]:
+        if self.cost_ms:
+            time.sleep(self.cost_ms / 1000.0)
+        thought = digest([tag, params, inputs])
+        base = sum(i['score'] for i in inputs) / len(inputs) if inputs else 0.5
+        noise = random.Random(int(thought[:8], 16)).gauss(0.02, 0.05)
+        return {'thought': thought[:12], 'score': round(min(1.0, max(0.0, base + noise)), 4)}
+
+    def generate(self, params, inputs):
+        return self._score(params, inputs, 'generate')
+
+    def refine(self, params, inputs):
+        return self._score(params, inputs, 'refine')
+
+    def merge(self, params, inputs):
+        return self._score(params, inputs, 'merge')
+
+    def score(self, params, inputs):
+        return self._score(params, inputs, 'score')
+
+
+def synthetic_graph(nodes: int, width: int = 50, fan_in: int = 3, seed: int = 0,
+                    duplicate_rate: float = 0.2) -> ThoughtGraph:
+    """
+    Layered GoT graph: generate layer, then layers of merge/refine nodes whose
+    parents are drawn from the previous layer.
+
+    A mirror of each layer is labelled differently (`_path`) but carries
+    identical thoughts: the first layer is mirrored in full, and later merges
+    are mirrored with probability `duplicate_rate`, so memoization has shared
+    sub-thoughts to find.
+    """
+    rng = random.Random(seed)
+    graph = ThoughtGraph()
+    root = graph.add('generate', topic='problem')
+    layer = graph.branch(root, width)
+    mirror = graph.branch(root, width, _path='mirror')
+    while len(graph.nodes) < nodes:
+        next_layer, next_mirror = [], []
+        for k in range(width):
+            if len(graph.nodes) >= nodes:
+                break
+            if rng.random() < 0.5:
+                picks = sorted(rng.sample(range(len(layer)), min(fan_in, len(layer))))
+                node = graph.merge([layer[p] for p in picks], slot=k % 7)
+                copy = [mirror[p] for p in picks]
+                duplicate = rng.random() < duplicate_rate
+                twin = graph.merge(copy, slot=k % 7, _path='mirror') if duplicate else node
+            else:
+                node = graph.add('refine', (layer[k],), slot=k % 5)
+                twin = graph.add('refine', (mirror[k],), slot=k % 5, _path='mirror') if mirror[k] != layer[k] else node
+            next_layer.append(node)
+            next_mirror.append(twin)
+        layer, mirror = next_layer, next_mirror
+    return graph
+
+
+def bench(nodes: int, workers: int, cost_ms: float, seed: int) -> Dict[str, Any]:
+    """Full run, a no-op rerun, and an incremental rerun after changing one mid-graph thought."""
+    graph = synthetic_graph(nodes, seed=seed)
+    operator = SyntheticOperator(cost_ms)
+    executor = GoTExecutor(graph, operator, max_workers=workers)
+    full = executor.run()
+    rerun = executor.run()
+    middle = graph.waves()[len(graph.waves()) // 2][0]
+    affected = graph.update(middle, note='revised')
+    incremental = executor.run()
+    return {
+        'nodes': len(graph.nodes),
+        'waves': len(graph.waves()),
+        'tree_expansion_work': graph.path_count(),
+        'full': full,
+        'rerun': rerun,
+        'incremental': {'marked_dirty': affected, **incremental},
+    }
+
+
+def load_graph(path: str) -> ThoughtGraph:
+    """Load [{"id", "op", "parents", "params"}, ...]; ids are arbitrary labels."""
+    with open(path) as f:
+        spec = json.load(f)
+    graph = ThoughtGraph()
+    ids: Dict[str, int] = {}
+    for entry in spec:
+        missing = [p for p in entry.get('parents', []) if p not in ids]
+        if missing:
+            raise ValueError(f"Node {entry['id']} lists parents before they are defined: {missing}")
+        ids[entry['id']] = graph.add(entry['op'], [ids[p] for p in entry.get('parents', [])],
+                                     **entry.get('params', {}))
+    return graph
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Graph of Thoughts executor: memoized parallel DAG evaluation')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    bench_parser = subparsers.add_parser('bench', help='Run a synthetic GoT graph')
+    bench_parser.add_argument('--nodes', type=int, default=20000, help='Graph size (default: 20000)')
+    bench_parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                              help=f'Worker pool size (default: {MAX_WORKERS})')
+    bench_parser.add_argument('--cost-ms', type=float, default=0.0, help='Simulated latency per operation')
+    bench_parser.add_argument('--seed', type=int, default=0)
+    bench_parser.add_argument('--json', action='store_true', help='Print JSON')
+
+    plan_parser = subparsers.add_parser('plan', help='Show the parallel schedule of a graph file')
+    plan_parser.add_argument('graph', help='JSON list of {id, op, parents, params}')
+
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        result = bench(args.nodes, args.workers, args.cost_ms, args.seed)
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+        print(f"Graph: {result['nodes']} nodes in {result['waves']} waves "
+              f"(tree expansion without sharing: {float(result['tree_expansion_work']):.3g} evaluations)\n")
+        print(f"{'Run':<12} {'Scheduled':>10} {'Computed':>9} {'Memo hits':>10} {'Shared':>7} {'Time':>9}")
+        for name in ('full', 'rerun', 'incremental'):
+            r = result[name]
+            print(f"{name:<12} {r['scheduled']:>10} {r['computed']:>9} {r['memo_hits']:>10} "
+                  f"{r['shared']:>7} {r['elapsed_s']:>8.3f}s")
+
+    elif args.command == 'plan':
+        try:
+            graph = load_graph(args.graph)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Cannot load graph: {e}")
+            sys.exit(1)
+        waves = graph.waves()
+        print(f"{len(graph.nodes)} unique thoughts, {len(waves)} waves, "
+              f"widest wave {max((len(w) for w in waves), default=0)}")
+        for level, wave in enumerate(waves):
+            labels = ', '.join(f"{graph.nodes[n].op}#{n}" for n in wave[:12])
+            more = f" (+{len(wave) - 12})" if len(wave) > 12 else ''
+            print(f"  wave {level}: {labels}{more}")
+
+
+if __name__ == '__main__':
+    main()
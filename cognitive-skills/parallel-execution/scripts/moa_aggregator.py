@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Mixture-of-Agents (MoA) runtime with streaming fan-in.
+
+Executable form of Pattern 3 in parallel-execution/SKILL.md:
+
+- Proposers (ToT, BoT, AT, ...) run concurrently on asyncio, each under its
+  own timeout and within a global deadline.
+- Each proposal goes into WeightedSynthesis as soon as it arrives. Proposer
+  weights are normalized over the proposers still in play (equal by default).
+  The combined confidence is the weighted mean confidence of the proposers
+  backing the leading answer.
+- Conflict rules from the MoA configuration. Disagreement is the share of
+  the responding weight that does not back the leading answer:
+    unanimous (no minority)  -> confidence + agreement_boost (0.05)
+    disagreement <= 30%      -> majority: use it, document the minority,
+                                confidence - disagreement_penalty × disagreement
+    disagreement > 30%       -> escalate to Dialectical Reasoning (DR)
+- Early decision: once the leader stays the leader and disagreement stays
+  within the threshold even if every outstanding proposer backs another
+  answer, the decision and the escalation cannot change. The remaining
+  proposers are then cancelled, so latency tracks the fastest sufficient
+  subset rather than the slowest proposer. Agreement and confidence are then
+  computed over the proposers heard, and the result is marked partial. A
+  failing or timed-out proposer drops out of the weight total.
+
+Proposers are pluggable: subclass Proposer and implement `async propose()`.
+
+Usage:
+    python moa_aggregator.py demo
+    python moa_aggregator.py demo --scenario split
+    python moa_aggregator.py simulate --trials 200 --proposers 5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+AGREEMENT_BOOST = 0.05
+DISAGREEMENT_PENALTY = 0.10
+ESCALATION_THRESHOLD = 0.30
+
+
+class Proposer:
+    """Interface for MoA proposers."""
+
+    def __init__(self, name: str, weight: float = 1.0, timeout: Optional[float] = None):
+        """
+        Args:
+            name: Proposer label (e.g. 'ToT')
+            weight: Relative weight in the synthesis
+            timeout: Seconds allowed for this proposer
+        """
+        self.name = name
+        self.weight = weight
+        self.timeout = timeout
+
+    async def propose(self, problem: Any) -> Dict[str, Any]:
+        """Return {'answer', 'confidence', 'rationale'}."""
+        raise NotImplementedError
+
+
+class WeightedSynthesis:
+    """Incremental aggregator applying the MoA weighting and conflict rules."""
+
+    def __init__(self, weights: Dict[str, float], agreement_boost: float = AGREEMENT_BOOST,
+                 disagreement_penalty: float = DISAGREEMENT_PENALTY,
+                 escalation_threshold: float = ESCALATION_THRESHOLD):
+        """
+        Args:
+            weights: Proposer name -> relative weight, for every proposer in the run
+            agreement_boost: Added to confidence on unanimous agreement
+            disagreement_penalty: Subtracted in proportion to the disagreement
+            escalation_threshold: Disagreement above which the decision escalates to DR
+        """
+        self.weights = dict(weights)
+        self.agreement_boost = agreement_boost
+        self.disagreement_penalty = disagreement_penalty
+        self.escalation_threshold = escalation_threshold
+        self.proposals: Dict[str, Dict[str, Any]] = {}
+        self.dropped: Dict[str, str] = {}
+        self._labels: Dict[str, Any] = {}
+
+    def add(self, name: str, proposal: Dict[str, Any]) -> None:
+        key = json.dumps(proposal.get('answer'), sort_keys=True, default=str).lower()
+        self._labels.setdefault(key, proposal.get('answer'))
+        self.proposals[name] = {**proposal, 'key': key}
+
+    def drop(self, name: str, reason: str) -> None:
+        """Remove a failed or timed-out proposer from the weight total."""
+        self.dropped[name] = reason
+
+    def _shares(self) -> Dict[str, Any]:
+        active = {n: w for n, w in self.weights.items() if n not in self.dropped}
+        total = sum(active.values()) or 1.0
+        support: Dict[str, float] = defaultdict(float)
+        conviction: Dict[str, float] = defaultdict(float)
+        for name, proposal in self.proposals.items():
+            support[proposal['key']] += active[name] / total
+            conviction[proposal['key']] += active[name] * float(proposal.get('confidence', 0.0))
+        pending = sum(w for n, w in active.items() if n not in self.proposals) / total
+        # Equal support is broken by confidence-weighted support, then by answer, never by arrival order
+        ranked = sorted(support.items(), key=lambda item: (-round(item[1], 9), -conviction[item[0]], item[0]))
+        return {'active': active, 'total': total, 'ranked': ranked, 'pending': pending}
+
+    def decisive(self) -> bool:
+        """True if the decision and escalation hold whatever the outstanding proposers say."""
+        shares = self._shares()
+        if not shares['ranked'] or shares['pending'] == 0:
+            return False
+        lead = shares['ranked'][0][1]
+        second = shares['ranked'][1][1] if len(shares['ranked']) > 1 else 0.0
+        responded = 1.0 - shares['pending']
+        # worst case: every outstanding proposer answers, and none backs the leader
+        worst_disagreement = (responded - lead + shares['pending']) / (responded + shares['pending'])
+        return lead > second + shares['pending'] and worst_disagreement <= self.escalation_threshold
+
+    def result(self) -> Dict[str, Any]:
+        shares = self._shares()
+        if not shares['ranked']:
+            return {'decision': None, 'agreement': 'none', 'escalate_to': 'DR', 'confidence': 0.0,
+                    'base_confidence': 0.0, 'support': {}, 'backers': [], 'minority': [],
+                    'not_heard': sorted(shares['active']), 'dropped': self.dropped,
+                    'partial': bool(shares['active'])}
+        lead_key, lead = shares['ranked'][0]
+        backers = [n for n, p in self.proposals.items() if p['key'] == lead_key]
+        backer_weight = sum(shares['active'][n] for n in backers)
+        base = sum(shares['active'][n] * float(self.proposals[n].get('confidence', 0.0)) for n in backers)
+        base /= backer_weight or 1.0
+        responded = sum(shares['active'][n] for n in self.proposals) / shares['total']
+        disagreement = max(0.0, responded - lead) / responded
+        minority = [
+            {'proposer': n, 'answer': p.get('answer'), 'rationale': p.get('rationale')}
+            for n, p in self.proposals.items() if p['key'] != lead_key
+        ]
+
+        if not minority:
+            agreement, confidence, escalate = 'unanimous', base + self.agreement_boost, None
+        elif disagreement <= self.escalation_threshold:
+            agreement, confidence, escalate = 'majority', base - self.disagreement_penalty * disagreement, None
+        else:
+            agreement, confidence, escalate = 'none', base - self.disagreement_penalty * disagreement, 'DR'
+
+        not_heard = sorted(n for n in shares['active'] if n not in self.proposals)
+        return {
+            'decision': self._labels[lead_key],
+            'agreement': agreement,
+            'escalate_to': escalate,
+            'confidence': round(min(1.0, max(0.0, confidence)), 4),
+            'base_confidence': round(base, 4),
+            'support': {json.dumps(self._labels[k], default=str): round(s, 4) for k, s in shares['ranked']},
+            'disagreement': round(disagreement, 4),
+            'backers': backers,
+            'minority': minority,
+            'not_heard': not_heard,
+            'dropped': self.dropped,
+            # agreement and confidence cover only the proposers heard
+            'partial': bool(not_heard),
+        }
+
+
+async def run_moa(problem: Any, proposers: List[Proposer], deadline: Optional[float] = None,
+                  early_stop: bool = True, **synthesis_options) -> Dict[str, Any]:
+    """
+    Fan out to all proposers and aggregate as they complete.
+
+    Args:
+        problem: Passed to every proposer
+        proposers: Proposers to run concurrently
+        deadline: Global deadline in seconds
+        early_stop: Cancel outstanding proposers once the synthesis is decisive
+        **synthesis_options: Passed to WeightedSynthesis
+
+    Returns:
+        Synthesis result plus per-proposer timeline and stop reason
+    """
+    names = [p.name for p in proposers]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Proposer names must be unique: {names}")
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    synthesis = WeightedSynthesis({p.name: p.weight for p in proposers}, **synthesis_options)
+    timeline: Dict[str, Dict[str, Any]] = {}
+
+    async def call(proposer: Proposer):
+        began = loop.time()
+        try:
+            proposal = await asyncio.wait_for(proposer.propose(problem), proposer.timeout)
+            return proposer, proposal, None, loop.time() - began
+        except asyncio.TimeoutError:
+            return proposer, None, f"timeout after {proposer.timeout}s", loop.time() - began
+        except Exception as e:
+            return proposer, None, f"error: {e}", loop.time() - began
+
+    tasks = {asyncio.ensure_future(call(p)): p for p in proposers}
+    pending = set(tasks)
+    stop_reason = 'all_proposers_done'
+    try:
+        while pending:
+            remaining = None if deadline is None else deadline - (loop.time() - start)
+            if remaining is not None and remaining <= 0:
+                stop_reason = 'deadline'
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                stop_reason = 'deadline'
+                break
+            for task in done:
+                proposer, proposal, error, elapsed = task.result()
+                timeline[proposer.name] = {'status': 'ok' if error is None else 'dropped',
+                                           'finished_s': round(loop.time() - start, 4),
+                                           'elapsed_s': round(elapsed, 4), 'error': error}
+                if error is None:
+                    synthesis.add(proposer.name, proposal)
+                else:
+                    synthesis.drop(proposer.name, error)
+            if early_stop and pending and synthesis.decisive():
+                stop_reason = 'decisive'
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    for task in pending:
+        proposer = tasks[task]
+        timeline[proposer.name] = {'status': 'skipped' if stop_reason == 'decisive' else 'deadline',
+                                   'finished_s': None, 'elapsed_s': None, 'error': None}
+        if stop_reason == 'deadline':
+            synthesis.drop(proposer.name, 'deadline')
+
+    return {
+        **synthesis.result(),
+        'stop_reason': stop_reason,
+        'wall_s': round(loop.time() - start, 4),
+        'proposers': {p.name: timeline[p.name] for p in proposers},
+    }
+
+
+class SyntheticProposer(Proposer):
+    """Fixed proposal after a fixed delay, optionally failing."""
+
+    def __init__(self, name: str, answer: Any, confidence: float, latency: float, fail: bool = False,
+                 rationale: str = '', **kwargs):
+        super().__init__(name, **kwargs)
+        self.answer = answer
+        self.confidence = confidence
+        self.latency = latency
+        self.fail = fail
+        self.rationale = rationale
+
+    async def propose(self, problem: Any) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        return {'answer': self.answer, 'confidence': self.confidence, 'rationale': self.rationale}
+
+
+SCENARIOS = {
+    'agree': [
+        ('ToT', 'PostgreSQL', 0.87, 0.3, 'Best score for ACID compliance and query performance'),
+        ('BoT', 'PostgreSQL', 0.72, 0.6, 'Top of PostgreSQL / MongoDB / DynamoDB option map'),
+        ('AT', 'PostgreSQL', 0.75, 1.5, 'Banking systems use relational stores for audit trails'),
+    ],
+    'split': [
+        ('ToT', 'PostgreSQL', 0.87, 0.3, 'Best score for ACID compliance'),
+        ('BoT', 'MongoDB', 0.68, 0.6, 'Flexible schema fits evolving product'),
+        ('AT', 'DynamoDB', 0.65, 1.5, 'Serverless scale like event-driven retail systems'),
+    ],
+}
+
+
+RESULT_FIELDS = ('decision', 'agreement', 'escalate_to', 'confidence', 'disagreement', 'minority')
+
+
+async def simulate(trials: int, proposers: int, seed: int) -> Dict[str, Any]:
+    """Early-stopping MoA vs waiting for every proposer on random proposer panels."""
+    rng = random.Random(seed)
+    wall_early = wall_all = 0.0
+    same = same_result = partial = 0
+    for _ in range(trials):
+        p_lead = rng.uniform(0.5, 0.95)
+        panel = []
+        for k in range(proposers):
+            answer = 'A' if rng.random() < p_lead else rng.choice(['B', 'C'])
+            panel.append(dict(name=f"P{k + 1}", answer=answer, confidence=round(rng.uniform(0.55, 0.9), 2),
+                              latency=rng.lognormvariate(-3.0, 0.8), fail=rng.random() < 0.05))
+        early = await run_moa(None, [SyntheticProposer(**p) for p in panel])
+        full = await run_moa(None, [SyntheticProposer(**p) for p in panel], early_stop=False)
+        wall_early += early['wall_s']
+        wall_all += full['wall_s']
+        same += (early['decision'], early['escalate_to']) == (full['decision'], full['escalate_to'])
+        same_result += all(early[k] == full[k] for k in RESULT_FIELDS)
+        partial += early['partial']
+    return {
+        'trials': trials,
+        'proposers': proposers,
+        'mean_wall_early_s': round(wall_early / trials, 4),
+        'mean_wall_all_s': round(wall_all / trials, 4),
+        'latency_saved': round(1.0 - wall_early / wall_all, 4) if wall_all else 0.0,
+        'same_decision': round(same / trials, 4),
+        'same_result': round(same_result / trials, 4),
+        'partial': round(partial / trials, 4),
+    }
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print(f"{'Proposer':<10} {'Status':<8} {'Finished':>9}  Error")
+    for name, entry in result['proposers'].items():
+        finished = f"{entry['finished_s']:.2f}s" if entry['finished_s'] is not None else '-'
+        print(f"{name:<10} {entry['status']:<8} {finished:>9}  {entry['error'] or ''}")
+    print(f"\nDecision: {result['decision']} (agreement: {result['agreement']}, "
+          f"confidence {result['confidence']:.0%}, stop: {result['stop_reason']}, wall {result['wall_s']:.2f}s)")
+    if result['partial']:
+        heard = len(result['proposers']) - len(result['not_heard'])
+        print(f"  Partial: agreement and confidence from {heard} of {len(result['proposers'])} proposers")
+    if result['escalate_to']:
+        print(f"Escalate to {result['escalate_to']}: disagreement {result['disagreement']:.0%} "
+              f"above the escalation threshold")
+    for minority in result['minority']:
+        print(f"  Minority: {minority['proposer']} -> {minority['answer']} ({minority['rationale']})")
+    if result['not_heard']:
+        print(f"  Not waited for: {', '.join(result['not_heard'])}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Mixture-of-Agents runtime with streaming aggregation')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    demo_parser = subparsers.add_parser('demo', help='Database-choice example from SKILL.md')
+    demo_parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='agree')
+    demo_parser.add_argument('--wait-all', action='store_true', help='Disable early decision')
+
+    sim_parser = subparsers.add_parser('simulate', help='Latency saved by early decision')
+    sim_parser.add_argument('--trials', type=int, default=100)
+    sim_parser.add_argument('--proposers', type=int, default=5)
+    sim_parser.add_argument('--seed', type=int, default=0)
+
+    for sub_parser in (demo_parser, sim_parser):
+        sub_parser.add_argument('--json', action='store_true', help='Print JSON')
+
+    args = parser.parse_args()
+
+    if args.command == 'demo':
+        proposers = [SyntheticProposer(name, answer, conf, latency, rationale=why)
+                     for name, answer, conf, latency, why in SCENARIOS[args.scenario]]
+        result = asyncio.run(run_moa('Choose database for new microservice', proposers,
+                                     early_stop=not args.wait_all))
+        if args.json:
+            print(json.dumps(result, indent=2, default=str))
+        else:
+            print_result(result)
+
+    elif args.command == 'simulate':
+        if args.trials < 1 or args.proposers < 1:
+            print("--trials and --proposers must be at least 1")
+            sys.exit(1)
+        result = asyncio.run(simulate(args.trials, args.proposers, args.seed))
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"{result['trials']} panels of {result['proposers']} proposers")
+            print(f"  Wait for all:   {result['mean_wall_all_s'] * 1000:.1f} ms mean")
+            print(f"  Early decision: {result['mean_wall_early_s'] * 1000:.1f} ms mean "
+                  f"({result['latency_saved']:.0%} lower)")
+            print(f"  Same decision as waiting for all: {result['same_decision']:.1%}")
+            print(f"  Same full result (agreement, confidence, minority): {result['same_result']:.1%}; "
+                  f"early results are partial in {result['partial']:.1%} of panels")
+
+
+if __name__ == '__main__':
+    main()
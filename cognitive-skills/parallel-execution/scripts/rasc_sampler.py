@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Adaptive self-consistency sampler for RASC (Pattern 5 in parallel-execution/SKILL.md).
+
+Fixed-K self-consistency always pays for K paths. This sampler pays only for
+the paths it needs:
+
+- Paths are generated incrementally, `batch` at a time.
+- Each rationale is embedded (hashed word unigrams and bigrams, L2
+  normalized) and clustered online. One matrix-vector product against the
+  cluster centroids decides between joining the nearest cluster and opening a
+  new one.
+- Answers are voted on by cluster, as in the RASC weighted voting method:
+  each cluster backs its representative's answer with weight = cluster size
+  × representative confidence. Per-path votes (count or confidence) are
+  available for comparison. After each batch the leader is compared with the
+  runner-up under a Beta posterior over those weights. Sampling stops once
+  P(leader > runner-up) reaches the stopping threshold (after a minimum
+  number of paths) or the budget runs out.
+- The report gives paths consumed against the fixed budget, so the compute
+  reduction is measured rather than assumed. It also lists the rationale
+  clusters with their representatives (the path closest to the centroid).
+
+Path generators are pluggable: subclass PathGenerator and implement
+generate(). `replay` runs the stopping rule over paths recorded in a JSONL
+file of {"answer", "rationale", "confidence"} lines.
+
+Usage:
+    python rasc_sampler.py simulate --problems 200 --budget 10
+    python rasc_sampler.py replay paths.jsonl --budget 10 --stop 0.95
+"""
+
+import argparse
+import json
+import re
+import sys
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+BUDGET = 10
+MIN_PATHS = 3
+STOP_PROBABILITY = 0.95
+CLUSTER_SIMILARITY = 0.5
+EMBED_DIM = 1024
+POSTERIOR_DRAWS = 4000
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def embed(text: str, dim: int = EMBED_DIM) -> np.ndarray:
+    """Signed feature-hashing embedding of word unigrams and bigrams, L2 normalized."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    vector = np.zeros(dim, dtype=np.float32)
+    if not features:
+        return vector
+    hashes = np.fromiter((zlib.crc32(f.encode()) for f in features), dtype=np.uint64, count=len(features))
+    signs = np.where(hashes & np.uint64(1 << 31), -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, (hashes % np.uint64(dim)).astype(np.intp), signs)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def normalize_answer(answer: Any) -> str:
+    return ' '.join(str(answer).lower().split())
+
+
+def leader_probability(lead: float, runner_up: float, draws: int = POSTERIOR_DRAWS, seed: int = 0) -> float:
+    """P(p_lead > p_runner_up) with Beta(lead+1, runner_up+1) over the two-answer share."""
+    rng = np.random.default_rng(seed)
+    return float(np.mean(rng.beta(lead + 1.0, runner_up + 1.0, size=draws) > 0.5))
+
+
+class PathGenerator:
+    """Interface for reasoning path generation."""
+
+    def generate(self, index: int) -> Dict[str, Any]:
+        """Return {'answer', 'rationale', 'confidence'} for the index-th path."""
+        raise NotImplementedError
+
+
+class RationaleClusters:
+    """Online clustering of rationale embeddings against running centroids."""
+
+    def __init__(self, threshold: float = CLUSTER_SIMILARITY, dim: int = EMBED_DIM):
+        self.threshold = threshold
+        self.sums = np.zeros((0, dim), dtype=np.float32)
+        self.members: List[List[int]] = []
+        self.vectors: List[np.ndarray] = []
+
+    def add(self, vector: np.ndarray) -> int:
+        """Assign a path to the nearest cluster above threshold, or open a new one."""
+        self.vectors.append(vector)
+        path = len(self.vectors) - 1
+        if len(self.members):
+            norms = np.linalg.norm(self.sums, axis=1)
+            similarity = (self.sums @ vector) / np.maximum(norms, 1e-12)
+            best = int(np.argmax(similarity))
+            if similarity[best] >= self.threshold:
+                self.sums[best] += vector
+                self.members[best].append(path)
+                return best
+        self.sums = np.vstack([self.sums, vector[None, :]])
+        self.members.append([path])
+        return len(self.members) - 1
+
+    def representative(self, cluster: int) -> int:
+        """Member path closest to the cluster centroid."""
+        members = self.members[cluster]
+        vectors = np.stack([self.vectors[p] for p in members])
+        return members[int(np.argmax(vectors @ self.sums[cluster]))]
+
+
+WEIGHTINGS = ('cluster', 'count', 'confidence')
+
+
+def path_confidence(path: Dict[str, Any]) -> float:
+    return float(path.get('confidence', 1.0))
+
+
+class RASCSampler:
+    """Generates paths until the leading answer is settled or the budget is spent."""
+
+    def __init__(self, generator: PathGenerator, budget: int = BUDGET, min_paths: int = MIN_PATHS,
+                 stop_probability: float = STOP_PROBABILITY, batch: int = 1,
+                 cluster_similarity: float = CLUSTER_SIMILARITY, weighting: str = 'cluster'):
+        """
+        Initialize sampler.
+
+        Args:
+            generator: Produces reasoning paths
+            budget: Fixed self-consistency budget K (upper bound on paths)
+            min_paths: Never stop before this many paths
+            stop_probability: Stop once P(leader > runner-up) reaches this
+            batch: Paths generated between stopping checks
+            cluster_similarity: Cosine similarity needed to join a rationale cluster
+            weighting: 'cluster' (cluster size × representative confidence), 'count' (one vote
+                per path) or 'confidence' (vote = path confidence)
+        """
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting: {weighting}")
+        if budget <= 0:
+            raise ValueError(f"budget must be positive, got {budget}")
+        self.generator = generator
+        self.budget = budget
+        self.min_paths = min_paths
+        self.stop_probability = stop_probability
+        self.batch = max(1, batch)
+        self.cluster_similarity = cluster_similarity
+        self.weighting = weighting
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Sample adaptively.
+
+        Returns:
+            Answer, posterior, paths consumed vs budget, clusters and per-step trace
+        """
+        clusters = RationaleClusters(self.cluster_similarity)
+        paths: List[Dict[str, Any]] = []
+        votes: Dict[str, float] = {}
+        labels: Dict[str, Any] = {}
+        trace = []
+        probability = 0.0
+        stop_reason = 'budget_exhausted'
+
+        while len(paths) < self.budget:
+            for _ in range(min(self.batch, self.budget - len(paths))):
+                path = self.generator.generate(len(paths))
+                path['cluster'] = clusters.add(embed(str(path.get('rationale', ''))))
+                paths.append(path)
+                labels.setdefault(normalize_answer(path['answer']), path['answer'])
+
+            votes = self._votes(paths, clusters)
+            ranked = sorted(votes.values(), reverse=True)
+            lead, runner_up = ranked[0], ranked[1] if len(ranked) > 1 else 0.0
+            probability = leader_probability(lead, runner_up, seed=len(paths))
+            trace.append({'paths': len(paths), 'leader_probability': round(probability, 4),
+                          'clusters': len(clusters.members)})
+            if len(paths) >= self.min_paths and probability >= self.stop_probability:
+                stop_reason = 'confident'
+                break
+
+        return self._report(paths, votes, labels, clusters, probability, stop_reason, trace)
+
+    def _votes(self, paths: List[Dict[str, Any]], clusters: RationaleClusters) -> Dict[str, float]:
+        """Vote weight per normalized answer."""
+        votes: Dict[str, float] = defaultdict(float)
+        if self.weighting == 'cluster':
+            for cid, members in enumerate(clusters.members):
+                rep = paths[clusters.representative(cid)]
+                votes[normalize_answer(rep['answer'])] += len(members) * path_confidence(rep)
+        else:
+            for path in paths:
+                weight = path_confidence(path) if self.weighting == 'confidence' else 1.0
+                votes[normalize_answer(path['answer'])] += weight
+        return votes
+
+    def _report(self, paths, votes, labels, clusters, probability, stop_reason, trace) -> Dict[str, Any]:
+        total = sum(votes.values()) or 1.0
+        ranking = sorted(((labels[k], w) for k, w in votes.items()), key=lambda item: -item[1])
+        cluster_report = []
+        for cid, members in enumerate(clusters.members):
+            rep = clusters.representative(cid)
+            cluster_report.append({
+                'size': len(members),
+                'representative': rep,
+                'weight': round(len(members) * path_confidence(paths[rep]), 4),
+                'answer': paths[rep]['answer'],
+                'rationale': paths[rep].get('rationale'),
+            })
+        cluster_report.sort(key=lambda c: (-c['weight'], -c['size']))
+        return {
+            'answer': ranking[0][0] if ranking else None,
+            'agreement': round(ranking[0][1] / total, 4) if ranking else 0.0,
+            'leader_probability': round(probability, 4),
+            'ranking': [{'answer': a, 'weight': round(w / total, 4)} for a, w in ranking],
+            'paths_used': len(paths),
+            'budget': self.budget,
+            'compute_saved': round(1.0 - len(paths) / self.budget, 4),
+            'stop_reason': stop_reason,
+            'clusters': cluster_report,
+            'trace': trace,
+        }
+
+
+class ReplayGenerator(PathGenerator):
+    """Serves pre-recorded paths in order."""
+
+    def __init__(self, paths: List[Dict[str, Any]]):
+        self.paths = paths
+
+    def generate(self, index: int) -> Dict[str, Any]:
+        return dict(self.paths[index])
+
+
+class SyntheticGenerator(PathGenerator):
+    """
+    Paths for a problem with a hidden answer distribution. Each answer has a
+    few rationale templates, so paths cluster the way real rationales do.
+    """
+
+    RATIONALES = [
+        'matches market expectations and leaves room for upsell',
+        'scales with customer success and is fair for small users',
+        'simplicity wins with no confusion about which tier to pick',
+        'free tier drives adoption and a single paid tier stays simple',
+        'undercut competition on price for a volume strategy',
+        'aligns revenue with the value customers actually receive',
+    ]
+
+    def __init__(self, probabilities: List[float], seed: int = 0):
+        self.probabilities = np.asarray(probabilities) / np.sum(probabilities)
+        self.rng = np.random.default_rng(seed)
+
+    def generate(self, index: int) -> Dict[str, Any]:
+        answer = int(self.rng.choice(len(self.probabilities), p=self.probabilities))
+        template = self.RATIONALES[(answer * 2 + int(self.rng.integers(2))) % len(self.RATIONALES)]
+        return {
+            'answer': f"option-{answer}",
+            'rationale': f"{template} (path {index})",
+            'confidence': float(np.round(self.rng.uniform(0.55, 0.9), 2)),
+        }
+
+
+def simulate(problems: int, budget: int, min_paths: int, stop_probability: float, batch: int,
+             seed: int) -> Dict[str, Any]:
+    """
+    Adaptive sampling vs the fixed budget on synthetic problems.
+
+    Each problem draws a random answer distribution. The same path sequence
+    is replayed to the full budget, so the fixed-K majority shows how often
+    early stopping changes the answer.
+    """
+    rng = np.random.default_rng(seed)
+    used, agree = [], 0
+    for k in range(problems):
+        probabilities = rng.dirichlet(np.full(int(rng.integers(2, 5)), 0.7))
+        generator = SyntheticGenerator(probabilities, seed=seed * 100003 + k)
+        recorded = [generator.generate(i) for i in range(budget)]
+        adaptive = RASCSampler(ReplayGenerator(recorded), budget, min_paths, stop_probability, batch).run()
+        fixed = RASCSampler(ReplayGenerator(recorded), budget, budget, 1.1, batch=budget).run()
+        used.append(adaptive['paths_used'])
+        agree += adaptive['answer'] == fixed['answer']
+    total_used = int(np.sum(used))
+    return {
+        'problems': problems,
+        'budget': budget,
+        'paths_fixed': problems * budget,
+        'paths_adaptive': total_used,
+        'mean_paths': round(total_used / problems, 2),
+        'compute_saved': round(1.0 - total_used / (problems * budget), 4),
+        'agreement_with_fixed': round(agree / problems, 4),
+    }
+
+
+def load_paths(path: str) -> List[Dict[str, Any]]:
+    """
+    Read recorded paths, one JSON object per line.
+
+    Raises:
+        ValueError: naming file:line for a line that is not an object with an
+            `answer`, or whose `confidence` is not a number in [0, 1]
+    """
+    paths = []
+    with open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            where = f"{path}:{lineno}"
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{where}: invalid JSON ({e})")
+            if not isinstance(record, dict) or record.get('answer') is None:
+                raise ValueError(f"{where}: expected an object with an 'answer'")
+            if 'confidence' in record:
+                confidence = record['confidence']
+                if isinstance(confidence, bool) or not isinstance(confidence, (int, float)) \
+                        or not 0.0 <= confidence <= 1.0:
+                    raise ValueError(f"{where}: 'confidence' must be a number in [0, 1], got {confidence!r}")
+            paths.append(record)
+    return paths
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Adaptive early-stopping RASC sampler')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sim_parser = subparsers.add_parser('simulate', help='Measure compute saved on synthetic problems')
+    sim_parser.add_argument('--problems', type=int, default=200)
+    sim_parser.add_argument('--seed', type=int, default=0)
+
+    replay_parser = subparsers.add_parser('replay', help='Apply the stopping rule to recorded paths')
+    replay_parser.add_argument('paths', help='JSONL of {"answer", "rationale", "confidence"}')
+    replay_parser.add_argument('--weighting', choices=WEIGHTINGS, default='cluster',
+                               help='Vote weights (default: cluster size × representative confidence)')
+    replay_parser.add_argument('--cluster-similarity', type=float, default=CLUSTER_SIMILARITY)
+
+    for sub_parser in (sim_parser, replay_parser):
+        sub_parser.add_argument('--budget', type=int, default=BUDGET, help=f'Fixed budget K (default: {BUDGET})')
+        sub_parser.add_argument('--min-paths', type=int, default=MIN_PATHS)
+        sub_parser.add_argument('--stop', type=float, default=STOP_PROBABILITY,
+                                help=f'Stop at this P(leader > runner-up) (default: {STOP_PROBABILITY})')
+        sub_parser.add_argument('--batch', type=int, default=1, help='Paths per stopping check')
+        sub_parser.add_argument('--json', action='store_true', help='Print JSON')
+
+    args = parser.parse_args()
+    if args.budget < 1:
+        print("--budget must be at least 1")
+        sys.exit(1)
+
+    if args.command == 'simulate':
+        result = simulate(args.problems, args.budget, args.min_paths, args.stop, args.batch, args.seed)
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+        print(f"{result['problems']} problems, budget K={result['budget']}")
+        print(f"  Fixed:    {result['paths_fixed']} paths")
+        print(f"  Adaptive: {result['paths_adaptive']} paths ({result['mean_paths']} per problem)")
+        print(f"  Compute saved: {result['compute_saved']:.1%}; "
+              f"same answer as fixed-K majority: {result['agreement_with_fixed']:.1%}")
+
+    elif args.command == 'replay':
+        try:
+            recorded = load_paths(args.paths)
+        except (OSError, ValueError) as e:
+            print(f"Cannot read paths: {e}")
+            sys.exit(1)
+        if not recorded:
+            print(f"No paths in {args.paths}")
+            sys.exit(1)
+        budget = min(args.budget, len(recorded))
+        sampler = RASCSampler(ReplayGenerator(recorded), budget, args.min_paths, args.stop, args.batch,
+                              args.cluster_similarity, args.weighting)
+        report = sampler.run()
+        if args.json:
+            print(json.dumps(report, indent=2))
+            return
+        print(f"Answer: {report['answer']} (agreement {report['agreement']:.0%}, "
+              f"P(leader > runner-up) = {report['leader_probability']:.3f})")
+        print(f"Paths used: {report['paths_used']}/{report['budget']} "
+              f"({report['compute_saved']:.0%} saved, {report['stop_reason']})")
+        print("Clusters:")
+        for cluster in report['clusters']:
+            print(f"  size {cluster['size']}, weight {cluster['weight']:.2f}: path {cluster['representative'] + 1} "
+                  f"-> {cluster['answer']} - \"{cluster['rationale']}\"")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Iteration controller for Ralph-loop reasoning sessions.
+
+Applies the `iteration_safeguards` from the Ralph-Loop Integration skill while
+a loop runs instead of reading iteration-log tables by hand:
+
+- Stop conditions are evaluated in the documented order: error/interrupt,
+  confidence >= target, MAX_ITERATIONS, MAX_TOTAL_TIME, plateau
+- Plateau detection keeps a fixed-size window of confidence deltas and a count
+  of low-gain entries in it, so each update is O(1)
+- Time and token budgets use a monotonic clock and are checked both at the end
+  of an iteration and mid-iteration via `check_budget()`, so a runaway pattern
+  can be stopped before it returns
+- Every completed iteration is appended to a compact JSON-lines log. Each line
+  carries the controller state after that iteration, so resuming after a crash
+  reads only the last intact line instead of replaying history
+
+Confidence values are percentages (0-100), as in the skill's iteration logs.
+
+Usage:
+    python iteration_controller.py simulate --target 90 --confidences 72 78 79 80 80.5
+    python iteration_controller.py simulate --target 90 --confidences 65 78 85 --minutes 12 15 10
+    python iteration_controller.py status .claude/ralph-loop.iterations.jsonl
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_LOG = '.claude/ralph-loop.iterations.jsonl'
+LOG_VERSION = 1
+
+# Stop reason -> exit status from "Stop Conditions (ANY triggers exit)"
+STOP_STATUS = {
+    'error': 'fail_safe',
+    'token_limit': 'fail_safe',
+    'interrupted': 'manual_stop',
+    'target_reached': 'success',
+    'max_iterations': 'bounded_failure',
+    'time_limit': 'timeout',
+    'plateau': 'diminishing_returns',
+}
+
+
+class SessionLockedError(Exception):
+    """Raised when another controller holds the iteration log."""
+
+
+class SafeguardConfig:
+    """The `iteration_safeguards` block of the Ralph-loop configuration."""
+
+    def __init__(
+        self,
+        max_iterations: int = 5,
+        max_tokens_per_iteration: int = 50000,
+        max_total_time_minutes: float = 30,
+        window_size: int = 3,
+        min_improvement_percent: float = 2,
+        exit_on_error: bool = True,
+    ):
+        self.max_iterations = max_iterations
+        self.max_tokens_per_iteration = max_tokens_per_iteration
+        self.max_total_time_minutes = max_total_time_minutes
+        self.window_size = window_size
+        self.min_improvement_percent = min_improvement_percent
+        self.exit_on_error = exit_on_error
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> 'SafeguardConfig':
+        """Accept the full `ralph_loop` settings, the safeguards block, or a flat dict."""
+        config = config.get('ralph_loop', config)
+        config = config.get('iteration_safeguards', config)
+        plateau = config.get('plateau_detection', {})
+        return cls(
+            max_iterations=int(config.get('max_iterations', 5)),
+            max_tokens_per_iteration=int(config.get('max_tokens_per_iteration', 50000)),
+            max_total_time_minutes=float(config.get('max_total_time_minutes', 30)),
+            window_size=int(plateau.get('window_size', 3)),
+            min_improvement_percent=float(plateau.get('min_improvement_percent', 2)),
+            exit_on_error=bool(config.get('exit_on_error', True)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'max_iterations': self.max_iterations,
+            'max_tokens_per_iteration': self.max_tokens_per_iteration,
+            'max_total_time_minutes': self.max_total_time_minutes,
+            'plateau_detection': {
+                'window_size': self.window_size,
+                'min_improvement_percent': self.min_improvement_percent,
+            },
+            'exit_on_error': self.exit_on_error,
+        }
+
+
+class PlateauWindow:
+    """Last `size` confidence deltas plus how many of them are below the threshold."""
+
+    def __init__(self, size: int, threshold: float, deltas: Optional[List[float]] = None):
+        self.size = size
+        self.threshold = threshold
+        self.deltas: deque = deque(maxlen=size)
+        self.low = 0
+        for delta in deltas or []:
+            self.push(delta)
+
+    def push(self, delta: float) -> None:
+        if len(self.deltas) == self.size and self.deltas[0] < self.threshold:
+            self.low -= 1
+        self.deltas.append(delta)
+        if delta < self.threshold:
+            self.low += 1
+
+    @property
+    def plateaued(self) -> bool:
+        return len(self.deltas) == self.size and self.low == self.size
+
+
+class StopDecision:
+    """Outcome of evaluating the stop conditions."""
+
+    def __init__(self, stop: bool, reason: Optional[str] = None, detail: str = ''):
+        self.stop = stop
+        self.reason = reason
+        self.status = STOP_STATUS.get(reason) if reason else None
+        self.detail = detail
+
+    def __bool__(self) -> bool:
+        return self.stop
+
+    def __repr__(self) -> str:
+        return f"StopDecision(stop={self.stop}, reason={self.reason!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'stop': self.stop, 'reason': self.reason, 'status': self.status, 'detail': self.detail}
+
+
+CONTINUE = StopDecision(False)
+
+
+class IterationController:
+    """Runs the safeguard checks for one Ralph-loop session."""
+
+    def __init__(
+        self,
+        target_confidence: float = 90.0,
+        config: Optional[SafeguardConfig] = None,
+        log_path: Optional[str] = None,
+        inclusive_target: bool = True,
+        initial_confidence: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize controller, resuming from `log_path` if it already has iterations.
+
+        Args:
+            target_confidence: Promise threshold in percent
+            config: Safeguard limits (defaults match the skill)
+            log_path: Append-only iteration log (None keeps state in memory only)
+            inclusive_target: True for '>= target', False for a strict '> target'
+                promise (Edge Case 1: 90.00% does not satisfy '>90%')
+            initial_confidence: Confidence before iteration 1; when given, the
+                first iteration's gain counts towards plateau detection
+            clock: Monotonic seconds source (injectable for tests and simulation)
+        """
+        self.target = target_confidence
+        self.config = config or SafeguardConfig()
+        self.inclusive_target = inclusive_target
+        self.clock = clock
+
+        self.iteration = 0
+        self.elapsed_before = 0.0
+        self.last_confidence = initial_confidence
+        self.patterns: List[str] = []
+        self.window = PlateauWindow(self.config.window_size, self.config.min_improvement_percent)
+        self.final: Optional[Dict[str, Any]] = None
+        self.last_record: Optional[Dict[str, Any]] = None
+
+        self._session_start = clock()
+        self._iteration_start: Optional[float] = None
+        self._iteration_pattern: Optional[str] = None
+        self._iteration_tokens = 0
+        self._log = None
+        if log_path:
+            self._open_log(Path(log_path))
+
+    # -- persistence -------------------------------------------------------
+
+    def _open_log(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._log = open(path, 'a+')
+        try:
+            fcntl.flock(self._log.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._log.close()
+            self._log = None
+            raise SessionLockedError(f"Iteration log {path} is held by another session")
+        _trim_torn_tail(self._log.fileno())
+        state = read_last_state(path)
+        if state:
+            self._restore(state)
+
+    def _restore(self, state: Dict[str, Any]) -> None:
+        self.iteration = state['iteration']
+        self.elapsed_before = state['elapsed_s']
+        self.last_confidence = state['confidence']
+        self.patterns = state.get('patterns', [])
+        self.window = PlateauWindow(self.config.window_size, self.config.min_improvement_percent,
+                                    state.get('window', []))
+        if state.get('stop'):
+            self.final = state
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        if self._log is None:
+            return
+        self._log.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    def close(self) -> None:
+        if self._log is not None:
+            fcntl.flock(self._log.fileno(), fcntl.LOCK_UN)
+            self._log.close()
+            self._log = None
+
+    def __enter__(self) -> 'IterationController':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- budgets -----------------------------------------------------------
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Loop time so far: logged time before a resume plus time in this process."""
+        return self.elapsed_before + (self.clock() - self._session_start)
+
+    def start_iteration(self, pattern: str) -> None:
+        """Mark the start of the next iteration."""
+        if self.final:
+            raise RuntimeError(f"Session already stopped ({self.final.get('stop')})")
+        self._iteration_start = self.clock()
+        self._iteration_pattern = pattern
+        self._iteration_tokens = 0
+
+    def add_tokens(self, tokens: int) -> StopDecision:
+        """Charge tokens to the running iteration and return the budget check."""
+        self._iteration_tokens += tokens
+        return self.check_budget()
+
+    def check_budget(self) -> StopDecision:
+        """Mid-iteration check of the token and time budgets."""
+        if self._iteration_tokens > self.config.max_tokens_per_iteration:
+            return StopDecision(True, 'token_limit',
+                                f"{self._iteration_tokens} tokens > {self.config.max_tokens_per_iteration} per iteration")
+        limit = self.config.max_total_time_minutes * 60
+        if self.elapsed_seconds >= limit:
+            return StopDecision(True, 'time_limit',
+                                f"{self.elapsed_seconds / 60:.1f}m >= {self.config.max_total_time_minutes:g}m")
+        return CONTINUE
+
+    # -- stop conditions ---------------------------------------------------
+
+    def _target_met(self, confidence: float) -> bool:
+        return confidence >= self.target if self.inclusive_target else confidence > self.target
+
+    def evaluate(self, confidence: float, error: Optional[str] = None, interrupted: bool = False) -> StopDecision:
+        """Apply the stop conditions, in order, to the state after an iteration."""
+        if error and self.config.exit_on_error:
+            return StopDecision(True, 'error', error)
+        if interrupted:
+            return StopDecision(True, 'interrupted', 'user interrupt')
+        budget = self.check_budget()
+        if budget.reason == 'token_limit':
+            return budget
+        if self._target_met(confidence):
+            comparison = '>=' if self.inclusive_target else '>'
+            return StopDecision(True, 'target_reached', f"{confidence:g}% {comparison} {self.target:g}%")
+        if self.iteration >= self.config.max_iterations:
+            return StopDecision(True, 'max_iterations', f"{self.iteration}/{self.config.max_iterations} iterations")
+        if budget:
+            return budget
+        if self.window.plateaued:
+            deltas = ', '.join(f"{d:+g}%" for d in self.window.deltas)
+            return StopDecision(True, 'plateau',
+                                f"last {self.window.size} deltas [{deltas}] < {self.window.threshold:g}%")
+        return CONTINUE
+
+    def end_iteration(self, confidence: float, tokens: Optional[int] = None, error: Optional[str] = None,
+                      interrupted: bool = False) -> StopDecision:
+        """
+        Record a completed iteration and decide whether the loop stops.
+
+        Args:
+            confidence: Confidence after this iteration, in percent
+            tokens: Total tokens used by the iteration (if not charged via add_tokens)
+            error: Pattern execution error message, if any
+            interrupted: True if the user stopped the loop
+
+        Returns:
+            StopDecision (truthy when the loop must exit)
+        """
+        if self._iteration_start is None:
+            raise RuntimeError('end_iteration() called without start_iteration()')
+        if tokens is not None:
+            self._iteration_tokens = tokens
+
+        self.iteration += 1
+        duration = self.clock() - self._iteration_start
+        delta = None if self.last_confidence is None else confidence - self.last_confidence
+        if delta is not None:
+            self.window.push(delta)
+        self.last_confidence = confidence
+        if not self.patterns or self.patterns[-1] != self._iteration_pattern:
+            self.patterns.append(self._iteration_pattern)
+
+        decision = self.evaluate(confidence, error, interrupted)
+        record = {
+            'v': LOG_VERSION,
+            'iteration': self.iteration,
+            'pattern': self._iteration_pattern,
+            'confidence': confidence,
+            'delta': None if delta is None else round(delta, 4),
+            'tokens': self._iteration_tokens,
+            'duration_s': round(duration, 3),
+            'elapsed_s': round(self.elapsed_seconds, 3),
+            'window': list(self.window.deltas),
+            'patterns': list(self.patterns),
+            'stop': decision.reason,
+            'detail': decision.detail,
+        }
+        if error:
+            record['error'] = error
+        self._append(record)
+        self.last_record = record
+        if decision:
+            self.final = record
+        self._iteration_start = None
+        return decision
+
+
+def _trim_torn_tail(fd: int, chunk_size: int = 4096) -> None:
+    """Cut a partial last line left by a crash so the next append starts on a fresh line."""
+    size = os.fstat(fd).st_size
+    if size == 0 or os.pread(fd, 1, size - 1) == b'\n':
+        return
+    position = size
+    while position > 0:
+        step = min(chunk_size, position)
+        position -= step
+        newline = os.pread(fd, step, position).rfind(b'\n')
+        if newline != -1:
+            os.ftruncate(fd, position + newline + 1)
+            return
+    os.ftruncate(fd, 0)
+
+
+def read_last_state(path: Path, chunk_size: int = 4096) -> Optional[Dict[str, Any]]:
+    """
+    Return the last intact record of an iteration log without reading the whole file.
+
+    Reads backwards from the end in chunks. A torn final line (crash mid-write)
+    is skipped in favour of the previous complete one.
+    """
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return None
+    with open(path, 'rb') as f:
+        buffer = b''
+        position = size
+        while position > 0:
+            step = min(chunk_size, position)
+            position -= step
+            f.seek(position)
+            buffer = f.read(step) + buffer
+            lines = buffer.split(b'\n')
+            # lines[0] may be partial unless we reached the start of the file
+            candidates = lines if position == 0 else lines[1:]
+            for line in reversed(candidates):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and 'iteration' in record:
+                    return record
+            buffer = lines[0]
+    return None
+
+
+def read_log(path: Path) -> List[Dict[str, Any]]:
+    """All intact records of an iteration log (for reporting, not for resume)."""
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def format_log(records: List[Dict[str, Any]]) -> str:
+    """Render records as the skill's Iteration Log table."""
+    lines = [
+        '| Iter | Pattern | Confidence | Delta | Time | Cumulative | Decision |',
+        '|------|---------|------------|-------|------|------------|----------|',
+    ]
+    for r in records:
+        delta = '-' if r.get('delta') is None else f"{r['delta']:+g}%"
+        decision = f"STOP ({r['stop']})" if r.get('stop') else 'continue'
+        lines.append(f"| {r['iteration']} | {r['pattern']} | {r['confidence']:g}% | {delta} | "
+                     f"{r['duration_s'] / 60:.0f}m | {r['elapsed_s'] / 60:.0f}m | {decision} |")
+    return '\n'.join(lines)
+
+
+class _SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Ralph-loop iteration controller')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sim_parser = subparsers.add_parser('simulate', help='Evaluate a confidence sequence against the safeguards')
+    sim_parser.add_argument('--confidences', type=float, nargs='+', required=True, help='Confidence per iteration (%%)')
+    sim_parser.add_argument('--minutes', type=float, nargs='+', help='Duration per iteration (default: 5 each)')
+    sim_parser.add_argument('--tokens', type=int, nargs='+', help='Tokens per iteration')
+    sim_parser.add_argument('--target', type=float, default=90.0, help='Target confidence %% (default: 90)')
+    sim_parser.add_argument('--strict', action='store_true', help="Promise is '>' rather than '>='")
+    sim_parser.add_argument('--initial', type=float, help='Confidence before iteration 1')
+    sim_parser.add_argument('--config', help='JSON file with ralph_loop / iteration_safeguards settings')
+    sim_parser.add_argument('--log', help='Append iterations to this log')
+
+    status_parser = subparsers.add_parser('status', help='Show an iteration log and its resume state')
+    status_parser.add_argument('log', nargs='?', default=DEFAULT_LOG, help=f'Iteration log (default: {DEFAULT_LOG})')
+
+    args = parser.parse_args()
+
+    if args.command == 'status':
+        path = Path(args.log)
+        if not path.exists():
+            print(f"Error: {path} not found", file=sys.stderr)
+            sys.exit(1)
+        print(format_log(read_log(path)))
+        state = read_last_state(path)
+        if state:
+            outcome = f"stopped: {state['stop']} ({state['detail']})" if state.get('stop') else 'resumable'
+            print(f"\nLast iteration {state['iteration']}, confidence {state['confidence']:g}%, "
+                  f"{state['elapsed_s'] / 60:.1f}m elapsed - {outcome}")
+        return
+
+    config = SafeguardConfig()
+    if args.config:
+        with open(args.config) as f:
+            config = SafeguardConfig.from_dict(json.load(f))
+    minutes = args.minutes or [5.0] * len(args.confidences)
+    tokens = args.tokens or [0] * len(args.confidences)
+    clock = _SimulatedClock()
+
+    try:
+        controller = IterationController(args.target, config, args.log, inclusive_target=not args.strict,
+                                         initial_confidence=args.initial, clock=clock)
+    except SessionLockedError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if controller.final:
+        controller.close()
+        print(f"Error: session in {args.log} already stopped at iteration {controller.final['iteration']} "
+              f"({controller.final['stop']}); start a new log to continue", file=sys.stderr)
+        sys.exit(1)
+
+    with controller:
+        records = []
+        for i, confidence in enumerate(args.confidences):
+            controller.start_iteration(f"iter-{controller.iteration + 1}")
+            clock.now += minutes[i % len(minutes)] * 60
+            decision = controller.end_iteration(confidence, tokens=tokens[i % len(tokens)])
+            records.append(controller.last_record)
+            if decision:
+                break
+
+    print(format_log(records))
+    if decision:
+        print(f"\nExit Reason: {decision.reason} [{decision.status}] - {decision.detail}")
+    else:
+        print('\nNo stop condition triggered')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Parallel branch merge engine (Part 3.2, Parallel Branch Merge Protocol).
+
+Takes N branch handovers, matches their deliverable items across branches,
+applies the IR-v2 agreement arithmetic (confidence_aggregation.py) and writes
+a parallel-merge-v1 record:
+
+- FULL_AGREEMENT:    min(max(c) + 0.05, 0.95)
+- PARTIAL_AGREEMENT: avg(agreeing) × 0.7 + avg(disagreeing) × 0.15
+- NO_AGREEMENT:      min(c) - 0.10
+- Shared assumptions across branches: -0.05
+- Floor 0.10, ceiling 0.95
+- A tie between the two largest groups is NO_AGREEMENT (see confidence_aggregation.py)
+
+Items match when they share a normalized ID and their text does not diverge,
+or when their token-set similarity alone passes the threshold. Candidates come
+from an inverted token index and are grouped with union-find, so merging
+branches with hundreds of items stays near-linear instead of comparing every
+pair.
+
+Accepts both universal handovers (deliverables.items) and merge branch
+summaries ({pattern, branch_id, conclusion, confidence}).
+
+Usage:
+    python branch_merge.py handovers/001-bot.json handovers/002-at.json
+    python branch_merge.py bot.json at.json dr.json --session .reasoning/sessions/session-X
+    python branch_merge.py bot.json at.json --similarity 0.4 --assume-shared
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from confidence_aggregation import (
+    CONFIDENCE_CEILING,
+    CONFIDENCE_FLOOR,
+    SHARED_ASSUMPTION_DISCOUNT,
+    aggregate,
+    aggregate_conclusions,
+    as_probability,
+    bound,
+)
+from handover_chain import write_json_atomic
+
+TEXT_SIMILARITY = 0.5
+ID_SIMILARITY = 0.2
+MAX_POSTING_FRACTION = 0.5
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'best', 'by', 'case', 'for',
+    'from', 'in', 'into', 'is', 'it', 'of', 'on', 'or', 'the', 'this', 'to',
+    'use', 'using', 'via', 'with',
+}
+
+TEXT_FIELDS = ('name', 'conclusion', 'summary', 'description', 'content', 'overview')
+
+
+def normalize_id(item_id: Optional[str]) -> str:
+    """Lowercase alphanumerics only: 'Approach_2' and 'approach-2' compare equal."""
+    return re.sub(r'[^a-z0-9]', '', str(item_id).lower()) if item_id else ''
+
+
+def tokenize(text: str) -> Set[str]:
+    """Split text into a set of lowercase content tokens with plural 's' stripped."""
+    tokens = set()
+    for word in re.findall(r'[a-z0-9][a-z0-9+#.]*', text.lower()):
+        word = word.rstrip('.')
+        if word in STOPWORDS or len(word) < 2:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        tokens.add(word)
+    return tokens
+
+
+class Branch:
+    """One parallel branch and its deliverable items."""
+
+    def __init__(self, data: Dict[str, Any], source: str = ''):
+        source_pattern = data.get('source_pattern')
+        if isinstance(source_pattern, dict):
+            self.pattern = source_pattern.get('name', 'unknown')
+        else:
+            self.pattern = data.get('pattern', 'unknown')
+        self.branch_id = data.get('branch_id') or data.get('handover_id') or Path(source).stem
+        self.source = source
+
+        deliverables = data.get('deliverables') or {}
+        scores = deliverables.get('confidence_scores') or {}
+        self.items: List[Dict[str, Any]] = []
+        for raw in deliverables.get('items') or []:
+            item = raw if isinstance(raw, dict) else {'name': str(raw)}
+            confidence = as_probability(item.get('confidence', scores.get(item.get('id'))))
+            self.items.append({**item, 'confidence': confidence})
+
+        if data.get('conclusion'):
+            conclusion_item = {
+                'id': data.get('conclusion_id'),
+                'name': data['conclusion'],
+                'confidence': as_probability(data.get('confidence')),
+            }
+            self.items.insert(0, conclusion_item)
+
+        metadata = data.get('metadata') or {}
+        confidence = as_probability(data.get('confidence', metadata.get('confidence_at_handover')))
+        ranked = sorted(self.items, key=lambda i: i['confidence'] or 0.0, reverse=True)
+        if confidence is None and ranked:
+            confidence = ranked[0]['confidence']
+        self.confidence = confidence if confidence is not None else 0.5
+        self.conclusion = ranked[0] if ranked else None
+        self.key_insight = data.get('key_insight') or (
+            (data.get('evidence_chain') or {}).get('key_findings') or [None]
+        )[0]
+
+        context = data.get('context_transfer') or {}
+        self.assumptions = {' '.join(sorted(tokenize(a))) for a in context.get('assumptions_made') or []}
+        self.assumptions.discard('')
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+class BranchMerger:
+    """Matches items across branches and computes merged confidence."""
+
+    def __init__(
+        self,
+        similarity: float = TEXT_SIMILARITY,
+        id_similarity: float = ID_SIMILARITY,
+        assume_shared: bool = False,
+    ):
+        """
+        Initialize merger.
+
+        Args:
+            similarity: Token-set Jaccard needed to match items by text alone
+            id_similarity: Jaccard needed when items already share a normalized ID
+            assume_shared: Always apply the shared assumption discount
+        """
+        self.similarity = similarity
+        self.id_similarity = id_similarity
+        self.assume_shared = assume_shared
+
+    def _cluster(self, branches: List[Branch]) -> List[List[Tuple[int, Dict[str, Any]]]]:
+        """Group (branch_index, item) pairs into equivalence classes."""
+        entries: List[Tuple[int, Dict[str, Any]]] = []
+        tokens: List[Set[str]] = []
+        for b, branch in enumerate(branches):
+            for item in branch.items:
+                entries.append((b, item))
+                text = ' '.join(str(item[f]) for f in TEXT_FIELDS if item.get(f))
+                tokens.append(tokenize(text))
+
+        uf = _UnionFind(len(entries))
+        by_id: Dict[str, List[int]] = defaultdict(list)
+        postings: Dict[str, List[int]] = defaultdict(list)
+        max_posting = max(8, int(len(entries) * MAX_POSTING_FRACTION))
+
+        for i, (b, item) in enumerate(entries):
+            # Overlap counts against earlier items from other branches; tokens
+            # present in most items are skipped as too common to discriminate
+            overlap: Dict[int, int] = defaultdict(int)
+            for token in tokens[i]:
+                posting = postings[token]
+                if len(posting) <= max_posting:
+                    for j in posting:
+                        if entries[j][0] != b:
+                            overlap[j] += 1
+                posting.append(i)
+
+            same_id = set()
+            nid = normalize_id(item.get('id'))
+            if nid:
+                same_id = {j for j in by_id[nid] if entries[j][0] != b}
+                by_id[nid].append(i)
+
+            for j in same_id | set(overlap):
+                shared = overlap.get(j, 0)
+                union_size = len(tokens[i]) + len(tokens[j]) - shared
+                jaccard = shared / union_size if union_size else 0.0
+                if j in same_id:
+                    matched = jaccard >= self.id_similarity or not tokens[i] or not tokens[j]
+                else:
+                    matched = jaccard >= self.similarity
+                if matched:
+                    uf.union(i, j)
+
+        groups: Dict[int, List[Tuple[int, Dict[str, Any]]]] = defaultdict(list)
+        for i, entry in enumerate(entries):
+            groups[uf.find(i)].append(entry)
+        return list(groups.values())
+
+    def _shared_assumptions(self, branches: List[Branch]) -> List[str]:
+        seen: Dict[str, int] = defaultdict(int)
+        for branch in branches:
+            for assumption in branch.assumptions:
+                seen[assumption] += 1
+        return sorted(a for a, count in seen.items() if count > 1)
+
+    def merge(self, branches: List[Branch], merge_id: str = 'merge-001') -> Dict[str, Any]:
+        """
+        Merge branches into a parallel-merge-v1 record.
+
+        Args:
+            branches: Completed branches to merge (two or more)
+            merge_id: Identifier for the merge record
+
+        Returns:
+            The merge record as a dict
+        """
+        if len(branches) < 2:
+            raise ValueError("A merge needs at least two branches")
+
+        groups = self._cluster(branches)
+
+        # Conclusion agreement: which group holds each branch's top item
+        group_of: Dict[int, int] = {}
+        for g, members in enumerate(groups):
+            for b, item in members:
+                if branches[b].conclusion is item:
+                    group_of[b] = g
+        shared = self._shared_assumptions(branches)
+        discount = SHARED_ASSUMPTION_DISCOUNT if (shared or self.assume_shared) else 0.0
+        result = aggregate_conclusions(
+            [(f"__group_{group_of.get(b, -1 - b)}__", branch.confidence) for b, branch in enumerate(branches)],
+            key=str, shared_assumptions=bool(discount),
+        )
+        agreement_type, confidence, calculation = result['agreement'], result['confidence'], result['calculation']
+        majority = result['agreeing']
+        if len(majority) < 2:
+            majority = [max(range(len(branches)), key=lambda b: branches[b].confidence)]
+
+        merged_items = []
+        for members in groups:
+            supporting = sorted({b for b, _ in members})
+            by_branch: Dict[int, float] = {}
+            for b, item in members:
+                c = item['confidence'] if item['confidence'] is not None else branches[b].confidence
+                by_branch[b] = max(by_branch.get(b, 0.0), c)
+            item_type, item_raw, item_calc = aggregate(list(by_branch.values()), [])
+            representative = max(members, key=lambda m: m[1]['confidence'] or 0.0)[1]
+            merged_items.append({
+                'id': representative.get('id'),
+                'name': next((representative[f] for f in TEXT_FIELDS if representative.get(f)), None),
+                'supported_by': [branches[b].branch_id for b in supporting],
+                'support': len(supporting),
+                'agreement': item_type,
+                'confidence': bound(item_raw - discount),
+                'confidence_calculation': item_calc,
+                'members': [
+                    {'branch_id': branches[b].branch_id, 'id': item.get('id'),
+                     'confidence': item['confidence']}
+                    for b, item in members
+                ],
+            })
+        merged_items.sort(key=lambda i: (-i['support'], -i['confidence']))
+
+        conclusion_item = branches[majority[0]].conclusion
+        conclusion = next(
+            (conclusion_item[f] for f in TEXT_FIELDS if conclusion_item and conclusion_item.get(f)),
+            None,
+        )
+        if agreement_type == 'NO_AGREEMENT':
+            conclusion = "NO CLEAR RECOMMENDATION - branches reached conflicting conclusions"
+
+        return {
+            '$schema': 'parallel-merge-v1',
+            'merge_id': merge_id,
+            'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'merge_type': 'parallel_branches',
+            'branches': [
+                {
+                    'pattern': branch.pattern,
+                    'branch_id': branch.branch_id,
+                    'conclusion': next((branch.conclusion[f] for f in TEXT_FIELDS
+                                        if branch.conclusion and branch.conclusion.get(f)), None),
+                    'confidence': branch.confidence,
+                    'key_insight': branch.key_insight,
+                }
+                for branch in branches
+            ],
+            'agreement_analysis': {
+                'type': agreement_type,
+                'methodology': 'Normalized ID and token-set similarity of deliverable items',
+                'agreeing_branches': [branches[b].branch_id for b in majority],
+                'disagreeing_branches': [branches[b].branch_id for b in range(len(branches))
+                                         if b not in majority],
+                'shared_assumptions': shared,
+                'shared_assumption_discount': -discount if discount else 0.0,
+            },
+            'merged_result': {
+                'conclusion': conclusion,
+                'confidence': confidence,
+                'confidence_calculation': calculation,
+                'agreed_items': sum(1 for i in merged_items if i['support'] > 1),
+                'unique_items': sum(1 for i in merged_items if i['support'] == 1),
+            },
+            'merged_items': merged_items,
+            'merge_verification': {
+                'branches_complete': True,
+                'conclusions_compatible': {
+                    'FULL_AGREEMENT': True, 'PARTIAL_AGREEMENT': 'partial',
+                }.get(agreement_type, False),
+                'confidence_aggregation_valid': CONFIDENCE_FLOOR <= confidence <= CONFIDENCE_CEILING,
+                'requires_further_analysis': agreement_type != 'FULL_AGREEMENT',
+            },
+        }
+
+
+def next_merge_path(handovers_dir: Path, branches: List[Branch]) -> Tuple[str, Path]:
+    """Pick the next merge-{NNN}-{patterns}.json name in a handovers directory."""
+    sequence = len(list(handovers_dir.glob('merge-*.json'))) + 1
+    patterns = '-'.join(b.pattern.lower() for b in branches)
+    merge_id = f"merge-{sequence:03d}-{patterns}"
+    return merge_id, handovers_dir / f"{merge_id}.json"
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Merge parallel branch handovers into a parallel-merge-v1 record'
+    )
+    parser.add_argument('branches', nargs='+', help='Branch handover JSON files')
+    parser.add_argument('--session', help='Session directory; writes handovers/merge-NNN-*.json')
+    parser.add_argument('--output', help='Write the merge record to this path')
+    parser.add_argument(
+        '--similarity',
+        type=float,
+        default=TEXT_SIMILARITY,
+        help=f'Token-set similarity needed to match items by text (default: {TEXT_SIMILARITY})'
+    )
+    parser.add_argument(
+        '--assume-shared',
+        action='store_true',
+        help='Apply the shared assumption discount even without overlapping assumptions'
+    )
+
+    args = parser.parse_args()
+
+    branches = []
+    for path in args.branches:
+        try:
+            with open(path, 'r') as f:
+                branches.append(Branch(json.load(f), source=path))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error: cannot read {path}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    merger = BranchMerger(similarity=args.similarity, assume_shared=args.assume_shared)
+    output: Optional[Path] = Path(args.output) if args.output else None
+    merge_id = 'merge-001'
+    if args.session:
+        handovers_dir = Path(args.session) / 'handovers'
+        handovers_dir.mkdir(parents=True, exist_ok=True)
+        merge_id, session_path = next_merge_path(handovers_dir, branches)
+        output = output or session_path
+
+    try:
+        record = merger.merge(branches, merge_id=merge_id)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if output:
+        write_json_atomic(output, record)
+        result = record['merged_result']
+        print(f"✅ {record['agreement_analysis']['type']}: confidence {result['confidence']:.2f} "
+              f"({result['agreed_items']} agreed, {result['unique_items']} unique items) -> {output}")
+    else:
+        print(json.dumps(record, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Multi-pattern confidence aggregation (IR-v2 "Confidence Aggregation (Fixed)").
+
+One implementation of the agreement arithmetic used by syntheses and parallel
+merges, instead of repeating the numbers by hand in each handover:
+
+- FULL_AGREEMENT:    min(max(c) + 0.05, 0.95)
+- PARTIAL_AGREEMENT: avg(agreeing) × 0.7 + avg(disagreeing) × 0.15
+- NO_AGREEMENT:      min(c) - 0.10
+- Shared assumptions across patterns: -0.05
+- Floor 0.10, ceiling 0.95
+
+Conclusions are grouped into equivalence classes in a single pass. The
+largest class is the agreeing group. Tie rule: when the two largest classes
+are the same size there is no majority, and the result is NO_AGREEMENT (a
+2-vs-2 split is not a partial agreement). branch_merge.py goes through
+aggregate_conclusions(), so merges and re-scoring apply the same rule.
+
+`rescore_corpus()` re-scores every merge/synthesis record under a directory,
+optionally on a process pool. `regress` compares the recomputed values with a
+committed baseline so rule changes show up as diffs, and lists records whose
+recorded confidence disagrees with the rules.
+
+Usage:
+    python confidence_aggregation.py score "Kafka streaming:0.85" "Kafka streaming:0.78"
+    python confidence_aggregation.py rescore .reasoning/
+    python confidence_aggregation.py regress .reasoning/ --baseline aggregation-baseline.json
+    python confidence_aggregation.py regress .reasoning/ --baseline aggregation-baseline.json --update
+"""
+
+import argparse
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+FULL_AGREEMENT_BOOST = 0.05
+PARTIAL_AGREE_WEIGHT = 0.7
+PARTIAL_DISAGREE_WEIGHT = 0.15
+NO_AGREEMENT_PENALTY = 0.10
+SHARED_ASSUMPTION_DISCOUNT = 0.05
+CONFIDENCE_FLOOR = 0.10
+CONFIDENCE_CEILING = 0.95
+
+TOLERANCE = 0.005
+RECORD_GLOBS = ('merge-*.json', 'conclusion-*.json')
+KEY_STOPWORDS = {'a', 'an', 'and', 'the', 'of', 'for', 'to', 'with', 'is', 'are', 'best', 'this', 'use', 'case'}
+
+
+def as_probability(value: Any) -> Optional[float]:
+    """Accept 0-1 floats or 0-100 percentages."""
+    if value is None:
+        return None
+    value = float(value)
+    return value / 100.0 if value > 1.0 else value
+
+
+def bound(confidence: float) -> float:
+    """Apply the 10% floor and 95% ceiling."""
+    return round(min(max(confidence, CONFIDENCE_FLOOR), CONFIDENCE_CEILING), 4)
+
+
+def _avg(values: List[float]) -> float:
+    return sum(values) / len(values)
+
+
+def aggregate(agreeing: List[float], disagreeing: List[float]) -> Tuple[str, float, str]:
+    """
+    Apply the documented agreement arithmetic.
+
+    Args:
+        agreeing: Confidences of branches in the majority group; empty or a
+            single branch with others disagreeing means no majority
+        disagreeing: Confidences of all other branches
+
+    Returns:
+        Tuple of (agreement_type, unbounded confidence, calculation string)
+    """
+    if not disagreeing and len(agreeing) > 1:
+        value = max(agreeing) + FULL_AGREEMENT_BOOST
+        calc = f"max({', '.join(f'{c:.2f}' for c in agreeing)}) + {FULL_AGREEMENT_BOOST:.2f} = {value:.2f}"
+        return 'FULL_AGREEMENT', value, calc
+    if not disagreeing:
+        if not agreeing:
+            raise ValueError('No conclusions to aggregate')
+        return 'SINGLE_BRANCH', agreeing[0], f"{agreeing[0]:.2f} (single branch)"
+    if len(agreeing) > 1:
+        a, d = _avg(agreeing), _avg(disagreeing)
+        value = a * PARTIAL_AGREE_WEIGHT + d * PARTIAL_DISAGREE_WEIGHT
+        calc = (f"{a:.3f} × {PARTIAL_AGREE_WEIGHT} + {d:.3f} × {PARTIAL_DISAGREE_WEIGHT}"
+                f" = {value:.2f}")
+        return 'PARTIAL_AGREEMENT', value, calc
+    everything = agreeing + disagreeing
+    value = min(everything) - NO_AGREEMENT_PENALTY
+    calc = f"min({', '.join(f'{c:.2f}' for c in everything)}) - {NO_AGREEMENT_PENALTY:.2f} = {value:.2f}"
+    return 'NO_AGREEMENT', value, calc
+
+
+def conclusion_key(text: str) -> str:
+    """Default equivalence key: sorted content words, case and punctuation ignored."""
+    words = re.findall(r'[a-z0-9+#]+', str(text).lower())
+    content = {w for w in words if w not in KEY_STOPWORDS}
+    return ' '.join(sorted(content or words))
+
+
+def aggregate_conclusions(
+    conclusions: Iterable[Tuple[str, float]],
+    key: Callable[[str], str] = conclusion_key,
+    shared_assumptions: bool = False,
+) -> Dict[str, Any]:
+    """
+    Group conclusions into equivalence classes and apply the agreement rules.
+
+    Args:
+        conclusions: (conclusion, confidence) pairs; confidence as 0-1 or percent
+        key: Maps a conclusion to its equivalence class
+        shared_assumptions: Apply the -5% shared assumption discount
+
+    Returns:
+        Dict with agreement type, bounded confidence, calculation, classes and
+        `agreeing` (input positions of the majority class, empty without one)
+    """
+    # Single pass: per class [first_index, label, member positions, confidences]
+    classes: Dict[str, list] = {}
+    count = 0
+    for position, (label, raw) in enumerate(conclusions):
+        c = as_probability(raw)
+        k = key(label)
+        stats = classes.get(k)
+        if stats is None:
+            classes[k] = [len(classes), label, [position], [c]]
+        else:
+            stats[2].append(position)
+            stats[3].append(c)
+        count += 1
+    if not count:
+        raise ValueError('No conclusions to aggregate')
+
+    ranked = sorted(classes.items(), key=lambda kv: (-len(kv[1][3]), -max(kv[1][3]), kv[1][0]))
+    _, top = ranked[0]
+    tied = len(ranked) > 1 and len(ranked[1][1][3]) == len(top[3])
+    if tied:
+        agreeing: List[float] = []
+        members: List[int] = []
+    else:
+        agreeing, members = top[3], top[2]
+    disagreeing = [c for _, s in ranked if s is not top or tied for c in s[3]]
+    kind, raw, calc = aggregate(agreeing, disagreeing)
+
+    discount = SHARED_ASSUMPTION_DISCOUNT if shared_assumptions else 0.0
+    if discount:
+        calc += f" - {discount:.2f} (shared assumptions)"
+    return {
+        'agreement': kind,
+        'confidence': bound(raw - discount),
+        'unbounded': round(raw - discount, 4),
+        'calculation': calc,
+        'majority': top[1] if kind != 'NO_AGREEMENT' else None,
+        'agreeing': members if kind != 'NO_AGREEMENT' else [],
+        'classes': [
+            {'key': k, 'conclusion': s[1], 'count': len(s[3]), 'avg_confidence': round(_avg(s[3]), 4)}
+            for k, s in ranked
+        ],
+    }
+
+
+def record_conclusions(record: Dict[str, Any]) -> Optional[Tuple[List[Tuple[str, float]], Dict[str, Any]]]:
+    """
+    Extract (class key, confidence) pairs from a merge or synthesis record.
+
+    Merge records written by branch_merge.py list the agreeing branches, which
+    fixes the classes. Records produced by hand only state their agreement
+    type, which fixes the classes when it can (FULL: one class, NO: one class
+    per branch); otherwise conclusions are keyed by text.
+
+    Returns:
+        (pairs, context) or None when the record has no parallel conclusions
+        (e.g. a sequential synthesis chain)
+    """
+    branches = record.get('branches') or record.get('pattern_conclusions')
+    if not branches:
+        return None
+    analysis = record.get('agreement_analysis') or {}
+    stated = analysis.get('type')
+    agreeing = analysis.get('agreeing_branches')
+    ids = [branch.get('branch_id') for branch in branches]
+    if len(set(ids)) != len(ids):
+        agreeing = None  # membership by id is ambiguous
+    pairs = []
+    for i, branch in enumerate(branches):
+        label = branch.get('equivalence_class') or branch.get('conclusion') or branch.get('branch_id', str(i))
+        if 'equivalence_class' not in branch:
+            if isinstance(agreeing, list):
+                label = '__majority__' if branch.get('branch_id') in agreeing else f"__branch_{i}__"
+            elif stated == 'FULL_AGREEMENT':
+                label = '__all__'
+            elif stated == 'NO_AGREEMENT':
+                label = f"__branch_{i}__"
+        pairs.append((label, branch.get('confidence')))
+    merged = record.get('merged_result') or {}
+    recorded = merged.get('confidence', record.get('final_confidence'))
+    shared = bool(analysis.get('shared_assumptions') or analysis.get('shared_assumption_discount')
+                  or record.get('shared_assumptions'))
+    return pairs, {'stated': stated, 'recorded': as_probability(recorded), 'shared': shared}
+
+
+def _identity(label: str) -> str:
+    return label if label.startswith('__') else conclusion_key(label)
+
+
+def rescore_file(path: str) -> Dict[str, Any]:
+    """Re-score one record file."""
+    try:
+        with open(path) as f:
+            record = json.load(f)
+    except (OSError, ValueError) as e:
+        return {'path': path, 'status': 'unreadable', 'error': str(e)}
+    extracted = record_conclusions(record)
+    if extracted is None:
+        return _check_chain(path, record)
+    pairs, context = extracted
+    result = aggregate_conclusions(pairs, key=_identity, shared_assumptions=context['shared'])
+    recorded = context['recorded']
+    consistent = recorded is not None and abs(recorded - result['confidence']) <= TOLERANCE
+    return {
+        'path': path,
+        'status': 'scored',
+        'agreement': result['agreement'],
+        'confidence': result['confidence'],
+        'calculation': result['calculation'],
+        'stated_agreement': context['stated'],
+        'recorded_confidence': recorded,
+        'consistent': consistent and context['stated'] in (None, result['agreement']),
+    }
+
+
+def _check_chain(path: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Sequential synthesis: no agreement to aggregate, but discounts and bounds still apply."""
+    chain = record.get('confidence_chain')
+    final = as_probability(record.get('final_confidence'))
+    if not chain or final is None:
+        return {'path': path, 'status': 'skipped', 'reason': 'no parallel conclusions'}
+    applied = int(chain.get('shared_assumption_discounts_applied', 0))
+    expected_discount = round(-SHARED_ASSUMPTION_DISCOUNT * applied, 4)
+    recorded_discount = chain.get('total_discount')
+    in_bounds = CONFIDENCE_FLOOR <= final <= CONFIDENCE_CEILING
+    discount_ok = recorded_discount is None or abs(recorded_discount - expected_discount) <= TOLERANCE
+    return {
+        'path': path,
+        'status': 'chain',
+        'agreement': 'SEQUENTIAL_CHAIN',
+        'confidence': bound(final),
+        'calculation': f"{applied} shared assumption discount(s) = {expected_discount:+.2f}",
+        'stated_agreement': None,
+        'recorded_confidence': final,
+        'consistent': in_bounds and discount_ok,
+    }
+
+
+def find_records(root: str) -> List[str]:
+    """All merge/synthesis records under root, sorted for deterministic output."""
+    found = set()
+    for pattern in RECORD_GLOBS:
+        found.update(str(p) for p in Path(root).rglob(pattern))
+    return sorted(found)
+
+
+def rescore_corpus(paths: Sequence[str], workers: int = 1) -> List[Dict[str, Any]]:
+    """Re-score many records, on a process pool when workers > 1. Output order follows paths."""
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(rescore_file, paths, chunksize=max(1, len(paths) // (workers * 4))))
+    return [rescore_file(p) for p in paths]
+
+
+def _relative(path: str, root: str) -> str:
+    return str(Path(path).resolve().relative_to(Path(root).resolve()))
+
+
+def _baseline_entry(result: Dict[str, Any]) -> Dict[str, Any]:
+    if result['status'] not in ('scored', 'chain'):
+        return {'status': result['status']}
+    return {'status': result['status'], 'agreement': result['agreement'], 'confidence': result['confidence']}
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='IR-v2 multi-pattern confidence aggregation')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    score_parser = subparsers.add_parser('score', help="Aggregate 'conclusion:confidence' pairs")
+    score_parser.add_argument('conclusions', nargs='+', help="e.g. 'Use Kafka:0.85'")
+    score_parser.add_argument('--shared-assumptions', action='store_true', help='Apply the -5%% discount')
+
+    rescore_parser = subparsers.add_parser('rescore', help='Re-score every merge/synthesis record under a directory')
+    rescore_parser.add_argument('root', help='Corpus root (e.g. .reasoning/)')
+    rescore_parser.add_argument('--workers', type=int, default=1, help='Process pool size (default: 1)')
+    rescore_parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    regress_parser = subparsers.add_parser('regress', help='Compare re-scored records with a baseline')
+    regress_parser.add_argument('root', help='Corpus root (e.g. .reasoning/)')
+    regress_parser.add_argument('--baseline', required=True, help='Baseline JSON (paths relative to root)')
+    regress_parser.add_argument('--update', action='store_true', help='Write the baseline instead of checking')
+
+    args = parser.parse_args()
+
+    if args.command == 'score':
+        pairs = []
+        for item in args.conclusions:
+            label, _, value = item.rpartition(':')
+            if not label:
+                print(f"Error: expected 'conclusion:confidence', got {item!r}", file=sys.stderr)
+                sys.exit(1)
+            pairs.append((label, float(value)))
+        print(json.dumps(aggregate_conclusions(pairs, shared_assumptions=args.shared_assumptions), indent=2))
+        return
+
+    results = rescore_corpus(find_records(args.root), getattr(args, 'workers', 1))
+
+    if args.command == 'rescore':
+        if args.json:
+            print(json.dumps(results, indent=2))
+            return
+        print(f"{'Record':<70} {'Agreement':<18} {'Conf':>5} {'Recorded':>8}")
+        for r in results:
+            name = _relative(r['path'], args.root)
+            if r['status'] not in ('scored', 'chain'):
+                print(f"{name:<70} {r['status']}")
+                continue
+            recorded = f"{r['recorded_confidence']:.2f}" if r['recorded_confidence'] is not None else '-'
+            flag = '' if r['consistent'] else '  ← inconsistent'
+            print(f"{name:<70} {r['agreement']:<18} {r['confidence']:>5.2f} {recorded:>8}{flag}")
+        return
+
+    current = {_relative(r['path'], args.root): _baseline_entry(r) for r in results}
+    if args.update:
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Wrote {len(current)} records to {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        expected = json.load(f)
+    failures = []
+    for name in sorted(set(expected) | set(current)):
+        if expected.get(name) != current.get(name):
+            failures.append((name, expected.get(name), current.get(name)))
+    inconsistent = [r for r in results if r['status'] in ('scored', 'chain') and not r['consistent']]
+
+    for name, want, got in failures:
+        print(f"FAIL {name}: expected {want}, got {got}")
+    for r in inconsistent:
+        print(f"NOTE {_relative(r['path'], args.root)}: recorded {r['recorded_confidence']} "
+              f"({r['stated_agreement']}) vs rules {r['confidence']} ({r['agreement']})")
+    print(f"\n{len(current) - len(failures)}/{len(current)} records match the baseline, "
+          f"{len(inconsistent)} recorded confidences disagree with the rules")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
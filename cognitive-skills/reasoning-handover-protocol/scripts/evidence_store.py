@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Evidence repository for reasoning sessions (Part 5, Evidence Repository).
+
+`evidence/index.json` holds every item and must be rewritten in full whenever
+evidence is added. This store keeps the same information append-only instead:
+
+- Artifacts are written content-addressed to `evidence/objects/ab/<sha256>`,
+  hashed while streaming, so identical profiler dumps or load-test reports
+  are stored once. Re-adding the same artifact with the same type returns the
+  existing item and records the pattern as a user.
+- Each add/use is one JSON line appended to `evidence/index.log`.
+- Inverted indexes by type, pattern (gathering or using) and tag live in
+  memory as insertion-ordered dicts, so adding evidence and looking it up are
+  O(1) per item no matter how large the session grows.
+
+Appends take an exclusive lock on the log and first read any lines other
+processes appended, so parallel patterns get unique sequential IDs (E001,
+E002, ...). `export` writes the documented `index.json` layout on demand, for
+checkpoints and for tools that read the old format. An existing `index.json`
+is loaded first and the log is applied on top of it, so evidence indexed
+before the log existed is kept and new IDs continue after the highest one;
+the exported `log_offset` marks how much of the log it already contains.
+
+Usage:
+    python evidence_store.py add .reasoning/sessions/session-X --type metric \\
+        --source prometheus:container_memory --pattern HE --file mem.json \\
+        --summary "Memory stable at 2GB" --tag memory --tag oom
+    python evidence_store.py query .reasoning/sessions/session-X --type metric --pattern HE
+    python evidence_store.py show .reasoning/sessions/session-X E001
+    python evidence_store.py export .reasoning/sessions/session-X
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from handover_chain import MANIFEST_NAME, write_json_atomic
+
+MAX_FILE_SIZE_MB = 10
+LOG_NAME = 'index.log'
+INDEX_NAME = 'index.json'
+OBJECTS_DIR = 'objects'
+CHUNK_SIZE = 1 << 20
+
+
+class EvidenceTooLargeError(ValueError):
+    """Raised when an artifact exceeds max_evidence_file_size_mb."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class EvidenceStore:
+    """Content-addressed evidence repository with an append-only index log."""
+
+    def __init__(self, session_dir: str, max_file_size_mb: float = MAX_FILE_SIZE_MB):
+        """
+        Initialize store and load the index log.
+
+        Args:
+            session_dir: Session directory (evidence/ is created inside it)
+            max_file_size_mb: Per-artifact limit (evidence_settings)
+        """
+        self.session_dir = Path(session_dir)
+        self.root = self.session_dir / 'evidence'
+        self.objects = self.root / OBJECTS_DIR
+        self.log_path = self.root / LOG_NAME
+        self.max_bytes = int(max_file_size_mb * 1024 * 1024)
+
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.by_type: Dict[str, Dict[str, None]] = {}
+        self.by_pattern: Dict[str, Dict[str, None]] = {}
+        self.by_tag: Dict[str, Dict[str, None]] = {}
+        self.by_content: Dict[tuple, str] = {}
+        self._max_seq = 0
+        self._offset = 0
+        self._thread_lock = threading.Lock()
+        self._snapshot = self._load_snapshot()
+        self._refresh()
+
+    def _load_snapshot(self) -> Dict[str, Any]:
+        """Seed the store from an existing index.json (items indexed before the log)."""
+        try:
+            with open(self.root / INDEX_NAME) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return {}
+        for item in snapshot.get('evidence', []):
+            if item.get('id'):
+                self._apply({**item, 'op': 'add'})
+        # An index written by `export` already reflects the log up to log_offset
+        offset = snapshot.get('log_offset', 0)
+        try:
+            if offset <= self.log_path.stat().st_size:
+                self._offset = offset
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    def session_id(self) -> str:
+        """Session id from manifest.json, falling back to the exported index, then the directory name."""
+        try:
+            with open(self.session_dir / MANIFEST_NAME) as f:
+                session_id = json.load(f).get('session_id')
+        except (OSError, ValueError):
+            session_id = None
+        return session_id or self._snapshot.get('session_id') or self.session_dir.name
+
+    # -- index maintenance -------------------------------------------------
+
+    @staticmethod
+    def _post(index: Dict[str, Dict[str, None]], key: Optional[str], evidence_id: str) -> None:
+        if key:
+            index.setdefault(key, {})[evidence_id] = None
+
+    @staticmethod
+    def _unpost(index: Dict[str, Dict[str, None]], key: Optional[str], evidence_id: str) -> None:
+        if key in index:
+            index[key].pop(evidence_id, None)
+
+    def _unindex(self, evidence_id: str) -> None:
+        item = self.items[evidence_id]
+        self._unpost(self.by_type, item.get('type'), evidence_id)
+        for pattern in [item.get('gathered_by_pattern')] + item['used_by_patterns']:
+            self._unpost(self.by_pattern, pattern, evidence_id)
+        for tag in item.get('tags', []):
+            self._unpost(self.by_tag, tag, evidence_id)
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        op = entry.get('op')
+        evidence_id = entry.get('id')
+        if op == 'add':
+            if evidence_id in self.items:
+                self._unindex(evidence_id)  # the log's record supersedes the exported copy
+            item = {k: v for k, v in entry.items() if k != 'op'}
+            item['used_by_patterns'] = list(item.get('used_by_patterns', []))
+            self.items[evidence_id] = item
+            if str(evidence_id)[1:].isdigit():
+                self._max_seq = max(self._max_seq, int(evidence_id[1:]))
+            self._post(self.by_type, item.get('type'), evidence_id)
+            self._post(self.by_pattern, item.get('gathered_by_pattern'), evidence_id)
+            for pattern in item['used_by_patterns']:
+                self._post(self.by_pattern, pattern, evidence_id)
+            for tag in item.get('tags', []):
+                self._post(self.by_tag, tag, evidence_id)
+            if item.get('sha256'):
+                self.by_content.setdefault((item['sha256'], item.get('type')), evidence_id)
+        elif op == 'use' and evidence_id in self.items:
+            item = self.items[evidence_id]
+            if entry['pattern'] not in item['used_by_patterns']:
+                item['used_by_patterns'].append(entry['pattern'])
+            self._post(self.by_pattern, entry['pattern'], evidence_id)
+            for effect in entry.get('hypotheses_affected', []):
+                item.setdefault('hypotheses_affected', []).append(effect)
+            if entry.get('note'):
+                item.setdefault('notes', []).append({'pattern': entry['pattern'], 'note': entry['note']})
+
+    def _refresh(self) -> None:
+        """Apply log lines appended since the last read (by this or other processes)."""
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b'\n')
+        if end == -1:
+            return  # nothing complete yet (or only a torn line)
+        for line in data[:end].split(b'\n'):
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except ValueError:
+                continue  # torn line from a crashed writer
+        self._offset += end + 1
+
+    def _append(self, entries: List[Dict[str, Any]]) -> None:
+        with open(self.log_path, 'ab') as f:
+            if f.tell() > 0:
+                with open(self.log_path, 'rb') as r:
+                    r.seek(-1, os.SEEK_END)
+                    if r.read(1) != b'\n':
+                        f.write(b'\n')  # seal a torn line so ours parses
+            f.write(b''.join(json.dumps(e, separators=(',', ':')).encode() + b'\n' for e in entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+    @contextmanager
+    def _locked(self):
+        """Serialize writers across threads and processes, then catch up with the log."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock, open(self.root / '.index.lock', 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    # -- artifacts ---------------------------------------------------------
+
+    def _store_object(self, content: Optional[bytes] = None, path: Optional[str] = None) -> Dict[str, Any]:
+        """Hash while copying into a temp file, then move it to its content address."""
+        digest = hashlib.sha256()
+        size = 0
+        self.objects.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.objects), prefix='.incoming-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                source = open(path, 'rb') if path else None
+                try:
+                    chunks = iter(lambda: source.read(CHUNK_SIZE), b'') if source else [content]
+                    for chunk in chunks:
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise EvidenceTooLargeError(
+                                f"Evidence exceeds {self.max_bytes // (1024 * 1024)} MB limit")
+                        digest.update(chunk)
+                        out.write(chunk)
+                finally:
+                    if source:
+                        source.close()
+                out.flush()
+                os.fsync(out.fileno())
+            sha = digest.hexdigest()
+            target = self.objects / sha[:2] / sha
+            if target.exists():
+                os.unlink(tmp_path)
+            else:
+                target.parent.mkdir(exist_ok=True)
+                os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return {'sha256': sha, 'size_bytes': size, 'file_path': f"./{OBJECTS_DIR}/{sha[:2]}/{sha}"}
+
+    # -- public API --------------------------------------------------------
+
+    def add(
+        self,
+        evidence_type: str,
+        source: str,
+        pattern: str,
+        content: Optional[Any] = None,
+        path: Optional[str] = None,
+        summary: str = '',
+        tags: Iterable[str] = (),
+        hypotheses_affected: Iterable[str] = (),
+    ) -> Dict[str, Any]:
+        """
+        Register an evidence item, storing its artifact content-addressed.
+
+        Args:
+            evidence_type: metric, log_analysis, code_analysis, ...
+            source: Where it came from (e.g. 'prometheus:container_memory')
+            pattern: Pattern that gathered it
+            content: Artifact bytes/str (or None with `path`, or neither for
+                summary-only evidence)
+            path: Artifact file to copy in
+            summary: One-line finding
+            tags: Free-form tags for lookup
+            hypotheses_affected: e.g. ['H1:eliminated']
+
+        Returns:
+            The evidence item (an existing one if the same artifact and type
+            were already registered)
+        """
+        artifact = None
+        if path is not None or content is not None:
+            if isinstance(content, str):
+                content = content.encode()
+            artifact = self._store_object(content=content, path=path)
+
+        with self._locked():
+            if artifact:
+                existing = self.by_content.get((artifact['sha256'], evidence_type))
+                if existing:
+                    self._record_use(existing, pattern, hypotheses_affected)
+                    return self.items[existing]
+            entry = {
+                'op': 'add',
+                'id': f"E{self._max_seq + 1:03d}",
+                'type': evidence_type,
+                'source': source,
+                'gathered_at': _now(),
+                'gathered_by_pattern': pattern,
+                'summary': summary,
+                'tags': sorted(set(tags)),
+                'used_by_patterns': [pattern],
+                'hypotheses_affected': list(hypotheses_affected),
+            }
+            if path:
+                entry['original_name'] = os.path.basename(path)
+            if artifact:
+                entry.update(artifact)
+            self._append([entry])
+            self._refresh()
+            return self.items[entry['id']]
+
+    def _record_use(self, evidence_id: str, pattern: str, hypotheses_affected: Iterable[str] = (),
+                    note: str = '') -> None:
+        effects = list(hypotheses_affected)
+        item = self.items[evidence_id]
+        if pattern in item['used_by_patterns'] and not effects and not note:
+            return
+        entry = {'op': 'use', 'id': evidence_id, 'pattern': pattern, 'at': _now()}
+        if effects:
+            entry['hypotheses_affected'] = effects
+        if note:
+            entry['note'] = note
+        self._append([entry])
+        self._refresh()
+
+    def use(self, evidence_id: str, pattern: str, hypotheses_affected: Iterable[str] = (),
+            note: str = '') -> None:
+        """Record that a pattern used an item (what it did to hypotheses, and an optional note)."""
+        with self._locked():
+            if evidence_id not in self.items:
+                raise KeyError(f"no evidence item {evidence_id}")
+            self._record_use(evidence_id, pattern, hypotheses_affected, note)
+
+    def get(self, evidence_id: str) -> Dict[str, Any]:
+        self._refresh()
+        if evidence_id not in self.items:
+            raise KeyError(f"no evidence item {evidence_id}")
+        return self.items[evidence_id]
+
+    def artifact_path(self, evidence_id: str) -> Optional[Path]:
+        file_path = self.get(evidence_id).get('file_path')
+        return self.root / file_path if file_path else None
+
+    def query(self, evidence_type: Optional[str] = None, pattern: Optional[str] = None,
+              tag: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Items matching every given filter, in gathering order."""
+        self._refresh()
+        postings = [index.get(key, {}) for index, key in
+                    ((self.by_type, evidence_type), (self.by_pattern, pattern), (self.by_tag, tag))
+                    if key is not None]
+        if not postings:
+            return list(self.items.values())
+        postings.sort(key=len)
+        smallest, rest = postings[0], postings[1:]
+        return [self.items[i] for i in smallest if all(i in p for p in rest)]
+
+    def export_index(self) -> Dict[str, Any]:
+        """The Part 5.1 index.json document (other top-level fields of an existing index are kept)."""
+        self._refresh()
+        return {
+            **self._snapshot,
+            'session_id': self.session_id(),
+            'evidence_count': len(self.items),
+            'last_updated': _now(),
+            'evidence': list(self.items.values()),
+            'evidence_by_type': {t: list(ids) for t, ids in self.by_type.items()},
+            'evidence_by_pattern': {p: list(ids) for p, ids in self.by_pattern.items()},
+            'evidence_by_tag': {t: list(ids) for t, ids in self.by_tag.items()},
+            'log_offset': self._offset,
+        }
+
+    def write_index(self) -> Path:
+        path = self.root / INDEX_NAME
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(path, self.export_index())
+        return path
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Content-addressed evidence repository for reasoning sessions')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add_parser = subparsers.add_parser('add', help='Register an evidence item')
+    add_parser.add_argument('session', help='Session directory')
+    add_parser.add_argument('--type', required=True, help='Evidence type (metric, log_analysis, ...)')
+    add_parser.add_argument('--source', required=True, help="Source (e.g. 'prometheus:container_memory')")
+    add_parser.add_argument('--pattern', required=True, help='Gathering pattern (e.g. HE)')
+    add_parser.add_argument('--file', help='Artifact file to store')
+    add_parser.add_argument('--summary', default='', help='One-line finding')
+    add_parser.add_argument('--tag', action='append', default=[], help='Tag (repeatable)')
+    add_parser.add_argument('--affects', action='append', default=[], help="Hypothesis effect, e.g. 'H1:eliminated'")
+
+    use_parser = subparsers.add_parser('use', help='Record that a pattern used an item')
+    use_parser.add_argument('session', help='Session directory')
+    use_parser.add_argument('id', help='Evidence id (e.g. E003)')
+    use_parser.add_argument('--pattern', required=True, help='Using pattern')
+    use_parser.add_argument('--affects', action='append', default=[], help="Hypothesis effect, e.g. 'H3:strengthened'")
+    use_parser.add_argument('--note', default='', help='What the pattern concluded from it')
+
+    query_parser = subparsers.add_parser('query', help='Find items by type, pattern and tag')
+    query_parser.add_argument('session', help='Session directory')
+    query_parser.add_argument('--type', help='Evidence type')
+    query_parser.add_argument('--pattern', help='Gathering or using pattern')
+    query_parser.add_argument('--tag', help='Tag')
+
+    show_parser = subparsers.add_parser('show', help='Show one item')
+    show_parser.add_argument('session', help='Session directory')
+    show_parser.add_argument('id', help='Evidence id')
+
+    export_parser = subparsers.add_parser('export', help='Write evidence/index.json from the log')
+    export_parser.add_argument('session', help='Session directory')
+
+    args = parser.parse_args()
+    store = EvidenceStore(args.session)
+
+    try:
+        if args.command == 'add':
+            item = store.add(args.type, args.source, args.pattern, path=args.file, summary=args.summary,
+                             tags=args.tag, hypotheses_affected=args.affects)
+            print(f"✅ {item['id']} ({item['type']}) {item.get('file_path') or '(no artifact)'}")
+        elif args.command == 'use':
+            store.use(args.id, args.pattern, args.affects, note=args.note)
+            print(f"✅ {args.id} used by {args.pattern}")
+        elif args.command == 'query':
+            for item in store.query(args.type, args.pattern, args.tag):
+                print(f"{item['id']:<6} {item['type']:<16} {item['gathered_by_pattern']:<5} {item['summary']}")
+        elif args.command == 'show':
+            print(json.dumps(store.get(args.id), indent=2))
+        else:
+            print(f"✅ Wrote {store.write_index()} ({len(store.items)} items)")
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
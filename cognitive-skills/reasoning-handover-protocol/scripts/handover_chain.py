@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Handover chain engine for reasoning sessions.
+
+Enforces the Cycle Detection rules of the Reasoning Handover Protocol before a
+handover is written to manifest.json:
+
+1. Every (from_pattern, to_pattern) pair is tracked; a repeated pair is blocked
+2. A handover back into a pattern that already precedes the source pattern in
+   the chain is blocked (AR -> BoT -> ToT -> AR, BoT -> ToT -> BoT)
+3. Chains longer than the maximum handover length (default 5) are blocked
+
+Pairs, ancestors and chain depths are kept in in-memory sets and dicts, so each
+check is a constant-time lookup. Appends to `orchestration.pattern_history` take
+an exclusive lock on the session, re-index only entries written by other
+processes since the last load, and replace the manifest atomically. Parallel
+branches handing over into the same session at once are therefore serialized
+and validated against each other.
+
+Usage:
+    python handover_chain.py check .reasoning/sessions/session-X BoT ToT
+    python handover_chain.py append .reasoning/sessions/session-X BoT ToT \\
+        --handover-json handover.json
+    python handover_chain.py validate .reasoning/sessions/session-X
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+MAX_CHAIN_LENGTH = 5
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = '.manifest.lock'
+
+
+class HandoverBlockedError(Exception):
+    """Raised when a handover violates the protocol's cycle detection rules."""
+
+    def __init__(self, from_pattern: str, to_pattern: str, reason: str):
+        super().__init__(f"Handover {from_pattern} -> {to_pattern} blocked: {reason}")
+        self.from_pattern = from_pattern
+        self.to_pattern = to_pattern
+        self.reason = reason
+
+
+class CycleDetectedError(HandoverBlockedError):
+    """Handover repeats a pair or returns to a pattern already in the chain."""
+
+
+class ChainTooLongError(HandoverBlockedError):
+    """Handover would push the chain past the maximum length."""
+
+
+def _key(pattern: str) -> str:
+    """Normalize a pattern name so 'BoT', 'bot' and ' BOT ' compare equal."""
+    return pattern.strip().lower()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    """Write JSON to a temp file in the same directory and rename it over path."""
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class ChainIndex:
+    """
+    In-memory index of the handover graph recorded in pattern_history.
+
+    Each handover is an edge from_pattern -> to_pattern. The index keeps:
+    - pairs: set of edges, plus the history position that created each edge
+    - ancestors: for every pattern, the set of patterns that lead into it
+    - depth: longest handover chain ending at each pattern
+    - height: longest handover chain starting at each pattern
+
+    Parallel merges (AT -> ToT and BoT -> ToT) are allowed; only a handover
+    into a pattern's own ancestry is a cycle.
+    """
+
+    def __init__(self, max_chain_length: int = MAX_CHAIN_LENGTH):
+        self.max_chain_length = max_chain_length
+        self.pairs: Set[Tuple[str, str]] = set()
+        self.pair_index: Dict[Tuple[str, str], int] = {}
+        self.ancestors: Dict[str, Set[str]] = {}
+        self.children: Dict[str, Set[str]] = {}
+        self.parents: Dict[str, Set[str]] = {}
+        self.height: Dict[str, int] = {}
+        self.depth: Dict[str, int] = {}
+        self.indexed_entries = 0
+        self.handover_count = 0
+
+    def check(self, from_pattern: str, to_pattern: str) -> None:
+        """
+        Validate a proposed handover.
+
+        Raises:
+            CycleDetectedError: If the pair repeats or to_pattern is upstream
+            ChainTooLongError: If the resulting chain exceeds max_chain_length
+        """
+        src, dst = _key(from_pattern), _key(to_pattern)
+
+        if src == dst:
+            raise CycleDetectedError(from_pattern, to_pattern, "pattern cannot hand over to itself")
+        if (src, dst) in self.pairs:
+            raise CycleDetectedError(
+                from_pattern, to_pattern,
+                f"pair already recorded at pattern_history[{self.pair_index[(src, dst)]}]"
+            )
+        if dst in self.ancestors.get(src, ()):
+            raise CycleDetectedError(
+                from_pattern, to_pattern,
+                f"{to_pattern} already precedes {from_pattern} in the chain"
+            )
+
+        length = self.depth.get(src, 0) + 1 + self.height.get(dst, 0)
+        if length > self.max_chain_length:
+            raise ChainTooLongError(
+                from_pattern, to_pattern,
+                f"chain length {length} exceeds maximum {self.max_chain_length}; synthesize current state"
+            )
+
+    def add(self, from_pattern: str, to_pattern: str, position: int) -> None:
+        """Record an edge that has already been validated (or read from disk)."""
+        src, dst = _key(from_pattern), _key(to_pattern)
+        self.pairs.add((src, dst))
+        self.pair_index.setdefault((src, dst), position)
+        self.children.setdefault(src, set()).add(dst)
+        self.parents.setdefault(dst, set()).add(src)
+        self.handover_count += 1
+
+        # Push ancestry and depth downstream, and height upstream. Patterns
+        # already below dst (or above src) only exist when branches were
+        # recorded out of order, and the pattern set is small, so this stays
+        # cheap.
+        stack = [(src, dst)]
+        while stack:
+            parent, child = stack.pop()
+            inherited = self.ancestors.get(parent, set()) | {parent}
+            child_ancestors = self.ancestors.setdefault(child, set())
+            child_depth = self.depth.get(parent, 0) + 1
+            if inherited <= child_ancestors and child_depth <= self.depth.get(child, 0):
+                continue
+            child_ancestors |= inherited
+            self.depth[child] = max(self.depth.get(child, 0), child_depth)
+            stack.extend((child, grandchild) for grandchild in self.children.get(child, ()))
+
+        stack = [(dst, src)]
+        while stack:
+            child, parent = stack.pop()
+            parent_height = self.height.get(child, 0) + 1
+            if parent_height <= self.height.get(parent, 0):
+                continue
+            self.height[parent] = parent_height
+            stack.extend((parent, grandparent) for grandparent in self.parents.get(parent, ()))
+
+    def extend(self, history: List[Dict[str, Any]]) -> List[str]:
+        """
+        Index history entries not seen yet.
+
+        Returns:
+            List of violations found in the newly indexed entries (history
+            written by hand or by tools that did not use this engine)
+        """
+        violations = []
+        for position in range(self.indexed_entries, len(history)):
+            entry = history[position]
+            src, dst = entry.get('pattern'), entry.get('handover_to')
+            if src and dst:
+                try:
+                    self.check(src, dst)
+                except HandoverBlockedError as e:
+                    violations.append(f"pattern_history[{position}]: {e}")
+                self.add(src, dst, position)
+        self.indexed_entries = len(history)
+        return violations
+
+
+class HandoverChain:
+    """
+    Session-level handover orchestration backed by manifest.json.
+
+    Safe to share between threads, and between processes working on the same
+    session directory.
+    """
+
+    def __init__(self, session_dir: str, max_chain_length: int = MAX_CHAIN_LENGTH):
+        """
+        Initialize the chain for a session.
+
+        Args:
+            session_dir: Path to the session directory containing manifest.json
+            max_chain_length: Maximum number of handovers in any chain
+        """
+        self.session_dir = Path(session_dir)
+        self.manifest_path = self.session_dir / MANIFEST_NAME
+        self.lock_path = self.session_dir / LOCK_NAME
+        self.index = ChainIndex(max_chain_length)
+        self.manifest: Dict[str, Any] = {}
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._thread_lock = threading.Lock()
+
+        if not self.manifest_path.exists():
+            raise FileNotFoundError(f"Manifest not found: {self.manifest_path}")
+        self._refresh()
+
+    def _refresh(self) -> List[str]:
+        """Reload the manifest if another writer changed it since our last read."""
+        st = os.stat(self.manifest_path)
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return []
+
+        with open(self.manifest_path, 'r') as f:
+            self.manifest = json.load(f)
+        self._stamp = stamp
+
+        history = self._history()
+        if len(history) < self.index.indexed_entries:
+            # History was rewritten rather than appended to; rebuild.
+            self.index = ChainIndex(self.index.max_chain_length)
+        return self.index.extend(history)
+
+    def _history(self) -> List[Dict[str, Any]]:
+        orchestration = self.manifest.setdefault('orchestration', {})
+        return orchestration.setdefault('pattern_history', [])
+
+    def check(self, from_pattern: str, to_pattern: str) -> Tuple[bool, str]:
+        """
+        Check a handover without writing anything.
+
+        Returns:
+            Tuple of (allowed, reason)
+        """
+        with self._thread_lock:
+            self._refresh()
+            try:
+                self.index.check(from_pattern, to_pattern)
+            except HandoverBlockedError as e:
+                return False, e.reason
+            return True, "ok"
+
+    def validate(self) -> List[str]:
+        """
+        Re-check the whole recorded history.
+
+        Returns:
+            List of violations (empty if the history obeys the protocol)
+        """
+        with self._thread_lock:
+            self._stamp = None
+            self.index = ChainIndex(self.index.max_chain_length)
+            return self._refresh()
+
+    def append(
+        self,
+        from_pattern: str,
+        to_pattern: str,
+        handover: Optional[Dict[str, Any]] = None,
+        started: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Validate and record a handover.
+
+        The check runs against the latest on-disk history under an exclusive
+        lock, so concurrent branches cannot both slip past the same rule.
+
+        Args:
+            from_pattern: Pattern handing over (e.g. "BoT")
+            to_pattern: Pattern receiving the handover (e.g. "ToT")
+            handover: Optional handover document; written to
+                handovers/{sequence}-{from}-to-{to}.json
+            started: When from_pattern started (ISO 8601)
+
+        Returns:
+            The pattern_history entry that was appended
+
+        Raises:
+            CycleDetectedError, ChainTooLongError: If the handover is blocked
+        """
+        with self._thread_lock, open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                self.index.check(from_pattern, to_pattern)
+
+                timestamp = _now()
+                entry: Dict[str, Any] = {
+                    'pattern': from_pattern,
+                    'started': started,
+                    'completed': timestamp,
+                    'handover_to': to_pattern,
+                    'handover_file': None,
+                }
+
+                if handover is not None:
+                    sequence = self.index.handover_count + 1
+                    name = f"{sequence:03d}-{_key(from_pattern)}-to-{_key(to_pattern)}.json"
+                    handovers_dir = self.session_dir / 'handovers'
+                    handovers_dir.mkdir(exist_ok=True)
+                    handover.setdefault('handover_id', name[:-len('.json')])
+                    handover.setdefault('timestamp', timestamp)
+                    write_json_atomic(handovers_dir / name, handover)
+                    entry['handover_file'] = f"./handovers/{name}"
+
+                history = self._history()
+                history.append(entry)
+                orchestration = self.manifest['orchestration']
+                orchestration['current_pattern'] = to_pattern
+                self.manifest['last_updated'] = timestamp
+                write_json_atomic(self.manifest_path, self.manifest)
+
+                self.index.add(from_pattern, to_pattern, len(history) - 1)
+                self.index.indexed_entries = len(history)
+                st = os.stat(self.manifest_path)
+                self._stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+                return entry
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Enforce handover cycle detection and chain length for a reasoning session'
+    )
+    parser.add_argument('command', choices=['check', 'append', 'validate'])
+    parser.add_argument('session_dir', help='Session directory containing manifest.json')
+    parser.add_argument('from_pattern', nargs='?', help='Pattern handing over')
+    parser.add_argument('to_pattern', nargs='?', help='Pattern receiving the handover')
+    parser.add_argument('--handover-json', help='Handover document to write into handovers/')
+    parser.add_argument('--started', help='ISO 8601 start time of the source pattern')
+    parser.add_argument(
+        '--max-chain-length',
+        type=int,
+        default=MAX_CHAIN_LENGTH,
+        help=f'Maximum handovers per chain (default: {MAX_CHAIN_LENGTH})'
+    )
+
+    args = parser.parse_args()
+
+    try:
+        chain = HandoverChain(args.session_dir, max_chain_length=args.max_chain_length)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'validate':
+        violations = chain.validate()
+        if violations:
+            print("❌ Handover history violates cycle detection rules:\n")
+            for violation in violations:
+                print(f"  {violation}")
+            sys.exit(1)
+        print(f"✅ {chain.index.handover_count} handovers, no cycles or over-long chains")
+        sys.exit(0)
+
+    if not args.from_pattern or not args.to_pattern:
+        parser.error(f"{args.command} requires from_pattern and to_pattern")
+
+    if args.command == 'check':
+        allowed, reason = chain.check(args.from_pattern, args.to_pattern)
+        print(f"{'✅ Allowed' if allowed else '❌ Blocked'}: {args.from_pattern} -> {args.to_pattern} ({reason})")
+        sys.exit(0 if allowed else 1)
+
+    handover = None
+    if args.handover_json:
+        with open(args.handover_json, 'r') as f:
+            handover = json.load(f)
+
+    try:
+        entry = chain.append(args.from_pattern, args.to_pattern, handover=handover, started=args.started)
+    except HandoverBlockedError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(entry, indent=2))
+
+
+if __name__ == '__main__':
+    main()
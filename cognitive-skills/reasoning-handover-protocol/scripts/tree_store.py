@@ -0,0 +1,828 @@
+#!/usr/bin/env python3
+"""
+Columnar, memory-mappable store for ToT/BoT pattern-state trees (Part 4).
+
+`pattern-state/tot/state.json` and `pattern-state/bot/state.json` hold the
+exploration tree as nested JSON. The whole file has to be parsed to resume,
+and every new level means rewriting all of it. This store keeps the same
+document in a binary file instead:
+
+- Node lists are found by shape: any list whose items are all objects with a
+  string "id" (ToT `levels[].branches`, BoT `level_N.approaches`, HE
+  hypotheses). Everything else in the document is kept as a skeleton with a
+  placeholder per node list.
+- Nodes are kept in columns: parent index, depth, confidence, status,
+  id, name, node list and position within it. Strings are interned in a
+  shared string table. Each node's full JSON object is kept as a payload,
+  so export is lossless.
+- Parents come from an explicit "parent"/"parent_id" field, or else from
+  the dotted id ("branch-2.3" -> "branch-2").
+- The file is a header followed by segments. sync() appends one segment with
+  the new and changed nodes and the current skeleton. A changed node gets a
+  new record that supersedes the old one, and a removed node gets a
+  tombstone. Nothing already written is modified, and a torn segment from an
+  interrupted write is ignored and truncated by the next sync.
+- Readers mmap the file and cast each column to a typed memoryview, so
+  opening costs one header read per segment. Each segment carries its nodes
+  sorted by parent and by id hash, so children(), subtree() and find() are
+  binary searches. Nothing is parsed except the nodes that are asked for.
+
+Columns are written in native byte order with the array module. The file is
+meant to be read on the machine type that wrote it, like the session
+directory itself.
+
+Usage:
+    python tree_store.py import pattern-state/bot/state.json
+    python tree_store.py sync   pattern-state/bot/state.json
+    python tree_store.py subtree pattern-state/bot/state.tree approach-2 --depth 1
+    python tree_store.py export pattern-state/bot/state.tree -o state.json
+    python tree_store.py bench --branching 8 --depth 5 --grow 50
+"""
+
+import argparse
+import bisect
+import fcntl
+import hashlib
+import json
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from handover_chain import write_json_atomic
+
+MAGIC = b'RHTREE01'
+SEGMENT_MAGIC = b'TSEG'
+# magic, nodes, first node, strings, first string, replacements,
+# strings bytes, payload bytes, skeleton bytes, total segment bytes
+SEGMENT_HEADER = struct.Struct('<4sIIIIIQQQQ')
+ALIGN = 8
+PLACEHOLDER = '$nodes'
+TREE_SUFFIX = '.tree'
+
+# name, array typecode; one value per node
+NODE_COLUMNS = (
+    ('parent', 'i'),
+    ('depth', 'H'),
+    ('confidence', 'f'),
+    ('status', 'I'),
+    ('ident', 'I'),
+    ('name', 'I'),
+    ('slot', 'I'),
+    ('position', 'I'),
+)
+
+
+def _pad(length: int) -> int:
+    return -length % ALIGN
+
+
+def _key_hash(ident: str) -> int:
+    return int.from_bytes(hashlib.blake2b(ident.encode(), digest_size=8).digest(), 'little') >> 1
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def _node_confidence(node: Dict[str, Any]) -> float:
+    value = node.get('confidence')
+    if value is None and isinstance(node.get('self_reflection'), dict):
+        value = node['self_reflection'].get('confidence')
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+
+def _node_name(node: Dict[str, Any]) -> str:
+    for key in ('name', 'statement', 'description'):
+        if isinstance(node.get(key), str):
+            return node[key]
+    return ''
+
+
+def _parent_id(node: Dict[str, Any]) -> Optional[str]:
+    for key in ('parent', 'parent_id'):
+        if isinstance(node.get(key), str):
+            return node[key]
+    ident = node['id']
+    return ident.rsplit('.', 1)[0] if '.' in ident else None
+
+
+def split_document(document: Any, prefix: str = '') -> Tuple[Any, List[Tuple[str, int, Dict[str, Any]]]]:
+    """
+    Separate node lists from the rest of a state document (or of the part at prefix).
+
+    Returns:
+        (skeleton with {"$nodes": path} placeholders, [(path, position, node), ...])
+    """
+    nodes: List[Tuple[str, int, Dict[str, Any]]] = []
+
+    def walk(value: Any, path: str) -> Any:
+        if isinstance(value, dict):
+            return {k: walk(v, f"{path}/{k}" if path else k) for k, v in value.items()}
+        if isinstance(value, list):
+            if value and all(isinstance(x, dict) and isinstance(x.get('id'), str) for x in value):
+                nodes.extend((path, i, x) for i, x in enumerate(value))
+                return {PLACEHOLDER: path}
+            return [walk(v, f"{path}/{i}") for i, v in enumerate(value)]
+        return value
+
+    return walk(document, prefix), nodes
+
+
+class _Segment:
+    """Typed memoryviews over one segment of the mapped file."""
+
+    def __init__(self, view: memoryview, offset: int, end: int):
+        (magic, self.count, self.first_node, self.string_count, self.first_string, replacements,
+         strings_len, payload_len, skeleton_len, total) = SEGMENT_HEADER.unpack_from(view, offset)
+        if magic != SEGMENT_MAGIC or offset + total > end:
+            raise ValueError('torn or invalid segment')
+        self.end = offset + total
+        cursor = offset + SEGMENT_HEADER.size
+        self.views: List[memoryview] = []
+
+        def take(typecode: str, count: int) -> memoryview:
+            nonlocal cursor
+            size = array(typecode).itemsize * count
+            raw = view[cursor:cursor + size]
+            cursor += size + _pad(size)
+            cast = raw.cast('B').cast(typecode)
+            self.views.extend((raw, cast))
+            return cast
+
+        def take_bytes(size: int) -> memoryview:
+            nonlocal cursor
+            raw = view[cursor:cursor + size]
+            cursor += size + _pad(size)
+            self.views.append(raw)
+            return raw
+
+        n = self.count
+        self.columns = {name: take(code, n) for name, code in NODE_COLUMNS}
+        self.payload_offsets = take('Q', n + 1)
+        self.child_parents = take('i', n)
+        self.child_nodes = take('i', n)
+        self.key_hashes = take('q', n)
+        self.key_nodes = take('i', n)
+        self.string_offsets = take('Q', self.string_count + 1)
+        self.replacements = take('i', 2 * replacements)
+        self.strings = take_bytes(strings_len)
+        self.payload = take_bytes(payload_len)
+        self.skeleton = take_bytes(skeleton_len)
+
+    def release(self) -> None:
+        for v in reversed(self.views):
+            v.release()
+        self.views = []
+
+
+class TreeStore:
+    """Read access to a tree file, plus append-only sync from a state document."""
+
+    def __init__(self, path: str):
+        """
+        Open (or prepare to create) a tree file.
+
+        Args:
+            path: Tree file; it is created on the first sync()
+        """
+        self.path = Path(path)
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self.segments: List[_Segment] = []
+        self.valid_end = len(MAGIC)
+        self._open()
+
+    def _open(self) -> None:
+        self.close()
+        self.segments, self.superseded, self.versions = [], set(), {}
+        self.node_count = self.string_count = 0
+        self.valid_end = len(MAGIC)
+        if not self.path.exists() or self.path.stat().st_size <= len(MAGIC):
+            return
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        if bytes(self._view[:len(MAGIC)]) != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a tree store")
+        offset, end = len(MAGIC), len(self._map)
+        while offset + SEGMENT_HEADER.size <= end:
+            try:
+                segment = _Segment(self._view, offset, end)
+            except ValueError:
+                break
+            self.segments.append(segment)
+            offset = self.valid_end = segment.end
+        self._first_nodes = [s.first_node for s in self.segments]
+        self._first_strings = [s.first_string for s in self.segments]
+        if self.segments:
+            last = self.segments[-1]
+            self.node_count = last.first_node + last.count
+            self.string_count = last.first_string + last.string_count
+        for segment in self.segments:
+            pairs = segment.replacements
+            for k in range(0, len(pairs), 2):
+                new, old = pairs[k], pairs[k + 1]
+                self.superseded.add(old)
+                if new >= 0:
+                    self.versions[new] = [old] + self.versions.pop(old, [])
+
+    def close(self) -> None:
+        """Release the mapping."""
+        for segment in self.segments:
+            segment.release()
+        self.segments = []
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'TreeStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ----------------------------------------------------------------- reading
+
+    def _locate(self, index: int) -> Tuple[_Segment, int]:
+        if not 0 <= index < self.node_count:
+            raise IndexError(index)
+        segment = self.segments[bisect.bisect_right(self._first_nodes, index) - 1]
+        return segment, index - segment.first_node
+
+    def string(self, index: int) -> str:
+        """Interned string by index."""
+        segment = self.segments[bisect.bisect_right(self._first_strings, index) - 1]
+        local = index - segment.first_string
+        start, stop = segment.string_offsets[local], segment.string_offsets[local + 1]
+        return bytes(segment.strings[start:stop]).decode()
+
+    def column(self, index: int, name: str) -> Any:
+        """One column value of a node record."""
+        segment, local = self._locate(index)
+        return segment.columns[name][local]
+
+    def node(self, index: int) -> Dict[str, Any]:
+        """Column values of a node record, strings resolved."""
+        segment, local = self._locate(index)
+        c = segment.columns
+        confidence = c['confidence'][local]
+        return {
+            'index': index,
+            'id': self.string(c['ident'][local]),
+            'name': self.string(c['name'][local]),
+            'parent': c['parent'][local],
+            'depth': c['depth'][local],
+            'confidence': None if math.isnan(confidence) else round(confidence, 4),
+            'status': self.string(c['status'][local]),
+            'live': index not in self.superseded,
+        }
+
+    def payload(self, index: int) -> Dict[str, Any]:
+        """Full JSON object of a node record."""
+        segment, local = self._locate(index)
+        start, stop = segment.payload_offsets[local], segment.payload_offsets[local + 1]
+        return json.loads(bytes(segment.payload[start:stop]))
+
+    def live(self) -> Iterator[int]:
+        """Indexes of current node records in file order."""
+        return (i for i in range(self.node_count) if i not in self.superseded)
+
+    def find(self, ident: str) -> Optional[int]:
+        """Current record of a node id, newest segment first."""
+        target = _key_hash(ident)
+        for segment in reversed(self.segments):
+            hashes = segment.key_hashes
+            k = bisect.bisect_left(hashes, target)
+            while k < len(hashes) and hashes[k] == target:
+                index = segment.first_node + segment.key_nodes[k]
+                local = index - segment.first_node
+                if index not in self.superseded and self.string(segment.columns['ident'][local]) == ident:
+                    return index
+                k += 1
+        return None
+
+    def children(self, index: int) -> List[int]:
+        """Current child records of a node, including children of its earlier versions."""
+        found: List[int] = []
+        for version in [index] + self.versions.get(index, []):
+            for segment in self.segments:
+                parents = segment.child_parents
+                k = bisect.bisect_left(parents, version)
+                while k < len(parents) and parents[k] == version:
+                    child = segment.first_node + segment.child_nodes[k]
+                    if child not in self.superseded:
+                        found.append(child)
+                    k += 1
+        return sorted(found)
+
+    def subtree(self, index: int, max_depth: Optional[int] = None) -> List[Tuple[int, int]]:
+        """(record, depth below index) pairs in preorder."""
+        result: List[Tuple[int, int]] = []
+        stack = [(index, 0)]
+        while stack:
+            node, level = stack.pop()
+            result.append((node, level))
+            if max_depth is None or level < max_depth:
+                stack.extend((child, level + 1) for child in reversed(self.children(node)))
+        return result
+
+    def roots(self) -> List[int]:
+        """Current records without a current parent."""
+        result = []
+        for i in self.live():
+            parent = self.column(i, 'parent')
+            if parent < 0 or (parent in self.superseded and not self._successor(parent)):
+                result.append(i)
+        return result
+
+    def _successor(self, index: int) -> Optional[int]:
+        for new, older in self.versions.items():
+            if index in older:
+                return new
+        return None
+
+    def skeleton(self) -> Any:
+        """Document skeleton from the newest segment."""
+        if not self.segments:
+            return None
+        return json.loads(bytes(self.segments[-1].skeleton))
+
+    def export(self) -> Any:
+        """Rebuild the state document."""
+        slots: Dict[str, List[Tuple[int, int]]] = {}
+        for i in self.live():
+            segment, local = self._locate(i)
+            c = segment.columns
+            slots.setdefault(self.string(c['slot'][local]), []).append((c['position'][local], i))
+
+        def fill(value: Any) -> Any:
+            if isinstance(value, dict):
+                if len(value) == 1 and isinstance(value.get(PLACEHOLDER), str):
+                    return [self.payload(i) for _, i in sorted(slots.get(value[PLACEHOLDER], []))]
+                return {k: fill(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [fill(v) for v in value]
+            return value
+
+        return fill(self.skeleton())
+
+    def stats(self) -> Dict[str, Any]:
+        """Node counts by depth and status, from the columns only."""
+        by_depth: Dict[int, int] = {}
+        by_status: Dict[str, int] = {}
+        statuses: Dict[int, str] = {}
+        for segment in self.segments:
+            depth, status = segment.columns['depth'], segment.columns['status']
+            for local in range(segment.count):
+                if segment.first_node + local in self.superseded:
+                    continue
+                by_depth[depth[local]] = by_depth.get(depth[local], 0) + 1
+                name = statuses.setdefault(status[local], self.string(status[local]))
+                by_status[name] = by_status.get(name, 0) + 1
+        return {
+            'records': self.node_count,
+            'live': sum(by_depth.values()),
+            'segments': len(self.segments),
+            'strings': self.string_count,
+            'bytes': self.path.stat().st_size if self.path.exists() else 0,
+            'by_depth': dict(sorted(by_depth.items())),
+            'by_status': by_status,
+        }
+
+    # ----------------------------------------------------------------- writing
+
+    def sync(self, value: Any, path: str = '') -> Dict[str, int]:
+        """
+        Append the difference between the store and a state document.
+
+        Unchanged nodes cost nothing. New nodes are appended, changed nodes are
+        appended as superseding records, and nodes missing from the document
+        get tombstones.
+
+        Args:
+            value: Whole state document, or the part at path
+            path: Slash-separated location of value (e.g. "exploration/level_3").
+                  Only nodes under it are compared, encoded and written, and
+                  nodes elsewhere are never removed. Finding the live nodes
+                  under it still scans the slot column of every segment, so
+                  that step is linear in the stored node count (an integer
+                  pass; only matching ids are decoded).
+
+        Returns:
+            Counts of added, changed, removed and unchanged nodes
+        """
+        prefix = path.strip('/')
+        part, records = split_document(value, prefix)
+        return self._locked(lambda: self._sync_locked(prefix, part, records))
+
+    def update(self, nodes: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Replace stored node objects by id, keeping their place in the document."""
+        return self._locked(lambda: self._update_locked(nodes))
+
+    def _locked(self, action: Callable[[], Dict[str, int]]) -> Dict[str, int]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'ab') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._open()
+            counts = action()
+            self._open()
+        return counts
+
+    def _live_keys(self, prefix: str) -> Dict[Tuple[str, str], int]:
+        """(node list, id) -> record for current nodes under prefix."""
+        slots: Dict[int, str] = {}
+        keys: Dict[Tuple[str, str], int] = {}
+        for segment in self.segments:
+            slot_column, ident_column = segment.columns['slot'], segment.columns['ident']
+            for local in range(segment.count):
+                index = segment.first_node + local
+                if index in self.superseded:
+                    continue
+                slot = slots.get(slot_column[local])
+                if slot is None:
+                    slot = slots[slot_column[local]] = self.string(slot_column[local])
+                if not prefix or slot == prefix or slot.startswith(prefix + '/'):
+                    keys[(slot, self.string(ident_column[local]))] = index
+        return keys
+
+    def _sync_locked(self, prefix: str, part: Any, records: List[Tuple[str, int, Dict[str, Any]]]) -> Dict[str, int]:
+        skeleton = _set_path(self.skeleton() or {}, prefix, part) if prefix else part
+        existing = self._live_keys(prefix)
+        base = self.node_count
+        pending: List[Tuple[str, int, Dict[str, Any], bytes]] = []
+        replacements: List[Tuple[int, int]] = []
+        seen = set()
+        counts = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+        for slot, position, node in records:
+            key = (slot, node['id'])
+            if key in seen:
+                raise ValueError(f"duplicate node id {node['id']!r} in {slot}")
+            seen.add(key)
+            encoded = _encode(node)
+            old = existing.get(key)
+            if old is not None:
+                segment, local = self._locate(old)
+                start, stop = segment.payload_offsets[local], segment.payload_offsets[local + 1]
+                if segment.columns['position'][local] == position and bytes(segment.payload[start:stop]) == encoded:
+                    counts['unchanged'] += 1
+                    continue
+                replacements.append((base + len(pending), old))
+                counts['changed'] += 1
+            else:
+                counts['added'] += 1
+            pending.append((slot, position, node, encoded))
+        for key, old in existing.items():
+            if key not in seen:
+                replacements.append((-1, old))
+                counts['removed'] += 1
+
+        skeleton_bytes = _encode(skeleton)
+        if not pending and not replacements and self.segments and bytes(self.segments[-1].skeleton) == skeleton_bytes:
+            return counts
+        self._write_segment(skeleton_bytes, pending, replacements)
+        return counts
+
+    def _update_locked(self, nodes: List[Dict[str, Any]]) -> Dict[str, int]:
+        if not self.segments:
+            raise ValueError(f"{self.path} is empty; import a state document first")
+        pending: List[Tuple[str, int, Dict[str, Any], bytes]] = []
+        replacements: List[Tuple[int, int]] = []
+        for node in nodes:
+            old = self.find(node['id'])
+            if old is None:
+                raise KeyError(f"no node {node['id']!r}")
+            replacements.append((self.node_count + len(pending), old))
+            pending.append((self.string(self.column(old, 'slot')), self.column(old, 'position'), node, _encode(node)))
+        self._write_segment(bytes(self.segments[-1].skeleton), pending, replacements)
+        return {'added': 0, 'changed': len(pending), 'removed': 0, 'unchanged': 0}
+
+    def _write_segment(self, skeleton_bytes: bytes, pending: List[Tuple[str, int, Dict[str, Any], bytes]],
+                       replacements: List[Tuple[int, int]]) -> None:
+        """Append one segment; parents resolve to records in it first, then to stored ones."""
+        base = self.node_count
+        new_ids = {node['id']: base + k for k, (_, _, node, _) in enumerate(pending)}
+        parents: List[int] = []
+        for k, (_, _, node, _) in enumerate(pending):
+            parent_ident = _parent_id(node)
+            parent = -1
+            if parent_ident:
+                parent = new_ids.get(parent_ident, -1)
+                if parent < 0:
+                    found = self.find(parent_ident)
+                    parent = found if found is not None else -1
+            parents.append(-1 if parent == base + k else parent)
+
+        depths: Dict[int, int] = {}
+
+        def depth_of(k: int) -> int:
+            if k not in depths:
+                depths[k] = 0  # provisional, so a parent cycle ends here
+                parent = parents[k]
+                if 0 <= parent < base:
+                    depths[k] = self.column(parent, 'depth') + 1
+                elif parent >= base:
+                    depths[k] = depth_of(parent - base) + 1
+            return depths[k]
+
+        strings: Dict[str, int] = {}
+        string_blob = bytearray()
+        string_offsets = array('Q', [0])
+
+        def intern(value: str) -> int:
+            if value not in strings:
+                strings[value] = self.string_count + len(strings)
+                string_blob.extend(value.encode())
+                string_offsets.append(len(string_blob))
+            return strings[value]
+
+        columns = {name: array(code) for name, code in NODE_COLUMNS}
+        payload_offsets = array('Q', [0])
+        payload = bytearray()
+        for k, (slot, position, node, encoded) in enumerate(pending):
+            columns['parent'].append(parents[k])
+            columns['depth'].append(min(depth_of(k), 0xFFFF))
+            columns['confidence'].append(_node_confidence(node))
+            columns['status'].append(intern(str(node.get('status', ''))))
+            columns['ident'].append(intern(node['id']))
+            columns['name'].append(intern(_node_name(node)))
+            columns['slot'].append(intern(slot))
+            columns['position'].append(position)
+            payload += encoded
+            payload_offsets.append(len(payload))
+
+        by_parent = sorted(range(len(pending)), key=lambda k: (parents[k], k))
+        hashes = [_key_hash(node['id']) for _, _, node, _ in pending]
+        by_hash = sorted(range(len(pending)), key=hashes.__getitem__)
+        sections: List[bytes] = [columns[name].tobytes() for name, _ in NODE_COLUMNS]
+        sections += [
+            payload_offsets.tobytes(),
+            array('i', [parents[k] for k in by_parent]).tobytes(),
+            array('i', by_parent).tobytes(),
+            array('q', [hashes[k] for k in by_hash]).tobytes(),
+            array('i', by_hash).tobytes(),
+            string_offsets.tobytes(),
+            array('i', [x for pair in replacements for x in pair]).tobytes(),
+            bytes(string_blob),
+            bytes(payload),
+            skeleton_bytes,
+        ]
+        body = b''.join(s + b'\0' * _pad(len(s)) for s in sections)
+        header = SEGMENT_HEADER.pack(SEGMENT_MAGIC, len(pending), base, len(strings), self.string_count,
+                                     len(replacements), len(string_blob), len(payload), len(skeleton_bytes),
+                                     SEGMENT_HEADER.size + len(body))
+
+        valid_end = self.valid_end
+        self.close()
+        with open(self.path, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size < len(MAGIC):
+                f.seek(0)
+                f.truncate()
+                f.write(MAGIC)
+            elif size > valid_end:
+                f.truncate(valid_end)
+            f.seek(0, os.SEEK_END)
+            f.write(header)
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _set_path(skeleton: Any, path: str, value: Any) -> Any:
+    """Put value at a slash-separated path of the skeleton, creating objects on the way."""
+    keys = path.split('/')
+    node = skeleton
+    for key in keys[:-1]:
+        if isinstance(node, dict) and PLACEHOLDER in node:
+            raise ValueError(f"{path} points inside a node list; use update() for single nodes")
+        node = node[int(key)] if isinstance(node, list) else node.setdefault(key, {})
+    if isinstance(node, list):
+        node[int(keys[-1])] = value
+    elif isinstance(node, dict) and PLACEHOLDER not in node:
+        node[keys[-1]] = value
+    else:
+        raise ValueError(f"cannot set {path}")
+    return skeleton
+
+
+def default_tree_path(state_path: str) -> Path:
+    """state.json -> state.tree next to it."""
+    return Path(state_path).with_suffix(TREE_SUFFIX)
+
+
+def synthetic_state(branching: int, depth: int, seed: int = 0) -> Dict[str, Any]:
+    """BoT-style state document with branching^1 + ... + branching^(depth+1) approaches."""
+    rng = random.Random(seed)
+    statuses = ('retained', 'pruned', 'explored', 'selected')
+    levels: Dict[str, Any] = {}
+    parents = ['']
+    for level in range(depth + 1):
+        approaches = []
+        for parent in parents:
+            for k in range(1, branching + 1):
+                ident = f"{parent}.{k}" if parent else f"approach-{k}"
+                approaches.append({
+                    'id': ident,
+                    'name': f"Approach {ident.split('-', 1)[1]}",
+                    'overview': 'Synthetic approach ' + ' '.join(rng.choice('abcdefgh') * 4 for _ in range(6)),
+                    'strengths': ['Mature tooling', 'Low cost'][:rng.randint(0, 2)],
+                    'weaknesses': ['High latency'],
+                    'feasibility': {'technical': 'High', 'operational': 'Medium', 'business': 'High'},
+                    'confidence': rng.randint(20, 95),
+                    'status': rng.choice(statuses),
+                })
+        levels[f"level_{level}"] = {'approaches_generated': len(approaches), 'approaches': approaches}
+        parents = [a['id'] for a in approaches if a['status'] != 'pruned']
+    return {
+        'pattern': 'BoT',
+        'version': '1.0',
+        'started_at': '2026-01-18T14:30:00Z',
+        'current_phase': 'step-4-expansion',
+        'exploration': {'problem': 'Synthetic exploration', **levels},
+        'exploration_stats': {'total_branches_explored': sum(v['approaches_generated'] for v in levels.values())},
+    }
+
+
+def grow_state(document: Dict[str, Any], parents: int, branching: int,
+               seed: int = 0) -> Tuple[Dict[str, Any], str, List[Dict[str, Any]]]:
+    """
+    Next exploration level under the first retained leaves of a synthetic state.
+
+    Returns:
+        (grown copy of the document, path of the new level, expanded leaf nodes)
+    """
+    grown = json.loads(json.dumps(document))
+    exploration = grown['exploration']
+    level = max(int(k.split('_')[1]) for k in exploration if k.startswith('level_'))
+    rng = random.Random(seed)
+    leaves = [a for a in exploration[f"level_{level}"]['approaches'] if a['status'] != 'pruned'][:parents]
+    approaches = []
+    for leaf in leaves:
+        leaf['status'] = 'expanded'
+        for k in range(1, branching + 1):
+            ident = f"{leaf['id']}.{k}"
+            approaches.append({'id': ident, 'name': f"Approach {ident.split('-', 1)[1]}",
+                               'confidence': rng.randint(20, 95), 'status': 'retained'})
+    exploration[f"level_{level + 1}"] = {'approaches_generated': len(approaches), 'approaches': approaches}
+    return grown, f"exploration/level_{level + 1}", leaves
+
+
+def bench(branching: int, depth: int, grow: int, seed: int) -> Dict[str, Any]:
+    """Compare resuming and growing a JSON state with the tree store."""
+    document = synthetic_state(branching, depth, seed)
+    grown, level_path, leaves = grow_state(document, grow, branching, seed)
+    result: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / 'state.json'
+        write_json_atomic(json_path, document)
+        start = time.perf_counter()
+        with open(json_path) as f:
+            loaded = json.load(f)
+        result['json_load_s'] = time.perf_counter() - start
+        result['json_bytes'] = json_path.stat().st_size
+
+        store = TreeStore(str(Path(tmp) / 'state.tree'))
+        start = time.perf_counter()
+        result['import'] = store.sync(loaded)
+        result['import_s'] = time.perf_counter() - start
+        store.close()
+
+        start = time.perf_counter()
+        store = TreeStore(str(Path(tmp) / 'state.tree'))
+        result['open_s'] = time.perf_counter() - start
+        rng = random.Random(seed)
+        probes = [f"approach-{rng.randint(1, branching)}.{rng.randint(1, branching)}" for _ in range(200)]
+        start = time.perf_counter()
+        sizes = [len(store.subtree(index, max_depth=2)) for index in map(store.find, probes) if index is not None]
+        result['subtree_ms'] = (time.perf_counter() - start) * 1000 / len(probes)
+        result['subtree_nodes'] = sum(sizes) / max(1, len(sizes))
+        result['tree_bytes'] = store.path.stat().st_size
+        result['nodes'] = store.stats()['live']
+        result['lossless'] = store.export() == document
+
+        start = time.perf_counter()
+        write_json_atomic(json_path, grown)
+        result['json_rewrite_s'] = time.perf_counter() - start
+        start = time.perf_counter()
+        result['append'] = store.sync(grown['exploration'][level_path.split('/')[-1]], level_path)
+        result['append']['changed'] = store.update(leaves)['changed']
+        result['append_s'] = time.perf_counter() - start
+        result['append_lossless'] = store.export() == grown
+        result['grown_json_bytes'] = json_path.stat().st_size
+        result['grown_tree_bytes'] = store.path.stat().st_size
+        store.close()
+    return result
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Columnar tree store for ToT/BoT pattern state')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for name, text in (('import', 'Create a tree file from state.json'),
+                       ('sync', 'Append changes from state.json to its tree file')):
+        sub = subparsers.add_parser(name, help=text)
+        sub.add_argument('state', help='Pattern state JSON')
+        sub.add_argument('--tree', help='Tree file (default: state.tree next to the JSON)')
+
+    export_parser = subparsers.add_parser('export', help='Write the state document back to JSON')
+    export_parser.add_argument('tree', help='Tree file')
+    export_parser.add_argument('-o', '--output', help='Output JSON (default: stdout)')
+
+    subtree_parser = subparsers.add_parser('subtree', help='Show a node and its descendants')
+    subtree_parser.add_argument('tree', help='Tree file')
+    subtree_parser.add_argument('id', nargs='?', help='Node id (default: all roots)')
+    subtree_parser.add_argument('--depth', type=int, help='Levels below the node')
+    subtree_parser.add_argument('--json', action='store_true', help='Print full node objects')
+
+    stats_parser = subparsers.add_parser('stats', help='Counts by depth and status')
+    stats_parser.add_argument('tree', help='Tree file')
+
+    bench_parser = subparsers.add_parser('bench', help='Compare with JSON on a synthetic BoT state')
+    bench_parser.add_argument('--branching', type=int, default=8, help='Approaches per node (default: 8)')
+    bench_parser.add_argument('--depth', type=int, default=5, help='Deepest level (default: 5)')
+    bench_parser.add_argument('--grow', type=int, default=50,
+                              help='Leaves expanded into a new level (default: 50)')
+    bench_parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+
+    try:
+        if args.command in ('import', 'sync'):
+            tree = Path(args.tree) if args.tree else default_tree_path(args.state)
+            if args.command == 'import' and tree.exists():
+                tree.unlink()
+            with open(args.state) as f:
+                document = json.load(f)
+            with TreeStore(str(tree)) as store:
+                counts = store.sync(document)
+                stats = store.stats()
+            print(f"✅ {tree}: {counts['added']} added, {counts['changed']} changed, "
+                  f"{counts['removed']} removed, {counts['unchanged']} unchanged "
+                  f"({stats['live']} nodes, {stats['segments']} segments, {stats['bytes']} bytes)")
+
+        elif args.command == 'export':
+            with TreeStore(args.tree) as store:
+                if not store.segments:
+                    raise ValueError(f"{args.tree} is empty or missing")
+                document = store.export()
+            if args.output:
+                write_json_atomic(Path(args.output), document)
+                print(f"✅ Wrote {args.output}")
+            else:
+                print(json.dumps(document, indent=2))
+
+        elif args.command == 'subtree':
+            with TreeStore(args.tree) as store:
+                if args.id:
+                    start = store.find(args.id)
+                    if start is None:
+                        raise KeyError(f"no node {args.id!r}")
+                    entries = store.subtree(start, args.depth)
+                else:
+                    entries = [e for root in store.roots() for e in store.subtree(root, args.depth)]
+                if args.json:
+                    print(json.dumps([store.payload(i) for i, _ in entries], indent=2))
+                else:
+                    for i, level in entries:
+                        node = store.node(i)
+                        confidence = '' if node['confidence'] is None else f" {node['confidence']:g}%"
+                        print(f"{'  ' * level}{node['id']} {node['name']} [{node['status']}]{confidence}")
+
+        elif args.command == 'stats':
+            with TreeStore(args.tree) as store:
+                print(json.dumps(store.stats(), indent=2))
+
+        elif args.command == 'bench':
+            r = bench(args.branching, args.depth, args.grow, args.seed)
+            print(f"{r['nodes']} nodes: JSON {r['json_bytes'] / 1e6:.1f} MB, tree {r['tree_bytes'] / 1e6:.1f} MB "
+                  f"(lossless: {r['lossless']})")
+            print(f"  resume: json.load {r['json_load_s'] * 1000:.1f} ms vs open {r['open_s'] * 1000:.2f} ms")
+            print(f"  subtree (2 levels, ~{r['subtree_nodes']:.0f} nodes): {r['subtree_ms']:.2f} ms")
+            print(f"  import: {r['import_s']:.2f}s")
+            print(f"New level ({r['append']['added']} added, {r['append']['changed']} changed): rewrite JSON {r['json_rewrite_s']:.2f}s "
+                  f"({r['grown_json_bytes'] / 1e6:.1f} MB) vs append {r['append_s']:.2f}s "
+                  f"(tree {r['grown_tree_bytes'] / 1e6:.1f} MB, lossless: {r['append_lossless']})")
+    except (KeyError, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Log-space Bayesian confidence scoring for Tree of Thoughts branches.
+
+Implements the skill's Bayesian Confidence Scoring:
+
+    LR         = 0.25 + (score / 20) * 3.75        per criterion score (0-20)
+    odds       = prior_odds × Π LR
+    confidence = odds / (1 + odds), capped at 95%
+
+Multiplying odds along deep paths overflows a float after a few hundred
+criteria (3.81^531 > 1e308) and loses all ranking information long before
+that, because every path saturates at the cap. Here everything stays in
+log-odds: a level of branches is scored as one (branches × criteria) array,
+and ranking uses the uncapped log-odds while reported confidence is capped.
+
+`ScoredTree` keeps nodes in flat NumPy arrays. A node's path log-odds is its
+parent's plus its own evidence. Each node also tracks the best path log-odds
+anywhere in its subtree. Adding children updates that best value upwards only
+while it improves, so a parent's confidence reflects new children without
+rescoring the subtree.
+
+Usage:
+    python bayesian_scorer.py score 18 19 17 18 19
+    python bayesian_scorer.py score 18 19 17 18 19 --prior 0.3
+    python bayesian_scorer.py bench --branching 5 --depth 6 --criteria 5
+"""
+
+import argparse
+import math
+import sys
+import time
+from typing import Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+MAX_SCORE = 20.0
+LR_FLOOR = 0.25
+LR_RANGE = 3.75
+CONFIDENCE_CAP = 0.95
+DEFAULT_PRIOR = 0.50
+
+
+def likelihood_ratios(scores) -> np.ndarray:
+    """Criterion scores (0-20, any shape) to likelihood ratios."""
+    scores = np.clip(np.asarray(scores, dtype=float), 0.0, MAX_SCORE)
+    return LR_FLOOR + (scores / MAX_SCORE) * LR_RANGE
+
+
+def evidence(scores) -> np.ndarray:
+    """Summed log likelihood ratio over the last axis: one value per branch."""
+    return np.log(likelihood_ratios(scores)).sum(axis=-1)
+
+
+def logit(p: float) -> float:
+    return math.log(p / (1.0 - p))
+
+
+def confidence(log_odds, cap: float = CONFIDENCE_CAP) -> np.ndarray:
+    """Log-odds to probability (numerically stable sigmoid), capped."""
+    log_odds = np.asarray(log_odds, dtype=float)
+    return np.minimum(np.exp(-np.logaddexp(0.0, -log_odds)), cap)
+
+
+def score_level(scores, prior: float = DEFAULT_PRIOR, cap: float = CONFIDENCE_CAP):
+    """
+    Score a whole level of branches at once.
+
+    Args:
+        scores: (branches, criteria) array of 0-20 scores
+        prior: Prior probability the branch is correct
+        cap: Confidence ceiling
+
+    Returns:
+        Tuple of (log-odds, capped confidence), one entry per branch
+    """
+    log_odds = logit(prior) + evidence(scores)
+    return log_odds, confidence(log_odds, cap)
+
+
+class ScoredTree:
+    """Flat-array ToT tree with incremental path and best-subtree posteriors."""
+
+    def __init__(self, prior: float = DEFAULT_PRIOR, cap: float = CONFIDENCE_CAP, capacity: int = 1024):
+        """
+        Initialize tree with the root (node 0) at the prior.
+
+        Args:
+            prior: Prior probability for the root
+            cap: Confidence ceiling applied when reporting
+            capacity: Initial array capacity (grows by doubling)
+        """
+        self.cap = cap
+        self.size = 1
+        self.parent = np.full(capacity, -1, dtype=np.int64)
+        self.depth = np.zeros(capacity, dtype=np.int32)
+        self.own = np.zeros(capacity)
+        self.path = np.zeros(capacity)
+        self.best = np.full(capacity, -np.inf)
+        self.best_leaf = np.zeros(capacity, dtype=np.int64)
+        self.path[0] = self.best[0] = logit(prior)
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        capacity = len(self.parent)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, fill in (('parent', -1), ('depth', 0), ('own', 0.0), ('path', 0.0),
+                           ('best', -np.inf), ('best_leaf', 0)):
+            old = getattr(self, name)
+            grown = np.full(capacity, fill, dtype=old.dtype)
+            grown[:self.size] = old[:self.size]
+            setattr(self, name, grown)
+
+    def add_level(self, parents: Sequence[int], scores) -> np.ndarray:
+        """
+        Add a batch of children, possibly under different parents.
+
+        Args:
+            parents: Parent node id per child
+            scores: (children, criteria) array of 0-20 scores
+
+        Returns:
+            Node ids of the new children
+        """
+        parents = np.asarray(parents, dtype=np.int64)
+        scores = np.atleast_2d(np.asarray(scores, dtype=float))
+        if len(parents) != len(scores):
+            raise ValueError(f"{len(parents)} parents for {len(scores)} score rows")
+        if len(parents) and (parents.min() < 0 or parents.max() >= self.size):
+            raise ValueError('Unknown parent node')
+
+        count = len(parents)
+        self._reserve(count)
+        ids = np.arange(self.size, self.size + count)
+        self.size += count
+
+        self.parent[ids] = parents
+        self.depth[ids] = self.depth[parents] + 1
+        self.own[ids] = evidence(scores)
+        self.path[ids] = self.path[parents] + self.own[ids]
+        self.best[ids] = self.path[ids]
+        self.best_leaf[ids] = ids
+        self._propagate(ids)
+        return ids
+
+    def add_children(self, parent: int, scores) -> np.ndarray:
+        """Add children under a single parent."""
+        scores = np.atleast_2d(np.asarray(scores, dtype=float))
+        return self.add_level(np.full(len(scores), parent, dtype=np.int64), scores)
+
+    def _propagate(self, nodes: np.ndarray) -> None:
+        """Push improved best-subtree values up, stopping where nothing improves."""
+        while len(nodes):
+            parents = self.parent[nodes]
+            keep = parents >= 0
+            nodes, parents = nodes[keep], parents[keep]
+            if not len(nodes):
+                return
+            before = self.best[parents].copy()
+            np.maximum.at(self.best, parents, self.best[nodes])
+            improved = self.best[parents] > before
+            if not improved.any():
+                return
+            # Record which child's leaf now holds each improved parent's maximum
+            winners = nodes[improved & (self.best[nodes] == self.best[parents])]
+            self.best_leaf[self.parent[winners]] = self.best_leaf[winners]
+            nodes = np.unique(parents[improved])
+
+    def path_confidence(self, nodes=None) -> np.ndarray:
+        """Capped confidence of the path ending at each node."""
+        nodes = np.arange(self.size) if nodes is None else np.asarray(nodes)
+        return confidence(self.path[nodes], self.cap)
+
+    def subtree_confidence(self, nodes=None) -> np.ndarray:
+        """Capped confidence of the best path through each node's subtree."""
+        nodes = np.arange(self.size) if nodes is None else np.asarray(nodes)
+        return confidence(self.best[nodes], self.cap)
+
+    def level(self, depth: int) -> np.ndarray:
+        return np.flatnonzero(self.depth[:self.size] == depth)
+
+    def top_k(self, k: int, depth: Optional[int] = None) -> np.ndarray:
+        """Node ids with the highest uncapped path log-odds (optionally at one depth)."""
+        nodes = np.arange(self.size) if depth is None else self.level(depth)
+        if k >= len(nodes):
+            return nodes[np.argsort(-self.path[nodes])]
+        picked = nodes[np.argpartition(-self.path[nodes], k)[:k]]
+        return picked[np.argsort(-self.path[picked])]
+
+    def winning_path(self, node: int = 0) -> list:
+        """Root-to-leaf node ids of the best path through `node`'s subtree."""
+        leaf = int(self.best_leaf[node])
+        path = []
+        while leaf >= 0:
+            path.append(leaf)
+            leaf = int(self.parent[leaf])
+        return path[::-1]
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Log-space Bayesian confidence scoring for ToT branches')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    score_parser = subparsers.add_parser('score', help='Score one branch from its criterion scores')
+    score_parser.add_argument('scores', type=float, nargs='+', help='Criterion scores (0-20)')
+    score_parser.add_argument('--prior', type=float, default=DEFAULT_PRIOR, help='Prior confidence (default: 0.5)')
+
+    bench_parser = subparsers.add_parser('bench', help='Build and score a synthetic tree level by level')
+    bench_parser.add_argument('--branching', type=int, default=5, help='Children per node (default: 5)')
+    bench_parser.add_argument('--depth', type=int, default=6, help='Levels (default: 6)')
+    bench_parser.add_argument('--criteria', type=int, default=5, help='Criteria per branch (default: 5)')
+    bench_parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+
+    args = parser.parse_args()
+
+    if args.command == 'score':
+        ratios = likelihood_ratios(args.scores)
+        log_odds, conf = score_level([args.scores], prior=args.prior)
+        print(f"Likelihood ratios: {', '.join(f'{r:.2f}' for r in ratios)}")
+        print(f"Log-odds: {log_odds[0]:.3f} (odds {math.exp(min(log_odds[0], 700)):.4g})")
+        print(f"Confidence: {conf[0]:.1%}" + (' (capped)' if conf[0] >= CONFIDENCE_CAP else ''))
+        return
+
+    rng = np.random.default_rng(args.seed)
+    tree = ScoredTree()
+    frontier = np.array([0])
+    start = time.perf_counter()
+    for _ in range(args.depth):
+        parents = np.repeat(frontier, args.branching)
+        scores = rng.integers(0, 21, size=(len(parents), args.criteria))
+        frontier = tree.add_level(parents, scores)
+    elapsed = time.perf_counter() - start
+
+    # Naive odds product along the deepest paths, for comparison
+    ratios_per_path = args.depth * args.criteria
+    naive_overflow = ratios_per_path * math.log(LR_FLOOR + LR_RANGE) > math.log(sys.float_info.max)
+    best = tree.winning_path()
+    print(f"Scored {tree.size - 1:,} branches ({args.depth} levels × {args.branching} children, "
+          f"{args.criteria} criteria) in {elapsed * 1000:.1f} ms")
+    print(f"Root best-path log-odds: {tree.best[0]:.2f} -> confidence {tree.subtree_confidence([0])[0]:.1%}")
+    print(f"Winning path: {' -> '.join(map(str, best))}")
+    print(f"Leaves at the cap: {np.mean(tree.path_confidence(frontier) >= CONFIDENCE_CAP):.1%} "
+          f"(ranking still uses uncapped log-odds)")
+    if naive_overflow:
+        print(f"A naive odds product over {ratios_per_path} ratios can overflow float64")
+
+
+if __name__ == '__main__':
+    main()
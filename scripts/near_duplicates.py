@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection across the agent and skill library.
+
+Confidence-check Duplicate Detection and agent-creator's common mistakes both
+warn against overlapping agents and skills. This script measures the overlap:
+
+- Every document is split into sections at `##`/`###` headings. Each section
+  becomes a set of 5-word shingles and then a 128-value MinHash signature. A
+  document's signature is the element-wise minimum of its sections'.
+- Locality-sensitive hashing splits signatures into bands. Only units that
+  share a band are compared, so the cost grows with the number of units, not
+  with the number of pairs. Candidates are kept when their estimated Jaccard
+  similarity reaches the threshold.
+- Signatures are cached per file (keyed by mtime and size) in
+  `.claude/near-duplicates/`. A run re-shingles only changed files, and
+  `--changed` / `--staged` reports only pairs that involve the given files,
+  which makes it usable as a pre-commit check.
+
+Usage:
+    python scripts/near_duplicates.py                          # whole library
+    python scripts/near_duplicates.py --threshold 0.6 --json
+    python scripts/near_duplicates.py --staged --fail          # pre-commit
+    python scripts/near_duplicates.py --changed cognitive-skills/tree-of-thoughts/SKILL.md
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+DEFAULT_GLOBS = ['agent-examples/*.md', 'cognitive-skills/*/SKILL.md', 'skill-frameworks/*/SKILL.md']
+CACHE_DIR = '.claude/near-duplicates'
+CACHE_VERSION = 1
+NUM_PERM = 128
+SHINGLE_WORDS = 5
+MIN_SECTION_WORDS = 40
+DEFAULT_THRESHOLD = 0.5
+MERSENNE = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+SECTION_PATTERN = re.compile(r'^(#{2,3})\s+(.+?)\s*#*$', re.M)
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+_rng = np.random.RandomState(1)
+PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def sections(text: str) -> List[Tuple[str, int, str]]:
+    """Split markdown into (heading, line, body); text before the first heading is '(preamble)'."""
+    marks = [(m.start(), m.group(2), text.count('\n', 0, m.start()) + 1) for m in SECTION_PATTERN.finditer(text)]
+    parts = []
+    starts = [(0, '(preamble)', 1)] + marks
+    for k, (start, heading, line) in enumerate(starts):
+        end = starts[k + 1][0] if k + 1 < len(starts) else len(text)
+        body = text[start:end]
+        if body.strip():
+            parts.append((heading, line, body))
+    return parts
+
+
+def shingles(text: str, k: int = SHINGLE_WORDS) -> Tuple[np.ndarray, int]:
+    """32-bit hashes of the distinct k-word shingles, plus the word count."""
+    tokens = WORD_PATTERN.findall(text.lower())
+    if len(tokens) < k:
+        grams = [' '.join(tokens)] if tokens else []
+    else:
+        grams = [' '.join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+    hashes = np.fromiter({zlib.crc32(g.encode()) for g in grams}, dtype=np.uint64)
+    return hashes, len(tokens)
+
+
+def minhash(hashes: np.ndarray) -> np.ndarray:
+    """MinHash signature: min over shingles of (a·x + b) mod p for each permutation."""
+    if not len(hashes):
+        return np.full(NUM_PERM, MAX_HASH, dtype=np.uint64)
+    values = (np.outer(hashes, PERM_A) + PERM_B) % MERSENNE & MAX_HASH
+    return values.min(axis=0)
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """Bands × rows = num_perm whose S-curve midpoint (1/b)^(1/r) is closest to the threshold."""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class LibraryIndex:
+    """Per-file cached section signatures for the library."""
+
+    def __init__(self, root: str, cache_dir: Optional[str] = None):
+        self.root = Path(root).resolve()
+        self.cache_dir = Path(cache_dir) if cache_dir else self.root / CACHE_DIR
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.signatures: Dict[str, np.ndarray] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            meta = json.loads((self.cache_dir / 'index.json').read_text())
+            arrays = np.load(self.cache_dir / 'signatures.npz')
+        except (OSError, ValueError):
+            return
+        if meta.get('version') != CACHE_VERSION or meta.get('num_perm') != NUM_PERM:
+            return
+        self.files = meta['files']
+        self.signatures = {rel: arrays[entry['key']] for rel, entry in self.files.items()
+                           if entry['key'] in arrays.files}
+
+    def save(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        arrays = {}
+        for n, rel in enumerate(sorted(self.files)):
+            key = f"f{n}"
+            self.files[rel]['key'] = key
+            arrays[key] = self.signatures[rel]
+        tmp = self.cache_dir / 'signatures.tmp.npz'
+        np.savez(tmp, **arrays)
+        os.replace(tmp, self.cache_dir / 'signatures.npz')
+        meta = {'version': CACHE_VERSION, 'num_perm': NUM_PERM, 'files': self.files}
+        (self.cache_dir / 'index.tmp.json').write_text(json.dumps(meta))
+        os.replace(self.cache_dir / 'index.tmp.json', self.cache_dir / 'index.json')
+
+    def update(self, paths: Iterable[str]) -> Dict[str, int]:
+        """Re-shingle changed files, drop files no longer in the corpus."""
+        wanted = set()
+        changed = 0
+        for rel in paths:
+            wanted.add(rel)
+            stat = (self.root / rel).stat()
+            entry = self.files.get(rel)
+            if entry and entry['m'] == stat.st_mtime_ns and entry['s'] == stat.st_size:
+                continue
+            text = (self.root / rel).read_text(encoding='utf-8', errors='replace')
+            units, signatures = [], []
+            for heading, line, body in sections(text):
+                hashes, word_count = shingles(body)
+                units.append([heading, line, word_count])
+                signatures.append(minhash(hashes))
+            self.files[rel] = {'m': stat.st_mtime_ns, 's': stat.st_size, 'sections': units, 'key': None}
+            self.signatures[rel] = np.array(signatures, dtype=np.uint64).reshape(-1, NUM_PERM)
+            changed += 1
+        removed = [rel for rel in self.files if rel not in wanted]
+        for rel in removed:
+            del self.files[rel]
+            self.signatures.pop(rel, None)
+        return {'files': len(self.files), 'changed': changed, 'removed': len(removed)}
+
+    def units(self, min_words: int = MIN_SECTION_WORDS):
+        """
+        Flatten to (document signatures, section signatures) with labels.
+
+        Returns:
+            Tuple of (doc_labels, doc_sigs, section_labels, section_sigs); labels are
+            (file, heading, line, words) tuples, heading None for whole documents
+        """
+        doc_labels, doc_sigs, sec_labels, sec_sigs = [], [], [], []
+        for rel in sorted(self.files):
+            sigs = self.signatures[rel]
+            meta = self.files[rel]['sections']
+            if not len(sigs):
+                continue
+            doc_labels.append((rel, None, 1, sum(m[2] for m in meta)))
+            doc_sigs.append(sigs.min(axis=0))
+            for (heading, line, words), sig in zip(meta, sigs):
+                if words >= min_words:
+                    sec_labels.append((rel, heading, line, words))
+                    sec_sigs.append(sig)
+        stack = lambda rows: np.array(rows, dtype=np.uint64).reshape(-1, NUM_PERM)
+        return doc_labels, stack(doc_sigs), sec_labels, stack(sec_sigs)
+
+
+def candidate_pairs(signatures: np.ndarray, bands: int, rows: int,
+                    focus: Optional[np.ndarray] = None) -> Set[Tuple[int, int]]:
+    """
+    Pairs that share at least one LSH band.
+
+    Args:
+        signatures: (units, num_perm) MinHash signatures
+        bands, rows: LSH banding
+        focus: If given, only pairs with at least one unit in this boolean mask
+    """
+    pairs: Set[Tuple[int, int]] = set()
+    if len(signatures) < 2:
+        return pairs
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        shared = np.flatnonzero(counts[inverse] > 1)
+        if not len(shared):
+            continue
+        order = shared[np.argsort(inverse[shared], kind='stable')]
+        groups = np.split(order, np.flatnonzero(np.diff(inverse[order])) + 1)
+        for members in groups:
+            if focus is not None and not focus[members].any():
+                continue
+            members = members.tolist()
+            for a in range(len(members)):
+                for b in range(a + 1, len(members)):
+                    if focus is None or focus[members[a]] or focus[members[b]]:
+                        pairs.add((members[a], members[b]))
+    return pairs
+
+
+def near_duplicates(labels: List[tuple], signatures: np.ndarray, threshold: float,
+                    focus_files: Optional[Set[str]] = None, same_file: bool = False) -> List[Dict[str, Any]]:
+    """LSH candidates verified by estimated Jaccard (fraction of equal MinHash values)."""
+    bands, rows = lsh_params(threshold)
+    focus = None
+    if focus_files is not None:
+        focus = np.array([label[0] in focus_files for label in labels], dtype=bool)
+    results = []
+    for i, j in candidate_pairs(signatures, bands, rows, focus):
+        if not same_file and labels[i][0] == labels[j][0]:
+            continue
+        similarity = float(np.mean(signatures[i] == signatures[j]))
+        if similarity >= threshold:
+            results.append({'similarity': round(similarity, 3), 'a': _label(labels[i]), 'b': _label(labels[j])})
+    results.sort(key=lambda r: (-r['similarity'], r['a']['file'], r['b']['file']))
+    return results
+
+
+def _label(label: tuple) -> Dict[str, Any]:
+    rel, heading, line, words = label
+    out = {'file': rel, 'words': words}
+    if heading is not None:
+        out.update({'section': heading, 'line': line})
+    return out
+
+
+def corpus(root: Path, globs: List[str]) -> List[str]:
+    paths = set()
+    for pattern in globs:
+        paths.update(p.relative_to(root).as_posix() for p in root.glob(pattern) if p.is_file())
+    return sorted(paths)
+
+
+def staged_files(root: Path) -> List[str]:
+    result = subprocess.run(['git', 'diff', '--cached', '--name-only', '--diff-filter=ACMR'],
+                            cwd=root, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"git diff failed: {result.stderr.strip()}")
+        sys.exit(2)
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def _where(unit: Dict[str, Any]) -> str:
+    if 'section' in unit:
+        return f"{unit['file']}:{unit['line']} \"{unit['section']}\""
+    return unit['file']
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='MinHash/LSH near-duplicate report for agents and skills')
+    parser.add_argument('--root', default=str(Path(__file__).resolve().parent.parent), help='Repository root')
+    parser.add_argument('--glob', action='append', help=f"Corpus glob (repeatable, default: {' '.join(DEFAULT_GLOBS)})")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Section Jaccard threshold (default: 0.5)')
+    parser.add_argument('--doc-threshold', type=float, help='Document Jaccard threshold (default: same as --threshold)')
+    parser.add_argument('--min-words', type=int, default=MIN_SECTION_WORDS, help='Ignore shorter sections (default: 40)')
+    parser.add_argument('--same-file', action='store_true', help='Also report duplicate sections within one file')
+    parser.add_argument('--changed', nargs='+', metavar='FILE', help='Only report pairs involving these files')
+    parser.add_argument('--staged', action='store_true', help='Only report pairs involving staged files')
+    parser.add_argument('--fail', action='store_true', help='Exit 1 if any near-duplicate is reported')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the signature cache')
+    parser.add_argument('--json', action='store_true', help='Print JSON')
+
+    args = parser.parse_args()
+    root = Path(args.root).resolve()
+    paths = corpus(root, args.glob or DEFAULT_GLOBS)
+    if not paths:
+        print("No documents matched the corpus globs.")
+        return
+
+    index = LibraryIndex(str(root))
+    if args.no_cache:
+        index.files, index.signatures = {}, {}
+    stats = index.update(paths)
+    if stats['changed'] or stats['removed']:
+        if not args.no_cache:
+            index.save()
+
+    focus = None
+    if args.staged or args.changed:
+        given = staged_files(root) if args.staged else args.changed
+        focus = {Path(p).resolve().relative_to(root).as_posix() if Path(p).is_absolute() else Path(p).as_posix()
+                 for p in given}
+        focus &= set(paths)
+        if not focus:
+            if not args.json:
+                print("No library documents among the changed files.")
+            else:
+                print(json.dumps({'documents': [], 'sections': []}))
+            return
+
+    doc_labels, doc_sigs, sec_labels, sec_sigs = index.units(args.min_words)
+    documents = near_duplicates(doc_labels, doc_sigs, args.doc_threshold or args.threshold, focus)
+    section_pairs = near_duplicates(sec_labels, sec_sigs, args.threshold, focus, args.same_file)
+
+    if args.json:
+        print(json.dumps({'files': stats['files'], 'reparsed': stats['changed'], 'sections_compared': len(sec_labels),
+                          'documents': documents, 'sections': section_pairs}, indent=2))
+    else:
+        print(f"Library: {stats['files']} documents, {len(sec_labels)} sections "
+              f"({stats['changed']} files re-shingled)")
+        print(f"\nNear-duplicate documents (Jaccard ≥ {args.doc_threshold or args.threshold:.2f}): {len(documents)}")
+        for pair in documents:
+            print(f"  {pair['similarity']:.2f}  {_where(pair['a'])}  <->  {_where(pair['b'])}")
+        print(f"\nNear-duplicate sections (Jaccard ≥ {args.threshold:.2f}): {len(section_pairs)}")
+        for pair in section_pairs:
+            print(f"  {pair['similarity']:.2f}  {_where(pair['a'])}")
+            print(f"        {_where(pair['b'])}")
+    if args.fail and (documents or section_pairs):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
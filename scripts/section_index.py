@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Sectioned, lazy loading for skill and reference documents.
+
+Progressive disclosure asks tools to read only the section they need, but a
+tool that wants the DPTS threshold or one handover schema still has to read
+and scan a 1,000+ line SKILL.md. This script keeps a section index instead:
+
+- Every document is mapped from heading path ("Part 5 > 5.1 Schema") to the
+  byte range of that section (with its subsections) and a SHA-256 of the
+  bytes. Headings inside fenced code blocks are ignored.
+- The index is stored in `.claude/section-index.json`. A file is re-parsed
+  only when its mtime or size changes, and the check is one stat of that file.
+- Reads memory-map the document and slice out the byte range, so fetching a
+  section costs one dictionary lookup plus a seek. The rest of the file is
+  never read.
+
+Library use:
+    from section_index import SectionIndex
+    index = SectionIndex('/path/to/repo')
+    text = index.get('cognitive-skills/parallel-execution/SKILL.md', 'DPTS')
+
+Usage:
+    python scripts/section_index.py build
+    python scripts/section_index.py list cognitive-skills/reasoning-handover-protocol/SKILL.md
+    python scripts/section_index.py get cognitive-skills/parallel-execution/SKILL.md "Pattern 1"
+    python scripts/section_index.py find "handover schema"
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_GLOBS = [
+    'cognitive-skills/*/SKILL.md',
+    'cognitive-skills/*/references/*.md',
+    'skill-frameworks/*/SKILL.md',
+    'skill-frameworks/*/references/*.md',
+]
+INDEX_FILE = '.claude/section-index.json'
+INDEX_VERSION = 1
+PATH_SEPARATOR = ' > '
+
+HEADING_PATTERN = re.compile(rb'^(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*\r?$')
+FENCE_PATTERN = re.compile(rb'^[ \t]{0,3}(```|~~~)')
+
+
+def parse_sections(data: bytes) -> List[Dict[str, Any]]:
+    """
+    Map each heading to the byte range it covers.
+
+    A section runs from its heading line to the next heading of the same or a
+    higher level, so a parent section includes its subsections.
+
+    Args:
+        data: Raw document bytes
+
+    Returns:
+        Sections in document order: path, level, line, start, end, sha256
+    """
+    sections: List[Dict[str, Any]] = []
+    open_sections: List[Dict[str, Any]] = []
+    fence = None
+    offset = 0
+    for line_no, line in enumerate(data.splitlines(keepends=True), start=1):
+        fence_match = FENCE_PATTERN.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            fence = None if fence == marker else (fence or marker)
+        elif fence is None:
+            match = HEADING_PATTERN.match(line.rstrip(b'\n'))
+            if match:
+                level = len(match.group(1))
+                while open_sections and open_sections[-1]['level'] >= level:
+                    open_sections.pop()['end'] = offset
+                title = match.group(2).decode('utf-8', errors='replace')
+                parent = open_sections[-1]['path'] + PATH_SEPARATOR if open_sections else ''
+                section = {'path': parent + title, 'level': level, 'line': line_no, 'start': offset, 'end': None}
+                sections.append(section)
+                open_sections.append(section)
+        offset += len(line)
+    for section in open_sections:
+        section['end'] = offset
+    for section in sections:
+        section['sha256'] = hashlib.sha256(data[section['start']:section['end']]).hexdigest()
+    return sections
+
+
+class SectionIndex:
+    """Persistent heading-path → byte-range index with memory-mapped reads."""
+
+    def __init__(self, root: str, index_file: Optional[str] = None, globs: Optional[List[str]] = None):
+        self.root = Path(root).resolve()
+        self.index_path = Path(index_file) if index_file else self.root / INDEX_FILE
+        self.globs = globs or DEFAULT_GLOBS
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._by_path: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._maps: Dict[str, tuple] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.files = data.get('files', {})
+
+    def save(self) -> None:
+        """Write the index if anything changed since it was loaded."""
+        if not self._dirty:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'version': INDEX_VERSION, 'files': self.files}))
+        os.replace(tmp, self.index_path)
+        self._dirty = False
+
+    def close(self) -> None:
+        for mm, handle, _ in self._maps.values():
+            mm.close()
+            handle.close()
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+        self.close()
+
+    def _rel(self, path: str) -> str:
+        p = Path(path)
+        if p.is_absolute():
+            return p.resolve().relative_to(self.root).as_posix()
+        return p.as_posix()
+
+    def _entry(self, rel: str) -> Dict[str, Any]:
+        """Index entry for one file, re-parsed only if its mtime or size changed."""
+        stat = (self.root / rel).stat()
+        entry = self.files.get(rel)
+        if entry is None or entry['m'] != stat.st_mtime_ns or entry['s'] != stat.st_size:
+            data = (self.root / rel).read_bytes()
+            entry = {'m': stat.st_mtime_ns, 's': stat.st_size, 'sections': parse_sections(data)}
+            self.files[rel] = entry
+            self._by_path.pop(rel, None)
+            self._drop_map(rel)
+            self._dirty = True
+        return entry
+
+    def _drop_map(self, rel: str) -> None:
+        cached = self._maps.pop(rel, None)
+        if cached:
+            cached[0].close()
+            cached[1].close()
+
+    def refresh(self) -> Dict[str, int]:
+        """Stat every document matched by the globs; re-parse changed ones, forget removed ones."""
+        seen = set()
+        parsed = 0
+        for pattern in self.globs:
+            for p in self.root.glob(pattern):
+                if not p.is_file():
+                    continue
+                rel = p.relative_to(self.root).as_posix()
+                before = self.files.get(rel)
+                seen.add(rel)
+                if self._entry(rel) is not before:
+                    parsed += 1
+        removed = [rel for rel in self.files if rel not in seen]
+        for rel in removed:
+            del self.files[rel]
+            self._by_path.pop(rel, None)
+            self._drop_map(rel)
+            self._dirty = True
+        return {'files': len(self.files), 'parsed': parsed, 'removed': len(removed)}
+
+    def sections(self, path: str) -> List[Dict[str, Any]]:
+        """All sections of one document, in order."""
+        return self._entry(self._rel(path))['sections']
+
+    def lookup(self, path: str, heading: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a heading path within one document.
+
+        Tries, in order: the exact heading path, a heading whose own title
+        equals the query, then the first heading path containing the query
+        (all but the exact match are case-insensitive).
+        """
+        rel = self._rel(path)
+        entry = self._entry(rel)
+        by_path = self._by_path.get(rel)
+        if by_path is None:
+            by_path = {s['path']: s for s in entry['sections']}
+            self._by_path[rel] = by_path
+        if heading in by_path:
+            return by_path[heading]
+        query = heading.lower()
+        for section in entry['sections']:
+            if section['path'].rsplit(PATH_SEPARATOR, 1)[-1].lower() == query:
+                return section
+        for section in entry['sections']:
+            if query in section['path'].lower():
+                return section
+        return None
+
+    def read(self, path: str, section: Dict[str, Any], verify: bool = False) -> str:
+        """Slice one section out of the memory-mapped document."""
+        rel = self._rel(path)
+        entry = self._entry(rel)
+        cached = self._maps.get(rel)
+        if cached is None or cached[2] != entry['m']:
+            self._drop_map(rel)
+            handle = open(self.root / rel, 'rb')
+            mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            cached = (mm, handle, entry['m'])
+            self._maps[rel] = cached
+        data = cached[0][section['start']:section['end']]
+        if verify and hashlib.sha256(data).hexdigest() != section['sha256']:
+            raise ValueError(f"Section hash mismatch in {rel}: {section['path']}")
+        return data.decode('utf-8', errors='replace')
+
+    def get(self, path: str, heading: str, verify: bool = False) -> Optional[str]:
+        """Text of one section (with its subsections), or None if no heading matches."""
+        section = self.lookup(path, heading)
+        if section is None:
+            return None
+        return self.read(path, section, verify)
+
+    def find(self, query: str) -> List[Dict[str, Any]]:
+        """Sections in any indexed document whose heading path contains every query word."""
+        words = query.lower().split()
+        hits = []
+        for rel in sorted(self.files):
+            for section in self.files[rel]['sections']:
+                target = section['path'].lower()
+                if all(word in target for word in words):
+                    hits.append({'file': rel, **section})
+        return hits
+
+
+def _format_size(size: int) -> str:
+    return f"{size / 1024:.1f} KB" if size >= 1024 else f"{size} B"
+
+
+def bench(index: SectionIndex, rounds: int) -> Dict[str, float]:
+    """Compare reading one section via the index with reading and scanning the whole file."""
+    targets = []
+    for rel in sorted(index.files):
+        sections = index.files[rel]['sections']
+        if sections:
+            targets.append((rel, sections[len(sections) // 2]['path']))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for rel, heading in targets:
+            index.get(rel, heading)
+    indexed = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for rel, heading in targets:
+            data = (index.root / rel).read_bytes()
+            for section in parse_sections(data):
+                if section['path'] == heading:
+                    data[section['start']:section['end']].decode('utf-8')
+                    break
+    scanned = time.perf_counter() - start
+    lookups = rounds * len(targets)
+    return {'lookups': lookups, 'indexed_us': indexed / lookups * 1e6, 'full_scan_us': scanned / lookups * 1e6}
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Heading-path section index for skill and reference docs')
+    parser.add_argument('--root', default=str(Path(__file__).resolve().parent.parent), help='Repository root')
+    parser.add_argument('--index', help=f'Index file (default: <root>/{INDEX_FILE})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('build', help='Index every skill and reference doc (changed files only)')
+
+    list_parser = subparsers.add_parser('list', help='List the sections of one document')
+    list_parser.add_argument('file')
+
+    get_parser = subparsers.add_parser('get', help='Print one section')
+    get_parser.add_argument('file')
+    get_parser.add_argument('heading', help="Heading path ('A > B'), heading title, or substring")
+    get_parser.add_argument('--verify', action='store_true', help='Check the section hash before printing')
+
+    find_parser = subparsers.add_parser('find', help='Search heading paths across all indexed docs')
+    find_parser.add_argument('query')
+    find_parser.add_argument('--json', action='store_true', help='Print JSON')
+
+    bench_parser = subparsers.add_parser('bench', help='Indexed read vs full read-and-scan')
+    bench_parser.add_argument('--rounds', type=int, default=20)
+
+    args = parser.parse_args()
+
+    with SectionIndex(args.root, args.index) as index:
+        if args.command == 'build':
+            stats = index.refresh()
+            count = sum(len(e['sections']) for e in index.files.values())
+            print(f"Indexed {stats['files']} documents, {count} sections "
+                  f"({stats['parsed']} re-parsed, {stats['removed']} removed)")
+
+        elif args.command == 'list':
+            try:
+                sections = index.sections(args.file)
+            except OSError as e:
+                print(f"Cannot read {args.file}: {e.strerror or e}")
+                sys.exit(1)
+            except ValueError as e:
+                print(e)
+                sys.exit(1)
+            for section in sections:
+                indent = '  ' * (section['level'] - 1)
+                title = section['path'].rsplit(PATH_SEPARATOR, 1)[-1]
+                size = _format_size(section['end'] - section['start'])
+                print(f"{section['line']:>6}  {indent}{title}  [{size}]")
+
+        elif args.command == 'get':
+            try:
+                text = index.get(args.file, args.heading, verify=args.verify)
+            except OSError as e:
+                print(f"Cannot read {args.file}: {e.strerror or e}")
+                sys.exit(1)
+            except ValueError as e:
+                print(e)
+                sys.exit(1)
+            if text is None:
+                print(f"No section matching '{args.heading}' in {args.file}")
+                sys.exit(1)
+            sys.stdout.write(text)
+
+        elif args.command == 'find':
+            index.refresh()
+            hits = index.find(args.query)
+            if args.json:
+                print(json.dumps(hits, indent=2))
+            else:
+                for hit in hits:
+                    print(f"{hit['file']}:{hit['line']}  {hit['path']}")
+                if not hits:
+                    print(f"No headings matching '{args.query}'")
+
+        elif args.command == 'bench':
+            index.refresh()
+            result = bench(index, args.rounds)
+            print(f"{result['lookups']} lookups: indexed {result['indexed_us']:.1f} µs, "
+                  f"full read+scan {result['full_scan_us']:.1f} µs "
+                  f"({result['full_scan_us'] / max(result['indexed_us'], 1e-9):.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
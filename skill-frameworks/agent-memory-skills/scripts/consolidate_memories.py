@@ -0,0 +1,860 @@
+#!/usr/bin/env python3
+"""
+Deterministic memory consolidation for the local ChromaDB store.
+
+Implements the memory-consolidation-agent cycles without reading memories one
+at a time. All `agent_*_improvements` collections are paged in bulk, with
+their embeddings, into NumPy arrays. Each phase is then an array operation:
+
+    Phase 1  Inventory                 per-agent counts
+    Phase 2  Cross-agent patterns      groups of similar memories (cosine >= 0.7)
+                                       spanning agents
+    Phase 3  Schema formation          clusters with 3+ examples from 2+ agents,
+                                       represented by their medoid memory
+    Phase 4  Conflict detection        similar memories from different agents whose
+                                       recommendations differ in polarity, each
+                                       paired with its closest opponent
+    Phase 5  Temporal decay            half-life 90 days on last use, with the
+                                       usage / success / cross-validation boosts
+    Phase 6  Knowledge transfer        principles close to an agent's own memories
+    Phase 7  Failure analysis          clusters of deprecated memories
+    Phase 8  Report                    the documented markdown report
+
+Similar pairs are found with blocked matrix products of normalized embeddings,
+one block of rows at a time and only within a category (conflicts and schemas
+are per category), so memory stays bounded and 100k memories take seconds to
+minutes rather than hours. Near-duplicates (cosine >= 0.92) within one agent
+are merged into the strongest copy; the others are deprecated with
+`merged_into`, never deleted, except by the monthly archive cleanup.
+
+Cycles:
+    daily    Phases 1, 2 (detect only), 4 (scan only), health, 8
+    weekly   Phases 1-8, including duplicate merging
+    monthly  weekly + archive cleanup of long-deprecated memories
+
+Decay is computed from `base_confidence` (the confidence before the first
+adjustment) so repeated runs do not compound it.
+
+Usage:
+    python consolidate_memories.py daily
+    python consolidate_memories.py weekly --dry-run --output report.md
+    python consolidate_memories.py bench --size 100000
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+# Timestamp parsing is shared with the chromadb-integration skill, installed alongside this one
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'chromadb-integration-skills' / 'scripts'))
+from temporal_retrieval import to_epoch  # noqa: E402
+
+CHROMA_DIR = Path.home() / ".claude" / "chroma_data"
+IMPROVEMENTS_PATTERN = re.compile(r'^agent_(.+)_improvements$')
+PAGE_SIZE = 5000
+SECONDS_PER_DAY = 86400.0
+
+CROSS_AGENT_SIMILARITY = 0.70     # distance < 0.3 in the agent spec
+DUPLICATE_SIMILARITY = 0.92
+FAILURE_SIMILARITY = 0.80
+PATTERN_MIN_CONFIDENCE = 0.70
+SCHEMA_MIN_EXAMPLES = 3
+DECAY_HALF_LIFE_DAYS = 90.0
+CONFIDENCE_CAP = 0.95
+DEPRECATE_BELOW = 0.40
+ADJUST_THRESHOLD = 0.05
+TRANSFER_MIN_VALIDATION = 3
+TRANSFER_MIN_CONFIDENCE = 0.75
+TRANSFER_RELEVANCE = 0.60
+TRANSFER_DISCOUNT = 0.90
+STRENGTH_RATIO = 1.5
+ARCHIVE_DAYS = 365
+BLOCK_ELEMENTS = 1 << 25          # similarity block size (~128 MB of float32)
+
+NEGATION = re.compile(r"\b(?:not|never|avoid|don't|do not|no longer|instead of|stop|skip|without)\b", re.I)
+
+CYCLE_PHASES = {
+    'daily': {'patterns', 'conflict_scan'},
+    'weekly': {'patterns', 'merge', 'schemas', 'conflicts', 'decay', 'transfer', 'failures'},
+    'monthly': {'patterns', 'merge', 'schemas', 'conflicts', 'decay', 'transfer', 'failures', 'archive'},
+}
+
+
+def _chromadb():
+    try:
+        import chromadb
+    except ImportError:
+        print("chromadb not installed. Run: pip install chromadb")
+        sys.exit(1)
+    return chromadb
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _stable_id(prefix: str, parts) -> str:
+    return f"{prefix}_{hashlib.sha1('|'.join(sorted(parts)).encode()).hexdigest()[:12]}"
+
+
+def _clean(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """ChromaDB metadata values must be str, int, float or bool."""
+    return {k: v for k, v in metadata.items() if isinstance(v, (str, int, float, bool))}
+
+
+class MemorySet:
+    """Columnar view of memories: parallel lists plus NumPy arrays."""
+
+    def __init__(self, records: List[Dict[str, Any]], dim: Optional[int] = None):
+        """
+        Build columns from records.
+
+        Args:
+            records: Dicts with id, collection, agent, document, metadata, embedding
+            dim: Embedding dimension when records is empty
+        """
+        self.ids = [r['id'] for r in records]
+        self.collections = [r['collection'] for r in records]
+        self.agents = np.array([r['agent'] for r in records], dtype=object)
+        self.documents = [r.get('document') or '' for r in records]
+        self.metadatas = [dict(r.get('metadata') or {}) for r in records]
+        meta = self.metadatas
+        self.categories = np.array([m.get('category') or 'uncategorized' for m in meta], dtype=object)
+        self.confidence = np.array([float(m.get('confidence', 0.5)) for m in meta])
+        self.base_confidence = np.array([float(m.get('base_confidence', m.get('confidence', 0.5)))
+                                         for m in meta])
+        self.usage = np.array([int(m.get('usage_count') or 0) for m in meta])
+        self.successes = np.array([int(m.get('success_count')
+                                       or round((m.get('success_rate') or 0) * (m.get('usage_count') or 0)))
+                                   for m in meta])
+        self.success_rate = np.array([float(m['success_rate']) if m.get('success_rate') is not None
+                                      else np.nan for m in meta])
+        self.created = np.array([to_epoch(m.get('created_at'), np.nan) for m in meta])
+        self.last_used = np.array([to_epoch(m.get('last_used'), np.nan) for m in meta])
+        self.deprecated = np.array([bool(m.get('deprecated')) for m in meta], dtype=bool)
+        self.cross_validated = np.array([bool(m.get('cross_validated')) for m in meta], dtype=bool)
+        self.eligible = np.array([m.get('consolidation_eligible', True) is not False for m in meta], dtype=bool)
+        self.negated = np.array([bool(NEGATION.search(d)) for d in self.documents], dtype=bool)
+
+        if records:
+            emb = np.asarray([r['embedding'] for r in records], dtype=np.float32)
+            norms = np.linalg.norm(emb, axis=1, keepdims=True)
+            self.embeddings = emb / np.where(norms == 0, 1, norms)
+        else:
+            self.embeddings = np.zeros((0, dim or 1), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def strength(self) -> np.ndarray:
+        """usage_count × success_rate × confidence (Phase 4 validation strength)."""
+        return self.usage * np.nan_to_num(self.success_rate, nan=0.0) * self.confidence
+
+
+def similar_pairs(embeddings: np.ndarray, indices: np.ndarray, groups: np.ndarray,
+                  threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    All pairs (i < j) in the same group with cosine similarity >= threshold.
+
+    Args:
+        embeddings: (n, d) normalized embeddings
+        indices: Rows to consider
+        groups: Group label per row (pairs never cross groups)
+        threshold: Minimum cosine similarity
+
+    Returns:
+        Tuple of (i, j, similarity) arrays of global row indices
+    """
+    found_i, found_j, found_s = [], [], []
+    labels = groups[indices]
+    for label in dict.fromkeys(labels):
+        members = indices[labels == label]
+        if len(members) < 2:
+            continue
+        sub = embeddings[members]
+        rows = max(64, BLOCK_ELEMENTS // len(members))
+        for start in range(0, len(members), rows):
+            stop = min(start + rows, len(members))
+            # Only the upper triangle: this block against itself and later rows
+            sims = sub[start:stop] @ sub[start:].T
+            r, c = np.nonzero(sims >= threshold)
+            keep = c > r
+            r, c = r[keep], c[keep]
+            found_s.append(sims[r, c])
+            found_i.append(members[start + r])
+            found_j.append(members[start + c])
+    if not found_i:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float32)
+    return np.concatenate(found_i), np.concatenate(found_j), np.concatenate(found_s)
+
+
+def clusters(size: int, pairs_i: np.ndarray, pairs_j: np.ndarray) -> List[np.ndarray]:
+    """Connected components (union-find) of the pair graph; singletons omitted."""
+    parent = list(range(size))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in zip(pairs_i.tolist(), pairs_j.tolist()):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for node in set(pairs_i.tolist()) | set(pairs_j.tolist()):
+        groups[find(node)].append(node)
+    return [np.array(sorted(members)) for _, members in sorted(groups.items())]
+
+
+def medoid(embeddings: np.ndarray, members: np.ndarray) -> int:
+    """Member closest to the cluster centroid."""
+    return int(members[np.argmax(embeddings[members] @ embeddings[members].mean(axis=0))])
+
+
+class Consolidator:
+    """Runs one consolidation cycle and collects the writes it implies."""
+
+    def __init__(self, memories: MemorySet, cycle: str = 'weekly', now: Optional[float] = None,
+                 principles: Optional[MemorySet] = None, existing_conflicts=(),
+                 previous_health: Optional[Dict[str, Any]] = None):
+        """
+        Initialize consolidator.
+
+        Args:
+            memories: All agent improvement memories
+            cycle: daily, weekly or monthly
+            now: Reference time (epoch seconds)
+            principles: Existing system_principles, with embeddings
+            existing_conflicts: IDs already in system_conflicts (not re-added)
+            previous_health: Last system_health_metrics record, for the trend
+        """
+        if cycle not in CYCLE_PHASES:
+            raise ValueError(f"Unknown cycle: {cycle}")
+        self.m = memories
+        self.cycle = cycle
+        self.phases = CYCLE_PHASES[cycle]
+        self.now = time.time() if now is None else now
+        self.principles = principles
+        self.existing_conflicts = set(existing_conflicts)
+        self.previous_health = previous_health or {}
+        self.updates: Dict[int, Dict[str, Any]] = {}
+        self.adds: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.deletes: Dict[str, List[str]] = defaultdict(list)
+        self.report: Dict[str, Any] = {'cycle': cycle, 'timings': {}}
+
+    # -- helpers -----------------------------------------------------------
+
+    def _update(self, row: int, **fields) -> None:
+        merged = self.updates.setdefault(row, dict(self.m.metadatas[row]))
+        merged.update(fields)
+
+    def _timed(self, name: str, func) -> None:
+        start = time.perf_counter()
+        func()
+        self.report['timings'][name] = time.perf_counter() - start
+
+    def run(self) -> Dict[str, Any]:
+        """Run the phases of this cycle; returns the report data."""
+        m = self.m
+        self.active = np.flatnonzero(~m.deprecated)
+        self._timed('inventory', self.inventory)
+        if 'patterns' in self.phases:
+            self._timed('pairs', self.find_pairs)
+            self._timed('patterns', self.cross_agent_patterns)
+        if 'merge' in self.phases:
+            self._timed('merge', self.merge_duplicates)
+        if 'schemas' in self.phases:
+            self._timed('schemas', self.form_schemas)
+        if self.phases & {'conflicts', 'conflict_scan'}:
+            self._timed('conflicts', self.detect_conflicts)
+        if 'decay' in self.phases:
+            self._timed('decay', self.temporal_dynamics)
+        if 'transfer' in self.phases:
+            self._timed('transfer', self.transfer_knowledge)
+        if 'failures' in self.phases:
+            self._timed('failures', self.analyze_failures)
+        if 'archive' in self.phases:
+            self._timed('archive', self.archive_cleanup)
+        self._timed('health', self.system_health)
+        return self.report
+
+    # -- Phase 1 -------------------------------------------------------------
+
+    def inventory(self) -> None:
+        m = self.m
+        rows = {}
+        for agent in sorted(set(m.agents.tolist())):
+            mask = m.agents == agent
+            rows[agent] = {
+                'total': int(mask.sum()),
+                'active': int((mask & ~m.deprecated).sum()),
+                'deprecated': int((mask & m.deprecated).sum()),
+                'high_confidence': int((mask & (m.confidence >= 0.8)).sum()),
+                'categories': sorted(set(m.categories[mask].tolist())),
+            }
+        self.report['inventory'] = rows
+
+    # -- Phase 2 -------------------------------------------------------------
+
+    def find_pairs(self) -> None:
+        """Similar active pairs within each category (shared by phases 2-4)."""
+        m = self.m
+        # Transferred principles opt out (consolidation_eligible: false)
+        self.pair_i, self.pair_j, self.pair_s = similar_pairs(
+            m.embeddings, self.active[m.eligible[self.active]], m.categories, CROSS_AGENT_SIMILARITY)
+        self.cross = m.agents[self.pair_i] != m.agents[self.pair_j]
+
+    def cross_agent_patterns(self) -> None:
+        """Group confident cross-agent pairs into patterns (connected components)."""
+        m = self.m
+        confident = np.maximum(m.confidence[self.pair_i], m.confidence[self.pair_j]) >= PATTERN_MIN_CONFIDENCE
+        chosen = self.cross & confident
+        patterns = []
+        for members in clusters(len(m), self.pair_i[chosen], self.pair_j[chosen]):
+            center = medoid(m.embeddings, members)
+            patterns.append({
+                'pattern': m.documents[center],
+                'ids': [m.ids[r] for r in members],
+                'agents': sorted(set(m.agents[members].tolist())),
+                'category': m.categories[center],
+                'similarity': float((m.embeddings[members] @ m.embeddings[center]).mean()),
+                'combined_confidence': float(m.confidence[members].mean()),
+            })
+            if 'decay' in self.phases:
+                for row in members[~m.cross_validated[members]].tolist():
+                    m.cross_validated[row] = True
+                    self._update(row, cross_validated=True)
+        patterns.sort(key=lambda p: (-len(p['agents']), -len(p['ids'])))
+        self.report['patterns'] = patterns
+
+    # -- merge ---------------------------------------------------------------
+
+    def merge_duplicates(self) -> None:
+        """Merge near-duplicates within one agent's collection into the strongest copy."""
+        m = self.m
+        dup = (self.pair_s >= DUPLICATE_SIMILARITY) & ~self.cross
+        strength = m.strength()
+        merged = 0
+        for members in clusters(len(m), self.pair_i[dup], self.pair_j[dup]):
+            # Strongest first; ties go to the oldest memory
+            order = np.lexsort((np.nan_to_num(m.created[members], nan=np.inf), -strength[members]))
+            keeper, rest = int(members[order[0]]), members[order[1:]]
+            usage = int(m.usage[members].sum())
+            successes = int(m.successes[members].sum())
+            fields = {
+                'usage_count': usage,
+                'success_count': successes,
+                'confidence': float(m.confidence[members].max()),
+                'merged_count': int(m.metadatas[keeper].get('merged_count', 0)) + len(rest),
+            }
+            if usage:
+                fields['success_rate'] = successes / usage
+                m.success_rate[keeper] = fields['success_rate']
+            m.usage[keeper], m.successes[keeper] = usage, successes
+            m.confidence[keeper] = fields['confidence']
+            self._update(keeper, **fields)
+            for row in rest.tolist():
+                m.deprecated[row] = True
+                self._update(row, deprecated=True, merged_into=m.ids[keeper],
+                             deprecated_reason=f"Merged into {m.ids[keeper]}",
+                             deprecated_at=_iso(self.now))
+            merged += len(rest)
+        self.report['merged'] = merged
+        self.active = np.flatnonzero(~m.deprecated)
+
+    # -- Phase 3 -------------------------------------------------------------
+
+    def form_schemas(self) -> None:
+        m = self.m
+        live = ~m.deprecated[self.pair_i] & ~m.deprecated[self.pair_j]
+        schemas = []
+        for members in clusters(len(m), self.pair_i[live], self.pair_j[live]):
+            agents = sorted(set(m.agents[members].tolist()))
+            if len(members) < SCHEMA_MIN_EXAMPLES or len(agents) < 2:
+                continue
+            center = medoid(m.embeddings, members)
+            category = m.categories[center]
+            centroid = m.embeddings[members].mean(axis=0)
+            schema = {
+                'id': _stable_id(f"principle_{category}", (m.ids[r] for r in members)),
+                'principle': m.documents[center],
+                'embedding': (centroid / (np.linalg.norm(centroid) or 1)).tolist(),
+                'metadata': {
+                    'category': category,
+                    'confidence': float(min(m.confidence[members].mean(), CONFIDENCE_CAP)),
+                    'validation_count': int(len(members)),
+                    'contexts_validated': ','.join(agents),
+                    'evidence_ids': ','.join(m.ids[r] for r in members[:50]),
+                    'created_at': _iso(self.now),
+                },
+            }
+            schemas.append(schema)
+            self.adds['system_principles'].append(
+                {'id': schema['id'], 'document': schema['principle'],
+                 'metadata': schema['metadata'], 'embedding': schema['embedding']})
+        self.report['schemas'] = schemas
+
+    # -- Phase 4 -------------------------------------------------------------
+
+    def detect_conflicts(self) -> None:
+        m = self.m
+        live = ~m.deprecated[self.pair_i] & ~m.deprecated[self.pair_j]
+        opposed = m.negated[self.pair_i] != m.negated[self.pair_j]
+        strength = m.strength()
+        conflicts = []
+        candidates = np.flatnonzero(self.cross & live & opposed)
+        # Most similar opposing pair first; each memory joins at most one conflict
+        taken = np.zeros(len(m), dtype=bool)
+        for k in candidates[np.argsort(-self.pair_s[candidates], kind='stable')]:
+            i, j = int(self.pair_i[k]), int(self.pair_j[k])
+            if taken[i] or taken[j]:
+                continue
+            taken[i] = taken[j] = True
+            if strength[i] > strength[j] * STRENGTH_RATIO:
+                resolution = ('DEPRECATE_B', 'A has significantly more validation')
+            elif strength[j] > strength[i] * STRENGTH_RATIO:
+                resolution = ('DEPRECATE_A', 'B has significantly more validation')
+            else:
+                resolution = ('CONTEXT_SPLIT', 'Both valid - may apply in different contexts')
+            floor = min(m.confidence[i], m.confidence[j])
+            severity = 'critical' if floor >= 0.8 else 'medium' if floor >= 0.6 else 'low'
+            conflict_id = _stable_id('conflict', (m.ids[i], m.ids[j]))
+            conflict = {
+                'id': conflict_id,
+                'improvement_a': m.ids[i], 'agent_a': m.agents[i],
+                'improvement_b': m.ids[j], 'agent_b': m.agents[j],
+                'category': m.categories[i],
+                'contradiction_score': float(self.pair_s[k]),
+                'resolution': resolution[0], 'resolution_reason': resolution[1],
+                'severity': severity,
+                'detected_at': _iso(self.now),
+                'status': 'pending',
+            }
+            conflicts.append(conflict)
+            if 'conflicts' in self.phases and conflict_id not in self.existing_conflicts:
+                self.adds['system_conflicts'].append({
+                    'id': conflict_id,
+                    'document': f"{m.documents[i]}\n---\n{m.documents[j]}",
+                    'metadata': {k: v for k, v in conflict.items() if k != 'id'},
+                })
+        self.report['conflicts'] = conflicts
+
+    # -- Phase 5 -------------------------------------------------------------
+
+    def temporal_dynamics(self) -> None:
+        m = self.m
+        rows = self.active
+        created = np.where(np.isnan(m.created[rows]), self.now, m.created[rows])
+        last = np.where(np.isnan(m.last_used[rows]), created, m.last_used[rows])
+        idle_days = np.maximum(self.now - last, 0.0) / SECONDS_PER_DAY
+
+        decay = 0.5 ** (idle_days / DECAY_HALF_LIFE_DAYS)
+        boost = (np.where(m.usage[rows] > 10, 1.2, 1.0)
+                 * np.where(np.nan_to_num(m.success_rate[rows]) > 0.8, 1.1, 1.0)
+                 * np.where(m.cross_validated[rows], 1.3, 1.0))
+        adjusted = np.minimum(CONFIDENCE_CAP, m.base_confidence[rows] * decay * boost)
+        delta = adjusted - m.confidence[rows]
+
+        moved = np.abs(delta) > ADJUST_THRESHOLD
+        changed = rows[moved]
+        for row, value, diff in zip(changed.tolist(), adjusted[moved].tolist(), delta[moved].tolist()):
+            self._update(row, confidence=value, base_confidence=float(m.base_confidence[row]),
+                         decay_applied_at=_iso(self.now), temporal_adjustment=diff)
+            m.confidence[row] = value
+
+        expired = rows[adjusted < DEPRECATE_BELOW]
+        for row in expired.tolist():
+            m.deprecated[row] = True
+            self._update(row, deprecated=True, deprecated_at=_iso(self.now),
+                         deprecated_reason='Temporal decay - confidence dropped below threshold')
+        self.report['temporal'] = {'adjusted': int(len(changed)), 'deprecated': int(len(expired))}
+        self.active = np.flatnonzero(~m.deprecated)
+
+    # -- Phase 6 -------------------------------------------------------------
+
+    def transfer_knowledge(self) -> None:
+        m = self.m
+        candidates = [(s['id'], s['principle'], np.asarray(s['embedding'], dtype=np.float32), s['metadata'])
+                      for s in self.report.get('schemas', [])]
+        seen = {c[0] for c in candidates}
+        if self.principles is not None:
+            p = self.principles
+            for row in range(len(p)):
+                if p.ids[row] not in seen:
+                    candidates.append((p.ids[row], p.documents[row], p.embeddings[row], p.metadatas[row]))
+        eligible = [c for c in candidates
+                    if int(c[3].get('validation_count', 0)) >= TRANSFER_MIN_VALIDATION
+                    and float(c[3].get('confidence', 0)) >= TRANSFER_MIN_CONFIDENCE]
+
+        if not eligible or not len(self.active):
+            self.report['transfers'] = []
+            return
+        # Relevance to an agent = best similarity to any of its active memories,
+        # taken per agent with one reduceat over memories sorted by agent
+        rows = self.active[np.argsort(m.agents[self.active], kind='stable')]
+        agents, starts = np.unique(m.agents[rows], return_index=True)
+        vectors = np.stack([c[2] for c in eligible])
+        relevance = np.concatenate([
+            np.maximum.reduceat(vectors[lo:lo + 256] @ m.embeddings[rows].T, starts, axis=1)
+            for lo in range(0, len(vectors), 256)])
+
+        existing = set(m.ids)
+        collection_of = {m.agents[r]: m.collections[r] for r in range(len(m))}
+        transfers = []
+        for p_idx, a_idx in zip(*np.nonzero(relevance > TRANSFER_RELEVANCE)):
+            pid, document, vector, meta = eligible[p_idx]
+            agent = agents[a_idx]
+            new_id = f"transferred_{pid}_to_{agent}"
+            if agent in meta.get('contexts_validated', '').split(',') or new_id in existing:
+                continue
+            self.adds[collection_of[agent]].append({
+                'id': new_id, 'document': document, 'embedding': vector.tolist(),
+                'metadata': {
+                    'agent_name': agent,
+                    'category': meta.get('category', 'uncategorized'),
+                    'confidence': float(meta.get('confidence', 0)) * TRANSFER_DISCOUNT,
+                    'source': 'system_principles',
+                    'original_id': pid,
+                    'transferred_at': _iso(self.now),
+                    'created_at': _iso(self.now),
+                    'usage_count': 0,
+                    'cross_validated': True,
+                    'consolidation_eligible': False,
+                },
+            })
+            transfers.append({'principle': pid, 'agent': agent, 'relevance': float(relevance[p_idx, a_idx])})
+        self.report['transfers'] = transfers
+
+    # -- Phase 7 -------------------------------------------------------------
+
+    def analyze_failures(self) -> None:
+        m = self.m
+        # Memories deprecated before this run (merged copies are not failures)
+        failed = np.array([r for r in np.flatnonzero(m.deprecated).tolist()
+                           if r not in self.updates and not m.metadatas[r].get('merged_into')], dtype=np.int64)
+        fi, fj, _ = similar_pairs(m.embeddings, failed, m.categories, FAILURE_SIMILARITY)
+        themes = []
+        for members in clusters(len(m), fi, fj):
+            center = medoid(m.embeddings, members)
+            reasons = Counter(m.metadatas[r].get('deprecated_reason') or 'Low success rate' for r in members)
+            reason, _ = reasons.most_common(1)[0]
+            lifespans = [(to_epoch(m.metadatas[r].get('deprecated_at'), np.nan) - m.created[r]) / SECONDS_PER_DAY
+                         for r in members]
+            lifespans = [d for d in lifespans if not np.isnan(d)]
+            theme = {
+                'id': _stable_id('failure_theme', (m.ids[r] for r in members)),
+                'description': m.documents[center],
+                'count': int(len(members)),
+                'agents': sorted(set(m.agents[members].tolist())),
+                'category': m.categories[center],
+                'lesson': f"{len(members)} similar improvements deprecated: {reason}",
+                'median_lifespan_days': float(np.median(lifespans)) if lifespans else None,
+            }
+            themes.append(theme)
+            self.adds['system_deprecated_analysis'].append({
+                'id': theme['id'], 'document': theme['description'],
+                'metadata': {
+                    'theme': theme['category'], 'occurrence_count': theme['count'],
+                    'affected_agents': ','.join(theme['agents']), 'common_category': theme['category'],
+                    'lesson_learned': theme['lesson'], 'analyzed_at': _iso(self.now),
+                },
+            })
+        themes.sort(key=lambda t: -t['count'])
+        self.report['failures'] = themes
+
+    # -- monthly archive ---------------------------------------------------
+
+    def archive_cleanup(self) -> None:
+        """Delete memories deprecated for longer than ARCHIVE_DAYS."""
+        m = self.m
+        cutoff = self.now - ARCHIVE_DAYS * SECONDS_PER_DAY
+        removed = 0
+        for row in np.flatnonzero(m.deprecated).tolist():
+            if row in self.updates:
+                continue
+            when = to_epoch(m.metadatas[row].get('deprecated_at'),
+                            default=m.last_used[row] if not np.isnan(m.last_used[row]) else m.created[row])
+            if not np.isnan(when) and when < cutoff:
+                self.deletes[m.collections[row]].append(m.ids[row])
+                removed += 1
+        self.report['archived'] = removed
+
+    # -- health --------------------------------------------------------------
+
+    def system_health(self) -> None:
+        m = self.m
+        usage = m.usage.sum()
+        active = self.active
+        success_rate = float(m.successes.sum() / usage) if usage else None
+        health = {
+            'success_rate': success_rate,
+            'avg_confidence': float(m.confidence[active].mean()) if len(active) else None,
+            'efficiency': float(len(active) / max(len(active) + self.report.get('merged', 0), 1)),
+            'active': int(len(active)),
+            'total': int(len(m)),
+            'trend': 'stable',
+        }
+        previous = self.previous_health.get('success_rate')
+        if success_rate is not None and previous is not None:
+            if success_rate > previous + 0.02:
+                health['trend'] = 'improving'
+            elif success_rate < previous - 0.02:
+                health['trend'] = 'declining'
+            health['anomaly'] = success_rate < previous - 0.10
+        self.report['health'] = health
+        run_id = f"health_{self.cycle}_{_iso(self.now)}"
+        self.adds['system_health_metrics'].append({
+            'id': run_id,
+            'document': f"{self.cycle} consolidation {_iso(self.now)}",
+            'metadata': {'cycle': self.cycle, 'run_at': _iso(self.now), 'run_epoch': self.now,
+                         **{k: v for k, v in health.items() if v is not None}},
+        })
+
+
+def render_report(report: Dict[str, Any], now: float) -> str:
+    """Phase 8 markdown report."""
+    lines = [f"## Memory Consolidation Report - {_iso(now)[:10]}", "",
+             f"### Consolidation Type: {report['cycle']}", "", "### Inventory Summary",
+             "| Agent | Total | Active | Deprecated | High Confidence |",
+             "|-------|-------|--------|------------|-----------------|"]
+    for agent, row in report['inventory'].items():
+        lines.append(f"| {agent} | {row['total']} | {row['active']} | {row['deprecated']} | {row['high_confidence']} |")
+
+    patterns = report.get('patterns', [])
+    lines += ["", "### Cross-Agent Patterns Detected", f"- **{len(patterns)} patterns** found across multiple agents"]
+    if patterns:
+        top = patterns[0]
+        agents = ', '.join(top['agents'][:5]) + (f" +{len(top['agents']) - 5} more" if len(top['agents']) > 5 else '')
+        lines.append(f"- Top pattern: \"{top['pattern'][:120]}\" (agents: {agents})")
+    if 'merged' in report:
+        lines.append(f"- **{report['merged']} near-duplicates** merged into their strongest copy")
+
+    schemas = report.get('schemas', [])
+    lines += ["", "### Schemas Formed", f"- **{len(schemas)} new principles** abstracted from concrete improvements"]
+    if schemas:
+        lines.append(f"- Categories: {', '.join(sorted({s['metadata']['category'] for s in schemas}))}")
+
+    conflicts = report.get('conflicts', [])
+    severity = Counter(c['severity'] for c in conflicts)
+    lines += ["", "### Conflicts Detected", f"- **{len(conflicts)} conflicts** requiring resolution",
+              f"- Critical: {severity['critical']} | Medium: {severity['medium']} | Low: {severity['low']}"]
+
+    temporal = report.get('temporal', {'adjusted': 0, 'deprecated': 0})
+    lines += ["", "### Temporal Adjustments",
+              f"- **{temporal['adjusted']} improvements** had confidence adjusted",
+              f"- **{temporal['deprecated']} improvements** auto-deprecated due to decay"]
+    if 'archived' in report:
+        lines.append(f"- **{report['archived']} deprecated improvements** archived (older than {ARCHIVE_DAYS} days)")
+
+    transfers = report.get('transfers', [])
+    lines += ["", "### Knowledge Transfers", f"- **{len(transfers)} principles** transferred to new agents",
+              f"- Agents receiving transfers: {', '.join(sorted({t['agent'] for t in transfers})) or 'none'}"]
+
+    failures = report.get('failures', [])
+    lines += ["", "### Failure Analysis", f"- **{len(failures)} failure themes** identified"]
+    if failures:
+        lines.append(f"- Top lesson: \"{failures[0]['lesson']}\"")
+
+    health = report['health']
+    pct = lambda v: 'n/a' if v is None else f"{v * 100:.1f}%"
+    lines += ["", "### System Health",
+              f"- Overall success rate: {pct(health['success_rate'])}",
+              f"- Average active confidence: {pct(health['avg_confidence'])}",
+              f"- Knowledge base efficiency: {pct(health['efficiency'])}",
+              f"- Trend: {health['trend']}"]
+
+    recommendations = []
+    if health.get('anomaly'):
+        recommendations.append("Success rate dropped more than 10 points since the last run: run a weekly consolidation")
+    if severity['critical']:
+        recommendations.append(f"Resolve {severity['critical']} critical conflicts in system_conflicts")
+    if report['cycle'] == 'daily' and patterns:
+        recommendations.append("Cross-agent patterns pending: the weekly cycle will form schemas from them")
+    if temporal['deprecated']:
+        recommendations.append("Review decayed improvements; re-validate any that are still in use")
+    if failures:
+        recommendations.append(f"Check new improvements in {failures[0]['category']} against the top failure theme")
+    recommendations = recommendations or ["No action needed"]
+    lines += ["", "### Recommendations"] + [f"{n}. {r}" for n, r in enumerate(recommendations[:3], 1)]
+
+    timings = ', '.join(f"{k} {v:.2f}s" for k, v in report['timings'].items())
+    lines += ["", f"_Phase timings: {timings}_", ""]
+    return '\n'.join(lines)
+
+
+# -- ChromaDB I/O -------------------------------------------------------------
+
+def _page(collection, where=None) -> List[Dict[str, Any]]:
+    records, offset = [], 0
+    while True:
+        kwargs = {'include': ['embeddings', 'metadatas', 'documents'], 'limit': PAGE_SIZE, 'offset': offset}
+        if where:
+            kwargs['where'] = where
+        page = collection.get(**kwargs)
+        if not len(page['ids']):
+            return records
+        for k, record_id in enumerate(page['ids']):
+            records.append({'id': record_id, 'document': page['documents'][k],
+                            'metadata': page['metadatas'][k], 'embedding': page['embeddings'][k]})
+        offset += len(page['ids'])
+
+
+def _collection_names(client) -> List[str]:
+    return sorted(c if isinstance(c, str) else c.name for c in client.list_collections())
+
+
+def load(client) -> Tuple[MemorySet, Optional[MemorySet], List[str], Dict[str, Any]]:
+    """Load improvements, existing principles, existing conflict IDs and the last health record."""
+    records = []
+    names = _collection_names(client)
+    for name in names:
+        match = IMPROVEMENTS_PATTERN.match(name)
+        if match:
+            for record in _page(client.get_collection(name)):
+                records.append({**record, 'collection': name, 'agent': match.group(1)})
+    principles = None
+    if 'system_principles' in names:
+        rows = [{**r, 'collection': 'system_principles', 'agent': 'system'}
+                for r in _page(client.get_collection('system_principles'))]
+        principles = MemorySet(rows) if rows else None
+    conflicts: List[str] = []
+    if 'system_conflicts' in names:
+        conflicts = client.get_collection('system_conflicts').get(include=[])['ids']
+    previous: Dict[str, Any] = {}
+    if 'system_health_metrics' in names:
+        metas = client.get_collection('system_health_metrics').get(include=['metadatas'])['metadatas']
+        if metas:
+            previous = max(metas, key=lambda meta: meta.get('run_epoch', 0))
+    return MemorySet(records), principles, conflicts, previous
+
+
+def apply(client, consolidator: Consolidator, batch_size: int = PAGE_SIZE) -> None:
+    """Write updates, additions and deletions back to ChromaDB in batches."""
+    m = consolidator.m
+    by_collection: Dict[str, List[int]] = defaultdict(list)
+    for row in consolidator.updates:
+        by_collection[m.collections[row]].append(row)
+    for name, rows in by_collection.items():
+        collection = client.get_collection(name)
+        for lo in range(0, len(rows), batch_size):
+            chunk = rows[lo:lo + batch_size]
+            collection.update(ids=[m.ids[r] for r in chunk],
+                              metadatas=[_clean(consolidator.updates[r]) for r in chunk])
+    for name, items in consolidator.adds.items():
+        collection = client.get_or_create_collection(name)
+        for lo in range(0, len(items), batch_size):
+            chunk = items[lo:lo + batch_size]
+            kwargs = {'ids': [i['id'] for i in chunk], 'documents': [i['document'] for i in chunk],
+                      'metadatas': [_clean(i['metadata']) for i in chunk]}
+            if all('embedding' in i for i in chunk):
+                kwargs['embeddings'] = [i['embedding'] for i in chunk]
+            collection.upsert(**kwargs)
+    for name, ids in consolidator.deletes.items():
+        collection = client.get_collection(name)
+        for lo in range(0, len(ids), batch_size):
+            collection.delete(ids=ids[lo:lo + batch_size])
+
+
+# -- benchmark ----------------------------------------------------------------
+
+def synthetic(size: int, dim: int, agents: int, categories: int, seed: int, now: float) -> MemorySet:
+    """Synthetic memories: topic clusters shared across agents plus planted duplicates."""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((max(size // 50, 1), dim)).astype(np.float32)
+    topic = rng.integers(0, len(topics), size)
+    emb = topics[topic] + rng.standard_normal((size, dim)).astype(np.float32) * 0.75
+    dupes = rng.choice(size, size // 20, replace=False)
+    emb[dupes] = emb[(dupes + 1) % size] + rng.standard_normal((len(dupes), dim)).astype(np.float32) * 0.05
+    agent = rng.integers(0, agents, size)
+    agent[dupes] = agent[(dupes + 1) % size]
+    category = topic % categories
+    category[dupes] = category[(dupes + 1) % size]
+    usage = rng.poisson(8, size)
+    records = []
+    for k in range(size):
+        successes = int(rng.binomial(usage[k], 0.75)) if usage[k] else 0
+        deprecated = rng.random() < 0.08
+        records.append({
+            'id': f"imp_{k}", 'collection': f"agent_a{agent[k]}_improvements", 'agent': f"a{agent[k]}",
+            'document': ("Avoid " if rng.random() < 0.2 else "Prefer ") + f"approach {topic[k]}",
+            'embedding': emb[k],
+            'metadata': {
+                'category': f"c{category[k]}", 'confidence': float(rng.uniform(0.5, 0.95)),
+                'usage_count': int(usage[k]), 'success_count': successes,
+                'success_rate': successes / usage[k] if usage[k] else 0.0,
+                'created_at': _iso(now - rng.uniform(0, 400) * SECONDS_PER_DAY),
+                'last_used': _iso(now - rng.exponential(40) * SECONDS_PER_DAY),
+                'deprecated': bool(deprecated),
+                **({'deprecated_at': _iso(now - rng.uniform(0, 500) * SECONDS_PER_DAY)} if deprecated else {}),
+            },
+        })
+    return MemorySet(records)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Deterministic memory consolidation over ChromaDB')
+    parser.add_argument('cycle', choices=['daily', 'weekly', 'monthly', 'bench'],
+                        help='Consolidation cycle, or bench for a synthetic timing run')
+    parser.add_argument('--chroma-dir', default=str(CHROMA_DIR), help='ChromaDB data directory')
+    parser.add_argument('--dry-run', action='store_true', help='Report only; write nothing back')
+    parser.add_argument('--output', help='Write the report to this file')
+    parser.add_argument('--size', type=int, default=100_000, help='bench: memories (default: 100,000)')
+    parser.add_argument('--dim', type=int, default=384, help='bench: embedding dimension (default: 384)')
+    parser.add_argument('--bench-cycle', default='weekly', choices=list(CYCLE_PHASES), help='bench: cycle')
+    parser.add_argument('--seed', type=int, default=42, help='bench: random seed (default: 42)')
+
+    args = parser.parse_args()
+    now = time.time()
+
+    if args.cycle == 'bench':
+        start = time.perf_counter()
+        memories = synthetic(args.size, args.dim, agents=20, categories=12, seed=args.seed, now=now)
+        print(f"Generated {len(memories):,} memories in {time.perf_counter() - start:.1f} s")
+        consolidator = Consolidator(memories, args.bench_cycle, now=now)
+        start = time.perf_counter()
+        report = consolidator.run()
+        elapsed = time.perf_counter() - start
+        text = render_report(report, now)
+        print(text)
+        print(f"{args.bench_cycle} consolidation of {len(memories):,} memories: {elapsed:.1f} s, "
+              f"{len(consolidator.updates):,} updates, "
+              f"{sum(len(v) for v in consolidator.adds.values()):,} additions")
+        return
+
+    client = _chromadb().PersistentClient(path=args.chroma_dir)
+    memories, principles, conflicts, previous = load(client)
+    if not len(memories):
+        print("No agent_*_improvements collections found. Nothing to consolidate.")
+        return
+    consolidator = Consolidator(memories, args.cycle, now=now, principles=principles,
+                                existing_conflicts=conflicts, previous_health=previous)
+    text = render_report(consolidator.run(), now)
+    if not args.dry_run:
+        apply(client, consolidator)
+    if args.output:
+        Path(args.output).write_text(text)
+    print(text)
+    if args.dry_run:
+        print(f"(dry run: {len(consolidator.updates)} updates, "
+              f"{sum(len(v) for v in consolidator.adds.values())} additions, "
+              f"{sum(len(v) for v in consolidator.deletes.values())} deletions not written)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Incremental performance-metrics rollups for agent memory (Collection 3).
+
+`trackPerformanceMetrics` and the Agent Memory Dashboard recompute their
+aggregates by fetching every recent self-evaluation. This store keeps the
+aggregates up to date as each outcome or evaluation arrives instead:
+
+- One row per (agent, task_type, day) with running counts, success count,
+  quality / token / insight sums and a latency quantile sketch.
+- Every event also updates the `*` rows (all task types, all time), so the
+  all-time view is a single row and a 30-day view is at most 30 rows,
+  regardless of how many evaluations were stored.
+- Latency quantiles use a log-bucketed sketch (2% relative error) that merges
+  by adding bucket counts, so day rows combine exactly into window quantiles.
+
+Events carrying an `id` are recorded at most once, so re-ingesting the
+outcome log is safe. `ingest` tails `skill_outcomes.jsonl` from the last byte
+offset it read.
+
+The store is a SQLite file (standard library, safe for concurrent hook
+writers); counters are plain columns updated with UPSERT.
+
+Usage:
+    python metrics_rollup.py record research-specialist --task-type research --success \\
+        --quality 85 --time-ms 42000 --tokens 12000 --insights 1
+    python metrics_rollup.py ingest
+    python metrics_rollup.py summary research-specialist --days 30
+    python metrics_rollup.py dashboard
+    python metrics_rollup.py bench --events 200000
+"""
+
+import argparse
+import json
+import math
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+DB_FILE = Path.home() / ".claude" / "logs" / "agent_metrics.db"
+OUTCOMES_LOG = Path.home() / ".claude" / "logs" / "skill_outcomes.jsonl"
+ALL = '*'
+RELATIVE_ACCURACY = 0.02
+DEFAULT_WINDOW_DAYS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    agent TEXT NOT NULL,
+    task_type TEXT NOT NULL,
+    day TEXT NOT NULL,
+    tasks INTEGER NOT NULL DEFAULT 0,
+    successes INTEGER NOT NULL DEFAULT 0,
+    quality_n INTEGER NOT NULL DEFAULT 0,
+    quality_sum REAL NOT NULL DEFAULT 0,
+    time_n INTEGER NOT NULL DEFAULT 0,
+    time_sum REAL NOT NULL DEFAULT 0,
+    tokens_n INTEGER NOT NULL DEFAULT 0,
+    tokens_sum REAL NOT NULL DEFAULT 0,
+    insights INTEGER NOT NULL DEFAULT 0,
+    latency_sketch TEXT NOT NULL DEFAULT '{}',
+    updated_at TEXT,
+    PRIMARY KEY (agent, task_type, day)
+);
+CREATE TABLE IF NOT EXISTS seen_events (id TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS ingest_offsets (path TEXT PRIMARY KEY, offset INTEGER NOT NULL);
+"""
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded relative error; merge = add counts."""
+
+    def __init__(self, buckets: Optional[Dict[int, int]] = None, accuracy: float = RELATIVE_ACCURACY):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = dict(buckets or {})
+        self.zeros = 0
+
+    @classmethod
+    def from_json(cls, text: str) -> 'QuantileSketch':
+        raw = json.loads(text or '{}')
+        sketch = cls({int(k): v for k, v in raw.get('b', {}).items()})
+        sketch.zeros = raw.get('z', 0)
+        return sketch
+
+    def to_json(self) -> str:
+        return json.dumps({'b': self.buckets, 'z': self.zeros}, separators=(',', ':'))
+
+    @property
+    def count(self) -> int:
+        return self.zeros + sum(self.buckets.values())
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            self.zeros += count
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zeros += other.zeros
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0-1), within the relative accuracy; None if empty."""
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Midpoint of (gamma^(k-1), gamma^k] in relative terms
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+def _day(timestamp: Any) -> str:
+    if isinstance(timestamp, (int, float)):
+        return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+    if isinstance(timestamp, str) and timestamp:
+        try:
+            parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc)
+            return parsed.strftime('%Y-%m-%d')
+        except ValueError:
+            pass
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+class MetricsRollup:
+    """SQLite-backed incremental rollups keyed by agent, task type and day."""
+
+    def __init__(self, path: str = str(DB_FILE)):
+        """
+        Open (and create) the rollup store.
+
+        Args:
+            path: SQLite file, or ':memory:'
+        """
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- writes --------------------------------------------------------------
+
+    def _apply(self, event: Dict[str, Any], pending: Dict[tuple, list]) -> bool:
+        """Add one event's deltas to the pending per-row totals of this batch."""
+        event_id = event.get('id')
+        if event_id is not None:
+            if self.conn.execute('INSERT OR IGNORE INTO seen_events (id) VALUES (?)',
+                                 (str(event_id),)).rowcount == 0:
+                return False
+
+        agent = event.get('agent') or event.get('agent_name') or 'unknown'
+        task_type = event.get('task_type') or 'unknown'
+        day = _day(event.get('timestamp'))
+        quality = event.get('quality_score', event.get('quality'))
+        time_ms = event.get('time_taken_ms', event.get('time_ms'))
+        tokens = event.get('tokens_used', event.get('tokens'))
+        success = event.get('success')
+        if isinstance(success, str):
+            success = success.lower() == 'true'
+        deltas = (
+            1, 1 if success else 0,
+            0 if quality is None else 1, quality or 0,
+            0 if time_ms is None else 1, time_ms or 0,
+            0 if tokens is None else 1, tokens or 0,
+            int(event.get('insights_count', event.get('insights', 0)) or 0),
+        )
+        for key in {(agent, task_type, day), (agent, ALL, day), (agent, task_type, ALL), (agent, ALL, ALL)}:
+            row = pending.get(key)
+            if row is None:
+                row = pending[key] = [0] * len(deltas) + [None]
+            for k, value in enumerate(deltas):
+                row[k] += value
+            if time_ms is not None:
+                if row[-1] is None:
+                    row[-1] = QuantileSketch()
+                row[-1].add(float(time_ms))
+        return True
+
+    def _flush(self, pending: Dict[tuple, list]) -> None:
+        """One UPSERT (and at most one sketch merge) per touched row."""
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        for key, row in pending.items():
+            self.conn.execute("""
+                INSERT INTO rollups (agent, task_type, day, tasks, successes, quality_n, quality_sum,
+                                     time_n, time_sum, tokens_n, tokens_sum, insights, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (agent, task_type, day) DO UPDATE SET
+                    tasks = tasks + excluded.tasks,
+                    successes = successes + excluded.successes,
+                    quality_n = quality_n + excluded.quality_n,
+                    quality_sum = quality_sum + excluded.quality_sum,
+                    time_n = time_n + excluded.time_n,
+                    time_sum = time_sum + excluded.time_sum,
+                    tokens_n = tokens_n + excluded.tokens_n,
+                    tokens_sum = tokens_sum + excluded.tokens_sum,
+                    insights = insights + excluded.insights,
+                    updated_at = excluded.updated_at
+            """, (*key, *row[:-1], now))
+            if row[-1] is not None:
+                stored = self.conn.execute(
+                    'SELECT latency_sketch FROM rollups WHERE agent = ? AND task_type = ? AND day = ?',
+                    key).fetchone()
+                sketch = QuantileSketch.from_json(stored['latency_sketch']).merge(row[-1])
+                self.conn.execute(
+                    'UPDATE rollups SET latency_sketch = ? WHERE agent = ? AND task_type = ? AND day = ?',
+                    (sketch.to_json(), *key))
+
+    def record(self, agent: str, task_type: str, success: bool, timestamp: Any = None,
+               quality: Optional[float] = None, time_ms: Optional[float] = None,
+               tokens: Optional[float] = None, insights: int = 0, event_id: Optional[str] = None) -> bool:
+        """
+        Fold one outcome or self-evaluation into the rollups.
+
+        Returns:
+            False if an event with this ID was already recorded
+        """
+        return self.record_many([{
+            'id': event_id, 'agent': agent, 'task_type': task_type, 'success': success,
+            'timestamp': timestamp, 'quality_score': quality, 'time_taken_ms': time_ms,
+            'tokens_used': tokens, 'insights_count': insights,
+        }]) == 1
+
+    def record_many(self, events: Iterable[Dict[str, Any]]) -> int:
+        """Fold events (evaluation metadata or outcome log entries) in one transaction."""
+        recorded = 0
+        pending: Dict[tuple, list] = {}
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            for event in events:
+                recorded += self._apply(event, pending)
+            self._flush(pending)
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return recorded
+
+    def ingest(self, log_path: str = str(OUTCOMES_LOG), batch_size: int = 1000) -> int:
+        """Fold new lines of a JSONL outcome log, resuming from the stored byte offset."""
+        path = str(Path(log_path).resolve())
+        row = self.conn.execute('SELECT offset FROM ingest_offsets WHERE path = ?', (path,)).fetchone()
+        offset = row['offset'] if row else 0
+        try:
+            size = Path(path).stat().st_size
+        except FileNotFoundError:
+            return 0
+        if size < offset:
+            offset = 0  # log was rotated or truncated
+        recorded = 0
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            batch: List[Dict[str, Any]] = []
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partial line still being written
+                offset += len(line)
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    continue
+                if len(batch) >= batch_size:
+                    recorded += self.record_many(batch)
+                    batch = []
+            recorded += self.record_many(batch)
+        self.conn.execute('INSERT INTO ingest_offsets (path, offset) VALUES (?, ?) '
+                          'ON CONFLICT (path) DO UPDATE SET offset = excluded.offset', (path, offset))
+        return recorded
+
+    # -- reads ---------------------------------------------------------------
+
+    @staticmethod
+    def _combine(rows: List[sqlite3.Row]) -> Dict[str, Any]:
+        totals = {k: sum(r[k] for r in rows) for k in
+                  ('tasks', 'successes', 'quality_n', 'quality_sum', 'time_n', 'time_sum',
+                   'tokens_n', 'tokens_sum', 'insights')}
+        sketch = QuantileSketch()
+        for r in rows:
+            sketch.merge(QuantileSketch.from_json(r['latency_sketch']))
+        ratio = lambda num, den: totals[num] / totals[den] if totals[den] else None
+        return {
+            'total_tasks': totals['tasks'],
+            'successful_tasks': totals['successes'],
+            'success_rate': ratio('successes', 'tasks'),
+            'avg_quality': ratio('quality_sum', 'quality_n'),
+            'avg_time_ms': ratio('time_sum', 'time_n'),
+            'p50_time_ms': sketch.quantile(0.50),
+            'p90_time_ms': sketch.quantile(0.90),
+            'p99_time_ms': sketch.quantile(0.99),
+            'avg_tokens': ratio('tokens_sum', 'tokens_n'),
+            'total_insights': totals['insights'],
+        }
+
+    def summary(self, agent: str, task_type: str = ALL, days: Optional[int] = DEFAULT_WINDOW_DAYS,
+                now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Aggregates for one agent (and task type) over the last `days` days.
+
+        Reads at most `days` day rows (or the single all-time row when days is
+        None), never individual evaluations. Field names follow
+        trackPerformanceMetrics; quality_trend compares the newer half of the
+        window with the older half.
+        """
+        if days is None:
+            rows = self.conn.execute('SELECT * FROM rollups WHERE agent = ? AND task_type = ? AND day = ?',
+                                     (agent, task_type, ALL)).fetchall()
+            metrics = self._combine(rows)
+            metrics.update({'agent_name': agent, 'task_type': task_type, 'period': 'all_time'})
+            return metrics
+
+        now = now or datetime.now(timezone.utc)
+        start = (now - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        mid = (now - timedelta(days=days // 2 - 1)).strftime('%Y-%m-%d') if days > 1 else start
+        rows = self.conn.execute(
+            'SELECT * FROM rollups WHERE agent = ? AND task_type = ? AND day >= ? AND day != ? ORDER BY day',
+            (agent, task_type, start, ALL)).fetchall()
+        metrics = self._combine(rows)
+        newer = self._combine([r for r in rows if r['day'] >= mid])['avg_quality']
+        older = self._combine([r for r in rows if r['day'] < mid])['avg_quality']
+        metrics['quality_trend'] = newer - older if newer is not None and older is not None else 0.0
+        metrics['improving'] = bool(metrics['quality_trend'] > 0 and (metrics['success_rate'] or 0) > 0.7)
+        metrics.update({'agent_name': agent, 'task_type': task_type, 'period': f"{days}_days"})
+        return metrics
+
+    def agents(self) -> List[str]:
+        return [r['agent'] for r in self.conn.execute(
+            'SELECT agent FROM rollups WHERE task_type = ? AND day = ? ORDER BY agent', (ALL, ALL))]
+
+    def task_types(self, agent: str) -> List[str]:
+        return [r['task_type'] for r in self.conn.execute(
+            'SELECT task_type FROM rollups WHERE agent = ? AND day = ? AND task_type != ? ORDER BY task_type',
+            (agent, ALL, ALL))]
+
+    def dashboard(self, agent: str, days: int = DEFAULT_WINDOW_DAYS) -> Dict[str, Any]:
+        """Dashboard aggregates: all-time, recent window, and per task type."""
+        return {
+            'agent_name': agent,
+            'all_time': self.summary(agent, days=None),
+            'recent': self.summary(agent, days=days),
+            'by_task_type': {t: self.summary(agent, t, days=days) for t in self.task_types(agent)},
+        }
+
+
+def _fmt(value: Optional[float], unit: str = '', digits: int = 0) -> str:
+    return '-' if value is None else f"{value:,.{digits}f}{unit}"
+
+
+def _print_summary(label: str, m: Dict[str, Any]) -> None:
+    rate = None if m['success_rate'] is None else m['success_rate'] * 100
+    print(f"  {label:14s} tasks {m['total_tasks']:>6,}  success {_fmt(rate, '%', 1):>6}  "
+          f"quality {_fmt(m['avg_quality'], '', 1):>5}  p50 {_fmt(m['p50_time_ms'], ' ms'):>10}  "
+          f"p90 {_fmt(m['p90_time_ms'], ' ms'):>10}  tokens {_fmt(m['avg_tokens']):>7}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Incremental agent performance rollups')
+    parser.add_argument('--db', default=str(DB_FILE), help='Rollup database (default: ~/.claude/logs/agent_metrics.db)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help='Record one outcome or evaluation')
+    record_parser.add_argument('agent', help='Agent name')
+    record_parser.add_argument('--task-type', default='unknown', help='Task type')
+    outcome = record_parser.add_mutually_exclusive_group(required=True)
+    outcome.add_argument('--success', action='store_true', help='Task succeeded')
+    outcome.add_argument('--failure', action='store_true', help='Task failed')
+    record_parser.add_argument('--quality', type=float, help='Quality score (0-100)')
+    record_parser.add_argument('--time-ms', type=float, help='Time taken in ms')
+    record_parser.add_argument('--tokens', type=float, help='Tokens used')
+    record_parser.add_argument('--insights', type=int, default=0, help='Insights extracted')
+    record_parser.add_argument('--id', help='Event ID (recorded at most once)')
+
+    ingest_parser = subparsers.add_parser('ingest', help='Fold new lines of the outcome log')
+    ingest_parser.add_argument('--log', default=str(OUTCOMES_LOG), help='JSONL outcome log')
+
+    summary_parser = subparsers.add_parser('summary', help='Aggregates for one agent')
+    summary_parser.add_argument('agent', help='Agent name')
+    summary_parser.add_argument('--task-type', default=ALL, help='Task type (default: all)')
+    summary_parser.add_argument('--days', type=int, default=DEFAULT_WINDOW_DAYS, help='Window (0 = all time)')
+    summary_parser.add_argument('--json', action='store_true', help='Print JSON')
+
+    dashboard_parser = subparsers.add_parser('dashboard', help='Dashboard for one or all agents')
+    dashboard_parser.add_argument('agent', nargs='?', help='Agent name (default: all)')
+    dashboard_parser.add_argument('--days', type=int, default=DEFAULT_WINDOW_DAYS, help='Recent window')
+
+    bench_parser = subparsers.add_parser('bench', help='Update and read latency on synthetic events')
+    bench_parser.add_argument('--events', type=int, default=200_000, help='Events (default: 200,000)')
+    bench_parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        import random
+        rng = random.Random(args.seed)
+        store = MetricsRollup(':memory:')
+        start_day = datetime.now(timezone.utc) - timedelta(days=90)
+        events = [{
+            'id': f"e{k}", 'agent': f"agent-{rng.randrange(10)}",
+            'task_type': rng.choice(['research', 'code', 'debug', 'review']),
+            'success': rng.random() < 0.8, 'quality_score': rng.uniform(40, 100),
+            'time_taken_ms': rng.lognormvariate(10, 1), 'tokens_used': rng.randrange(1000, 50000),
+            'timestamp': (start_day + timedelta(days=90 * k / args.events)).isoformat(),
+        } for k in range(args.events)]
+        t0 = time.perf_counter()
+        for lo in range(0, len(events), 1000):
+            store.record_many(events[lo:lo + 1000])
+        write = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(100):
+            store.summary('agent-3', days=30)
+        read = (time.perf_counter() - t0) / 100
+        exact = sorted(e['time_taken_ms'] for e in events if e['agent'] == 'agent-3')
+        approx = store.summary('agent-3', days=None)['p90_time_ms']
+        true_p90 = exact[int(0.9 * (len(exact) - 1))]
+        print(f"Recorded {args.events:,} events in {write:.2f} s ({write / args.events * 1e6:.0f} µs/event)")
+        print(f"30-day summary read: {read * 1000:.2f} ms (independent of event count)")
+        print(f"All-time p90 latency: sketch {approx:,.0f} ms vs exact {true_p90:,.0f} ms "
+              f"({abs(approx - true_p90) / true_p90:.2%} error)")
+        return
+
+    store = MetricsRollup(args.db)
+    if args.command == 'record':
+        recorded = store.record(args.agent, args.task_type, args.success, quality=args.quality,
+                                time_ms=args.time_ms, tokens=args.tokens, insights=args.insights,
+                                event_id=args.id)
+        print("✅ Recorded" if recorded else "Already recorded (duplicate event ID)")
+    elif args.command == 'ingest':
+        print(f"✅ Ingested {store.ingest(args.log)} new events from {args.log}")
+    elif args.command == 'summary':
+        metrics = store.summary(args.agent, args.task_type, days=args.days or None)
+        if args.json:
+            print(json.dumps(metrics, indent=2))
+        else:
+            print(f"{args.agent} ({metrics['period']}, task type {args.task_type})")
+            _print_summary('', metrics)
+            if 'quality_trend' in metrics:
+                print(f"  Quality trend {metrics['quality_trend']:+.1f}; improving: {metrics['improving']}")
+    else:
+        agents = [args.agent] if args.agent else store.agents()
+        if not agents:
+            print("No metrics recorded yet.")
+        for agent in agents:
+            board = store.dashboard(agent, args.days)
+            print(f"\n{agent}")
+            _print_summary('all time', board['all_time'])
+            _print_summary(f"last {args.days} days", board['recent'])
+            for task_type, metrics in board['by_task_type'].items():
+                _print_summary(f"  {task_type}", metrics)
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
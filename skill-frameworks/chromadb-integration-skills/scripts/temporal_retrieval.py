@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Temporal-decay retrieval over the skill_memory collection.
+
+Python version of the SKILL.md Temporal Decay and Query Optimization patterns:
+
+1. Prefilter in ChromaDB with a `where` clause (task type, agent, success,
+   maximum age). Age filtering needs a numeric timestamp, so outcomes carry
+   `timestamp_epoch` (seconds) next to the ISO `timestamp` string;
+   `sync-outcomes-to-chroma.py` writes both and `backfill` adds the field to
+   records synced before it existed.
+2. Over-fetch `n_results * overfetch` candidates.
+3. Re-rank all candidates at once with NumPy:
+       combined = 0.7 * (1 - distance) + 0.3 * exp(-age_days / 30)
+4. Cache the ranked result per (query, filters, reference time) for a short
+   TTL, since the same task descriptions are looked up repeatedly within a
+   session. Callers get a copy, so mutating a result never alters the cache.
+
+Usage:
+    python temporal_retrieval.py query "fix flaky auth test" --task-type debug --max-age-days 90
+    python temporal_retrieval.py backfill
+    python temporal_retrieval.py bench --size 1000000 --queries 50
+"""
+
+import argparse
+import copy
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Run: pip install numpy")
+    sys.exit(1)
+
+CHROMA_DIR = Path.home() / ".claude" / "chroma_data"
+COLLECTION = "skill_memory"
+SECONDS_PER_DAY = 86400.0
+DECAY_DAYS = 30.0
+SEMANTIC_WEIGHT = 0.7
+OVERFETCH = 5
+CACHE_TTL = 60.0
+CACHE_SIZE = 256
+
+
+def _chromadb():
+    try:
+        import chromadb
+    except ImportError:
+        print("chromadb not installed. Run: pip install chromadb")
+        sys.exit(1)
+    return chromadb
+
+
+def to_epoch(timestamp: Any, default: Optional[float] = None) -> Optional[float]:
+    """
+    ISO-8601 string (naive = UTC) or number to epoch seconds.
+
+    Shared by sync-outcomes-to-chroma.py and consolidate_memories.py, so every
+    writer and reader of `timestamp_epoch` parses timestamps the same way.
+
+    Returns:
+        Epoch seconds, or `default` if the value is missing or unparseable
+    """
+    if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+        return float(timestamp)
+    if not isinstance(timestamp, str) or not timestamp:
+        return default
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        return default
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def build_where(task_type: Optional[str] = None, agent: Optional[str] = None,
+                success: Optional[bool] = None, max_age_days: Optional[float] = None,
+                now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Build a ChromaDB `where` clause from optional filters.
+
+    Returns:
+        None when no filter is set, a single condition, or an `$and` of several
+    """
+    conditions = []
+    if task_type:
+        conditions.append({"task_type": task_type})
+    if agent:
+        conditions.append({"agent": agent})
+    if success is not None:
+        conditions.append({"success": success})
+    if max_age_days is not None:
+        now = time.time() if now is None else now
+        conditions.append({"timestamp_epoch": {"$gte": now - max_age_days * SECONDS_PER_DAY}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def decay_scores(distances, epochs, now: float, decay_days: float = DECAY_DAYS,
+                 semantic_weight: float = SEMANTIC_WEIGHT):
+    """
+    Vectorized temporal-decay scoring.
+
+    Args:
+        distances: ChromaDB distances per candidate
+        epochs: Outcome timestamps (epoch seconds); NaN counts as fully decayed
+        now: Reference time (epoch seconds)
+        decay_days: Decay constant in days
+        semantic_weight: Weight of semantic score; decay gets the rest
+
+    Returns:
+        Tuple of (combined, semantic, decay) arrays
+    """
+    semantic = 1.0 - np.asarray(distances, dtype=float)
+    age_days = np.maximum(now - np.asarray(epochs, dtype=float), 0.0) / SECONDS_PER_DAY
+    decay = np.nan_to_num(np.exp(-age_days / decay_days), nan=0.0)
+    combined = semantic_weight * semantic + (1.0 - semantic_weight) * decay
+    return combined, semantic, decay
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire after a fixed time-to-live."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def get(self, key) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TemporalRetriever:
+    """Prefiltered, over-fetched, decay re-ranked queries with a TTL cache."""
+
+    def __init__(self, collection, decay_days: float = DECAY_DAYS,
+                 semantic_weight: float = SEMANTIC_WEIGHT, overfetch: int = OVERFETCH,
+                 cache_ttl: float = CACHE_TTL, cache_size: int = CACHE_SIZE):
+        """
+        Initialize retriever.
+
+        Args:
+            collection: ChromaDB collection (skill_memory)
+            decay_days: Decay constant in days (SKILL.md default 30)
+            semantic_weight: Semantic share of the combined score (default 0.7)
+            overfetch: Candidates fetched per requested result
+            cache_ttl: Seconds a cached result stays valid (0 disables caching)
+            cache_size: Maximum cached queries
+        """
+        self.collection = collection
+        self.decay_days = decay_days
+        self.semantic_weight = semantic_weight
+        self.overfetch = max(1, overfetch)
+        self.cache = TTLCache(cache_size, cache_ttl) if cache_ttl > 0 else None
+
+    def query(self, query_text: Optional[str] = None, n_results: int = 10,
+              query_embedding: Optional[List[float]] = None, now: Optional[float] = None,
+              **filters) -> List[Dict[str, Any]]:
+        """
+        Return the top results by combined semantic + recency score.
+
+        Args:
+            query_text: Query text (embedded by the collection)
+            n_results: Results to return
+            query_embedding: Precomputed embedding instead of query_text
+            now: Reference time (defaults to current time)
+            **filters: task_type, agent, success, max_age_days (see build_where)
+
+        Returns:
+            Ranked list of dicts with id, scores, metadata and document
+        """
+        if (query_text is None) == (query_embedding is None):
+            raise ValueError("Pass exactly one of query_text or query_embedding")
+        key = None
+        if self.cache is not None and query_text is not None:
+            # An explicit `now` is part of the key: decay and max_age_days depend on it
+            key = (query_text, n_results, now, tuple(sorted(filters.items())))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+        now = time.time() if now is None else now
+        request = {
+            "n_results": n_results * self.overfetch,
+            "include": ["metadatas", "distances", "documents"],
+        }
+        if query_text is not None:
+            request["query_texts"] = [query_text]
+        else:
+            request["query_embeddings"] = [query_embedding]
+        where = build_where(now=now, **filters)
+        if where is not None:
+            request["where"] = where
+
+        raw = self.collection.query(**request)
+        ids = raw["ids"][0]
+        if not ids:
+            results: List[Dict[str, Any]] = []
+        else:
+            metadatas = raw["metadatas"][0]
+            documents = (raw.get("documents") or [[None] * len(ids)])[0]
+            epochs = [m.get("timestamp_epoch", to_epoch(m.get("timestamp"))) if m else None
+                      for m in metadatas]
+            epochs = [np.nan if e is None else e for e in epochs]
+            combined, semantic, decay = decay_scores(
+                raw["distances"][0], epochs, now, self.decay_days, self.semantic_weight)
+            top = min(n_results, len(ids))
+            order = np.argpartition(-combined, top - 1)[:top]
+            order = order[np.argsort(-combined[order], kind='stable')]
+            results = [{
+                "id": ids[i],
+                "combined_score": float(combined[i]),
+                "semantic_score": float(semantic[i]),
+                "decay_factor": float(decay[i]),
+                "metadata": metadatas[i],
+                "document": documents[i],
+            } for i in order]
+
+        if key is not None:
+            self.cache.put(key, copy.deepcopy(results))
+        return results
+
+
+def backfill(collection, batch_size: int = 1000) -> int:
+    """
+    Add `timestamp_epoch` to records that only have the ISO timestamp.
+
+    Returns:
+        Number of records updated
+    """
+    updated = 0
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+        if not page["ids"]:
+            return updated
+        ids, metadatas = [], []
+        for record_id, metadata in zip(page["ids"], page["metadatas"]):
+            metadata = metadata or {}
+            if "timestamp_epoch" in metadata:
+                continue
+            epoch = to_epoch(metadata.get("timestamp"))
+            if epoch is None:
+                continue
+            ids.append(record_id)
+            metadatas.append({**metadata, "timestamp_epoch": epoch})
+        if ids:
+            collection.update(ids=ids, metadatas=metadatas)
+            updated += len(ids)
+        offset += len(page["ids"])
+
+
+def _percentiles(samples: List[float]) -> str:
+    ms = np.asarray(samples) * 1000
+    return f"p50 {np.percentile(ms, 50):7.2f} ms   p95 {np.percentile(ms, 95):7.2f} ms"
+
+
+def bench(size: int, queries: int, dim: int, n_results: int, seed: int) -> None:
+    """Latency benchmark on a synthetic in-memory outcome collection."""
+    chromadb = _chromadb()
+    rng = np.random.default_rng(seed)
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection(f"bench_{seed}_{size}", metadata={"hnsw:space": "cosine"})
+
+    now = time.time()
+    task_types = np.array(["debug", "implement", "research", "architecture", "security"])
+    agents = np.array([f"agent-{i}" for i in range(20)])
+    max_batch = getattr(client, "get_max_batch_size", lambda: 5000)()
+
+    print(f"Building synthetic {COLLECTION} with {size:,} outcomes (dim {dim})...")
+    start = time.perf_counter()
+    for lo in range(0, size, max_batch):
+        hi = min(lo + max_batch, size)
+        count = hi - lo
+        ages = rng.exponential(120.0, count) * SECONDS_PER_DAY
+        kinds = rng.integers(0, len(task_types), count)
+        who = rng.integers(0, len(agents), count)
+        wins = rng.random(count) < 0.7
+        collection.add(
+            ids=[f"o{i}" for i in range(lo, hi)],
+            embeddings=rng.standard_normal((count, dim)).astype(np.float32).tolist(),
+            metadatas=[{
+                "task_type": str(task_types[k]), "agent": str(agents[a]), "success": bool(s),
+                "timestamp_epoch": float(now - age),
+            } for k, a, s, age in zip(kinds, who, wins, ages)],
+        )
+    print(f"Built in {time.perf_counter() - start:.1f} s\n")
+
+    probes = rng.standard_normal((queries, dim)).astype(np.float32).tolist()
+    retriever = TemporalRetriever(collection, cache_ttl=0)
+    scenarios = [
+        ("no filter", {}),
+        ("task_type prefilter", {"task_type": "debug"}),
+        ("task_type + success + 90 days", {"task_type": "debug", "success": True, "max_age_days": 90}),
+    ]
+    for label, filters in scenarios:
+        samples = []
+        for probe in probes:
+            t0 = time.perf_counter()
+            retriever.query(query_embedding=probe, n_results=n_results, now=now, **filters)
+            samples.append(time.perf_counter() - t0)
+        print(f"{label:32s} {_percentiles(samples)}")
+
+    # Post-filtering for comparison: over-fetch unfiltered, then drop non-matches
+    samples = []
+    for probe in probes:
+        t0 = time.perf_counter()
+        raw = collection.query(query_embeddings=[probe], n_results=n_results * OVERFETCH * 10,
+                               include=["metadatas", "distances"])
+        kept = [m for m in raw["metadatas"][0] if m["task_type"] == "debug" and m["success"]
+                and m["timestamp_epoch"] >= now - 90 * SECONDS_PER_DAY]
+        samples.append(time.perf_counter() - t0)
+    print(f"{'post-filter (same filters)':32s} {_percentiles(samples)}   (kept {len(kept)} of "
+          f"{n_results} wanted on the last query)")
+
+    distances = rng.random(n_results * OVERFETCH)
+    epochs = now - rng.exponential(120.0, n_results * OVERFETCH) * SECONDS_PER_DAY
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        decay_scores(distances, epochs, now)
+    print(f"{'re-rank only':32s} {(time.perf_counter() - t0):7.3f} ms per query "
+          f"({n_results * OVERFETCH} candidates)")
+
+    cache = TTLCache()
+    cache.put(("probe", n_results, ()), [])
+    t0 = time.perf_counter()
+    for _ in range(10000):
+        cache.get(("probe", n_results, ()))
+    print(f"{'cache hit':32s} {(time.perf_counter() - t0) / 10:7.4f} ms")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Temporal-decay retrieval over skill_memory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    query_parser = subparsers.add_parser('query', help='Ranked lookup of similar past outcomes')
+    query_parser.add_argument('text', help='Task description to match')
+    query_parser.add_argument('-n', '--n-results', type=int, default=10, help='Results (default: 10)')
+    query_parser.add_argument('--task-type', help='Only this task type')
+    query_parser.add_argument('--agent', help='Only this agent/skill')
+    query_parser.add_argument('--success', choices=['true', 'false'], help='Only successes or failures')
+    query_parser.add_argument('--max-age-days', type=float, help='Only outcomes newer than this')
+    query_parser.add_argument('--decay-days', type=float, default=DECAY_DAYS, help='Decay constant (default: 30)')
+
+    backfill_parser = subparsers.add_parser('backfill', help='Add timestamp_epoch to existing records')
+    backfill_parser.add_argument('--batch-size', type=int, default=1000, help='Records per page (default: 1000)')
+
+    bench_parser = subparsers.add_parser('bench', help='Latency benchmark on a synthetic collection')
+    bench_parser.add_argument('--size', type=int, default=1_000_000, help='Outcomes (default: 1,000,000)')
+    bench_parser.add_argument('--queries', type=int, default=50, help='Queries per scenario (default: 50)')
+    bench_parser.add_argument('--dim', type=int, default=64, help='Embedding dimension (default: 64)')
+    bench_parser.add_argument('-n', '--n-results', type=int, default=10, help='Results (default: 10)')
+    bench_parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+
+    for sub in (query_parser, backfill_parser):
+        sub.add_argument('--chroma-dir', default=str(CHROMA_DIR), help='ChromaDB data directory')
+
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        bench(args.size, args.queries, args.dim, args.n_results, args.seed)
+        return
+
+    client = _chromadb().PersistentClient(path=args.chroma_dir)
+    try:
+        collection = client.get_collection(COLLECTION)
+    except Exception:
+        print(f"Collection {COLLECTION} not found. Run sync-outcomes-to-chroma.py first.")
+        sys.exit(1)
+
+    if args.command == 'backfill':
+        print(f"Added timestamp_epoch to {backfill(collection, args.batch_size)} records.")
+        return
+
+    success = None if args.success is None else args.success == 'true'
+    retriever = TemporalRetriever(collection, decay_days=args.decay_days)
+    results = retriever.query(args.text, n_results=args.n_results, task_type=args.task_type,
+                              agent=args.agent, success=success, max_age_days=args.max_age_days)
+    if not results:
+        print("No matching outcomes.")
+        return
+    for rank, result in enumerate(results, 1):
+        meta = result["metadata"] or {}
+        print(f"{rank:2d}. {result['combined_score']:.3f} "
+              f"(semantic {result['semantic_score']:.3f}, recency {result['decay_factor']:.3f}) "
+              f"[{meta.get('task_type', '?')}/{meta.get('agent', '?')}] {meta.get('description', result['id'])}")
+
+
+if __name__ == '__main__':
+    main()
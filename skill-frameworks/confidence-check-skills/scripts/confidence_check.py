@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+"""
+Confidence check engine with a cached repository index.
+
+Scores the five factors of the confidence-check skill:
+
+    confidence = duplicate × 0.25 + architecture × 0.25 + docs × 0.20
+               + oss × 0.15 + rootcause × 0.15
+
+Duplicate Detection, Architecture Alignment and Documentation Review are
+answered from a repository index rather than fresh Glob/Grep passes:
+
+- Per file: mtime/size, symbols (def/class/function/fn/struct/... with line),
+  markdown headings, the word set of documentation files, and the declared
+  dependencies of manifests (package.json, requirements*.txt, pyproject.toml,
+  Cargo.toml, go.mod).
+- In memory: inverted indexes from word stems to paths, symbols and docs, so
+  each lookup costs a few dictionary probes.
+
+The index is cached in `.claude/confidence-index.json` under the repository
+root, with each file's word stems precomputed. Before a check, only files whose
+mtime or size changed are re-parsed. `watch` (needs watchdog) keeps the index
+in memory, updates it from file events and answers checks over a Unix socket
+(`.claude/confidence-index.sock`); `check` uses it when it is running, so a
+repeated check costs a socket round trip instead of a tree walk.
+
+OSS Reference needs a web search, so its score is passed in (`--oss`). Root
+Cause Analysis applies the skill's five bug clarity checks to `--problem`
+text; without one, the feature request is scored on requirement clarity
+(action, subject, target, no vague wording) instead.
+
+Usage:
+    python confidence_check.py check "Implement JWT authentication middleware" \\
+        --root . --language typescript --framework express --oss 1.0
+    python confidence_check.py index --root .
+    python confidence_check.py watch --root .
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+INDEX_VERSION = 1
+CACHE_NAME = '.claude/confidence-index.json'
+MAX_PARSE_BYTES = 1024 * 1024
+
+WEIGHTS = {'duplicate': 0.25, 'architecture': 0.25, 'docs': 0.20, 'oss': 0.15, 'rootcause': 0.15}
+FACTOR_NAMES = {
+    'duplicate': 'Duplicate Detection', 'architecture': 'Architecture Alignment',
+    'docs': 'Documentation Review', 'oss': 'OSS Reference', 'rootcause': 'Root Cause Analysis',
+}
+AGENT_THRESHOLDS = {
+    'security-audit-agent': 0.95, 'implementor': 0.90, 'developer-agent': 0.90,
+    'frontend-ui-developer': 0.85, 'research-specialist': 0.75, 'documentation-writer': 0.70,
+}
+
+SKIP_DIRS = {'.git', '.hg', '.svn', 'node_modules', '.venv', 'venv', 'env', '__pycache__', 'dist',
+             'build', 'target', '.next', '.nuxt', '.tox', '.mypy_cache', '.pytest_cache', 'vendor',
+             '.idea', '.vscode', 'coverage', '.claude'}
+CODE_LANGUAGES = {
+    '.py': 'python', '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript',
+    '.ts': 'typescript', '.tsx': 'typescript', '.rs': 'rust', '.go': 'go', '.java': 'java',
+    '.kt': 'kotlin', '.rb': 'ruby', '.php': 'php', '.cs': 'csharp', '.swift': 'swift',
+    '.c': 'c', '.h': 'c', '.cpp': 'cpp', '.hpp': 'cpp', '.sh': 'shell',
+}
+DOC_EXTENSIONS = {'.md', '.mdx', '.rst'}
+MANIFESTS = {'package.json': 'javascript', 'requirements.txt': 'python', 'pyproject.toml': 'python',
+             'setup.py': 'python', 'Cargo.toml': 'rust', 'go.mod': 'go'}
+# Languages that share a toolchain count as aligned
+LANGUAGE_FAMILIES = {'typescript': 'javascript', 'javascript': 'javascript'}
+
+SYMBOL_PATTERN = re.compile(
+    r'^\s*(?:export\s+)?(?:default\s+)?(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?'
+    r'(?:def|class|function\*?|fn|struct|enum|trait|interface|type|func(?:\s*\([^)]*\))?)\s+([A-Za-z_]\w*)'
+    r'|^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_]\w*)\s*=\s*(?:async\s*)?(?:\([^)]*\)\s*=>|function)',
+    re.M)
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+(.+?)\s*#*$', re.M)
+WORD_PATTERN = re.compile(r'[A-Za-z][A-Za-z0-9]*')
+CAMEL_PATTERN = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'that', 'this', 'from', 'into', 'onto', 'our', 'your', 'new',
+    'add', 'adds', 'adding', 'implement', 'implementing', 'create', 'creating', 'build', 'building',
+    'make', 'making', 'support', 'feature', 'use', 'using', 'fix', 'update', 'write', 'should', 'need',
+    'want', 'some', 'all', 'any', 'are', 'was', 'will', 'can', 'api', 'app', 'src', 'lib', 'index',
+    'main', 'test', 'tests', 'spec', 'md', 'js', 'ts', 'py', 'rs',
+}
+NEGATIVE_RULE = re.compile(r"\b(?:don't|do not|never|avoid|no longer|not use|forbidden|prohibited)\b", re.I)
+SUFFIXES = ('ations', 'ation', 'ings', 'ing', 'ers', 'er', 'ed', 'es', 's', 'e')
+FEATURE_ACTIONS = re.compile(
+    r'\b(?:add|implement|create|build|support|introduce|expose|integrate|migrate|replace|refactor|'
+    r'extract|remove|rename|enable|allow|generate|cache|validate|convert|port)\b')
+FEATURE_TARGET = re.compile(r'\b(?:for|to|in|into|on|from|with|via|using|across|between)\s+\S+')
+VAGUE_WORDING = re.compile(r'\b(?:something|somehow|stuff|things?|etc|maybe|better|nicer|improve it|fix it)\b')
+
+
+def stem(word: str) -> str:
+    """Crude suffix-strip + prefix stem: cache/caching/cached and authenticate/authentication collide."""
+    word = word.lower()
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    return word[:6]
+
+
+def words(text: str) -> List[str]:
+    """Split text and identifiers (camelCase, snake_case, kebab-case) into lowercase words."""
+    out = []
+    for token in WORD_PATTERN.findall(text):
+        out.extend(part.lower() for part in CAMEL_PATTERN.findall(token))
+    return out
+
+
+def keywords(text: str) -> List[str]:
+    """Distinct stems of the meaningful words in a feature description."""
+    seen = dict.fromkeys(stem(w) for w in words(text) if len(w) > 2 and w not in STOPWORDS)
+    return list(seen)
+
+
+# -- file parsing ---------------------------------------------------------------
+
+def _manifest_deps(name: str, text: str) -> List[str]:
+    deps: Set[str] = set()
+    try:
+        if name == 'package.json':
+            data = json.loads(text)
+            for section in ('dependencies', 'devDependencies', 'peerDependencies'):
+                deps.update((data.get(section) or {}).keys())
+        elif name.startswith('requirements') and name.endswith('.txt'):
+            for line in text.splitlines():
+                match = re.match(r'\s*([A-Za-z0-9_.\-]+)', line)
+                if match and not line.lstrip().startswith(('#', '-')):
+                    deps.add(match.group(1))
+        elif name in ('pyproject.toml', 'Cargo.toml') and tomllib is not None:
+            data = tomllib.loads(text)
+            project = data.get('project', {})
+            for spec in project.get('dependencies', []):
+                deps.add(re.split(r'[\s<>=!~;\[]', spec, 1)[0])
+            for extra in project.get('optional-dependencies', {}).values():
+                deps.update(re.split(r'[\s<>=!~;\[]', spec, 1)[0] for spec in extra)
+            poetry = data.get('tool', {}).get('poetry', {})
+            deps.update(k for k in poetry.get('dependencies', {}) if k != 'python')
+            for section in ('dependencies', 'dev-dependencies', 'build-dependencies'):
+                deps.update(data.get(section, {}).keys())
+        elif name in ('pyproject.toml', 'Cargo.toml'):
+            deps.update(re.findall(r'^\s*([A-Za-z0-9_\-]+)\s*=', text, re.M))
+        elif name == 'go.mod':
+            deps.update(m.rsplit('/', 1)[-1] for m in re.findall(r'^\s*(?:require\s+)?([\w.\-]+/[\w.\-/]+)\s+v', text, re.M))
+    except (ValueError, AttributeError, TypeError):
+        pass
+    return sorted(d.lower() for d in deps if d)
+
+
+def parse_file(path: Path, rel: str, stat: os.stat_result) -> Dict[str, Any]:
+    """Index entry for one file: symbols, headings, doc words, manifest dependencies."""
+    entry: Dict[str, Any] = {'m': stat.st_mtime_ns, 's': stat.st_size,
+                             'ps': sorted({stem(w) for w in words(rel)})}
+    suffix = path.suffix.lower()
+    name = path.name
+    is_manifest = name in MANIFESTS or (name.startswith('requirements') and name.endswith('.txt'))
+    if suffix not in CODE_LANGUAGES and suffix not in DOC_EXTENSIONS and not is_manifest:
+        return entry
+    if stat.st_size > MAX_PARSE_BYTES:
+        return entry
+    try:
+        text = path.read_text(encoding='utf-8', errors='replace')
+    except OSError:
+        return entry
+
+    if suffix in CODE_LANGUAGES:
+        entry['lang'] = CODE_LANGUAGES[suffix]
+        symbols = []
+        for match in SYMBOL_PATTERN.finditer(text):
+            symbol = match.group(1) or match.group(2)
+            symbols.append([symbol, text.count('\n', 0, match.start()) + 1,
+                            sorted({stem(w) for w in words(symbol)})])
+        entry['sym'] = symbols
+    if suffix in DOC_EXTENSIONS:
+        entry['h'] = [[m.group(1), text.count('\n', 0, m.start()) + 1] for m in HEADING_PATTERN.finditer(text)]
+        entry['w'] = sorted({stem(w) for w in words(text) if len(w) > 2})
+    if is_manifest:
+        entry['deps'] = _manifest_deps(name, text)
+        entry['manifest'] = MANIFESTS.get(name, 'python')
+    if name.upper().startswith('CLAUDE') and suffix == '.md':
+        entry['rules'] = [line.strip() for line in text.splitlines() if NEGATIVE_RULE.search(line)]
+    return entry
+
+
+def is_doc_path(rel: str) -> bool:
+    """The skill's doc glob: **/{docs,documentation,README,CLAUDE}*.md and anything under docs/."""
+    parts = rel.split('/')
+    name = parts[-1]
+    if Path(name).suffix.lower() not in DOC_EXTENSIONS:
+        return False
+    if any(p.lower() in ('docs', 'doc', 'documentation') for p in parts[:-1]):
+        return True
+    return name.lower().startswith(('readme', 'claude', 'docs', 'documentation'))
+
+
+# -- index ------------------------------------------------------------------------
+
+class RepoIndex:
+    """Cached per-file index plus in-memory inverted indexes."""
+
+    def __init__(self, root: str, cache_path: Optional[str] = None):
+        """
+        Load the cached index (if any) for a repository.
+
+        Args:
+            root: Repository root
+            cache_path: Cache file (default: <root>/.claude/confidence-index.json)
+        """
+        self.root = Path(root).resolve()
+        self.cache_path = Path(cache_path) if cache_path else self.root / CACHE_NAME
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        self._load()
+        self._build()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION and data.get('root') == str(self.root):
+            self.files = data.get('files', {})
+
+    def save(self) -> None:
+        """Write the cache atomically."""
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix('.tmp')
+        payload = {'version': INDEX_VERSION, 'root': str(self.root), 'saved_at': time.time(),
+                   'files': self.files}
+        tmp.write_text(json.dumps(payload, separators=(',', ':')))
+        os.replace(tmp, self.cache_path)
+        self.dirty = False
+
+    def _walk(self) -> Iterable[Tuple[str, Path, os.stat_result]]:
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    path = Path(entry.path)
+                    yield path.relative_to(self.root).as_posix(), path, entry.stat(follow_symlinks=False)
+
+    def refresh(self) -> Dict[str, int]:
+        """Stat every file, re-parse only new or changed ones, drop deleted ones."""
+        seen = set()
+        changed = 0
+        for rel, path, stat in self._walk():
+            seen.add(rel)
+            old = self.files.get(rel)
+            if old is None or old['m'] != stat.st_mtime_ns or old['s'] != stat.st_size:
+                self.files[rel] = parse_file(path, rel, stat)
+                changed += 1
+        removed = [rel for rel in self.files if rel not in seen]
+        for rel in removed:
+            del self.files[rel]
+        if changed or removed:
+            self.dirty = True
+            self._build()
+        return {'files': len(self.files), 'changed': changed, 'removed': len(removed)}
+
+    def update_paths(self, paths: Iterable[str]) -> int:
+        """Re-index specific paths (from file events); returns entries touched."""
+        touched = 0
+        for raw in paths:
+            path = Path(raw)
+            try:
+                rel = path.resolve().relative_to(self.root).as_posix()
+            except ValueError:
+                continue
+            if set(rel.split('/')[:-1]) & SKIP_DIRS:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                touched += self.files.pop(rel, None) is not None
+                continue
+            if path.is_file():
+                self.files[rel] = parse_file(path, rel, stat)
+                touched += 1
+        if touched:
+            self.dirty = True
+            self._build()
+        return touched
+
+    def _build(self) -> None:
+        """Inverted indexes: stem -> paths / symbols / docs."""
+        self.path_index: Dict[str, Set[str]] = defaultdict(set)
+        self.symbol_index: Dict[str, List[Tuple[str, str, int]]] = defaultdict(list)
+        self.symbol_names: Set[str] = set()
+        self.doc_index: Dict[str, Set[str]] = defaultdict(set)
+        self.docs: List[str] = []
+        self.languages: Counter = Counter()
+        self.manifest_languages: Set[str] = set()
+        self.dependencies: Set[str] = set()
+        self.rules: List[Tuple[str, str]] = []
+        for rel, entry in self.files.items():
+            for part in entry['ps']:
+                self.path_index[part].add(rel)
+            if 'lang' in entry:
+                self.languages[entry['lang']] += 1
+            for symbol, line, parts in entry.get('sym', ()):
+                self.symbol_names.add(symbol)
+                for part in parts:
+                    self.symbol_index[part].append((symbol, rel, line))
+            if 'w' in entry and is_doc_path(rel):
+                self.docs.append(rel)
+                for part in entry['w']:
+                    self.doc_index[part].add(rel)
+            if 'manifest' in entry and rel.count('/') <= 1:
+                self.manifest_languages.add(entry['manifest'])
+            self.dependencies.update(entry.get('deps', ()))
+            self.rules.extend((rel, rule) for rule in entry.get('rules', ()))
+
+    # -- lookups ----------------------------------------------------------------
+
+    def similar_files(self, stems: List[str]) -> List[str]:
+        """Paths whose name/directories contain at least min(2, len(stems)) of the keywords."""
+        need = min(2, len(stems))
+        counts: Counter = Counter()
+        for s in stems:
+            counts.update(self.path_index.get(s, ()))
+        return sorted(path for path, hits in counts.items() if hits >= need and 'lang' in self.files[path])
+
+    def similar_symbols(self, stems: List[str], pattern: Optional[str] = None) -> List[Tuple[str, str, int]]:
+        """Symbols matching the regex pattern, or sharing at least min(2, len(stems)) keywords."""
+        if pattern:
+            regex = re.compile(pattern, re.I)
+            names = [name for name in self.symbol_names if regex.search(name)]
+            return sorted({hit for name in names for s in {stem(w) for w in words(name)}
+                           for hit in self.symbol_index[s] if hit[0] == name})
+        need = min(2, len(stems))
+        counts: Counter = Counter()
+        for s in stems:
+            counts.update(set(self.symbol_index.get(s, ())))
+        return sorted(hit for hit, hits in counts.items() if hits >= need)
+
+    def relevant_docs(self, stems: List[str]) -> List[Dict[str, Any]]:
+        """Docs mentioning any keyword, most keywords first, with matching headings."""
+        counts: Counter = Counter()
+        for s in stems:
+            counts.update(self.doc_index.get(s, ()))
+        results = []
+        for rel, hits in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])):
+            headings = [(h, line) for h, line in self.files[rel].get('h', ())
+                        if {stem(w) for w in words(h)} & set(stems)]
+            results.append({'file': rel, 'keywords_matched': hits, 'sections': headings[:5]})
+        return results
+
+    def primary_language(self) -> Optional[str]:
+        if self.manifest_languages:
+            ranked = sorted(self.manifest_languages,
+                            key=lambda lang: -sum(n for l, n in self.languages.items()
+                                                  if LANGUAGE_FAMILIES.get(l, l) == lang))
+            return ranked[0]
+        return self.languages.most_common(1)[0][0] if self.languages else None
+
+
+# -- factors -----------------------------------------------------------------------
+
+def duplicate_factor(index: RepoIndex, stems: List[str], pattern: Optional[str] = None,
+                     semantic_distance: Optional[float] = None) -> Dict[str, Any]:
+    files = index.similar_files(stems)
+    symbols = index.similar_symbols(stems, pattern)
+    if files:
+        score, detail = 0.0, f"Found existing {', '.join(f'`{f}`' for f in files[:3])}"
+    elif symbols:
+        score, detail = 0.5, "Similar code: " + ', '.join(f"`{s}` ({p}:{l})" for s, p, l in symbols[:3])
+    elif semantic_distance is not None and semantic_distance < 0.3:
+        score, detail = 0.3, f"Semantically similar feature (distance {semantic_distance:.2f})"
+    else:
+        score, detail = 1.0, 'No similar files, symbols or semantic matches'
+    return {'score': score, 'detail': detail, 'files': files, 'symbols': [list(s) for s in symbols]}
+
+
+def architecture_factor(index: RepoIndex, language: Optional[str] = None,
+                        frameworks: Iterable[str] = ()) -> Dict[str, Any]:
+    stack = index.primary_language()
+    frameworks = [f.lower() for f in frameworks]
+    if language and stack and LANGUAGE_FAMILIES.get(language.lower(), language.lower()) != \
+            LANGUAGE_FAMILIES.get(stack, stack):
+        return {'score': 0.0, 'detail': f"Language mismatch: project is {stack}, proposal is {language}"}
+    new = [f for f in frameworks if f not in index.dependencies]
+    violated = [(rel, rule) for rel, rule in index.rules for f in frameworks if f in rule.lower()]
+    if violated:
+        rel, rule = violated[0]
+        return {'score': 0.3, 'detail': f"Conflicts with {rel}: \"{rule[:100]}\""}
+    if new:
+        return {'score': 0.5, 'detail': f"New dependency for this project: {', '.join(new)}"}
+    detail = f"Compatible with {stack or 'unknown stack'}"
+    if frameworks:
+        detail += f" + {', '.join(frameworks)}"
+    return {'score': 1.0, 'detail': detail}
+
+
+def docs_factor(index: RepoIndex, stems: List[str]) -> Dict[str, Any]:
+    """Score by the share of feature keywords the best-matching doc covers."""
+    if not index.docs:
+        return {'score': 0.5, 'detail': 'No documentation exists in the project', 'docs': []}
+    relevant = index.relevant_docs(stems)
+    if not relevant:
+        return {'score': 0.0, 'detail': f"{len(index.docs)} docs, none mention the feature", 'docs': []}
+    top = relevant[0]
+    coverage = top['keywords_matched'] / max(len(stems), 1)
+    where = f" ({top['sections'][0][0]}, line {top['sections'][0][1]})" if top['sections'] else ''
+    return {'score': round(min(coverage, 1.0), 2),
+            'detail': f"Review `{top['file']}`{where}: {top['keywords_matched']}/{len(stems)} keywords",
+            'docs': relevant[:10]}
+
+
+def _clarity(checks: Dict[str, bool], full: int, partial: int) -> Dict[str, Any]:
+    passed = sum(checks.values())
+    score = 1.0 if passed >= full else 0.6 if passed >= partial else 0.0
+    return {'score': score, 'detail': f"{passed}/{len(checks)} clarity checks: " +
+            ', '.join(name for name, ok in checks.items() if ok) if passed else f"0/{len(checks)} clarity checks"}
+
+
+def requirement_factor(feature: str) -> Dict[str, Any]:
+    """Requirement clarity for a feature request (the root cause factor when there is no bug)."""
+    text = feature.lower()
+    checks = {
+        'action stated': bool(FEATURE_ACTIONS.search(text)),
+        'subject named': len(keywords(feature)) >= 2,
+        'target given': bool(FEATURE_TARGET.search(text)),
+        'no vague wording': not VAGUE_WORDING.search(text),
+    }
+    return _clarity(checks, full=4, partial=2)
+
+
+def rootcause_factor(problem: str) -> Dict[str, Any]:
+    """The skill's five clarity checks on a bug or problem description."""
+    text = problem.lower()
+    checks = {
+        'symptoms described': any(k in text for k in ('error', 'fails', "doesn't work")),
+        'root cause identified': any(k in text for k in ('because', 'due to', 'caused by')),
+        'reproduction steps': len(re.findall(r'\d+\.\s+', problem)) >= 2,
+        'expected vs actual': 'expected' in text and 'actual' in text,
+        'context provided': len(problem) > 100,
+    }
+    return _clarity(checks, full=4, partial=2)
+
+
+def decide(confidence: float, agent: Optional[str] = None) -> Dict[str, Any]:
+    """Threshold rules; an agent-specific minimum replaces the 0.90 PROCEED bar."""
+    proceed = AGENT_THRESHOLDS.get(agent or '', 0.90)
+    if confidence >= proceed:
+        return {'decision': 'PROCEED', 'level': 'HIGH', 'threshold': proceed}
+    if confidence >= 0.70:
+        return {'decision': 'CLARIFY', 'level': 'MEDIUM', 'threshold': proceed}
+    return {'decision': 'STOP', 'level': 'LOW', 'threshold': proceed}
+
+
+def run_check(index: RepoIndex, feature: str, problem: Optional[str] = None, pattern: Optional[str] = None,
+              language: Optional[str] = None, frameworks: Iterable[str] = (), oss: Optional[float] = None,
+              semantic_distance: Optional[float] = None, agent: Optional[str] = None) -> Dict[str, Any]:
+    """Score all five factors for one feature request."""
+    stems = keywords(feature)
+    factors = {
+        'duplicate': duplicate_factor(index, stems, pattern, semantic_distance),
+        'architecture': architecture_factor(index, language, frameworks),
+        'docs': docs_factor(index, stems),
+        'oss': {'score': 0.0 if oss is None else oss,
+                'detail': 'Not assessed (pass --oss after a web search)' if oss is None
+                else 'Provided by caller'},
+        'rootcause': rootcause_factor(problem) if problem else requirement_factor(feature),
+    }
+    confidence = sum(WEIGHTS[name] * factor['score'] for name, factor in factors.items())
+    return {'feature': feature, 'keywords': stems, 'confidence': round(confidence, 4),
+            'factors': factors, **decide(confidence, agent)}
+
+
+def render(result: Dict[str, Any]) -> str:
+    """The skill's Confidence Check Results block."""
+    icon = {'PROCEED': '✅', 'CLARIFY': '⚠️', 'STOP': '❌'}[result['decision']]
+    lines = ['## Confidence Check Results', '',
+             f"**Overall Confidence**: {result['confidence']:.0%} ({result['level']}) {icon}", '',
+             f"**Decision**: {result['decision']} (threshold {result['threshold']:.0%})", '',
+             '### Breakdown', '', '| Factor | Score | Status | Details |',
+             '|--------|-------|--------|---------|']
+    for name, factor in result['factors'].items():
+        weight = WEIGHTS[name]
+        status = '✅ PASS' if factor['score'] >= 1.0 else '❌ FAIL' if factor['score'] <= 0 else '⚠️ PARTIAL'
+        lines.append(f"| {FACTOR_NAMES[name]} | {factor['score'] * weight * 100:.0f}/{weight * 100:.0f}% "
+                     f"| {status} | {factor['detail'].replace('|', '/')} |")
+    return '\n'.join(lines)
+
+
+def open_index(root: str, cache: Optional[str] = None) -> Tuple[RepoIndex, Dict[str, Any]]:
+    """Load the cached index and re-parse whatever changed since it was saved."""
+    index = RepoIndex(root, cache)
+    stats = index.refresh()
+    if index.dirty:
+        index.save()
+    return index, stats
+
+
+def socket_path(root: str, cache: Optional[str] = None) -> Path:
+    base = Path(cache) if cache else Path(root).resolve() / CACHE_NAME
+    return base.with_suffix('.sock')
+
+
+def ask_watcher(root: str, cache: Optional[str], request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Run a check in the watch process, or return None if none is listening."""
+    path = socket_path(root, cache)
+    if not path.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(5)
+            conn.connect(str(path))
+            conn.sendall(json.dumps(request).encode() + b'\n')
+            data = b''
+            while not data.endswith(b'\n'):
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        return json.loads(data)
+    except (OSError, ValueError):
+        return None
+
+
+def watch(root: str, cache: Optional[str] = None, interval: float = 1.0) -> None:
+    """Keep the index in memory, follow file events and serve checks until interrupted."""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        print("watchdog not installed. Run: pip install watchdog")
+        sys.exit(1)
+
+    index, stats = open_index(root, cache)
+    lock = threading.Lock()
+    pending: Set[str] = set()
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if not event.is_directory:
+                pending.add(event.src_path)
+                if getattr(event, 'dest_path', None):
+                    pending.add(event.dest_path)
+
+    class CheckHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+                with lock:
+                    index.update_paths(_drain(pending, index))
+                    result = run_check(index, **request)
+            except (ValueError, TypeError, re.error) as e:
+                result = {'error': str(e)}
+            self.wfile.write(json.dumps(result).encode() + b'\n')
+
+    path = socket_path(root, cache)
+    if path.exists():
+        if ask_watcher(root, cache, {'feature': 'ping'}) is not None:
+            print(f"Already watching {index.root} ({path})")
+            sys.exit(1)
+        path.unlink()
+    server = socketserver.ThreadingUnixStreamServer(str(path), CheckHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    observer = Observer()
+    observer.schedule(Handler(), str(index.root), recursive=True)
+    observer.start()
+    print(f"Indexed {stats['files']} files; watching {index.root}, serving checks on {path}")
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        while True:
+            time.sleep(interval)
+            with lock:
+                if index.update_paths(_drain(pending, index)):
+                    index.save()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        observer.stop()
+        observer.join()
+        server.shutdown()
+        server.server_close()
+        path.unlink(missing_ok=True)
+        if index.dirty:
+            index.save()
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _drain(pending: Set[str], index: RepoIndex) -> List[str]:
+    """Take queued event paths, ignoring the cache's own files."""
+    own = {index.cache_path.resolve(), index.cache_path.with_suffix('.tmp').resolve()}
+    batch = [p for p in list(pending) if Path(p).resolve() not in own]
+    pending.difference_update(batch)
+    return batch
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Confidence check with a cached repository index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    check_parser = subparsers.add_parser('check', help='Score a feature request')
+    check_parser.add_argument('feature', help='Feature description')
+    check_parser.add_argument('--problem', help='Bug or problem statement; without it, root cause scores the feature on requirement clarity')
+    check_parser.add_argument('--pattern', help='Regex for core logic symbols (e.g. "authenticate|jwt")')
+    check_parser.add_argument('--language', help='Proposed implementation language')
+    check_parser.add_argument('--framework', action='append', default=[], help='Proposed framework/library')
+    check_parser.add_argument('--oss', type=float, help='OSS reference score (0, 0.4, 0.7, 1.0)')
+    check_parser.add_argument('--semantic-distance', type=float, help='Best ChromaDB distance, if searched')
+    check_parser.add_argument('--agent', help='Agent type for agent-specific thresholds')
+    check_parser.add_argument('--json', action='store_true', help='Print JSON')
+
+    index_parser = subparsers.add_parser('index', help='Build or refresh the cached index')
+    watch_parser = subparsers.add_parser('watch', help='Keep the index current from file events')
+    for sub in (check_parser, index_parser, watch_parser):
+        sub.add_argument('--root', default='.', help='Repository root (default: .)')
+        sub.add_argument('--cache', help='Cache file (default: <root>/.claude/confidence-index.json)')
+
+    args = parser.parse_args()
+
+    if args.command == 'watch':
+        watch(args.root, args.cache)
+        return
+
+    if args.command == 'index':
+        start = time.perf_counter()
+        index, stats = open_index(args.root, args.cache)
+        print(f"✅ Indexed {stats['files']} files ({stats['changed']} parsed, {stats['removed']} removed) "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms -> {index.cache_path}")
+        return
+
+    if args.pattern:
+        try:
+            re.compile(args.pattern)
+        except re.error as e:
+            print(f"Error: invalid --pattern {args.pattern!r}: {e}")
+            sys.exit(1)
+
+    request = {'feature': args.feature, 'problem': args.problem, 'pattern': args.pattern,
+               'language': args.language, 'frameworks': args.framework, 'oss': args.oss,
+               'semantic_distance': args.semantic_distance, 'agent': args.agent}
+    start = time.perf_counter()
+    result = ask_watcher(args.root, args.cache, request)
+    if result is not None:
+        source = 'watch process'
+    else:
+        index, stats = open_index(args.root, args.cache)
+        result = run_check(index, **request)
+        source = f"{stats['files']} files, {stats['changed']} re-parsed"
+    if 'error' in result:
+        print(f"Error: {result['error']}")
+        sys.exit(1)
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(render(result))
+        print(f"\n_Index: {source}; {result['elapsed_ms']} ms_")
+
+
+if __name__ == '__main__':
+    main()